@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Мок-сервер API по спецификации проекта и нагрузочный клиент
+
+Разделы «### GET /api/v1/...» из 05_Решение_и_дизайн/спецификации_API.md
+превращаются в таблицу маршрутов: метод, шаблон пути ({id} — параметр),
+параметры запроса, пример тела запроса и пример ответа (JSON-блоки после
+«**Тело запроса:**» и «**Ответ:**»). Коды из раздела «Коды ошибок» служат
+ответами при --error-rate, Bearer-токен из раздела «Аутентификация»
+проверяется при --require-auth.
+
+Сервер написан на asyncio (HTTP/1.1 с keep-alive, без зависимостей):
+- --latency и --jitter — задержка ответа, мс (равномерно в ±jitter);
+- --rps — пропускная способность сервера: запросы сверх нее ждут своей
+  очереди, как на перегруженном бэкенде;
+- --concurrency — сколько запросов обрабатывается одновременно;
+- --route-latency 'POST /api/v1/analytics/reports/{id}/generate=800' —
+  своя задержка для маршрута.
+
+Нагрузочный клиент (--load URL или --bench, который поднимает мок в том же
+процессе) держит --clients соединений и отправляет --requests запросов
+по маршрутам спецификации; в отчете — запросов в секунду, ошибки и
+перцентили p50/p90/p99 времени ответа по каждому маршруту. С --load путь
+из URL добавляется перед путями спецификации, заголовок Host берется из
+URL, ответы читаются по Content-Length или по частям (chunked).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from report_writer import FORMATS, open_report
+
+
+SPEC_FILE = Path('05_Решение_и_дизайн') / 'спецификации_API.md'
+DEFAULT_PORT = 8080
+MAX_HEADER_LINES = 100
+
+ROUTE_HEADING = re.compile(r'^###\s+(GET|POST|PUT|PATCH|DELETE)\s+(/\S*)\s*$', re.M)
+SECTION_END = re.compile(r'^#{1,3} ', re.M)
+DESCRIPTION = re.compile(r'\*\*Описание:\*\*\s*(.*)')
+BLOCK_LABEL = re.compile(r'\*\*(Ответ|Тело запроса)[^*]*\*\*\s*```json\s*\n(.*?)\n```', re.S)
+PARAMETER = re.compile(r'^-\s*`(\w+)`\s*(\(optional\))?\s*:?\s*(.*)$', re.M)
+PATH_PARAMETER = re.compile(r'\{(\w+)\}')
+ERROR_CODE = re.compile(r'^-\s*`(\d{3})`\s*:\s*(.*?)\s*$', re.M)
+ERRORS_HEADING = re.compile(r'^##\s+Коды ошибок\s*$', re.M)
+REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized',
+           403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+PERCENTILES = (50, 90, 99)
+
+
+def parse_spec(text: str) -> Dict[str, Any]:
+    """Маршруты, коды ошибок и признак Bearer-аутентификации из спецификации"""
+    routes = []
+    for match in ROUTE_HEADING.finditer(text):
+        end = SECTION_END.search(text, match.end())
+        section = text[match.end():end.start() if end else len(text)]
+        method, path = match.group(1), match.group(2)
+        blocks = {label: body for label, body in BLOCK_LABEL.findall(section)}
+        description = DESCRIPTION.search(section)
+        params = [name for name, _, _ in PARAMETER.findall(section)]
+        path_params = PATH_PARAMETER.findall(path)
+        route = {
+            'method': method,
+            'path': path,
+            'name': f"{method} {path}",
+            'description': description.group(1).strip() if description else '',
+            'pattern': path_pattern(path),
+            'path_params': path_params,
+            'query_params': [name for name in params if name not in path_params],
+            'request': None,
+            'response': None,
+        }
+        for label, key in (('Тело запроса', 'request'), ('Ответ', 'response')):
+            if label in blocks:
+                try:
+                    route[key] = json.loads(blocks[label])
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{route['name']}: некорректный JSON в блоке «{label}»: {e}") from e
+        routes.append(route)
+
+    errors = {}
+    heading = ERRORS_HEADING.search(text)
+    if heading:
+        end = SECTION_END.search(text, heading.end())
+        errors = {int(code): message for code, message in ERROR_CODE.findall(
+            text[heading.end():end.start() if end else len(text)])}
+    return {'routes': routes, 'errors': errors, 'auth': 'Bearer' in text}
+
+
+def path_pattern(path: str) -> re.Pattern:
+    """/reports/{id}/generate → регулярное выражение с группой id"""
+    parts = PATH_PARAMETER.split(path)
+    # split чередует литералы и имена параметров
+    regex = ''.join(re.escape(part) if i % 2 == 0 else f"(?P<{part}>[^/]+)" for i, part in enumerate(parts))
+    return re.compile(f"^{regex}$")
+
+
+def load_spec(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        raise FileNotFoundError(f"Спецификация не найдена: {path}")
+    spec = parse_spec(path.read_text(encoding='utf-8'))
+    if not spec['routes']:
+        raise ValueError(f"{path.name}: нет разделов «### МЕТОД /путь»")
+    return spec
+
+
+def parse_route_options(items: List[str]) -> Dict[str, float]:
+    """--route-latency 'МЕТОД /путь=мс' → {'МЕТОД /путь': мс}"""
+    options = {}
+    for item in items:
+        name, sep, value = item.rpartition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"Ожидается 'МЕТОД /путь=мс': {item}")
+        try:
+            options[' '.join(name.split())] = float(value)
+        except ValueError:
+            raise ValueError(f"Задержка должна быть числом: {item}") from None
+    return options
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (отсортированный список)"""
+    if not values:
+        return math.nan
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+# --- Сервер ---
+
+class Throttle:
+    """Ограничение пропускной способности: не больше rps запросов в секунду, остальные ждут"""
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class MockServer:
+    """HTTP-сервер на asyncio, отвечающий примерами из спецификации"""
+
+    def __init__(self, spec: Dict[str, Any], latency: float = 0.0, jitter: float = 0.0, rps: float = 0.0,
+                 concurrency: int = 0, error_rate: float = 0.0, require_auth: bool = False,
+                 route_latency: Optional[Dict[str, float]] = None, seed: Optional[int] = None):
+        self.routes = spec['routes']
+        self.errors = [code for code in spec['errors'] if code >= 500] or [500]
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.throttle = Throttle(rps)
+        self.concurrency = concurrency
+        self.error_rate = error_rate
+        self.require_auth = require_auth and spec['auth']
+        self.route_latency = {name: value / 1000 for name, value in (route_latency or {}).items()}
+        unknown = set(self.route_latency) - {route['name'] for route in self.routes}
+        if unknown:
+            raise ValueError(f"Маршрутов нет в спецификации: {', '.join(sorted(unknown))}")
+        self.random = random.Random(seed)
+        self.served = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> int:
+        """Запускает сервер и возвращает порт (0 — свободный порт)"""
+        self._slots = asyncio.Semaphore(self.concurrency) if self.concurrency > 0 else None
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def match(self, method: str, path: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str], bool]:
+        """Маршрут, параметры пути и признак «путь есть, но метод другой»"""
+        path_known = False
+        for route in self.routes:
+            found = route['pattern'].match(path)
+            if found:
+                if route['method'] == method:
+                    return route, found.groupdict(), True
+                path_known = True
+        return None, {}, path_known
+
+    def respond(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any, str]:
+        """Код и тело ответа на запрос и имя маршрута (пустое, если маршрут не найден)"""
+        url = urlsplit(target)
+        route, path_params, path_known = self.match(method, url.path)
+        if route is None:
+            return (405, {'error': 'Метод не поддерживается'}, '') if path_known else \
+                (404, {'error': 'Ресурс не найден'}, '')
+        status, payload = self._route_response(route, path_params, method, url.query, headers, body)
+        return status, payload, route['name']
+
+    def _route_response(self, route: Dict[str, Any], path_params: Dict[str, str], method: str, query_string: str,
+                        headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if self.require_auth and not headers.get('authorization', '').startswith('Bearer '):
+            return 401, {'error': 'Требуется аутентификация'}
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.random.choice(self.errors), {'error': 'Внутренняя ошибка сервера'}
+        query = dict(parse_qsl(query_string))
+        unknown = sorted(set(query) - set(route['query_params']))
+        if unknown:
+            return 400, {'error': f"Неизвестные параметры: {', '.join(unknown)}"}
+        if body:
+            try:
+                json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return 400, {'error': 'Тело запроса — не JSON'}
+        if route['response'] is not None:
+            return 200, route['response']
+        # Для маршрутов без примера ответа — подтверждение с параметрами пути
+        return (202 if method != 'GET' else 200), {'status': 'accepted', **path_params}
+
+    async def _delay(self, route_name: str) -> None:
+        latency = self.route_latency.get(route_name, self.latency)
+        if self.jitter:
+            latency += self.random.uniform(-self.jitter, self.jitter)
+        await self.throttle.wait()
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if self._slots is not None:
+                    async with self._slots:
+                        status, payload = await self._process(method, target, headers, body)
+                else:
+                    status, payload = await self._process(method, target, headers, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(http_response(status, payload, keep_alive))
+                await writer.drain()
+                self.served += 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _process(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        status, payload, route_name = self.respond(method, target, headers, body)
+        await self._delay(route_name)
+        return status, payload
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Запрос HTTP/1.1: метод, адрес, заголовки (в нижнем регистре) и тело; None — соединение закрыто"""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError(f"Некорректная строка запроса: {line!r}")
+    headers = await _read_headers(reader)
+    body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+    return parts[0].upper(), parts[1], headers, body
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Слишком много заголовков")
+
+
+def http_response(status: int, payload: Any, keep_alive: bool = True) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+# --- Нагрузочный клиент ---
+
+def build_requests(routes: List[Dict[str, Any]], token: Optional[str] = None, host: str = 'localhost',
+                   base_path: str = '') -> List[Dict[str, Any]]:
+    """Запрос на каждый маршрут: параметры пути из примеров ответов или 'sample', тело — пример запроса
+
+    host — заголовок Host (хост и порт из URL нагрузки); base_path — путь из
+    URL, который добавляется перед путями спецификации, если они уже не
+    начинаются с него (http://host/api/v1 и /api/v1/users → /api/v1/users).
+    """
+    examples = [route['response'] for route in routes if route['response'] is not None]
+    base_path = base_path.rstrip('/')
+    requests = []
+    for route in routes:
+        values = {}
+        for name in route['path_params']:
+            example = _find_value(examples, name)
+            values[name] = str(example) if example is not None else 'sample'
+        path = PATH_PARAMETER.sub(lambda match: values[match.group(1)], route['path'])
+        if base_path and path != base_path and not path.startswith(base_path + '/'):
+            path = base_path + path
+        body = json.dumps(route['request'], ensure_ascii=False).encode('utf-8') if route['request'] else b''
+        headers = {'Host': host, 'Content-Length': str(len(body))}
+        if body:
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        head = f"{route['method']} {path} HTTP/1.1\r\n" + ''.join(f"{k}: {v}\r\n" for k, v in headers.items())
+        requests.append({'route': route['name'], 'method': route['method'],
+                         'data': (head + '\r\n').encode('utf-8') + body})
+    return requests
+
+
+def _find_value(data: Any, key: str) -> Any:
+    """Первое значение ключа в примере ответа (в том числе во вложенных списках)"""
+    if isinstance(data, dict):
+        if key in data and not isinstance(data[key], (dict, list)):
+            return data[key]
+        data = list(data.values())
+    if isinstance(data, list):
+        for item in data:
+            found = _find_value(item, key)
+            if found is not None:
+                return found
+    return None
+
+
+async def _client(host: str, port: int, requests: List[Dict[str, Any]], counter: List[int], total: int,
+                  results: Dict[str, Dict[str, list]]) -> None:
+    """Одно keep-alive соединение: берет запросы по очереди, пока не наберется total"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            request = requests[counter[0] % len(requests)]
+            counter[0] += 1
+            stats = results.setdefault(request['route'], {'times': [], 'errors': [], 'statuses': []})
+            started = time.perf_counter()
+            try:
+                writer.write(request['data'])
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("сервер закрыл соединение")
+                status = int(status_line.split()[1])
+                headers = await _read_headers(reader)
+                keep_alive = await _read_body(reader, headers, status, request['method'])
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                stats['errors'].append(str(e))
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            stats['times'].append(time.perf_counter() - started)
+            stats['statuses'].append(status)
+            if not keep_alive:
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str], status: int, method: str) -> bool:
+    """Дочитывает тело ответа; False, если соединение после ответа нельзя переиспользовать
+
+    Тело читается по Content-Length или по частям (Transfer-Encoding: chunked),
+    без них — до закрытия соединения сервером.
+    """
+    keep_alive = headers.get('connection', '').lower() != 'close'
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return keep_alive
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise ConnectionError("сервер закрыл соединение посреди ответа")
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                break
+            await reader.readexactly(size + 2)  # данные части и CRLF
+        await _read_headers(reader)  # завершающие заголовки (trailers) до пустой строки
+        return keep_alive
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length'] or 0))
+        return keep_alive
+    await reader.read()
+    return False
+
+
+async def run_load(url: str, routes: List[Dict[str, Any]], total: int, clients: int,
+                   token: Optional[str] = None) -> Dict[str, Any]:
+    """Отправляет total запросов через clients соединений и собирает время ответов по маршрутам"""
+    target = urlsplit(url if '://' in url else f"http://{url}")
+    if target.scheme != 'http':
+        raise ValueError("Поддерживается только http://")
+    requests = build_requests(routes, token, target.netloc.rsplit('@', 1)[-1] or 'localhost', target.path)
+    results: Dict[str, Dict[str, list]] = {}
+    counter = [0]
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(target.hostname or '127.0.0.1', target.port or 80, requests, counter, total,
+                                   results) for _ in range(max(1, min(clients, total)))))
+    return summarize(results, time.perf_counter() - started)
+
+
+def summarize(results: Dict[str, Dict[str, list]], duration: float) -> Dict[str, Any]:
+    """Перцентили времени ответа (мс), ошибки и пропускная способность по маршрутам и в целом"""
+    rows = []
+    all_times = []
+    for route, stats in results.items():
+        times = sorted(stats['times'])
+        all_times.extend(times)
+        failed = len(stats['errors']) + sum(status >= 400 for status in stats['statuses'])
+        rows.append({'route': route, 'requests': len(times) + len(stats['errors']), 'failed': failed,
+                     **{f"p{q}": percentile(times, q) * 1000 for q in PERCENTILES},
+                     'max': (times[-1] if times else math.nan) * 1000})
+    all_times.sort()
+    count = sum(row['requests'] for row in rows)
+    total = {'route': 'Все маршруты', 'requests': count, 'failed': sum(row['failed'] for row in rows),
+             **{f"p{q}": percentile(all_times, q) * 1000 for q in PERCENTILES},
+             'max': (all_times[-1] if all_times else math.nan) * 1000}
+    return {'routes': rows, 'total': total, 'duration': duration, 'rps': count / duration if duration else 0.0}
+
+
+async def bench(server: MockServer, routes: List[Dict[str, Any]], total: int, clients: int,
+                token: Optional[str]) -> Dict[str, Any]:
+    port = await server.start(port=0)
+    try:
+        return await run_load(f"http://127.0.0.1:{port}", routes, total, clients, token)
+    finally:
+        await server.stop()
+
+
+def _row(row: Dict[str, Any]) -> List[str]:
+    return [row['route'], row['requests'], row['failed'], *(f"{row[f'p{q}']:.1f}" for q in PERCENTILES),
+            f"{row['max']:.1f}"]
+
+
+def write_load_report(summary: Dict[str, Any], settings: List[Tuple[str, Any]], fmt: str, output: str) -> None:
+    with open_report(fmt, output) as writer:
+        writer.begin("⚡ Нагрузочный тест API")
+        writer.fields([("Дата запуска", datetime.now().strftime('%Y-%m-%d %H:%M')), *settings,
+                       ("Запросов в секунду", f"{summary['rps']:.1f}")])
+        writer.table(["Маршрут", "Запросов", "Ошибок", *(f"p{q}, мс" for q in PERCENTILES), "Макс., мс"],
+                     (_row(row) for row in [*summary['routes'], summary['total']]))
+        writer.end()
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    for row in [*summary['routes'], summary['total']]:
+        icon = '❌' if row['failed'] else '✅'
+        print(f"{icon} {row['route']}: {row['requests']} запросов, ошибок {row['failed']}, "
+              + ', '.join(f"p{q} {row[f'p{q}']:.1f} мс" for q in PERCENTILES) + f", макс. {row['max']:.1f} мс")
+    print(f"📊 {summary['total']['requests']} запросов за {summary['duration']:.2f} сек: "
+          f"{summary['rps']:.1f} запросов/сек")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Мок-сервер API по спецификации и нагрузочный тест')
+    parser.add_argument('--project', type=str, help=f'Путь к проекту (спецификация — {SPEC_FILE})')
+    parser.add_argument('--spec', type=str, help='Файл спецификации вместо проекта')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Порт сервера')
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа, мс')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Разброс задержки ±, мс')
+    parser.add_argument('--rps', type=float, default=0.0, help='Пропускная способность сервера, запросов/сек')
+    parser.add_argument('--concurrency', type=int, default=0, help='Одновременно обрабатываемых запросов')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов с ошибкой 5xx')
+    parser.add_argument('--require-auth', action='store_true', help='Требовать Bearer-токен')
+    parser.add_argument('--route-latency', action='append', default=[], metavar='"МЕТОД /путь=мс"',
+                        help='Задержка для отдельного маршрута')
+    parser.add_argument('--seed', type=int, help='Seed для задержек и ошибок')
+    parser.add_argument('--load', metavar='URL', help='Нагрузить запущенный сервер (мок или настоящий)')
+    parser.add_argument('--bench', action='store_true', help='Поднять мок и сразу нагрузить его')
+    parser.add_argument('--requests', type=int, default=1000, help='Число запросов нагрузочного теста')
+    parser.add_argument('--clients', type=int, default=10, help='Одновременных соединений клиента')
+    parser.add_argument('--token', default='test-token', help='Bearer-токен клиента')
+    parser.add_argument('--format', choices=FORMATS, default='md', help='Формат отчета (по умолчанию: md)')
+    parser.add_argument('--output', type=str, help='Файл отчета нагрузочного теста ("-" для вывода в stdout)')
+
+    args = parser.parse_args()
+    if args.spec:
+        spec_path = Path(args.spec)
+    elif args.project:
+        spec_path = Path(args.project) / SPEC_FILE
+    else:
+        print("❌ Укажите --project или --spec")
+        return
+    try:
+        spec = load_spec(spec_path)
+        server = MockServer(spec, args.latency, args.jitter, args.rps, args.concurrency, args.error_rate,
+                            args.require_auth, parse_route_options(args.route_latency), args.seed)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    if args.load or args.bench:
+        # При выводе отчета в консоль прогресс не печатается, чтобы не смешивать потоки
+        to_console = args.output == '-'
+        target = args.load or 'мок в этом процессе'
+        if not to_console:
+            print(f"🚀 {args.requests} запросов к {target} по {len(spec['routes'])} маршрутам, "
+                  f"соединений: {args.clients}")
+        try:
+            if args.bench:
+                summary = asyncio.run(bench(server, spec['routes'], args.requests, args.clients, args.token))
+            else:
+                summary = asyncio.run(run_load(args.load, spec['routes'], args.requests, args.clients, args.token))
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            return
+        if not to_console:
+            print_summary(summary)
+        if args.output:
+            settings = [("Сервер", target), ("Соединений", args.clients)]
+            if args.bench:
+                settings.append(("Задержка мока", f"{args.latency:.0f} ± {args.jitter:.0f} мс"))
+                settings.append(("Пропускная способность мока",
+                                 f"{args.rps:.0f} запросов/сек" if args.rps else "без ограничения"))
+            write_load_report(summary, settings, args.format, args.output)
+            if not to_console:
+                print(f"💾 Отчет: {args.output}")
+        return
+
+    async def serve():
+        port = await server.start(args.host, args.port)
+        print(f"✅ Мок API: http://{args.host}:{port} ({len(spec['routes'])} маршрутов из {spec_path.name})")
+        for route in spec['routes']:
+            print(f"   {route['name']}  {route['description']}")
+        print("   Ctrl+C — остановить")
+        await server.server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n📊 Обработано запросов: {server.served}")
+    except OSError as e:
+        print(f"❌ {e}")
+
+
+if __name__ == '__main__':
+    main()
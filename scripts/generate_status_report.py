@@ -4,11 +4,15 @@
 Генератор отчета о статусе проекта
 """
 
+import io
 import os
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable, Iterator
 import argparse
 
+from report_writer import FORMATS, MarkdownWriter, ReportWriter, open_report
+
 
 def count_files_in_section(section_path: Path) -> dict:
     """Подсчитывает файлы в секции проекта"""
@@ -72,23 +76,8 @@ def analyze_project_completeness(project_path: Path) -> dict:
     }
 
 
-def generate_report(project_path: Path) -> str:
-    """Генерирует отчет о статусе проекта"""
-    project_name = project_path.name
-    analysis = analyze_project_completeness(project_path)
-    
-    report = f"""# 📊 Отчет о статусе проекта: {project_name}
-
-**Дата создания:** {datetime.now().strftime('%Y-%m-%d %H:%M')}  
-**Общая готовность:** {analysis['completeness']}  
-**Всего файлов:** {analysis['total_files']}  
-**Пустых папок:** {analysis['total_empty_folders']}
-
-## 📈 Статистика по разделам
-
-| Раздел | Файлов | Папок | Пустых папок | Статус |
-|--------|---------|-------|--------------|---------|"""
-
+def iter_section_rows(analysis: dict) -> Iterator[tuple]:
+    """Строки таблицы статистики по разделам"""
     for section, stats in analysis['sections'].items():
         # Определяем статус секции
         if stats['files'] == 0:
@@ -98,28 +87,47 @@ def generate_report(project_path: Path) -> str:
         else:
             status = "✅ Готов"
         
-        report += f"\n| {section} | {stats['files']} | {stats['folders']} | {stats['empty_folders']} | {status} |"
+        yield (section, stats['files'], stats['folders'], stats['empty_folders'], status)
 
-    # Добавляем рекомендации
-    report += f"""
-
-## 🎯 Рекомендации
-
-### Приоритетные действия:"""
 
+def write_report(project_path: Path, writer: ReportWriter) -> None:
+    """Записывает отчет о статусе проекта в писатель"""
+    project_name = project_path.name
+    analysis = analyze_project_completeness(project_path)
+    
+    writer.begin(f"📊 Отчет о статусе проекта: {project_name}")
+    writer.fields([
+        ("Дата создания", datetime.now().strftime('%Y-%m-%d %H:%M')),
+        ("Общая готовность", analysis['completeness']),
+        ("Всего файлов", analysis['total_files']),
+        ("Пустых папок", analysis['total_empty_folders']),
+    ])
+    
+    writer.heading("📈 Статистика по разделам")
+    writer.table(
+        ["Раздел", "Файлов", "Папок", "Пустых папок", "Статус"],
+        iter_section_rows(analysis)
+    )
+    
+    # Добавляем рекомендации
+    writer.heading("🎯 Рекомендации")
+    writer.heading("Приоритетные действия:", level=3)
+    
     # Анализируем какие разделы нужно заполнить в первую очередь
     priority_sections = []
     for section, stats in analysis['sections'].items():
         if stats['files'] < 2:  # Мало файлов в секции
             priority_sections.append(section)
     
+    actions = []
     if priority_sections:
-        report += "\n- 🔥 **Заполните критически важные разделы:**"
-        for section in priority_sections[:3]:  # Топ 3
-            report += f"\n  - {section}"
+        actions.append(f"🔥 **Заполните критически важные разделы:** {', '.join(priority_sections[:3])}")  # Топ 3
     
     if analysis['total_empty_folders'] > 0:
-        report += f"\n- 📁 **Заполните {analysis['total_empty_folders']} пустых папок**"
+        actions.append(f"📁 **Заполните {analysis['total_empty_folders']} пустых папок**")
+    
+    if actions:
+        writer.bullet_list(actions)
     
     # Оценка времени до завершения
     if analysis['completeness'] == "Низкая":
@@ -129,27 +137,66 @@ def generate_report(project_path: Path) -> str:
     else:
         estimate = "Проект готов к передаче"
     
-    report += f"""
+    writer.heading(f"Оценка времени до готовности: {estimate}", level=3)
+    
+    writer.heading("📋 Следующие шаги")
+    writer.ordered_list([
+        "**Сегодня:** Заполните бриф проекта и основные требования",
+        "**На этой неделе:** Завершите анализ данных и создайте тест-кейсы",
+        "**На следующей неделе:** Подготовьте документацию для передачи",
+    ])
+    
+    writer.footer([
+        "Отчет сгенерирован автоматически. Для обновления запустите: "
+        "`python scripts/generate_status_report.py`"
+    ])
+    writer.end()
 
-### Оценка времени до готовности: {estimate}
 
-## 📋 Следующие шаги
+def generate_report(project_path: Path) -> str:
+    """Генерирует отчет о статусе проекта в виде Markdown-строки"""
+    buffer = io.StringIO()
+    write_report(project_path, MarkdownWriter(buffer))
+    return buffer.getvalue()
 
-1. **Сегодня:** Заполните бриф проекта и основные требования
-2. **На этой неделе:** Завершите анализ данных и создайте тест-кейсы  
-3. **На следующей неделе:** Подготовьте документацию для передачи
 
----
-*Отчет сгенерирован автоматически. Для обновления запустите: `python scripts/generate_status_report.py`*
-"""
-    
-    return report
+def find_projects(root: Path = Path('.')) -> Iterator[Path]:
+    """Находит аналитические проекты в каталоге (в порядке имен)
+
+    Общий поиск проектов для всех скриптов портфеля.
+    """
+    for item in sorted(root.iterdir()):
+        if item.is_dir() and not item.name.startswith('.') and not item.name == 'scripts':
+            # Проверяем, что это аналитический проект
+            if (item / '00_Администрирование').exists():
+                yield item
+
+
+def iter_portfolio_rows(projects: Iterable[Path]) -> Iterator[tuple]:
+    """Строки сводной таблицы по проектам (проекты анализируются по одному)"""
+    for project in projects:
+        analysis = analyze_project_completeness(project)
+        yield (project.name, analysis['completeness'], analysis['total_files'], analysis['total_empty_folders'])
+
+
+def write_portfolio_report(projects: Iterable[Path], writer: ReportWriter) -> int:
+    """Записывает сводный отчет по портфелю проектов, возвращает число проектов"""
+    writer.begin("📊 Статус портфеля проектов")
+    writer.fields([("Дата создания", datetime.now().strftime('%Y-%m-%d %H:%M'))])
+    count = writer.table(
+        ["Проект", "Готовность", "Файлов", "Пустых папок"],
+        iter_portfolio_rows(projects)
+    )
+    writer.end()
+    return count
 
 
 def main():
     parser = argparse.ArgumentParser(description='Генерация отчета о статусе проекта')
     parser.add_argument('--project', type=str, help='Путь к проекту')
     parser.add_argument('--all', action='store_true', help='Отчет по всем проектам')
+    parser.add_argument('--format', choices=FORMATS, default='md', help='Формат отчета (по умолчанию: md)')
+    parser.add_argument('--output', type=str, help='Файл отчета ("-" для вывода в stdout)')
     
     args = parser.parse_args()
     
@@ -159,35 +206,33 @@ def main():
             print(f"❌ Проект не найден: {project_path}")
             return
         
-        report = generate_report(project_path)
-        
-        # Сохраняем отчет
-        report_path = project_path / f"STATUS_REPORT_{datetime.now().strftime('%Y%m%d')}.md"
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report)
+        # Сохраняем отчет, записывая его в файл по мере формирования
+        report_path = args.output or project_path / f"STATUS_REPORT_{datetime.now().strftime('%Y%m%d')}.{args.format}"
+        with open_report(args.format, report_path) as writer:
+            write_report(project_path, writer)
         
-        print(f"✅ Отчет сохранен: {report_path}")
-        print("\n" + "="*50)
-        print(report)
+        if args.output != '-':
+            print(f"✅ Отчет сохранен: {report_path}")
         
     elif args.all:
         # Найти все аналитические проекты
-        projects = []
-        for item in Path('.').iterdir():
-            if item.is_dir() and not item.name.startswith('.') and not item.name == 'scripts':
-                # Проверяем, что это аналитический проект
-                if (item / '00_Администрирование').exists():
-                    projects.append(item)
+        projects = list(find_projects())
         
         if not projects:
             print("❌ Аналитические проекты не найдены")
             return
         
+        if args.output:
+            with open_report(args.format, args.output) as writer:
+                count = write_portfolio_report(projects, writer)
+            if args.output != '-':
+                print(f"✅ Сводный отчет по {count} проектам сохранен: {args.output}")
+            return
+        
         print(f"📊 Найдено {len(projects)} проектов:")
         
-        for project in projects:
-            analysis = analyze_project_completeness(project)
-            print(f"  📁 {project.name}: {analysis['completeness']} готовность, {analysis['total_files']} файлов")
+        for name, completeness, total_files, _ in iter_portfolio_rows(projects):
+            print(f"  📁 {name}: {completeness} готовность, {total_files} файлов")
     
     else:
         print("❌ Укажите --project или --all")
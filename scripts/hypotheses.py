@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Реестр гипотез проекта и проверка с кэшем результатов
+
+Гипотезы описываются в 04_Аналитика/гипотезы.md: раздел «### H1: Название»
+с полями формулировки и JSON-блоком регистрации (источник данных и тест):
+- источник query — таблица DataLoader проекта (03_Данные/выборки_и_примеры)
+  с фильтрами и столбцами; читается лениво, через снимки .cache/;
+- источник notebook — переменная из состояния ноутбука после запуска
+  через notebook_runner (неизменившиеся ячейки берутся из кэша);
+- тесты: threshold (агрегат против порога), mean_difference и
+  proportion_difference (z-тест между двумя группами), correlation
+  (коэффициент Пирсона против порога).
+
+Результат каждой гипотезы запоминается в 04_Аналитика/.cache/hypotheses.json
+под ключом из регистрации и отпечатка входных данных (sha256 файла таблицы
+или ключа последней ячейки ноутбука). Поэтому после обновления данных
+пересчитываются только гипотезы, чьи входы изменились. Раздел гипотез в
+выводы.md (между метками hypotheses) переписывается, только если
+изменились итоги.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import math
+import operator
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+from generate_status_report import find_projects
+from notebook_runner import Fingerprints, NotebookRunner, write_json
+
+
+ANALYTICS_DIR = '04_Аналитика'
+DATA_DIR = Path('03_Данные') / 'выборки_и_примеры'
+REGISTRY_FILE = 'гипотезы.md'
+CONCLUSIONS_FILE = 'выводы.md'
+CACHE_FILE = Path('.cache') / 'hypotheses.json'
+EVALUATOR_VERSION = 1
+
+HYPOTHESIS_HEADING = re.compile(r'^### (H[\w.-]*):?\s*(.*?)\s*$', re.M)
+SECTION_END = re.compile(r'^#{1,3} ', re.M)
+JSON_BLOCK = re.compile(r'```json\s*\n(.*?)\n```', re.S)
+STATEMENT = re.compile(r'\*\*Формулировка:\*\*\s*(.*)')
+RESULTS_START = '<!-- hypotheses:start -->'
+RESULTS_END = '<!-- hypotheses:end -->'
+
+TEST_TYPES = ('threshold', 'mean_difference', 'proportion_difference', 'correlation')
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+COMPARISONS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+               '==': operator.eq, '!=': operator.ne}
+ALTERNATIVES = ('two-sided', 'greater', 'less')
+STATUS_TITLES = {'confirmed': 'Подтвержденные гипотезы', 'rejected': 'Отклоненные гипотезы',
+                 'error': 'Не удалось проверить'}
+NORMAL = NormalDist()
+
+
+def parse_registry(text: str) -> List[Dict[str, Any]]:
+    """Гипотезы из гипотезы.md: id, название, формулировка и регистрация (или None)"""
+    hypotheses = []
+    headings = list(HYPOTHESIS_HEADING.finditer(text))
+    for match in headings:
+        end = SECTION_END.search(text, match.end())
+        section = text[match.end():end.start() if end else len(text)]
+        block = JSON_BLOCK.search(section)
+        statement = STATEMENT.search(section)
+        hypothesis = {
+            'id': match.group(1),
+            'title': match.group(2),
+            'statement': statement.group(1).strip() if statement else '',
+            'spec': None,
+        }
+        if block:
+            try:
+                hypothesis['spec'] = json.loads(block.group(1))
+            except ValueError as e:
+                hypothesis['error'] = f"ошибка JSON регистрации: {e}"
+        hypotheses.append(hypothesis)
+    return hypotheses
+
+
+def check_spec(spec: Dict[str, Any]) -> None:
+    """Проверяет регистрацию гипотезы: источник и тест"""
+    source = spec.get('source', {})
+    if not ('query' in source) ^ ('notebook' in source):
+        raise ValueError("Источник должен содержать ровно одно из полей 'query' или 'notebook'")
+    test = spec.get('test', {})
+    if test.get('type') not in TEST_TYPES:
+        raise ValueError(f"Тип теста должен быть одним из: {', '.join(TEST_TYPES)}")
+    if test['type'] == 'threshold':
+        if test.get('aggregate', 'value') not in AGGREGATES + ('value',) or test.get('op') not in COMPARISONS:
+            raise ValueError(f"Порог: aggregate из {AGGREGATES}, op из {tuple(COMPARISONS)}")
+    if test.get('alternative', 'two-sided') not in ALTERNATIVES:
+        raise ValueError(f"alternative должен быть одним из: {', '.join(ALTERNATIVES)}")
+
+
+# --- тесты ---
+
+def _frame(data: Any, columns: List[str]):
+    """DataFrame с нужными столбцами: из ленивого запроса читаются только они"""
+    if hasattr(data, 'select') and hasattr(data, 'collect'):
+        return data.select(*columns).collect()
+    return data[columns]
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.4g}".replace(',', ' ')
+    return str(value)
+
+
+def check_threshold(data: Any, test: Dict[str, Any]) -> Dict[str, Any]:
+    """Агрегат столбца (или значение переменной) сравнивается с порогом"""
+    aggregate, column = test.get('aggregate', 'value'), test.get('column', '*')
+    if aggregate == 'value':
+        value = data
+    elif hasattr(data, 'aggregate') and hasattr(data, 'collect'):
+        value = data.aggregate({column: [aggregate]})[column][aggregate]
+    elif aggregate == 'count' and column == '*':
+        value = len(data)
+    else:
+        value = getattr(data[column], aggregate)()
+    value = value.item() if hasattr(value, 'item') else value
+    confirmed = bool(COMPARISONS[test['op']](value, test['value']))
+    label = 'значение' if aggregate == 'value' else f"{aggregate}({column})"
+    return {'confirmed': confirmed, 'value': value,
+            'summary': f"{label} = {_format(value)} (порог {test['op']} {_format(test['value'])})"}
+
+
+def check_difference(data: Any, test: Dict[str, Any], proportion: bool = False) -> Dict[str, Any]:
+    """z-тест разницы средних (Уэлч) или долей между группами test и control"""
+    column, group = test['column'], test['group']
+    frame = _frame(data, [group, column])
+    stats = frame.groupby(frame[group].astype(str), observed=True)[column].agg(['count', 'mean', 'var'])
+    for name in (test['control'], test['test']):
+        if str(name) not in stats.index:
+            raise ValueError(f"В данных нет группы '{name}' в столбце {group}")
+    control, treated = stats.loc[str(test['control'])], stats.loc[str(test['test'])]
+    diff = treated['mean'] - control['mean']
+    if proportion:
+        pooled = (control['mean'] * control['count'] + treated['mean'] * treated['count']) \
+            / (control['count'] + treated['count'])
+        se = math.sqrt(pooled * (1 - pooled) * (1 / control['count'] + 1 / treated['count']))
+    else:
+        se = math.sqrt(control['var'] / control['count'] + treated['var'] / treated['count'])
+    if not se > 0:
+        raise ValueError("Недостаточно данных для z-теста (нулевая или неопределенная дисперсия)")
+    z = diff / se
+    alternative = test.get('alternative', 'two-sided')
+    if alternative == 'greater':
+        p_value = 1 - NORMAL.cdf(z)
+    elif alternative == 'less':
+        p_value = NORMAL.cdf(z)
+    else:
+        p_value = 2 * (1 - NORMAL.cdf(abs(z)))
+    alpha = test.get('alpha', 0.05)
+    lift = f", лифт {diff / control['mean'] * 100:+.2f}%" if control['mean'] else ''
+    return {'confirmed': bool(p_value < alpha), 'value': float(diff), 'p_value': float(p_value),
+            'summary': f"{test['test']} − {test['control']}: {_format(float(diff))}{lift}, "
+                       f"p = {p_value:.4f} (α = {alpha:g})"}
+
+
+def check_correlation(data: Any, test: Dict[str, Any]) -> Dict[str, Any]:
+    """Коэффициент Пирсона между x и y сравнивается с порогом"""
+    frame = _frame(data, [test['x'], test['y']])
+    value = float(frame[test['x']].corr(frame[test['y']]))
+    op = test.get('op', '>=')
+    confirmed = bool(COMPARISONS[op](value, test['value']))
+    return {'confirmed': confirmed, 'value': value,
+            'summary': f"r({test['x']}, {test['y']}) = {value:.3f} (порог {op} {test['value']})"}
+
+
+def run_test(data: Any, test: Dict[str, Any]) -> Dict[str, Any]:
+    if test['type'] == 'threshold':
+        return check_threshold(data, test)
+    if test['type'] == 'correlation':
+        return check_correlation(data, test)
+    return check_difference(data, test, proportion=test['type'] == 'proportion_difference')
+
+
+# --- проверка ---
+
+class HypothesisEvaluator:
+    """Проверка гипотез проекта с запоминанием результатов по отпечаткам входов"""
+
+    def __init__(self, project_path: Path, force: bool = False):
+        self.project_path = Path(project_path)
+        self.analytics_dir = self.project_path / ANALYTICS_DIR
+        self.data_dir = self.project_path / DATA_DIR
+        self.cache_path = self.analytics_dir / CACHE_FILE
+        self.force = force
+        self._loader = None
+        self._notebooks: Dict[str, Tuple[NotebookRunner, Dict[str, Any]]] = {}
+        self.fingerprints = Fingerprints(self.cache_path.with_name('hypothesis_fingerprints.json'))
+
+    def evaluate(self, hypotheses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Результаты зарегистрированных гипотез; неизменившиеся берутся из кэша"""
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            cache = {}
+
+        results = []
+        with self._project_modules():
+            for hypothesis in hypotheses:
+                if hypothesis['spec'] is None and 'error' not in hypothesis:
+                    continue
+                result = {'id': hypothesis['id'], 'title': hypothesis['title'], 'cached': False}
+                started = time.perf_counter()
+                try:
+                    if 'error' in hypothesis:
+                        raise ValueError(hypothesis['error'])
+                    check_spec(hypothesis['spec'])
+                    key = self._key(hypothesis['spec'])
+                    cached = cache.get(hypothesis['id'])
+                    if not self.force and cached and cached['key'] == key:
+                        result.update(cached['result'], cached=True)
+                    else:
+                        outcome = run_test(self._data(hypothesis['spec']['source']), hypothesis['spec']['test'])
+                        outcome['status'] = 'confirmed' if outcome.pop('confirmed') else 'rejected'
+                        result.update(outcome)
+                        cache[hypothesis['id']] = {'key': key, 'result': outcome}
+                except Exception as e:
+                    # Ошибка не кэшируется: гипотеза проверится снова при следующем запуске
+                    result.update(status='error', summary=f"{type(e).__name__}: {e}")
+                    cache.pop(hypothesis['id'], None)
+                result['duration'] = time.perf_counter() - started
+                results.append(result)
+
+        registered = {result['id'] for result in results}
+        write_json(self.cache_path, {key: value for key, value in cache.items() if key in registered})
+        self.fingerprints.save()
+        return results
+
+    @contextlib.contextmanager
+    def _project_modules(self):
+        """Модули данных проекта (data_loader, query) доступны только на время проверки
+
+        Модули другого проекта с теми же именами выгружаются, чтобы --all
+        не смешивал код разных проектов.
+        """
+        directory = str(self.data_dir.resolve())
+        sys.path.insert(0, directory)
+        try:
+            yield
+        finally:
+            sys.path.remove(directory)
+            for name, module in list(sys.modules.items()):
+                file_path = getattr(module, '__file__', None)
+                if file_path and str(Path(file_path).resolve().parent) == directory:
+                    del sys.modules[name]
+
+    def _key(self, spec: Dict[str, Any]) -> str:
+        payload = json.dumps([EVALUATOR_VERSION, spec, self._fingerprint(spec['source'])],
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _fingerprint(self, source: Dict[str, Any]) -> str:
+        """Отпечаток входных данных источника"""
+        if 'query' in source:
+            table_path = self._data_loader().table_path(source['query']['table'])
+            return self.fingerprints.of(table_path.resolve())
+        _, summary = self._notebook(source['notebook'])
+        return summary['key']
+
+    def _data(self, source: Dict[str, Any]) -> Any:
+        """Данные источника: ленивый запрос к таблице или переменная ноутбука"""
+        if 'query' in source:
+            query = source['query']
+            lazy = self._data_loader().scan(query['table'])
+            for column, op, value in query.get('filters', []):
+                lazy = lazy.filter(column, op, value)
+            return lazy.select(*query['columns']) if query.get('columns') else lazy
+        runner, summary = self._notebook(source['notebook'])
+        variable = source['notebook']['variable']
+        return runner.variables(summary['key'], [variable])[variable]
+
+    def _data_loader(self):
+        if self._loader is None:
+            if not (self.data_dir / 'data_loader.py').exists():
+                raise FileNotFoundError(f"Нет модуля загрузки данных: {self.data_dir / 'data_loader.py'}")
+            from data_loader import DataLoader
+            self._loader = DataLoader(str(self.data_dir))
+        return self._loader
+
+    def _notebook(self, settings: Dict[str, Any]) -> Tuple[NotebookRunner, Dict[str, Any]]:
+        """Запуск ноутбука (один раз на путь и параметры); ячейки — из кэша runner"""
+        cache_key = json.dumps([settings['path'], settings.get('params', {})], sort_keys=True)
+        if cache_key not in self._notebooks:
+            runner = NotebookRunner(self.analytics_dir / settings['path'], settings.get('params'), report=False)
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = runner.run()
+            if summary['error']:
+                raise RuntimeError(f"Ноутбук {settings['path']}: {summary['error']}")
+            self._notebooks[cache_key] = (runner, summary)
+        return self._notebooks[cache_key]
+
+
+# --- выводы ---
+
+def render_conclusions(results: List[Dict[str, Any]]) -> str:
+    """Разделы подтвержденных, отклоненных и непроверенных гипотез"""
+    lines = []
+    for status, title in STATUS_TITLES.items():
+        items = [result for result in results if result['status'] == status]
+        if not items and status == 'error':
+            continue
+        lines += [f"### {title}"]
+        if items:
+            lines += [f"- **{item['id']}: {item['title']}** — {item['summary']}" for item in items]
+        else:
+            lines.append("- нет")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def write_conclusions(path: Path, results: List[Dict[str, Any]]) -> bool:
+    """Обновляет раздел гипотез в выводы.md; False, если итоги не изменились
+
+    Раздел ограничен метками hypotheses. Если меток нет, ими заменяется
+    шаблонный текст от «### Подтвержденные гипотезы» до «### Рекомендации»
+    (или раздел добавляется в конец файла).
+    """
+    text = path.read_text(encoding='utf-8') if path.exists() else ''
+    body = render_conclusions(results)
+    start, end = text.find(RESULTS_START), text.find(RESULTS_END)
+    if start >= 0 and end > start:
+        current = text[start + len(RESULTS_START):end]
+        # Строка с датой не считается изменением
+        if re.sub(r'\n_Проверено гипотез:.*_\n', '\n', current).strip() == body.strip():
+            return False
+        before, after = text[:start], text[end + len(RESULTS_END):]
+    else:
+        begin, finish = text.find('### Подтвержденные гипотезы'), text.find('### Рекомендации')
+        if 0 <= begin < finish:
+            before, after = text[:begin], '\n\n' + text[finish:]
+        else:
+            before, after = text.rstrip('\n') + '\n\n## Проверка гипотез\n\n', '\n'
+    stamp = f"_Проверено гипотез: {len(results)}; обновлено: {datetime.now().strftime('%Y-%m-%d %H:%M')}_"
+    text = f"{before}{RESULTS_START}\n{body}\n{stamp}\n{RESULTS_END}{after}"
+    tmp_path = path.with_name(path.name + '.part')
+    tmp_path.write_text(text, encoding='utf-8')
+    tmp_path.replace(path)
+    return True
+
+
+def evaluate_project(project_path: Path, force: bool = False) -> Optional[Dict[str, Any]]:
+    """Проверяет гипотезы проекта и обновляет выводы.md; None, если реестра нет"""
+    analytics_dir = Path(project_path) / ANALYTICS_DIR
+    registry = analytics_dir / REGISTRY_FILE
+    if not registry.exists():
+        return None
+    started = time.perf_counter()
+    hypotheses = parse_registry(registry.read_text(encoding='utf-8'))
+    results = HypothesisEvaluator(project_path, force).evaluate(hypotheses)
+    updated = write_conclusions(analytics_dir / CONCLUSIONS_FILE, results) if results else False
+    return {'results': results, 'registered': len(results), 'total': len(hypotheses),
+            'recomputed': sum(1 for result in results if not result['cached']),
+            'updated': updated, 'duration': time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка зарегистрированных гипотез проекта')
+    parser.add_argument('--project', type=str, help='Путь к проекту')
+    parser.add_argument('--all', action='store_true', help='Проверить гипотезы всех проектов')
+    parser.add_argument('--force', action='store_true', help='Пересчитать все гипотезы без кэша')
+    parser.add_argument('--quiet', action='store_true', help='Только итог по проекту')
+
+    args = parser.parse_args()
+    if args.project:
+        projects = [Path(args.project)]
+        if not projects[0].exists():
+            print(f"❌ Проект не найден: {args.project}")
+            return
+    elif args.all:
+        projects = list(find_projects())
+    else:
+        print("❌ Укажите --project или --all")
+        return
+
+    icons = {'confirmed': '✅', 'rejected': '❌', 'error': '⚠️'}
+    for project in projects:
+        summary = evaluate_project(project, args.force)
+        if summary is None:
+            print(f"⚠️ {project.name}: нет {ANALYTICS_DIR}/{REGISTRY_FILE}")
+            continue
+        if not args.quiet:
+            for result in summary['results']:
+                source = '♻️ из кэша' if result['cached'] else f"{result['duration']:.2f} сек"
+                print(f"{icons[result['status']]} {result['id']}: {result['summary']} ({source})")
+        unregistered = summary['total'] - summary['registered']
+        note = f", без регистрации: {unregistered}" if unregistered else ''
+        print(f"📊 {project.name}: гипотез {summary['registered']}{note}, пересчитано {summary['recomputed']} "
+              f"за {summary['duration']:.2f} сек")
+        if summary['updated']:
+            print(f"💾 Обновлен {ANALYTICS_DIR}/{CONCLUSIONS_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Симулятор синхронизации интеграций по протоколам проекта
+
+Протоколы из 05_Решение_и_дизайн/протоколы_интеграций/*.md дают параметры
+синхронизации: система, частота («Каждые 15 минут»), политика повторов
+(«3 попытки» — всего попыток записи порции, включая первую) и сущности с таблицами маппинга полей (поле источника, поле
+хранилища, тип, обязательность). Сущности без таблицы маппинга пропускаются.
+
+Симулятор генерирует поток изменений (вставки, обновления и удаления
+записей с полями хранилища из маппинга) с заданной интенсивностью --rate
+и проигрывает его в модельном времени: каждые --interval минут задание
+синхронизации забирает накопленные изменения и пишет их порциями по
+--batch-size строк в приемник. Запись в приемник выполняется по-настоящему
+(SQLite с upsert по ключу или файлы JSON Lines), измеренное время записи
+плюс накладные расходы порции (--batch-overhead, например вызов API) и
+строки (--row-cost) продвигает модельные часы. Если задание не успевает
+до следующего запуска, следующий запуск сдвигается.
+
+По каждому запуску считаются очередь изменений (backlog) на старте и в
+конце, задержка (lag) от изменения в источнике до записи в хранилище и
+пропускная способность. Несколько значений --batch-size и --interval
+дают сравнительную таблицу: видно, какие сочетания держат --sla. Поток
+изменений задается только --seed, поэтому все сочетания проигрывают один
+и тот же поток.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from report_writer import FORMATS, open_report
+
+
+PROTOCOLS_DIR = Path('05_Решение_и_дизайн') / 'протоколы_интеграций'
+DEFAULT_RATE = 100.0  # изменений в минуту по всем сущностям
+DEFAULT_DURATION = 4.0  # часов модельного времени
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_RETRIES = 3
+OPERATIONS = ('insert', 'update', 'delete')
+DEFAULT_MIX = (0.3, 0.65, 0.05)
+NULL_SHARE = 0.1  # доля пустых значений в необязательных полях
+LAG_PERCENTILES = (50, 95)
+
+INTEGRATION_HEADING = re.compile(r'^##\s+(.+?)\s*$', re.M)
+ENTITY_HEADING = re.compile(r'^####\s+(.+?)\s*$', re.M)
+SECTION_END = re.compile(r'^#{1,4} ', re.M)
+FIELD = r'^-?\s*\*\*{}:\*\*\s*(.+?)\s*$'
+TABLE_ROW = re.compile(r'^\|(.+)\|\s*$', re.M)
+ENGLISH_NAME = re.compile(r'\(([^)]+)\)')
+INTERVAL = re.compile(r'(\d+(?:[.,]\d+)?)?\s*(сек|мин|час|сут|дн|день|дня)', re.I)
+INTERVAL_WORDS = {'ежечасно': 3600, 'ежедневно': 86400, 'ежеминутно': 60}
+UNIT_SECONDS = {'сек': 1, 'мин': 60, 'час': 3600, 'сут': 86400, 'дн': 86400, 'день': 86400, 'дня': 86400}
+RETRIES = re.compile(r'(\d+)\s*попыт')
+YES = {'да', 'yes', 'true', '+', 'обязательное'}
+
+
+def _field(text: str, name: str) -> Optional[str]:
+    match = re.search(FIELD.format(re.escape(name)), text, re.M)
+    return match.group(1) if match else None
+
+
+def parse_interval(text: Optional[str]) -> Optional[float]:
+    """«Каждые 15 минут» → 900 секунд; None, если частоту не распознать"""
+    if not text:
+        return None
+    lowered = text.lower()
+    for word, seconds in INTERVAL_WORDS.items():
+        if word in lowered:
+            return float(seconds)
+    match = INTERVAL.search(lowered)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(',', '.')) if match.group(1) else 1.0
+    return amount * UNIT_SECONDS[match.group(2)]
+
+
+def _slug(name: str) -> str:
+    english = ENGLISH_NAME.search(name)
+    base = english.group(1) if english else name
+    return re.sub(r'\W+', '_', base.strip().lower()).strip('_') or 'entity'
+
+
+def parse_mapping(section: str) -> List[Dict[str, Any]]:
+    """Строки таблицы маппинга: поле источника, поле хранилища, тип, обязательность"""
+    rows = [[cell.strip() for cell in match.group(1).split('|')] for match in TABLE_ROW.finditer(section)]
+    rows = [row for row in rows if not all(set(cell) <= set('-: ') for cell in row)]
+    if len(rows) < 2 or len(rows[0]) < 2:
+        return []
+    fields = []
+    for row in rows[1:]:
+        row = row + [''] * (4 - len(row))
+        fields.append({'source': row[0], 'target': row[1], 'type': (row[2] or 'string').lower(),
+                       'required': row[3].lower() in YES})
+    return [field for field in fields if field['target']]
+
+
+def parse_protocol(text: str, name: str = '') -> List[Dict[str, Any]]:
+    """Интеграции документа: система, частота, повторы и сущности с маппингом"""
+    integrations = []
+    headings = list(INTEGRATION_HEADING.finditer(text))
+    for i, match in enumerate(headings):
+        body = text[match.end():headings[i + 1].start() if i + 1 < len(headings) else len(text)]
+        entities = []
+        for entity in ENTITY_HEADING.finditer(body):
+            end = SECTION_END.search(body, entity.end())
+            section = body[entity.end():end.start() if end else len(body)]
+            entities.append({'name': entity.group(1), 'table': _slug(entity.group(1)),
+                             'direction': _field(section, 'Направление') or '',
+                             'fields': parse_mapping(section)})
+        retries = RETRIES.search(_field(body, 'Retry policy') or '')
+        frequency = _field(body, 'Частота синхронизации')
+        integrations.append({
+            'document': name,
+            'title': match.group(1),
+            'system': _field(body, 'Система') or match.group(1),
+            'frequency': frequency,
+            'interval': parse_interval(frequency),
+            'retries': max(int(retries.group(1)), 1) if retries else DEFAULT_RETRIES,
+            'entities': entities,
+        })
+    return [integration for integration in integrations if integration['entities']]
+
+
+def find_protocols(project_path: Path) -> List[Path]:
+    folder = project_path / PROTOCOLS_DIR
+    return sorted(path for path in folder.glob('*.md') if path.name != 'README.md') if folder.exists() else []
+
+
+def key_field(fields: List[Dict[str, Any]]) -> str:
+    """Ключ сущности: первое поле *_id (или id), иначе первое обязательное, иначе первое"""
+    for field in fields:
+        if field['target'].lower() == 'id' or field['target'].lower().endswith('_id'):
+            return field['target']
+    required = [field for field in fields if field['required']]
+    return (required or fields)[0]['target']
+
+
+# --- Поток изменений ---
+
+class ChangeStream:
+    """Пуассоновский поток изменений по сущностям с полями хранилища из маппинга
+
+    Моменты и содержание изменений разыгрываются одной последовательностью
+    по seed и не зависят от того, когда их забирает until(): при одном seed
+    все конфигурации синхронизации получают один и тот же поток.
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]], rate_per_minute: float, mix: Tuple[float, ...] = DEFAULT_MIX,
+                 seed: Optional[int] = None):
+        self.entities = entities
+        self.rate = rate_per_minute / 60.0
+        self.mix = mix
+        self.random = random.Random(seed)
+        self.keys: Dict[str, List[int]] = {entity['table']: [] for entity in entities}
+        self.next_key = {entity['table']: 1 for entity in entities}
+        self.time = 0.0
+        # Момент следующего изменения разыгрывается заранее и не перевыбирается
+        self.next_time = self._gap()
+
+    def _gap(self) -> float:
+        return self.random.expovariate(self.rate) if self.rate > 0 else math.inf
+
+    def _value(self, field: Dict[str, Any], key: int) -> Any:
+        if not field['required'] and self.random.random() < NULL_SHARE:
+            return None
+        kind = field['type']
+        if kind.startswith(('int', 'bigint', 'long')):
+            return self.random.randint(1, 1_000_000)
+        if kind.startswith(('num', 'dec', 'float', 'double', 'money')):
+            return round(self.random.uniform(0, 100_000), 2)
+        if kind.startswith('bool'):
+            return self.random.random() < 0.5
+        if kind.startswith(('date', 'time')):
+            return datetime.fromtimestamp(1_700_000_000 + self.random.randint(0, 86400 * 365)).isoformat()
+        return f"{field['target']}_{key}_{self.random.randint(0, 9999)}"
+
+    def _event(self) -> Dict[str, Any]:
+        entity = self.random.choice(self.entities)
+        table, keys = entity['table'], self.keys[entity['table']]
+        operation = self.random.choices(OPERATIONS, self.mix)[0] if keys else 'insert'
+        if operation == 'insert':
+            key = self.next_key[table]
+            self.next_key[table] += 1
+            keys.append(key)
+        else:
+            index = self.random.randrange(len(keys))
+            key = keys[index]
+            if operation == 'delete':
+                keys[index] = keys[-1]
+                keys.pop()
+        values = None if operation == 'delete' else {
+            field['target']: (key if field['target'] == entity['key'] else self._value(field, key))
+            for field in entity['fields']}
+        return {'time': self.time, 'table': table, 'op': operation, 'key': key, 'values': values}
+
+    def until(self, moment: float) -> List[Dict[str, Any]]:
+        """Изменения, произошедшие до момента moment (сек модельного времени)"""
+        events = []
+        while self.next_time <= moment:
+            self.time = self.next_time
+            events.append(self._event())
+            self.next_time = self.time + self._gap()
+        return events
+
+
+# --- Приемники ---
+
+class SqliteSink:
+    """Таблицы сущностей в SQLite: upsert по ключу, удаление по ключу"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def open(self, entities: List[Dict[str, Any]]) -> None:
+        self.conn = sqlite3.connect(str(self.path))
+        self.statements = {}
+        for entity in entities:
+            columns = [field['target'] for field in entity['fields']]
+            quoted = ', '.join(f'"{column}"' for column in columns)
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{entity["table"]}" ({quoted}, _synced_at TEXT, '
+                              f'PRIMARY KEY ("{entity["key"]}"))')
+            updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns + ['_synced_at'])
+            self.statements[entity['table']] = (
+                columns,
+                f'INSERT INTO "{entity["table"]}" ({quoted}, _synced_at) VALUES ({", ".join("?" * (len(columns) + 1))}) '
+                f'ON CONFLICT ("{entity["key"]}") DO UPDATE SET {updates}',
+                f'DELETE FROM "{entity["table"]}" WHERE "{entity["key"]}" = ?',
+            )
+        self.conn.commit()
+
+    def write(self, table: str, upserts: List[Dict[str, Any]], deletes: List[Any]) -> None:
+        columns, upsert, delete = self.statements[table]
+        stamp = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.executemany(upsert, ([row[column] for column in columns] + [stamp] for row in upserts))
+            self.conn.executemany(delete, ([key] for key in deletes))
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+
+class FileSink:
+    """Журнал изменений в файлах JSON Lines, по файлу на сущность"""
+
+    name = 'file'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: Dict[str, Any] = {}
+
+    def open(self, entities: List[Dict[str, Any]]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.files = {entity['table']: open(self.path / f"{entity['table']}.jsonl", 'a', encoding='utf-8')
+                      for entity in entities}
+
+    def write(self, table: str, upserts: List[Dict[str, Any]], deletes: List[Any]) -> None:
+        f = self.files[table]
+        f.writelines(json.dumps({'op': 'upsert', **row}, ensure_ascii=False) + '\n' for row in upserts)
+        f.writelines(json.dumps({'op': 'delete', 'key': key}) + '\n' for key in deletes)
+        f.flush()
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+
+
+SINKS = {'sqlite': SqliteSink, 'file': FileSink}
+
+
+def create_sink(kind: str, path: Path):
+    if kind not in SINKS:
+        raise ValueError(f"Неизвестный приемник: {kind}. Доступны: {', '.join(SINKS)}")
+    return SINKS[kind](path / 'sync.db' if kind == 'sqlite' else path / 'sync')
+
+
+# --- Симуляция ---
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (отсортированный список)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+class SyncSimulator:
+    """Проигрывает поток изменений через приемник запусками раз в interval секунд модельного времени"""
+
+    def __init__(self, integration: Dict[str, Any], sink, interval: float, batch_size: int,
+                 rate: float = DEFAULT_RATE, batch_overhead: float = 0.0, row_cost: float = 0.0,
+                 failure_rate: float = 0.0, max_batches: Optional[int] = None, seed: Optional[int] = None):
+        self.entities = [{**entity, 'key': key_field(entity['fields'])}
+                         for entity in integration['entities'] if entity['fields']]
+        if not self.entities:
+            raise ValueError(f"{integration['title']}: нет сущностей с таблицей маппинга")
+        self.integration = integration
+        self.sink = sink
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_overhead = batch_overhead
+        self.row_cost = row_cost
+        self.failure_rate = failure_rate
+        self.max_batches = max_batches
+        self.random = random.Random(seed)
+        self.stream = ChangeStream(self.entities, rate, seed=seed)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> Tuple[float, int, bool]:
+        """Пишет порцию (последнее изменение ключа побеждает): модельное время, число попыток и успех"""
+        latest: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for event in batch:
+            latest[(event['table'], event['key'])] = event
+        by_table: Dict[str, Tuple[list, list]] = {}
+        for event in latest.values():
+            upserts, deletes = by_table.setdefault(event['table'], ([], []))
+            if event['op'] == 'delete':
+                deletes.append(event['key'])
+            else:
+                upserts.append(event['values'])
+
+        cost, attempts = 0.0, 0
+        # «3 попытки» — всего три попытки записи, включая первую
+        for attempt in range(self.integration['retries']):
+            attempts += 1
+            cost += self.batch_overhead + self.row_cost * len(batch)
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                if attempt == self.integration['retries'] - 1:
+                    return cost, attempts, False
+                cost += 2 ** attempt  # экспоненциальная задержка перед повтором: 1, 2, 4 сек
+                continue
+            break
+        started = time.perf_counter()
+        for table, (upserts, deletes) in by_table.items():
+            self.sink.write(table, upserts, deletes)
+        return cost + time.perf_counter() - started, attempts, True
+
+    def run(self, duration: float) -> Dict[str, Any]:
+        """Запуски синхронизации в течение duration секунд модельного времени"""
+        self.sink.open(self.entities)
+        backlog: Deque[Dict[str, Any]] = deque()
+        runs, lags = [], []
+        busy, start, failed_batches, events = 0.0, 0.0, 0, 0
+        try:
+            while start <= duration:
+                arrived = self.stream.until(start)
+                events += len(arrived)
+                backlog.extend(arrived)
+                backlog_start = len(backlog)
+                clock, processed, batches, retries = start, 0, 0, 0
+                while backlog and (self.max_batches is None or batches < self.max_batches):
+                    batch = [backlog.popleft() for _ in range(min(self.batch_size, len(backlog)))]
+                    cost, attempts, written = self._write_batch(batch)
+                    clock += cost
+                    retries += attempts - 1
+                    if not written:
+                        # Порция возвращается в очередь и ждет следующего запуска
+                        backlog.extendleft(reversed(batch))
+                        failed_batches += 1
+                        break
+                    batches += 1
+                    processed += len(batch)
+                    lags.extend(clock - event['time'] for event in batch)
+                busy += clock - start
+                # Изменения, пришедшие за время самого запуска, ждут следующего
+                arrived = self.stream.until(clock)
+                events += len(arrived)
+                backlog.extend(arrived)
+                runs.append({
+                    'start': start, 'seconds': clock - start, 'backlog_start': backlog_start,
+                    'processed': processed, 'batches': batches, 'retries': retries,
+                    'backlog_end': len(backlog),
+                })
+                start = max(start + self.interval, clock)
+        finally:
+            self.sink.close()
+        return self._summary(runs, sorted(lags), events, busy, duration, failed_batches)
+
+    def _summary(self, runs: List[Dict[str, Any]], lags: List[float], events: int, busy: float, duration: float,
+                 failed_batches: int) -> Dict[str, Any]:
+        processed = sum(run['processed'] for run in runs)
+        span = max(duration, runs[-1]['start'] + runs[-1]['seconds']) if runs else duration
+        growing = len(runs) > 2 and runs[-1]['backlog_start'] > 2 * max(run['backlog_start'] for run in runs[:2])
+        return {
+            'interval': self.interval, 'batch_size': self.batch_size, 'runs': runs, 'events': events,
+            'processed': processed, 'pending': events - processed, 'failed_batches': failed_batches,
+            'retries': sum(run['retries'] for run in runs),
+            'max_backlog': max((run['backlog_start'] for run in runs), default=0),
+            **{f"lag_p{q}": percentile(lags, q) for q in LAG_PERCENTILES},
+            'lag_max': lags[-1] if lags else 0.0,
+            'throughput': processed / busy if busy else 0.0,
+            'arrival_rate': events / span if span else 0.0,
+            'utilization': busy / span if span else 0.0,
+            'growing': growing,
+        }
+
+
+def simulate(integration: Dict[str, Any], sink_kind: str, sink_dir: Optional[Path], interval: float,
+             batch_size: int, duration: float, **options: Any) -> Dict[str, Any]:
+    """Одна симуляция с новым приемником (во временной папке, если sink_dir не задан)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = sink_dir / f"{_slug(integration['title'])}_{int(interval)}s_{batch_size}" if sink_dir \
+            else Path(tmp)
+        sink = create_sink(sink_kind, folder)
+        return SyncSimulator(integration, sink, interval, batch_size, **options).run(duration)
+
+
+def _minutes(seconds: float) -> str:
+    return f"{seconds / 60:.1f} мин" if seconds >= 60 else f"{seconds:.1f} сек"
+
+
+def _verdict(summary: Dict[str, Any], sla: Optional[float]) -> str:
+    if summary['growing'] or summary['utilization'] >= 1:
+        return '❌ очередь растет'
+    if sla is not None:
+        return '✅ SLA' if summary['lag_max'] <= sla else '⚠️ выше SLA'
+    return '✅'
+
+
+def _summary_row(summary: Dict[str, Any], sla: Optional[float]) -> List[Any]:
+    return [_minutes(summary['interval']), summary['batch_size'], summary['events'], summary['processed'],
+            summary['max_backlog'], *(_minutes(summary[f"lag_p{q}"]) for q in LAG_PERCENTILES),
+            _minutes(summary['lag_max']), f"{summary['throughput']:.0f}", f"{summary['utilization']:.0%}",
+            _verdict(summary, sla)]
+
+
+SUMMARY_COLUMNS = ["Интервал", "Порция", "Изменений", "Записано", "Макс. очередь", "Lag p50", "Lag p95",
+                   "Lag макс.", "Строк/сек при записи", "Загрузка", "Итог"]
+
+
+def print_summary(integration: Dict[str, Any], summary: Dict[str, Any], sla: Optional[float]) -> None:
+    print(f"{_verdict(summary, sla)} интервал {_minutes(summary['interval'])}, порция {summary['batch_size']}: "
+          f"запусков {len(summary['runs'])}, записано {summary['processed']} из {summary['events']}, "
+          f"макс. очередь {summary['max_backlog']}, lag p50 {_minutes(summary['lag_p50'])}, "
+          f"p95 {_minutes(summary['lag_p95'])}, макс. {_minutes(summary['lag_max'])}, "
+          f"{summary['throughput']:.0f} строк/сек при записи, загрузка {summary['utilization']:.0%}")
+    if summary['retries']:
+        print(f"   🔁 Повторных попыток записи: {summary['retries']}")
+    if summary['failed_batches']:
+        print(f"   ⚠️ Порций не записано после {integration['retries']} попыток: {summary['failed_batches']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Симуляция синхронизации по протоколам интеграций')
+    parser.add_argument('--project', type=str, help=f'Путь к проекту (протоколы — {PROTOCOLS_DIR})')
+    parser.add_argument('--protocol', type=str, action='append', help='Файл протокола (можно несколько)')
+    parser.add_argument('--interval', type=float, nargs='+', help='Интервал синхронизации, мин (по умолчанию '
+                                                                  'из протокола)')
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[DEFAULT_BATCH_SIZE], help='Строк в порции')
+    parser.add_argument('--max-batches', type=int, help='Порций за один запуск')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Изменений в минуту по всем сущностям')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Модельное время, часов')
+    parser.add_argument('--sink', choices=list(SINKS), default='sqlite', help='Приемник изменений')
+    parser.add_argument('--sink-dir', type=str, help='Папка приемника (по умолчанию временная)')
+    parser.add_argument('--batch-overhead', type=float, default=0.0, help='Накладные расходы порции, мс')
+    parser.add_argument('--row-cost', type=float, default=0.0, help='Время на строку сверх записи, мс')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Доля неудачных попыток записи порции')
+    parser.add_argument('--sla', type=float, help='Допустимая задержка данных, мин')
+    parser.add_argument('--seed', type=int, default=0, help='Seed потока изменений')
+    parser.add_argument('--format', choices=FORMATS, default='md', help='Формат отчета (по умолчанию: md)')
+    parser.add_argument('--output', type=str, help='Файл отчета ("-" для вывода в stdout)')
+
+    args = parser.parse_args()
+    if args.protocol:
+        documents = [Path(path) for path in args.protocol]
+    elif args.project:
+        documents = find_protocols(Path(args.project))
+    else:
+        print("❌ Укажите --project или --protocol")
+        return
+    missing = [str(path) for path in documents if not path.exists()]
+    if missing or not documents:
+        print(f"❌ Протоколы не найдены: {', '.join(missing) or PROTOCOLS_DIR}")
+        return
+
+    integrations = [integration for path in documents
+                    for integration in parse_protocol(path.read_text(encoding='utf-8'), path.name)]
+    if not integrations:
+        print("❌ В протоколах нет сущностей («#### Сущность» с таблицей маппинга)")
+        return
+
+    sla = args.sla * 60 if args.sla is not None else None
+    options = {'rate': args.rate, 'batch_overhead': args.batch_overhead / 1000, 'row_cost': args.row_cost / 1000,
+               'failure_rate': args.failure_rate, 'max_batches': args.max_batches, 'seed': args.seed}
+    sink_dir = Path(args.sink_dir) if args.sink_dir else None
+    to_console = args.output == '-'
+    reports = []
+    for integration in integrations:
+        intervals = [minutes * 60 for minutes in args.interval] if args.interval else [integration['interval']]
+        if intervals == [None]:
+            print(f"⚠️ {integration['document']}: частота «{integration['frequency']}» не распознана, "
+                  f"укажите --interval")
+            continue
+        skipped = [entity['name'] for entity in integration['entities'] if not entity['fields']]
+        if not to_console:
+            entities = ', '.join(entity['name'] for entity in integration['entities'] if entity['fields'])
+            print(f"🔄 {integration['system']} ({integration['document']}): {entities}; "
+                  f"{args.rate:.0f} изменений/мин, {args.duration:g} ч, приемник {args.sink}")
+            if skipped:
+                print(f"   ⚠️ Без таблицы маппинга: {', '.join(skipped)}")
+        summaries = []
+        for interval in intervals:
+            for batch_size in args.batch_size:
+                try:
+                    summary = simulate(integration, args.sink, sink_dir, interval, batch_size,
+                                       args.duration * 3600, **options)
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    print(f"❌ {integration['title']}: {e}")
+                    break
+                summaries.append(summary)
+                if not to_console:
+                    print_summary(integration, summary, sla)
+        reports.append((integration, summaries))
+
+    if args.output:
+        with open_report(args.format, args.output) as writer:
+            writer.begin("🔄 Симуляция синхронизации интеграций")
+            writer.fields([
+                ("Дата запуска", datetime.now().strftime('%Y-%m-%d %H:%M')),
+                ("Интенсивность изменений", f"{args.rate:g} в минуту"),
+                ("Модельное время", f"{args.duration:g} ч"),
+                ("Приемник", args.sink),
+                ("SLA по задержке", f"{args.sla:g} мин" if args.sla is not None else "не задан"),
+            ])
+            for integration, summaries in reports:
+                writer.heading(f"{integration['system']}: {integration['title']}")
+                writer.table(SUMMARY_COLUMNS, (_summary_row(summary, sla) for summary in summaries))
+            writer.end()
+        if not to_console:
+            print(f"💾 Отчет: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пакетный запуск ноутбуков всех проектов портфеля
+
+Находит ноутбуки в формате ячеек (# %%) в 04_Аналитика/ноутбуки каждого
+проекта и выполняет их через notebook_runner в отдельных процессах, не
+больше --jobs одновременно. Процесс, превысивший время (--timeout) или
+память (--memory, пиковый RSS), завершается, остальные продолжают работу.
+
+Журнал выполнения (время, пиковый RSS, кэш ячеек, ошибки) пишется потоково
+через report_writer по мере завершения ноутбуков, в конце — самые долгие
+ноутбуки, чтобы было видно, что оптимизировать.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from generate_status_report import find_projects
+from notebook_runner import CELL_MARKER, parse_params, run_notebook
+from report_writer import FORMATS, open_report
+
+try:
+    import resource
+except ImportError:  # Windows: лимиты памяти и пиковый RSS недоступны
+    resource = None
+
+
+NOTEBOOKS_DIR = Path('04_Аналитика') / 'ноутбуки'
+DEFAULT_TIMEOUT = 30 * 60
+# Как часто проверяются время и память запущенных процессов, сек
+POLL_INTERVAL = 0.2
+SLOWEST_COUNT = 5
+MB = 1024 * 1024
+
+
+def is_cell_notebook(path: Path) -> bool:
+    """Файл .py с маркерами ячеек # %% (модули вроде eda.py пропускаются)"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return any(CELL_MARKER.match(line) for line in f)
+
+
+def find_notebooks(projects: List[Path]) -> List[Tuple[Path, Path]]:
+    """Пары (проект, ноутбук) по всем проектам"""
+    notebooks = []
+    for project in projects:
+        directory = project / NOTEBOOKS_DIR
+        if directory.is_dir():
+            notebooks.extend((project, path) for path in sorted(directory.glob('*.py')) if is_cell_notebook(path))
+    return notebooks
+
+
+def _peak_rss_self() -> Optional[int]:
+    """Пиковый RSS текущего процесса в байтах"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS — байты
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _proc_memory(pid: int) -> Tuple[Optional[int], Optional[int]]:
+    """Текущий и пиковый RSS процесса из /proc (только Linux)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            values = dict(line.split(':', 1) for line in f if line.startswith(('VmRSS', 'VmHWM')))
+    except OSError:
+        return None, None
+    rss, peak = (int(values[name].split()[0]) * 1024 if name in values else None for name in ('VmRSS', 'VmHWM'))
+    return rss, peak
+
+
+def _run_child(notebook: str, params: Dict[str, Any], force: bool, memory_limit: Optional[int], conn) -> None:
+    """Выполнение одного ноутбука в дочернем процессе; сводка уходит в conn"""
+    if memory_limit and resource is not None and not os.path.exists('/proc/self/status'):
+        # Без /proc родитель не видит RSS — ограничиваем адресное пространство
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        summary = run_notebook(Path(notebook), params, force=force)
+    except MemoryError:
+        summary = {'error': 'MemoryError: превышен лимит памяти'}
+    except Exception as e:
+        summary = {'error': f"{type(e).__name__}: {e}"}
+    summary['peak_rss'] = _peak_rss_self()
+    conn.send(summary)
+    conn.close()
+
+
+class BatchRunner:
+    """Ограниченный пул процессов для ноутбуков с таймаутами и лимитом памяти"""
+
+    def __init__(self, jobs: int, timeout: float = DEFAULT_TIMEOUT, memory_mb: Optional[int] = None,
+                 params: Optional[Dict[str, Any]] = None, force: bool = False):
+        self.jobs = max(jobs, 1)
+        self.timeout = timeout
+        self.memory_limit = memory_mb * MB if memory_mb else None
+        self.params = params or {}
+        self.force = force
+        self.results = []
+
+    def run(self, notebooks: List[Tuple[Path, Path]]) -> Iterator[Dict[str, Any]]:
+        """Выполняет ноутбуки, отдавая результаты по мере завершения"""
+        pending = deque(notebooks)
+        running = {}
+        while pending or running:
+            while pending and len(running) < self.jobs:
+                project, notebook = pending.popleft()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(
+                    target=_run_child, args=(str(notebook), self.params, self.force, self.memory_limit, sender),
+                    daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = {'project': project, 'notebook': notebook, 'process': process,
+                                     'started': time.perf_counter(), 'peak_rss': None}
+
+            ready = wait(list(running), timeout=POLL_INTERVAL)
+            for conn in list(running):
+                task = running[conn]
+                result = self._check(conn, task, conn in ready)
+                if result is not None:
+                    del running[conn]
+                    conn.close()
+                    self.results.append(result)
+                    yield result
+
+    def _check(self, conn, task: Dict[str, Any], ready: bool) -> Optional[Dict[str, Any]]:
+        """Результат задачи, если она завершилась или была остановлена"""
+        process = task['process']
+        elapsed = time.perf_counter() - task['started']
+        rss, peak = _proc_memory(process.pid)
+        if peak:
+            task['peak_rss'] = max(task['peak_rss'] or 0, peak)
+
+        if ready:
+            try:
+                summary = conn.recv()
+            except EOFError:
+                process.join()
+                return self._result(task, elapsed, error=f"процесс завершился с кодом {process.exitcode}")
+            process.join()
+            return self._result(task, elapsed, summary=summary)
+        if elapsed > self.timeout:
+            self._stop(process)
+            return self._result(task, elapsed, error=f"превышено время {self.timeout:.0f} сек", status='timeout')
+        if self.memory_limit and rss and rss > self.memory_limit:
+            self._stop(process)
+            return self._result(task, elapsed, error=f"превышен лимит памяти {self.memory_limit // MB} МБ",
+                                status='memory')
+        return None
+
+    @staticmethod
+    def _stop(process) -> None:
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    @staticmethod
+    def _result(task: Dict[str, Any], elapsed: float, summary: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None, status: Optional[str] = None) -> Dict[str, Any]:
+        summary = summary or {}
+        error = error or summary.get('error')
+        peaks = [value for value in (task['peak_rss'], summary.get('peak_rss')) if value]
+        return {
+            'project': task['project'].name,
+            'notebook': task['notebook'].name,
+            'status': status or ('error' if error else 'ok'),
+            'cells': summary.get('cells'),
+            'executed': summary.get('executed'),
+            'cached': summary.get('cached'),
+            'duration': elapsed,
+            'peak_rss': max(peaks) if peaks else None,
+            'error': error,
+        }
+
+
+STATUS_LABELS = {'ok': '✅ успешно', 'error': '❌ ошибка', 'timeout': '⏱️ таймаут', 'memory': '💥 память'}
+
+
+def _log_row(result: Dict[str, Any]) -> List[object]:
+    return [
+        result['project'],
+        result['notebook'],
+        STATUS_LABELS[result['status']],
+        '' if result['cells'] is None else result['cells'],
+        '' if result['executed'] is None else result['executed'],
+        '' if result['cached'] is None else result['cached'],
+        f"{result['duration']:.2f}",
+        '' if result['peak_rss'] is None else f"{result['peak_rss'] / MB:.0f}",
+        result['error'] or '',
+    ]
+
+
+def _print_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    name = f"{result['project']}/{result['notebook']}"
+    if result['status'] == 'ok':
+        print(f"✅ {name}: {result['duration']:.2f} сек, выполнено {result['executed']} из {result['cells']} ячеек")
+    else:
+        print(f"❌ {name}: {result['error']}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Пакетный запуск ноутбуков проектов')
+    parser.add_argument('--project', type=str, action='append', help='Путь к проекту (можно несколько)')
+    parser.add_argument('--all', action='store_true', help='Все проекты')
+    parser.add_argument('--base-dir', default='.', help='Каталог с проектами')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='Число одновременных процессов')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Лимит времени на ноутбук, сек')
+    parser.add_argument('--memory', type=int, help='Лимит памяти на ноутбук (пиковый RSS), МБ')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='ИМЯ=ЗНАЧЕНИЕ',
+                        help='Параметр для всех ноутбуков')
+    parser.add_argument('--force', action='store_true', help='Игнорировать кэш ячеек')
+    parser.add_argument('--format', choices=FORMATS, default='md', help='Формат журнала (по умолчанию: md)')
+    parser.add_argument('--output', type=str, help='Файл журнала ("-" для вывода в stdout)')
+
+    args = parser.parse_args()
+    base_dir = Path(args.base_dir)
+    if args.all:
+        projects = list(find_projects(base_dir))
+    elif args.project:
+        projects = [Path(name) for name in args.project]
+        missing = [project.name for project in projects if not project.exists()]
+        if missing:
+            print(f"❌ Проект не найден: {', '.join(missing)}")
+            sys.exit(2)
+    else:
+        print("❌ Укажите --project или --all")
+        sys.exit(2)
+    try:
+        params = parse_params(args.param)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    notebooks = find_notebooks(projects)
+    if not notebooks:
+        print("❌ Ноутбуки не найдены")
+        return
+    if args.memory and resource is None:
+        print("⚠️ Лимит памяти не поддерживается на этой платформе")
+
+    # При выводе журнала в консоль прогресс не печатается, чтобы не смешивать потоки
+    to_console = args.output == '-'
+    if not to_console:
+        print(f"🚀 Запуск {len(notebooks)} ноутбуков из {len(projects)} проектов, процессов: {args.jobs}\n")
+    output = args.output or base_dir / f"NOTEBOOK_RUNS_{datetime.now().strftime('%Y%m%d')}.{args.format}"
+    runner = BatchRunner(args.jobs, args.timeout, args.memory, params, args.force)
+    started = time.perf_counter()
+    with open_report(args.format, output) as writer:
+        writer.begin("📓 Журнал выполнения ноутбуков")
+        writer.fields([
+            ("Дата запуска", datetime.now().strftime('%Y-%m-%d %H:%M')),
+            ("Процессов", args.jobs),
+            ("Лимит времени", f"{args.timeout:.0f} сек"),
+            ("Лимит памяти", f"{args.memory} МБ" if args.memory else "нет"),
+        ])
+        writer.table(
+            ["Проект", "Ноутбук", "Статус", "Ячеек", "Выполнено", "Из кэша", "Время, сек", "Пик RSS, МБ", "Ошибка"],
+            (_log_row(result if to_console else _print_result(result)) for result in runner.run(notebooks))
+        )
+        slowest = sorted(runner.results, key=lambda result: result['duration'], reverse=True)[:SLOWEST_COUNT]
+        writer.heading("Самые долгие ноутбуки")
+        writer.ordered_list(f"{result['project']}/{result['notebook']} — {result['duration']:.2f} сек"
+                            for result in slowest)
+        writer.end()
+
+    failed = [result for result in runner.results if result['status'] != 'ok']
+    if not to_console:
+        print(f"\n📊 Выполнено {len(runner.results) - len(failed)} из {len(runner.results)} "
+              f"за {time.perf_counter() - started:.2f} сек")
+        print(f"💾 Журнал: {output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
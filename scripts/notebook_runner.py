@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Запуск ноутбуков-скриптов (ячейки # %%) без Jupyter с параметрами и кэшем
+
+Ячейки выполняются по порядку в общем пространстве имен. Ключ ячейки —
+хэш ее кода, ключа предыдущей ячейки, используемых параметров и отпечатков
+файлов данных, которые она читает: строковых литералов, указывающих на
+существующие файлы, и имен, которым такие строки присвоены выше (например,
+DATA_PATH из ячейки параметров или -p DATA_PATH=...). Отпечаток относится
+к ячейке, читающей файл, а не к ячейке, где задан путь, поэтому изменение
+данных или кода сбрасывает кэш только начиная с затронутой ячейки.
+
+Для каждой ячейки в .cache/<ноутбук>/ сохраняются вывод (stdout, stderr,
+значение последнего выражения, графики) и состояние пространства имен
+(объекты pickle, одинаковые объекты хранятся один раз). Если все ячейки
+в кэше, ничего не выполняется: отчет собирается из сохраненных выводов.
+Кэш хранит ячейки последних MAX_CACHED_RUNS запусков, поэтому запуски
+с разными параметрами не вытесняют друг друга.
+Иначе состояние восстанавливается из последней актуальной ячейки, ячейки
+настройки (импорты, опции) повторяются ради побочных эффектов, и
+выполняются только устаревшие ячейки. Если состояние сохранить нельзя
+(например, в ноутбуке объявлены функции), выполнение идет с первой ячейки.
+
+Параметры задаются в ячейке с тегом parameters (# %% tags=["parameters"])
+и переопределяются ключами -p ИМЯ=ЗНАЧЕНИЕ (значение разбирается как JSON,
+иначе остается строкой).
+
+Результат — отчет <ноутбук>.report.md рядом с ноутбуком, графики — в
+каталоге <ноутбук>_files/.
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import time
+import traceback
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+CACHE_DIR_NAME = '.cache'
+CACHE_VERSION = 1
+CELL_MARKER = re.compile(r'^# %%(.*)$')
+MARKDOWN_TAG = re.compile(r'\[markdown\]')
+PARAMETERS_TAG = re.compile(r'tags\s*=\s*\[[^\]]*["\']parameters["\'][^\]]*\]')
+# Сколько символов вывода ячейки попадает в отчет
+MAX_OUTPUT_CHARS = 20_000
+# Сколько последних запусков (например, с разными параметрами) хранит кэш ноутбука
+MAX_CACHED_RUNS = 8
+
+
+def parse_cells(text: str) -> List[Dict[str, Any]]:
+    """Разбивает текст ноутбука на ячейки по маркерам # %%
+
+    Текст до первого маркера — ячейка кода без заголовка (обычно только
+    комментарии). Ячейки [markdown] не выполняются и попадают в отчет как текст.
+    """
+    cells = []
+    header, start, lines = '', 1, []
+
+    def close():
+        code = '\n'.join(lines).strip('\n')
+        if not code and not header:
+            return
+        markdown = bool(MARKDOWN_TAG.search(header))
+        title = PARAMETERS_TAG.sub('', MARKDOWN_TAG.sub('', header)).strip()
+        cells.append({
+            'index': len(cells),
+            'line': start,
+            'title': title,
+            'markdown': markdown,
+            'parameters': bool(PARAMETERS_TAG.search(header)),
+            'code': '' if markdown else code,
+            'text': _markdown_text(code) if markdown else '',
+        })
+
+    for number, line in enumerate(text.splitlines(), 1):
+        match = CELL_MARKER.match(line)
+        if match:
+            close()
+            header, start, lines = match.group(1), number, []
+        else:
+            lines.append(line)
+    close()
+    return cells
+
+
+def _markdown_text(code: str) -> str:
+    return '\n'.join(re.sub(r'^# ?', '', line) for line in code.splitlines())
+
+
+def parse_params(items: List[str]) -> Dict[str, Any]:
+    """Параметры вида ИМЯ=ЗНАЧЕНИЕ: значение — JSON, иначе строка"""
+    params = {}
+    for item in items or []:
+        name, sep, value = item.partition('=')
+        if not sep or not name.strip().isidentifier():
+            raise ValueError(f"Параметр должен иметь вид ИМЯ=ЗНАЧЕНИЕ: {item}")
+        try:
+            params[name.strip()] = json.loads(value)
+        except ValueError:
+            params[name.strip()] = value
+    return params
+
+
+def _names(tree: ast.AST) -> set:
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def _loaded_names(tree: ast.AST) -> set:
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+
+
+def _definitions(tree: ast.Module) -> Dict[str, ast.Constant]:
+    """Строки, присвоенные именам на верхнем уровне ячейки: DATA_PATH = 'data.csv'"""
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) \
+                and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    definitions[target.id] = node.value
+    return definitions
+
+
+def _literals(tree: ast.AST, skip: Optional[set] = None) -> List[str]:
+    return [node.value for node in ast.walk(tree)
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in (skip or ())
+            and 0 < len(node.value) < 512 and '\n' not in node.value]
+
+
+def is_setup_cell(tree: ast.Module) -> bool:
+    """Ячейка настройки: импорты, вызовы функций и присваивания констант
+
+    Такие ячейки дешево повторить, а их побочные эффекты (опции pandas,
+    стиль графиков) не сохраняются в пространстве имен.
+    """
+    if not tree.body:
+        return False
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            continue
+        if isinstance(node, ast.Assign) and isinstance(node.value, (ast.Constant, ast.Tuple, ast.List)) \
+                and all(isinstance(item, ast.Constant) for item in getattr(node.value, 'elts', [node.value])):
+            continue
+        return False
+    return True
+
+
+class Fingerprints:
+    """Отпечатки файлов данных: sha256 содержимого, пересчет только при смене размера или mtime"""
+
+    def __init__(self, state_path: Path):
+        self.state_path = state_path
+        try:
+            self.known = json.loads(state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.known = {}
+        self.used = {}
+
+    def of(self, path: Path) -> str:
+        key = str(path)
+        if key in self.used:
+            return self.used[key]
+        if path.is_dir():
+            # Для каталога (например, снимков данных) — состав, размеры и mtime файлов
+            digest = hashlib.sha256()
+            for item in sorted(p for p in path.rglob('*') if p.is_file()):
+                stat = item.stat()
+                digest.update(f"{item.relative_to(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+            value = digest.hexdigest()
+        else:
+            stat = path.stat()
+            known = self.known.get(key)
+            if known and (known['size'], known['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                value = known['sha256']
+            else:
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+                value = digest.hexdigest()
+                self.known[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': value}
+        self.used[key] = value
+        return value
+
+    def save(self) -> None:
+        known = {key: value for key, value in self.known.items() if key in self.used}
+        write_json(self.state_path, known)
+
+
+class NotebookRunner:
+    """Выполнение ноутбука с кэшем выводов и состояния по ячейкам"""
+
+    def __init__(self, notebook_path: Path, params: Optional[Dict[str, Any]] = None,
+                 force: bool = False, cache_dir: Optional[Path] = None, report: bool = True,
+                 keep_runs: int = MAX_CACHED_RUNS):
+        self.notebook_path = Path(notebook_path).resolve()
+        self.base_dir = self.notebook_path.parent
+        self.params = params or {}
+        self.force = force
+        self.report = report
+        self.keep_runs = max(keep_runs, 1)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.base_dir / CACHE_DIR_NAME / self.notebook_path.stem
+        self.cells_dir = self.cache_dir / 'cells'
+        self.objects_dir = self.cache_dir / 'objects'
+        self.figures_dir = self.cache_dir / 'figures'
+
+    def run(self) -> Dict[str, Any]:
+        """Выполняет ноутбук; возвращает сводку запуска"""
+        started = time.perf_counter()
+        cells = parse_cells(self.notebook_path.read_text(encoding='utf-8'))
+        for cell in cells:
+            cell['tree'] = ast.parse(cell['code'], filename=self._filename(cell))
+        # Ячейки только из комментариев не выполняются
+        code_cells = [cell for cell in cells if cell['tree'].body]
+
+        fingerprints = Fingerprints(self.cache_dir / 'fingerprints.json')
+        previous = hashlib.sha256(f"{CACHE_VERSION}|{self.notebook_path.name}".encode('utf-8')).hexdigest()
+        # Строковые значения имен, заданные в предыдущих ячейках и параметрами
+        values = {name: value for name, value in self.params.items() if isinstance(value, str)}
+        for cell in code_cells:
+            cell['key'] = previous = self._cell_key(previous, cell, fingerprints, values)
+
+        records = {}
+        first_stale = None
+        for position, cell in enumerate(code_cells):
+            record = None if self.force else self._load_record(cell['key'])
+            if record is None:
+                first_stale = position
+                break
+            records[cell['key']] = record
+
+        executed, error = [], None
+        if first_stale is not None:
+            executed, error = self._execute(code_cells, first_stale, records)
+
+        fingerprints.save()
+        self._prune(records)
+        summary = {
+            'notebook': str(self.notebook_path),
+            'cells': len(code_cells),
+            'executed': len(executed),
+            'cached': sum(1 for cell in code_cells if cell['key'] in records and cell['index'] not in executed),
+            'error': error,
+            'duration': time.perf_counter() - started,
+            'report': None,
+            # Ключ последней ячейки: меняется при изменении кода, параметров или данных
+            'key': code_cells[-1]['key'] if code_cells else None,
+        }
+        if self.report:
+            summary['report'] = str(self._write_report(cells, records, executed, summary))
+        return summary
+
+    def variables(self, key: str, names: List[str]) -> Dict[str, Any]:
+        """Переменные из сохраненного состояния после ячейки key (см. run()['key'])"""
+        record = self._load_record(key)
+        if record is None or record.get('state') is None:
+            raise ValueError(f"Состояние ноутбука {self.notebook_path.name} не сохранено в кэше")
+        missing = [name for name in names if name not in record['state']]
+        if missing:
+            raise KeyError(f"В ноутбуке нет переменных: {', '.join(missing)}")
+        namespace = {}
+        if not self._restore({name: record['state'][name] for name in names}, namespace):
+            raise ValueError(f"Не удалось восстановить переменные ноутбука {self.notebook_path.name}")
+        return namespace
+
+    def _filename(self, cell: Dict[str, Any]) -> str:
+        return f"{self.notebook_path.name}:{cell['line']}"
+
+    def _cell_key(self, previous: str, cell: Dict[str, Any], fingerprints: Fingerprints,
+                  values: Dict[str, str]) -> str:
+        """Ключ ячейки; values — строковые значения имен (дополняются определениями ячейки)"""
+        names = _names(cell['tree'])
+        # Ячейка параметров зависит от всех переданных параметров
+        params = self.params if cell['parameters'] else {
+            name: value for name, value in self.params.items() if name in names}
+
+        # Путь, присвоенный имени, — не чтение файла: отпечаток получит ячейка,
+        # которая использует это имя, иначе смена данных сбрасывала бы все ячейки
+        definitions = _definitions(cell['tree'])
+        for name, node in definitions.items():
+            passed = self.params.get(name) if cell['parameters'] else None
+            values[name] = passed if isinstance(passed, str) else node.value
+        candidates = [values[name] for name in sorted(_loaded_names(cell['tree'])) if name in values]
+        candidates += _literals(cell['tree'], {id(node) for node in definitions.values()})
+        data = {}
+        for candidate in candidates:
+            path = self._data_path(candidate)
+            if path is not None:
+                data[candidate] = fingerprints.of(path)
+        payload = json.dumps([previous, cell['code'], params, data], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _data_path(self, value: str) -> Optional[Path]:
+        """Существующий файл или каталог данных, на который указывает строка"""
+        if '/' not in value and '.' not in value:
+            return None
+        try:
+            path = (self.base_dir / value).resolve()
+            exists = path.exists()
+        except (OSError, ValueError):
+            return None
+        if not exists or path == self.notebook_path or path in self.base_dir.parents or path == self.base_dir:
+            return None
+        if self.cache_dir in path.parents or path == self.cache_dir:
+            return None
+        return path
+
+    # --- выполнение ---
+
+    def _execute(self, cells: List[Dict[str, Any]], first_stale: int,
+                 records: Dict[str, Dict[str, Any]]) -> Tuple[List[int], Optional[str]]:
+        namespace = {'__name__': '__notebook__', '__file__': str(self.notebook_path)}
+        start = 0
+        if first_stale > 0:
+            state = records[cells[first_stale - 1]['key']].get('state')
+            restored = state is not None and self._restore(state, namespace)
+            if restored:
+                start = first_stale
+            else:
+                records.clear()
+
+        executed = []
+        with self._notebook_environment():
+            # Побочные эффекты пропущенных ячеек настройки (опции pandas, стиль графиков)
+            for cell in cells[:start]:
+                if is_setup_cell(cell['tree']):
+                    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                        exec(compile(cell['tree'], self._filename(cell), 'exec'), namespace)
+
+            for cell in cells[start:]:
+                print(f"▶️  Ячейка {cell['index']}: {cell['title'] or 'без заголовка'}")
+                record = self._run_cell(cell, namespace)
+                executed.append(cell['index'])
+                records[cell['key']] = record
+                if record['error']:
+                    return executed, record['error'].strip().splitlines()[-1]
+                self._save_record(cell['key'], record)
+        return executed, None
+
+    @contextlib.contextmanager
+    def _notebook_environment(self):
+        """Каталог ноутбука как рабочий и в sys.path, графики без окон"""
+        cwd = os.getcwd()
+        sys.path.insert(0, str(self.base_dir))
+        os.environ.setdefault('MPLBACKEND', 'Agg')
+        os.chdir(self.base_dir)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+            sys.path.remove(str(self.base_dir))
+
+    def _run_cell(self, cell: Dict[str, Any], namespace: Dict[str, Any]) -> Dict[str, Any]:
+        tree = cell['tree']
+        last = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            last = ast.Expression(tree.body[-1].value)
+            tree = ast.Module(body=tree.body[:-1], type_ignores=[])
+        filename = self._filename(cell)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        result, error = None, None
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                exec(compile(tree, filename, 'exec'), namespace)
+                if cell['parameters']:
+                    namespace.update(self.params)
+                if last is not None:
+                    value = eval(compile(last, filename, 'eval'), namespace)
+                    if value is not None:
+                        result = repr(value)
+            except Exception:
+                # Без кадра самого запускающего кода
+                kind, value, tb = sys.exc_info()
+                error = ''.join(traceback.format_exception(kind, value, tb.tb_next))
+        duration = time.perf_counter() - started
+
+        return {
+            'stdout': stdout.getvalue()[:MAX_OUTPUT_CHARS],
+            'stderr': stderr.getvalue()[:MAX_OUTPUT_CHARS],
+            'result': result[:MAX_OUTPUT_CHARS] if result else None,
+            'figures': self._save_figures(),
+            'error': error,
+            'duration': duration,
+            'state': None if error else self._snapshot(namespace),
+        }
+
+    def _save_figures(self) -> List[str]:
+        """Сохраняет открытые графики matplotlib в кэш и закрывает их"""
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        if pyplot is None:
+            return []
+        names = []
+        for number in pyplot.get_fignums():
+            buffer = io.BytesIO()
+            pyplot.figure(number).savefig(buffer, format='png', bbox_inches='tight')
+            data = buffer.getvalue()
+            name = hashlib.sha256(data).hexdigest()[:16] + '.png'
+            self.figures_dir.mkdir(parents=True, exist_ok=True)
+            if not (self.figures_dir / name).exists():
+                (self.figures_dir / name).write_bytes(data)
+            names.append(name)
+        pyplot.close('all')
+        return names
+
+    # --- состояние ---
+
+    def _snapshot(self, namespace: Dict[str, Any]) -> Optional[Dict[str, List[str]]]:
+        """Состояние пространства имен: модули по имени, объекты — pickle по хэшу
+
+        None, если какой-то объект не сериализуется (функции и классы ноутбука).
+        """
+        state = {}
+        for name, value in namespace.items():
+            if name.startswith('__'):
+                continue
+            if isinstance(value, types.ModuleType):
+                state[name] = ['module', value.__name__]
+                continue
+            try:
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return None
+            digest = hashlib.sha256(data).hexdigest()
+            path = self.objects_dir / f"{digest}.pkl"
+            if not path.exists():
+                self.objects_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(path.name + '.part')
+                tmp_path.write_bytes(data)
+                tmp_path.replace(path)
+            state[name] = ['object', digest]
+        return state
+
+    def _restore(self, state: Dict[str, List[str]], namespace: Dict[str, Any]) -> bool:
+        import importlib
+
+        with self._notebook_environment():
+            try:
+                for name, (kind, value) in state.items():
+                    if kind == 'module':
+                        namespace[name] = importlib.import_module(value)
+                    else:
+                        namespace[name] = pickle.loads((self.objects_dir / f"{value}.pkl").read_bytes())
+            except Exception:
+                return False
+        return True
+
+    # --- кэш ---
+
+    def _load_record(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.cells_dir / f"{key}.json"
+        try:
+            record = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if any(not (self.figures_dir / name).exists() for name in record['figures']):
+            return None
+        return record
+
+    def _save_record(self, key: str, record: Dict[str, Any]) -> None:
+        write_json(self.cells_dir / f"{key}.json", record)
+
+    def _prune(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Удаляет записи, объекты и графики, не нужные последним keep_runs запускам
+
+        Запуски хранятся в runs.json списками ключей ячеек, последний — первым.
+        """
+        runs_path = self.cache_dir / 'runs.json'
+        try:
+            runs = json.loads(runs_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            runs = []
+        current = list(records)
+        runs = ([current] + [run for run in runs if run != current])[:self.keep_runs]
+        write_json(runs_path, runs)
+
+        records = dict(records)
+        for key in {key for run in runs for key in run} - set(records):
+            record = self._load_record(key)
+            if record is not None:
+                records[key] = record
+        objects = {value for record in records.values() for kind, value in (record.get('state') or {}).values()
+                   if kind == 'object'}
+        figures = {name for record in records.values() for name in record['figures']}
+        for directory, keep, suffix in ((self.cells_dir, set(records), '.json'),
+                                        (self.objects_dir, objects, '.pkl'),
+                                        (self.figures_dir, figures, '')):
+            if not directory.exists():
+                continue
+            for path in directory.iterdir():
+                stem = path.stem if suffix else path.name
+                if path.suffix == '.part' or stem not in keep:
+                    path.unlink()
+
+    # --- отчет ---
+
+    def _write_report(self, cells: List[Dict[str, Any]], records: Dict[str, Dict[str, Any]],
+                      executed: List[int], summary: Dict[str, Any]) -> Path:
+        stem = self.notebook_path.stem
+        report_path = self.base_dir / f"{stem}.report.md"
+        files_dir = self.base_dir / f"{stem}_files"
+        lines = [f"# Отчет: {self.notebook_path.name}", '']
+        if self.params:
+            lines.append('**Параметры:** ' + ', '.join(f"`{name}={json.dumps(value, ensure_ascii=False)}`"
+                                                       for name, value in self.params.items()))
+        lines += [f"**Ячеек:** {summary['cells']} (выполнено {summary['executed']}, из кэша {summary['cached']})",
+                  f"**Время:** {summary['duration']:.2f} сек", '']
+
+        figures = []
+        for cell in cells:
+            if cell['markdown']:
+                lines += [cell['text'], '']
+                continue
+            record = records.get(cell.get('key'))
+            if record is None:
+                continue
+            source = 'выполнена' if cell['index'] in executed else 'из кэша'
+            lines.append(f"<!-- ячейка {cell['index']}: {source}, {record['duration']:.2f} сек -->")
+            for text in (record['stdout'], record['result'], record['stderr'], record['error']):
+                if text and text.strip():
+                    lines += ['```', text.rstrip('\n'), '```']
+            for name in record['figures']:
+                figures.append(name)
+                lines.append(f"![]({files_dir.name}/{name})")
+            lines.append('')
+
+        if figures:
+            files_dir.mkdir(exist_ok=True)
+            for name in figures:
+                if not (files_dir / name).exists():
+                    shutil.copyfile(self.figures_dir / name, files_dir / name)
+            for path in files_dir.iterdir():
+                if path.name not in figures:
+                    path.unlink()
+        elif files_dir.exists():
+            shutil.rmtree(files_dir)
+
+        tmp_path = report_path.with_name(report_path.name + '.part')
+        tmp_path.write_text('\n'.join(lines), encoding='utf-8')
+        tmp_path.replace(report_path)
+        return report_path
+
+
+def write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.part')
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def run_notebook(notebook_path: Path, params: Optional[Dict[str, Any]] = None, force: bool = False,
+                 report: bool = True) -> Dict[str, Any]:
+    """Выполняет ноутбук с кэшем ячеек; см. NotebookRunner"""
+    return NotebookRunner(notebook_path, params, force=force, report=report).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Запуск ноутбуков (# %%) с параметрами и кэшем ячеек')
+    parser.add_argument('notebooks', nargs='+', help='Файлы ноутбуков .py')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='ИМЯ=ЗНАЧЕНИЕ',
+                        help='Параметр ноутбука (значение — JSON или строка)')
+    parser.add_argument('--force', action='store_true', help='Игнорировать кэш и выполнить все ячейки')
+    parser.add_argument('--no-report', action='store_true', help='Не писать отчет .report.md')
+
+    args = parser.parse_args()
+    try:
+        params = parse_params(args.param)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    failed = 0
+    for notebook in args.notebooks:
+        path = Path(notebook)
+        if not path.is_file():
+            print(f"❌ Ноутбук не найден: {path}")
+            failed += 1
+            continue
+        summary = run_notebook(path, params, force=args.force, report=not args.no_report)
+        if summary['error']:
+            failed += 1
+            print(f"❌ {path.name}: {summary['error']}")
+        else:
+            print(f"✅ {path.name}: выполнено {summary['executed']}, из кэша {summary['cached']} "
+                  f"из {summary['cells']} ячеек за {summary['duration']:.2f} сек")
+        if summary['report']:
+            print(f"💾 Отчет: {summary['report']}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,18 @@
 Проверка качества аналитического проекта
 """
 
+import io
 import os
 import re
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Iterable, Iterator
 import argparse
 
+from generate_status_report import find_projects
+from report_writer import FORMATS, MarkdownWriter, ReportWriter, open_report
+from sql_lint import DEFAULT_ROWS, SEVERITY_ICONS, lint_project
+
 
 class QualityChecker:
     def __init__(self, project_path: Path):
@@ -17,6 +23,7 @@ class QualityChecker:
         self.issues = []
         self.warnings = []
         self.suggestions = []
+        self.sql_reports = []
     
     def check_required_files(self):
         """Проверяет наличие обязательных файлов"""
@@ -169,6 +176,22 @@ class QualityChecker:
             if broken_links:
                 self.warnings.append(f"⚠️ Найдено {len(broken_links)} битых ссылок в README")
     
+    def check_sql_scripts(self):
+        """Проверяет SQL-скрипты проекта на антипаттерны производительности"""
+        self.sql_reports = lint_project(self.project_path)
+        targets = {'critical': self.issues, 'warning': self.warnings, 'info': self.suggestions}
+        
+        for report in self.sql_reports:
+            if report['error']:
+                self.warnings.append(f"⚠️ Не удалось прочитать SQL-скрипт {report['file']}: {report['error']}")
+                continue
+            # Одна запись на файл и уровень, чтобы балл не обнулялся из-за одного скрипта
+            for severity, target in targets.items():
+                findings = [finding for finding in report['findings'] if finding['severity'] == severity]
+                if findings:
+                    details = ', '.join(f"{finding['title']} (стр. {finding['line']})" for finding in findings)
+                    target.append(f"{SEVERITY_ICONS[severity]} SQL {report['file']}: {details}")
+    
     def calculate_score(self):
         """Вычисляет общий балл качества проекта"""
         # Базовый балл
@@ -192,10 +215,11 @@ class QualityChecker:
         else:
             return "❌ Требует доработки"
     
-    def run_all_checks(self):
+    def run_all_checks(self, verbose: bool = True):
         """Запускает все проверки"""
-        print(f"🔍 Проверка качества проекта: {self.project_path.name}")
-        print("=" * 50)
+        if verbose:
+            print(f"🔍 Проверка качества проекта: {self.project_path.name}")
+            print("=" * 50)
         
         self.check_required_files()
         self.check_file_freshness()
@@ -204,6 +228,7 @@ class QualityChecker:
         self.check_testing_coverage()
         self.check_empty_folders()
         self.check_documentation_links()
+        self.check_sql_scripts()
         
         # Подсчет результатов
         score = self.calculate_score()
@@ -214,83 +239,111 @@ class QualityChecker:
             'quality_level': quality_level,
             'issues': self.issues,
             'warnings': self.warnings,
-            'suggestions': self.suggestions
+            'suggestions': self.suggestions,
+            'sql': self.sql_reports
         }
 
 
-def generate_quality_report(project_path: Path, results: dict):
-    """Генерирует отчет о качестве проекта"""
-    report = f"""# 🔍 Отчет о качестве проекта: {project_path.name}
-
-**Дата проверки:** {datetime.now().strftime('%Y-%m-%d %H:%M')}  
-**Общий балл:** {results['score']}/100  
-**Уровень качества:** {results['quality_level']}
-
-## 📊 Сводка
+ACTION_PLANS = [
+    (50, "Критический уровень - немедленные действия:", [
+        "Устраните все критичные проблемы",
+        "Заполните обязательные файлы",
+        "Добавьте базовую документацию",
+        "Проведите повторную проверку через 1-2 дня",
+    ]),
+    (70, "Требует улучшения:", [
+        "Исправьте критичные проблемы",
+        "Обратите внимание на предупреждения",
+        "Улучшите качество документации",
+        "Добавьте недостающие тест-кейсы",
+    ]),
+    (90, "Хорошее качество - финальные штрихи:", [
+        "Рассмотрите рекомендации",
+        "Обновите устаревшую документацию",
+        "Добавьте примеры данных",
+        "Проверьте ссылки в документации",
+    ]),
+]
 
-- ❌ Критичные проблемы: {len(results['issues'])}
-- ⚠️ Предупреждения: {len(results['warnings'])}  
-- 💡 Предложения: {len(results['suggestions'])}
-
-"""
 
+def write_quality_report(project_path: Path, results: dict, writer: ReportWriter) -> None:
+    """Записывает отчет о качестве проекта в писатель"""
+    writer.begin(f"🔍 Отчет о качестве проекта: {project_path.name}")
+    writer.fields([
+        ("Дата проверки", datetime.now().strftime('%Y-%m-%d %H:%M')),
+        ("Общий балл", f"{results['score']}/100"),
+        ("Уровень качества", results['quality_level']),
+    ])
+    
+    writer.heading("📊 Сводка")
+    writer.bullet_list([
+        f"❌ Критичные проблемы: {len(results['issues'])}",
+        f"⚠️ Предупреждения: {len(results['warnings'])}",
+        f"💡 Предложения: {len(results['suggestions'])}",
+    ])
+    
     if results['issues']:
-        report += "## ❌ Критичные проблемы\n\n"
-        for issue in results['issues']:
-            report += f"- {issue}\n"
-        report += "\n"
+        writer.heading("❌ Критичные проблемы")
+        writer.bullet_list(results['issues'])
     
     if results['warnings']:
-        report += "## ⚠️ Предупреждения\n\n"
-        for warning in results['warnings']:
-            report += f"- {warning}\n"
-        report += "\n"
+        writer.heading("⚠️ Предупреждения")
+        writer.bullet_list(results['warnings'])
     
     if results['suggestions']:
-        report += "## 💡 Рекомендации по улучшению\n\n"
-        for suggestion in results['suggestions']:
-            report += f"- {suggestion}\n"
-        report += "\n"
+        writer.heading("💡 Рекомендации по улучшению")
+        writer.bullet_list(results['suggestions'])
+    
+    sql_findings = [finding for report in results.get('sql', []) for finding in report['findings']]
+    if sql_findings:
+        writer.heading("🗄️ SQL-скрипты")
+        writer.paragraph("Стоимость — во сколько раз выражение дороже того же выражения без антипаттерна "
+                         f"(оценка при {DEFAULT_ROWS:,} строк в таблице)".replace(',', ' '))
+        writer.table(
+            ["Файл", "Строка", "Проблема", "Где", "Стоимость", "Доля файла", "Как исправить"],
+            [(finding['file'], finding['line'], f"{SEVERITY_ICONS[finding['severity']]} {finding['title']}",
+              finding['message'], f"×{finding['cost']:.1f}", f"{finding['share']:.0%}", finding['hint'])
+             for finding in sorted(sql_findings, key=lambda finding: -finding['cost'])]
+        )
     
     # Добавляем план действий
-    report += "## 🎯 План действий\n\n"
+    writer.heading("🎯 План действий")
     
-    if results['score'] < 50:
-        report += """### Критический уровень - немедленные действия:
-1. Устраните все критичные проблемы
-2. Заполните обязательные файлы
-3. Добавьте базовую документацию
-4. Проведите повторную проверку через 1-2 дня
-"""
-    elif results['score'] < 70:
-        report += """### Требует улучшения:
-1. Исправьте критичные проблемы
-2. Обратите внимание на предупреждения
-3. Улучшите качество документации
-4. Добавьте недостающие тест-кейсы
-"""
-    elif results['score'] < 90:
-        report += """### Хорошее качество - финальные штрихи:
-1. Рассмотрите рекомендации
-2. Обновите устаревшую документацию
-3. Добавьте примеры данных
-4. Проверьте ссылки в документации
-"""
+    for threshold, title, steps in ACTION_PLANS:
+        if results['score'] < threshold:
+            writer.heading(title, level=3)
+            writer.ordered_list(steps)
+            break
     else:
-        report += """### Отличная работа! 🎉
-Проект готов к передаче. Рекомендуется:
-1. Периодически обновлять документацию
-2. Следить за актуальностью требований
-3. Собирать обратную связь от команды
-"""
+        writer.heading("Отличная работа! 🎉", level=3)
+        writer.paragraph("Проект готов к передаче. Рекомендуется:")
+        writer.ordered_list([
+            "Периодически обновлять документацию",
+            "Следить за актуальностью требований",
+            "Собирать обратную связь от команды",
+        ])
     
-    report += f"""
----
-*Отчет сгенерирован автоматически*  
-*Для повторной проверки: `python scripts/quality_check.py --project {project_path.name}`*
-"""
-    
-    return report
+    writer.footer([
+        "Отчет сгенерирован автоматически",
+        f"Для повторной проверки: `python scripts/quality_check.py --project {project_path.name}`",
+    ])
+    writer.end()
+
+
+def generate_quality_report(project_path: Path, results: dict):
+    """Генерирует отчет о качестве проекта в виде Markdown-строки"""
+    buffer = io.StringIO()
+    write_quality_report(project_path, results, MarkdownWriter(buffer))
+    return buffer.getvalue()
+
+
+def iter_portfolio_rows(projects: Iterable[Path]) -> Iterator[tuple]:
+    """Строки сводной таблицы качества (проекты проверяются по одному)"""
+    for project in projects:
+        checker = QualityChecker(project)
+        results = checker.run_all_checks(verbose=False)
+        yield (project.name, results['score'], results['quality_level'],
+               len(results['issues']), len(results['warnings']))
 
 
 def main():
@@ -298,6 +351,8 @@ def main():
     parser.add_argument('--project', type=str, help='Путь к проекту')
     parser.add_argument('--all', action='store_true', help='Проверить все проекты')
     parser.add_argument('--save-report', action='store_true', help='Сохранить отчет в файл')
+    parser.add_argument('--format', choices=FORMATS, default='md', help='Формат отчета (по умолчанию: md)')
+    parser.add_argument('--output', type=str, help='Файл отчета ("-" для вывода в stdout)')
     
     args = parser.parse_args()
     
@@ -307,48 +362,61 @@ def main():
             print(f"❌ Проект не найден: {project_path}")
             return
         
+        # С --output - в stdout идет только отчет (CSV и т. п. остается разбираемым)
+        to_console = args.output == '-'
         checker = QualityChecker(project_path)
-        results = checker.run_all_checks()
+        results = checker.run_all_checks(verbose=not to_console)
         
-        # Вывод результатов
-        print(f"\n🎯 Результат: {results['quality_level']}")
-        print(f"📊 Балл качества: {results['score']}/100")
+        if not to_console:
+            # Вывод результатов
+            print(f"\n🎯 Результат: {results['quality_level']}")
+            print(f"📊 Балл качества: {results['score']}/100")
         
-        if results['issues']:
-            print(f"\n❌ Критичные проблемы ({len(results['issues'])}):")
-            for issue in results['issues'][:5]:  # Показываем первые 5
-                print(f"  {issue}")
+            if results['issues']:
+                print(f"\n❌ Критичные проблемы ({len(results['issues'])}):")
+                for issue in results['issues'][:5]:  # Показываем первые 5
+                    print(f"  {issue}")
         
-        if results['warnings']:
-            print(f"\n⚠️ Предупреждения ({len(results['warnings'])}):")
-            for warning in results['warnings'][:5]:  # Показываем первые 5
-                print(f"  {warning}")
+            if results['warnings']:
+                print(f"\n⚠️ Предупреждения ({len(results['warnings'])}):")
+                for warning in results['warnings'][:5]:  # Показываем первые 5
+                    print(f"  {warning}")
         
-        if results['suggestions']:
-            print(f"\n💡 Рекомендации ({len(results['suggestions'])}):")
-            for suggestion in results['suggestions'][:3]:  # Показываем первые 3
-                print(f"  {suggestion}")
+            if results['suggestions']:
+                print(f"\n💡 Рекомендации ({len(results['suggestions'])}):")
+                for suggestion in results['suggestions'][:3]:  # Показываем первые 3
+                    print(f"  {suggestion}")
         
         # Сохранение отчета
-        if args.save_report:
-            report = generate_quality_report(project_path, results)
-            report_path = project_path / f"QUALITY_REPORT_{datetime.now().strftime('%Y%m%d')}.md"
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"\n✅ Отчет сохранен: {report_path}")
+        if args.save_report or args.output:
+            report_path = args.output or project_path / f"QUALITY_REPORT_{datetime.now().strftime('%Y%m%d')}.{args.format}"
+            with open_report(args.format, report_path) as writer:
+                write_quality_report(project_path, results, writer)
+            if not to_console:
+                print(f"\n✅ Отчет сохранен: {report_path}")
     
     elif args.all:
         # Проверка всех проектов
-        projects = []
-        for item in Path('.').iterdir():
-            if item.is_dir() and not item.name.startswith('.') and not item.name == 'scripts':
-                if (item / '00_Администрирование').exists():
-                    projects.append(item)
+        projects = list(find_projects())
         
         if not projects:
             print("❌ Аналитические проекты не найдены")
             return
         
+        if args.output:
+            # Сводная таблица пишется по мере проверки проектов
+            with open_report(args.format, args.output) as writer:
+                writer.begin("🔍 Качество портфеля проектов")
+                writer.fields([("Дата проверки", datetime.now().strftime('%Y-%m-%d %H:%M'))])
+                count = writer.table(
+                    ["Проект", "Балл", "Уровень качества", "Критичных проблем", "Предупреждений"],
+                    iter_portfolio_rows(projects)
+                )
+                writer.end()
+            if args.output != '-':
+                print(f"✅ Сводный отчет по {count} проектам сохранен: {args.output}")
+            return
+        
         print(f"🔍 Проверка {len(projects)} проектов:\n")
         
         for project in projects:
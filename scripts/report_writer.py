@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потоковая запись отчетов в Markdown, HTML и CSV
+
+Писатели получают блоки отчета (заголовки, поля, списки, таблицы) и сразу
+пишут их в поток, не накапливая текст в памяти. Строки таблиц передаются
+итератором, поэтому отчет на тысячи строк занимает постоянный объем памяти.
+"""
+
+import csv
+import html
+import re
+import sys
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+
+
+FORMATS = ('md', 'html', 'csv')
+
+
+class ReportWriter(ABC):
+    """Базовый класс потокового писателя отчета"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def begin(self, title: str) -> None:
+        """Начинает документ и пишет главный заголовок"""
+        self.heading(title, level=1)
+
+    def end(self) -> None:
+        """Завершает документ"""
+
+    @abstractmethod
+    def heading(self, text: str, level: int = 2) -> None:
+        """Пишет заголовок раздела"""
+
+    @abstractmethod
+    def fields(self, items: Iterable[Tuple[str, object]]) -> None:
+        """Пишет пары «название: значение»"""
+
+    @abstractmethod
+    def paragraph(self, text: str) -> None:
+        """Пишет абзац текста"""
+
+    @abstractmethod
+    def bullet_list(self, items: Iterable[str]) -> None:
+        """Пишет маркированный список"""
+
+    @abstractmethod
+    def ordered_list(self, items: Iterable[str]) -> None:
+        """Пишет нумерованный список"""
+
+    @abstractmethod
+    def table(self, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
+        """Пишет таблицу построчно, возвращает количество строк"""
+
+    @abstractmethod
+    def footer(self, lines: Iterable[str]) -> None:
+        """Пишет служебную подпись в конце отчета"""
+
+
+class MarkdownWriter(ReportWriter):
+    """Писатель отчета в Markdown"""
+
+    def heading(self, text: str, level: int = 2) -> None:
+        self.stream.write(f"{'#' * level} {text}\n\n")
+
+    def fields(self, items: Iterable[Tuple[str, object]]) -> None:
+        for label, value in items:
+            self.stream.write(f"**{label}:** {value}  \n")
+        self.stream.write("\n")
+
+    def paragraph(self, text: str) -> None:
+        self.stream.write(f"{text}\n\n")
+
+    def bullet_list(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.stream.write(f"- {item}\n")
+        self.stream.write("\n")
+
+    def ordered_list(self, items: Iterable[str]) -> None:
+        for i, item in enumerate(items, 1):
+            self.stream.write(f"{i}. {item}\n")
+        self.stream.write("\n")
+
+    def table(self, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
+        write = self.stream.write
+        write("| " + " | ".join(columns) + " |\n")
+        write("|" + "|".join("-" * (len(col) + 2) for col in columns) + "|\n")
+        count = 0
+        for row in rows:
+            write("| " + " | ".join(_md_cell(value) for value in row) + " |\n")
+            count += 1
+        write("\n")
+        return count
+
+    def footer(self, lines: Iterable[str]) -> None:
+        self.stream.write("---\n")
+        for line in lines:
+            self.stream.write(f"*{line}*  \n")
+
+
+class HtmlWriter(ReportWriter):
+    """Писатель отчета в HTML"""
+
+    def begin(self, title: str) -> None:
+        self.stream.write(
+            "<!DOCTYPE html>\n<html lang=\"ru\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n</head>\n<body>\n"
+        )
+        self.heading(title, level=1)
+
+    def end(self) -> None:
+        self.stream.write("</body>\n</html>\n")
+
+    def heading(self, text: str, level: int = 2) -> None:
+        self.stream.write(f"<h{level}>{_html_inline(text)}</h{level}>\n")
+
+    def fields(self, items: Iterable[Tuple[str, object]]) -> None:
+        self.stream.write("<p>\n")
+        for label, value in items:
+            self.stream.write(f"<strong>{html.escape(label)}:</strong> {_html_inline(value)}<br>\n")
+        self.stream.write("</p>\n")
+
+    def paragraph(self, text: str) -> None:
+        self.stream.write(f"<p>{_html_inline(text)}</p>\n")
+
+    def bullet_list(self, items: Iterable[str]) -> None:
+        self._list('ul', items)
+
+    def ordered_list(self, items: Iterable[str]) -> None:
+        self._list('ol', items)
+
+    def _list(self, tag: str, items: Iterable[str]) -> None:
+        self.stream.write(f"<{tag}>\n")
+        for item in items:
+            self.stream.write(f"<li>{_html_inline(item)}</li>\n")
+        self.stream.write(f"</{tag}>\n")
+
+    def table(self, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
+        write = self.stream.write
+        write("<table>\n<thead><tr>")
+        write("".join(f"<th>{html.escape(col)}</th>" for col in columns))
+        write("</tr></thead>\n<tbody>\n")
+        count = 0
+        for row in rows:
+            write("<tr>" + "".join(f"<td>{_html_inline(value)}</td>" for value in row) + "</tr>\n")
+            count += 1
+        write("</tbody>\n</table>\n")
+        return count
+
+    def footer(self, lines: Iterable[str]) -> None:
+        self.stream.write("<hr>\n<footer>\n")
+        for line in lines:
+            self.stream.write(f"<p><em>{_html_inline(line)}</em></p>\n")
+        self.stream.write("</footer>\n")
+
+
+class CsvWriter(ReportWriter):
+    """Писатель отчета в CSV
+
+    В CSV попадают только табличные данные: таблицы целиком и списки
+    в виде строк «раздел, значение». Заголовки, поля и подписи пропускаются.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.writer = csv.writer(stream, lineterminator='\n')
+        self.section = ''
+        self.blocks = 0
+
+    def begin(self, title: str) -> None:
+        self.section = title
+
+    def heading(self, text: str, level: int = 2) -> None:
+        self.section = text
+
+    def fields(self, items: Iterable[Tuple[str, object]]) -> None:
+        pass
+
+    def paragraph(self, text: str) -> None:
+        pass
+
+    def bullet_list(self, items: Iterable[str]) -> None:
+        self.table(['Раздел', 'Значение'], ((self.section, item) for item in items))
+
+    def ordered_list(self, items: Iterable[str]) -> None:
+        self.bullet_list(items)
+
+    def table(self, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
+        if self.blocks:
+            self.stream.write("\n")
+        self.blocks += 1
+        self.writer.writerow(columns)
+        count = 0
+        for row in rows:
+            self.writer.writerow(row)
+            count += 1
+        return count
+
+    def footer(self, lines: Iterable[str]) -> None:
+        pass
+
+
+WRITERS = {
+    'md': MarkdownWriter,
+    'html': HtmlWriter,
+    'csv': CsvWriter,
+}
+
+
+def _html_inline(text: object) -> str:
+    """Экранирует текст и переводит **жирный** и `код` из Markdown в HTML"""
+    escaped = html.escape(str(text))
+    escaped = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', escaped)
+    return re.sub(r'`(.+?)`', r'<code>\1</code>', escaped)
+
+
+def _md_cell(value: object) -> str:
+    """Экранирует значение ячейки Markdown-таблицы"""
+    return str(value).replace('|', '\\|').replace('\n', ' ')
+
+
+def create_writer(fmt: str, stream: TextIO) -> ReportWriter:
+    """Создает писателя для указанного формата"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Неизвестный формат отчета: {fmt} (доступны: {', '.join(FORMATS)})")
+    return WRITERS[fmt](stream)
+
+
+@contextmanager
+def open_report(fmt: str, output: Optional[Path] = None) -> Iterator[ReportWriter]:
+    """Открывает писателя для файла или stdout (если output равен None или '-')"""
+    if output is None or str(output) == '-':
+        yield create_writer(fmt, sys.stdout)
+        sys.stdout.flush()
+        return
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    newline = '' if fmt == 'csv' else None
+    with open(output, 'w', encoding='utf-8', newline=newline) as f:
+        yield create_writer(fmt, f)
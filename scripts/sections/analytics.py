@@ -26,17 +26,43 @@ def create_section(root: Path, as_template: bool = False) -> None:
 **Метрика:** Как измерить
 **Критерий успеха:** При каком значении гипотеза подтверждена
 **Приоритет:** Высокий/Средний/Низкий
+**Проверка:** источник данных и тест для `python scripts/hypotheses.py --project <проект>`
+
+```json
+{{
+  "source": {{"query": {{"table": "orders", "filters": [["order_date", ">=", "2024-01-01"]]}}}},
+  "test": {{"type": "threshold", "column": "price", "aggregate": "mean", "op": ">=", "value": 1000}}
+}}
+```
+
+## Регистрация гипотез
+
+JSON-блок в разделе гипотезы связывает ее с данными и тестом; результаты
+проверки попадают в выводы.md, пересчитываются только гипотезы с
+изменившимися данными.
+
+- **source.query** — таблица из `03_Данные/выборки_и_примеры/data_config.json`:
+  `{{"table": "orders", "filters": [[столбец, оператор, значение]], "columns": [...]}}`
+- **source.notebook** — переменная ноутбука из `ноутбуки/`:
+  `{{"path": "ноутбуки/template_notebook.py", "variable": "data", "params": {{...}}}}`
+- **test.type**:
+  - `threshold` — агрегат (`count`, `sum`, `mean`, `min`, `max` или `value` для числа) против порога `op`/`value`
+  - `mean_difference`, `proportion_difference` — z-тест `column` между группами `control` и `test` столбца `group`
+    (`alternative`: `two-sided`, `greater`, `less`; `alpha`)
+  - `correlation` — коэффициент Пирсона `x` и `y` против порога `op`/`value`
 """)
     
     write_text_file(section_path / 'выводы.md', f"""{content}
 
 ## Ключевые выводы исследования
 
+<!-- hypotheses:start -->
 ### Подтвержденные гипотезы
 - [Гипотеза 1]: краткое описание результата
 
 ### Отклоненные гипотезы  
 - [Гипотеза 2]: почему отклонена
+<!-- hypotheses:end -->
 
 ### Рекомендации
 1. [Рекомендация 1] на основе [данных/анализа]
@@ -62,6 +88,8 @@ def create_section(root: Path, as_template: bool = False) -> None:
 - `03_feature_engineering.ipynb` — создание признаков
 - `04_modeling.ipynb` — построение моделей
 - `05_results_analysis.ipynb` — анализ результатов
+- `eda.py` — агрегаты EDA для больших таблиц: гистограммы, корреляции и выборка за один проход (используется в `template_notebook.py`)
+- `template_notebook.py` — шаблон ноутбука в формате ячеек `# %%`; параметры (`DATA_PATH`, `DATE_FROM`, `DATE_TO`) задаются в ячейке `tags=["parameters"]`, запуск без Jupyter — `python scripts/notebook_runner.py template_notebook.py -p DATE_FROM=2024-01-01`
 
 ## Соглашения по именованию
 - Префикс с номером для порядка выполнения
@@ -168,59 +196,56 @@ pd.set_option('display.max_rows', 100)
 
 print("✅ Библиотеки загружены")
 
+# %% Параметры tags=["parameters"]
+# Значения по умолчанию; при запуске через scripts/notebook_runner.py
+# переопределяются ключами -p, например: -p DATE_FROM=2024-01-01
+DATA_PATH = 'data/sample_data.csv'
+DATE_FROM = None
+DATE_TO = None
+
 # %% [markdown]
 # ## 1. Загрузка и первичный осмотр данных
 
 # %% Загрузка данных
-# Замените на ваши источники данных
-data = pd.read_csv('data/sample_data.csv')
+# Замените на ваши источники данных (CSV, Parquet, DataFrame или порции
+# DataLoader.fetch_table). Таблица читается порциями: в памяти остаются
+# только агрегаты и выборка строк, поэтому подходит и для 100M строк (см. eda.py)
+from eda import profile
 
-print(f"Размер данных: {data.shape}")
-print(f"Период данных: {data['date'].min()} - {data['date'].max()}")
+stats = profile(DATA_PATH, parse_dates=['date'], date_range=('date', DATE_FROM, DATE_TO))
+# Равномерная выборка строк для осмотра и точечных графиков
+data = stats.sample
 
-# %% Первичный анализ
-print("Информация о данных:")
-data.info()
+print(f"Размер данных: ({stats.rows}, {len(stats.columns)})")
+print(f"Период данных: {stats.min('date')} - {stats.max('date')}")
 
-print("\\nСтатистические характеристики:")
-data.describe()
+# %% Первичный анализ
+print("Характеристики столбцов:")
+print(stats.summary())
 
 print("\\nПропущенные значения:")
-missing = data.isnull().sum()
+missing = stats.missing()
 print(missing[missing > 0])
 
 # %% [markdown]
 # ## 2. Исследовательский анализ данных (EDA)
 
 # %% Распределения числовых переменных
-numeric_cols = data.select_dtypes(include=[np.number]).columns
-n_cols = len(numeric_cols)
-n_rows = (n_cols + 2) // 3
-
-fig, axes = plt.subplots(n_rows, 3, figsize=(15, 5*n_rows))
-axes = axes.flatten() if n_rows > 1 else [axes]
-
-for i, col in enumerate(numeric_cols):
-    if i < len(axes):
-        data[col].hist(bins=30, ax=axes[i])
-        axes[i].set_title(f'Распределение {col}')
-        axes[i].set_xlabel(col)
-        axes[i].set_ylabel('Частота')
-
-# Скрываем лишние subplot'ы
-for i in range(len(numeric_cols), len(axes)):
-    axes[i].set_visible(False)
-
-plt.tight_layout()
+# Гистограммы по счетчикам, накопленным при чтении всех строк
+numeric_cols = stats.numeric
+stats.plot_histograms(numeric_cols)
 plt.show()
 
 # %% Корреляционная матрица
-plt.figure(figsize=(10, 8))
-correlation_matrix = data[numeric_cols].corr()
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-plt.title('Корреляционная матрица')
+# Точные корреляции по всем строкам; для таблиц шире 50 числовых столбцов —
+# по выборке (profile(..., correlation='sample'))
+correlation_matrix = stats.correlation()
+stats.plot_correlation()
 plt.show()
 
+# Границы 95% доверительного интервала (для корреляций по выборке — шире)
+correlation_low, correlation_high = stats.correlation_bounds()
+
 # %% [markdown]
 # ## 3. Проверка гипотез
 
@@ -268,6 +293,444 @@ for i, rec in enumerate(recommendations, 1):
 # - [ ] Автоматизировать анализ в виде дашборда
 """)
         
+        # Агрегаты EDA для больших таблиц (используются шаблоном ноутбука)
+        write_text_file(section_path / 'ноутбуки/eda.py', """# -*- coding: utf-8 -*-
+\"\"\"
+Исследовательский анализ больших таблиц по агрегатам
+
+Таблица читается порциями один раз, в памяти остаются только агрегаты:
+- гистограммы — счетчики в заранее размеченных интервалах; если значение
+  выходит за границы, ширина интервалов удваивается (соседние объединяются),
+  поэтому счет точный, а размер не зависит от числа строк;
+- корреляции — суммы и попарные произведения по порциям (точный Пирсон с
+  попарным исключением пропусков, как DataFrame.corr) с доверительными
+  границами по Фишеру; для очень широких таблиц — по выборке;
+- равномерная выборка строк (reservoir) для осмотра и диаграмм рассеяния.
+
+Графики строятся из агрегатов, поэтому ноутбук работает и на таблицах
+в сотни миллионов строк.
+
+Пример:
+    from eda import profile
+    stats = profile('data/sample_data.csv', parse_dates=['date'])
+    stats.summary()
+    stats.plot_histograms()
+\"\"\"
+
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 500_000
+DEFAULT_BINS = 50
+DEFAULT_SAMPLE_SIZE = 10_000
+# Больше столбцов — корреляции по выборке: попарные суммы стоят O(строк × столбцов²)
+MAX_CHUNKED_CORRELATION_COLUMNS = 50
+
+Source = Union[str, Path, pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+class StreamingHistogram:
+    \"\"\"Гистограмма с точными счетчиками и фиксированным числом интервалов
+
+    Границы задаются первой порцией (или value_range); значения за их
+    пределами расширяют диапазон удвоением ширины интервалов. Если диапазон
+    задан явно, выбросы считаются отдельно (below, above) и не расширяют его.
+    \"\"\"
+
+    def __init__(self, bins: int = DEFAULT_BINS, integer: bool = False,
+                 value_range: Optional[Tuple[float, float]] = None):
+        self.bins = bins + bins % 2
+        self.integer = integer
+        self.fixed = value_range is not None
+        self.origin: Optional[float] = None
+        self.width = 1.0
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+        if value_range is not None:
+            self.origin = float(value_range[0])
+            self.width = (float(value_range[1]) - self.origin) / self.bins
+
+    def add(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.origin is None:
+            self._start(low, high)
+
+        if self.fixed:
+            below = values < self.origin
+            above = values > self.origin + self.bins * self.width
+            self.below += int(np.count_nonzero(below))
+            self.above += int(np.count_nonzero(above))
+            values = values[~below & ~above]
+        else:
+            while high >= self.origin + self.bins * self.width:
+                self._grow(left=False)
+            while low < self.origin:
+                self._grow(left=True)
+
+        index = ((values - self.origin) / self.width).astype(np.int64)
+        np.clip(index, 0, self.bins - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def _start(self, low: float, high: float) -> None:
+        if self.integer:
+            # Целые значения — в центрах интервалов целой ширины
+            self.width = float(max(1, math.ceil((high - low + 1) / self.bins)))
+            self.origin = low - 0.5
+        else:
+            self.width = (high - low) / self.bins if high > low else (abs(low) or 1.0) / self.bins
+            self.origin = low
+
+    def _grow(self, left: bool) -> None:
+        \"\"\"Удваивает ширину интервалов, расширяя диапазон влево или вправо\"\"\"
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        empty = np.zeros(self.bins // 2, dtype=np.int64)
+        if left:
+            self.origin -= self.bins * self.width
+            self.counts = np.concatenate([empty, merged])
+        else:
+            self.counts = np.concatenate([merged, empty])
+        self.width *= 2
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        \"\"\"Границы и счетчики без пустых интервалов по краям\"\"\"
+        if self.origin is None or not self.counts.any():
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        nonzero = np.flatnonzero(self.counts)
+        first, last = (0, self.bins - 1) if self.fixed else (nonzero[0], nonzero[-1])
+        edges = self.origin + self.width * np.arange(first, last + 2)
+        return edges, self.counts[first:last + 1]
+
+    def quantile(self, q: float) -> float:
+        \"\"\"Квантиль по гистограмме (линейно внутри интервала)\"\"\"
+        edges, counts = self.result()
+        if not len(counts):
+            return math.nan
+        cumulative = np.r_[0, np.cumsum(counts)]
+        return float(np.interp(q * cumulative[-1], cumulative, edges))
+
+
+class EDA:
+    \"\"\"Агрегаты для EDA, накапливаемые по порциям таблицы\"\"\"
+
+    def __init__(self, bins: int = DEFAULT_BINS, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                 correlation: str = 'auto', seed: int = 0):
+        if correlation not in ('auto', 'chunked', 'sample'):
+            raise ValueError(f"Неизвестный способ корреляции: {correlation} (доступны: auto, chunked, sample)")
+        self.bins = bins
+        self.sample_size = sample_size
+        self.ranges = ranges or {}
+        self.correlation_mode = correlation
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.nulls: Dict[str, int] = {}
+        self.numeric: List[str] = []
+        self.dates: List[str] = []
+        self.histograms: Dict[str, StreamingHistogram] = {}
+        self.extremes: Dict[str, List[Any]] = {}
+        self._sample: Optional[pd.DataFrame] = None
+
+        # Попарные суммы (значения сдвинуты на среднее первой порции — меньше потеря точности)
+        self.shift: Optional[np.ndarray] = None
+        self.n = self.sx = self.sxx = self.sxy = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        \"\"\"Добавляет порцию строк\"\"\"
+        if not len(chunk):
+            return
+        if not self.columns:
+            self._start(chunk)
+        self.rows += len(chunk)
+
+        for column in self.columns:
+            self.nulls[column] += int(chunk[column].isna().sum())
+
+        for column in self.dates:
+            values = pd.to_datetime(chunk[column], errors='coerce').dropna()
+            if len(values):
+                low, high = values.min(), values.max()
+                current = self.extremes.get(column)
+                self.extremes[column] = [low, high] if current is None else [min(current[0], low), max(current[1], high)]
+
+        matrix = self._numeric_matrix(chunk)
+        finite = np.isfinite(matrix)
+        for index, column in enumerate(self.numeric):
+            values = matrix[finite[:, index], index]
+            self.histograms[column].add(values)
+            if len(values):
+                low, high = float(values.min()), float(values.max())
+                current = self.extremes.get(column)
+                self.extremes[column] = [low, high] if current is None else [min(current[0], low), max(current[1], high)]
+
+        if self._chunked_correlation and self.numeric:
+            self._add_moments(matrix, finite)
+        self._add_sample(chunk)
+
+    def _start(self, chunk: pd.DataFrame) -> None:
+        self.columns = list(chunk.columns)
+        self.dtypes = {column: str(dtype) for column, dtype in chunk.dtypes.items()}
+        self.nulls = {column: 0 for column in self.columns}
+        self.dates = [column for column in self.columns
+                      if pd.api.types.is_datetime64_any_dtype(chunk[column].dtype)]
+        self.numeric = [column for column in self.columns
+                        if pd.api.types.is_numeric_dtype(chunk[column].dtype)
+                        and not pd.api.types.is_bool_dtype(chunk[column].dtype)]
+        self.histograms = {
+            column: StreamingHistogram(self.bins, pd.api.types.is_integer_dtype(chunk[column].dtype),
+                                       self.ranges.get(column))
+            for column in self.numeric
+        }
+        self._chunked_correlation = (self.correlation_mode == 'chunked' or (
+            self.correlation_mode == 'auto' and len(self.numeric) <= MAX_CHUNKED_CORRELATION_COLUMNS))
+
+    def _numeric_matrix(self, chunk: pd.DataFrame) -> np.ndarray:
+        if not self.numeric:
+            return np.empty((len(chunk), 0))
+        frame = chunk[self.numeric]
+        # В следующих порциях CSV числовой столбец может прочитаться как текст
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            frame = frame.apply(pd.to_numeric, errors='coerce')
+        return frame.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _add_moments(self, matrix: np.ndarray, finite: np.ndarray) -> None:
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                counts = finite.sum(axis=0)
+                self.shift = np.where(counts > 0, np.where(finite, matrix, 0).sum(axis=0) / np.maximum(counts, 1), 0)
+            size = len(self.numeric)
+            self.n, self.sx, self.sxx, self.sxy = (np.zeros((size, size)) for _ in range(4))
+        present = finite.astype(np.float64)
+        values = np.where(finite, matrix - self.shift, 0.0)
+        self.n += present.T @ present
+        # sx[i, j] — сумма столбца i по строкам, где заполнены и i, и j
+        self.sx += values.T @ present
+        self.sxx += (values * values).T @ present
+        self.sxy += values.T @ values
+
+    def _add_sample(self, chunk: pd.DataFrame) -> None:
+        \"\"\"Равномерная выборка: строки с наименьшими случайными ключами\"\"\"
+        if not self.sample_size:
+            return
+        chunk = chunk.assign(_sample_key=self.rng.random(len(chunk)))
+        combined = chunk if self._sample is None else pd.concat([self._sample, chunk], ignore_index=True)
+        if len(combined) > self.sample_size:
+            keep = np.argpartition(combined['_sample_key'].to_numpy(), self.sample_size - 1)[:self.sample_size]
+            combined = combined.iloc[keep]
+        self._sample = combined
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        \"\"\"Равномерная выборка строк (не больше sample_size)\"\"\"
+        if self._sample is None:
+            return pd.DataFrame(columns=self.columns)
+        return self._sample.sort_values('_sample_key').drop(columns='_sample_key').reset_index(drop=True)
+
+    def min(self, column: str) -> Any:
+        return self.extremes.get(column, [None, None])[0]
+
+    def max(self, column: str) -> Any:
+        return self.extremes.get(column, [None, None])[1]
+
+    def missing(self) -> pd.Series:
+        \"\"\"Число пропусков по столбцам (как data.isnull().sum())\"\"\"
+        return pd.Series(self.nulls, dtype='int64').reindex(self.columns)
+
+    def summary(self) -> pd.DataFrame:
+        \"\"\"Характеристики столбцов (вместо info() и describe())
+
+        Среднее и стандартное отклонение точные, квартили — по гистограмме.
+        \"\"\"
+        records = []
+        for column in self.columns:
+            record: Dict[str, Any] = {'column': column, 'dtype': self.dtypes[column],
+                                      'count': self.rows - self.nulls[column], 'nulls': self.nulls[column],
+                                      'null_rate': self.nulls[column] / self.rows if self.rows else 0.0}
+            if column in self.histograms:
+                histogram = self.histograms[column]
+                record.update({'mean': self._mean(column), 'std': self._std(column), 'min': self.min(column),
+                               '25%': histogram.quantile(0.25), '50%': histogram.quantile(0.5),
+                               '75%': histogram.quantile(0.75), 'max': self.max(column)})
+            elif column in self.dates:
+                record.update({'min': self.min(column), 'max': self.max(column)})
+            records.append(record)
+        return pd.DataFrame(records).set_index('column')
+
+    def _diagonal(self, column: str) -> Tuple[float, float, float]:
+        index = self.numeric.index(column)
+        if self.n is not None:
+            return self.n[index, index], self.sx[index, index], self.sxx[index, index]
+        # Корреляции по выборке: среднее и разброс тоже оцениваются по ней
+        values = pd.to_numeric(self.sample[column], errors='coerce').dropna().to_numpy(dtype=np.float64)
+        return float(len(values)), float(values.sum()), float((values ** 2).sum())
+
+    def _mean(self, column: str) -> float:
+        count, total, _ = self._diagonal(column)
+        shift = self.shift[self.numeric.index(column)] if self.n is not None else 0.0
+        return shift + total / count if count else math.nan
+
+    def _std(self, column: str) -> float:
+        count, total, squares = self._diagonal(column)
+        return math.sqrt(max(squares - total * total / count, 0.0) / (count - 1)) if count > 1 else math.nan
+
+    def histogram(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        \"\"\"Границы интервалов и счетчики числового столбца\"\"\"
+        return self.histograms[column].result()
+
+    def correlation(self, from_sample: bool = False) -> pd.DataFrame:
+        \"\"\"Матрица корреляций Пирсона числовых столбцов
+
+        По умолчанию точная по всем строкам (если таблица не слишком широкая),
+        from_sample=True — по выборке.
+        \"\"\"
+        r, _ = self._correlation(from_sample)
+        return r
+
+    def correlation_bounds(self, confidence: float = 0.95,
+                           from_sample: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        \"\"\"Нижняя и верхняя доверительные границы корреляций (преобразование Фишера)\"\"\"
+        r, n = self._correlation(from_sample)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            center = np.arctanh(np.clip(r.to_numpy(), -0.999999, 0.999999))
+            spread = z / np.sqrt(n - 3)
+            low = np.where(n > 3, np.tanh(center - spread), -1.0)
+            high = np.where(n > 3, np.tanh(center + spread), 1.0)
+        low[np.isnan(r.to_numpy())] = np.nan
+        high[np.isnan(r.to_numpy())] = np.nan
+        return (pd.DataFrame(low, index=r.index, columns=r.columns),
+                pd.DataFrame(high, index=r.index, columns=r.columns))
+
+    def _correlation(self, from_sample: bool) -> Tuple[pd.DataFrame, np.ndarray]:
+        \"\"\"Корреляции и число пар, по которым они посчитаны\"\"\"
+        if from_sample or self.n is None:
+            sample = self.sample[self.numeric].apply(pd.to_numeric, errors='coerce')
+            present = sample.notna().to_numpy(dtype=np.float64)
+            return sample.corr(), present.T @ present
+
+        n, sx, sxx, sxy = self.n, self.sx, self.sxx, self.sxy
+        sy, syy = sx.T, sxx.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(np.diag(n) > 1, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.numeric, columns=self.numeric), n
+
+    def plot_histograms(self, columns: Optional[Sequence[str]] = None, ncols: int = 3):
+        \"\"\"Гистограммы числовых столбцов по накопленным счетчикам\"\"\"
+        import matplotlib.pyplot as plt
+
+        columns = list(columns or self.numeric)
+        nrows = max((len(columns) + ncols - 1) // ncols, 1)
+        fig, axes = plt.subplots(nrows, ncols, figsize=(5 * ncols, 4 * nrows), squeeze=False)
+        axes = axes.flatten()
+        for ax, column in zip(axes, columns):
+            edges, counts = self.histogram(column)
+            ax.stairs(counts, edges, fill=True)
+            ax.set_title(f'Распределение {column}')
+            ax.set_xlabel(column)
+            ax.set_ylabel('Частота')
+        # Скрываем лишние subplot'ы
+        for ax in axes[len(columns):]:
+            ax.set_visible(False)
+        fig.tight_layout()
+        return fig
+
+    def plot_correlation(self, from_sample: bool = False, annotate: Optional[bool] = None):
+        \"\"\"Тепловая карта корреляций\"\"\"
+        import matplotlib.pyplot as plt
+
+        matrix = self.correlation(from_sample)
+        size = len(matrix)
+        annotate = size <= 15 if annotate is None else annotate
+        fig, ax = plt.subplots(figsize=(max(6, 0.6 * size + 4), max(5, 0.6 * size + 3)))
+        image = ax.imshow(matrix.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1)
+        ax.set_xticks(range(size), matrix.columns, rotation=90)
+        ax.set_yticks(range(size), matrix.index)
+        if annotate:
+            for i in range(size):
+                for j in range(size):
+                    value = matrix.iat[i, j]
+                    if not np.isnan(value):
+                        ax.text(j, i, f'{value:.2f}', ha='center', va='center', fontsize=9)
+        fig.colorbar(image, ax=ax)
+        ax.set_title('Корреляционная матрица' + (' (по выборке)' if from_sample or self.n is None else ''))
+        fig.tight_layout()
+        return fig
+
+
+def iter_chunks(source: Source, chunksize: int = DEFAULT_CHUNKSIZE, columns: Optional[List[str]] = None,
+                parse_dates: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    \"\"\"Порции таблицы: CSV, Parquet, DataFrame или готовый итератор порций
+    (например, DataLoader.fetch_table)\"\"\"
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize] if columns is None else source[columns].iloc[start:start + chunksize]
+        return
+
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Файл {path} не найден")
+        if path.suffix == '.parquet':
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Для Parquet установите pyarrow: pip install pyarrow")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+            return
+        usecols = None if columns is None else list(dict.fromkeys(columns + (parse_dates or [])))
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=usecols, parse_dates=parse_dates)
+        return
+
+    for chunk in source:
+        if parse_dates:
+            chunk = chunk.assign(**{column: pd.to_datetime(chunk[column], errors='coerce') for column in parse_dates})
+        yield chunk if columns is None else chunk[columns]
+
+
+def profile(source: Source, columns: Optional[List[str]] = None, parse_dates: Optional[List[str]] = None,
+            chunksize: int = DEFAULT_CHUNKSIZE, date_range: Optional[Tuple[str, Any, Any]] = None,
+            **options) -> EDA:
+    \"\"\"Агрегаты EDA за один проход по таблице
+
+    date_range — (столбец, начало, конец): только строки периода, границы
+    включительно, None — без границы.
+    options — параметры EDA: bins, sample_size, ranges ({'price': (0, 5000)}),
+    correlation ('auto', 'chunked', 'sample'), seed.
+    \"\"\"
+    if date_range is not None and date_range[0] not in (parse_dates or []):
+        parse_dates = list(parse_dates or []) + [date_range[0]]
+    stats = EDA(**options)
+    for chunk in iter_chunks(source, chunksize, columns, parse_dates):
+        if date_range is not None:
+            chunk = chunk[_in_period(chunk[date_range[0]], date_range[1], date_range[2])]
+        stats.update(chunk)
+    return stats
+
+
+def _in_period(values: pd.Series, start: Any, end: Any) -> pd.Series:
+    # Без границ строки с пропущенной датой остаются; сравнение с NaT ложно
+    mask = pd.Series(True, index=values.index)
+    if start is not None:
+        mask &= values >= pd.Timestamp(start)
+    if end is not None:
+        mask &= values <= pd.Timestamp(end)
+    return mask
+""")
+        
         # Примеры экспериментов
         write_text_file(section_path / 'эксперименты/README.md', """# Эксперименты
 
@@ -281,6 +744,7 @@ for i, rec in enumerate(recommendations, 1):
 - `experiment_design.md` — дизайн эксперимента
 - `results_analysis.ipynb` — анализ результатов
 - `statistical_tests.py` — статистические тесты
+- `experiment_analysis.py` — расчет результатов по спецификации из `experiment_template.md`: разница средних и долей, CUPED, границы последовательного теста, бутстреп; результаты записываются обратно в документ
 
 ### Машинное обучение
 - `ml_experiment_[название]/` — папка ML эксперимента
@@ -447,6 +911,9 @@ experiment_[название]/
 - **Для непрерывных метрик:** t-test / Mann-Whitney U
 - **Для категориальных метрик:** Chi-square / Fisher's exact test
 - **Для пропорций:** Z-test
+- **Снижение дисперсии:** CUPED по значению метрики до эксперимента
+- **Промежуточные проверки:** последовательный тест с расходованием alpha (O'Brien-Fleming / Pocock)
+- **Доверительные интервалы:** нормальное приближение и бутстреп
 
 ### Сегментация
 Планируемые разрезы для анализа:
@@ -523,10 +990,602 @@ experiment_[название]/
 - [ ] Отслеживание технических проблем
 - [ ] Регулярные отчеты стейкхолдерам
 
+## 12. Спецификация анализа
+
+Параметры расчета результатов для `experiment_analysis.py`. Путь к данным —
+относительно этого документа; если строк на единицу несколько (события),
+метрики агрегируются до единицы (`aggregate`: sum для средних, max для долей).
+
+```json
+{
+  "data": "data/experiment_units.csv",
+  "unit": "user_id",
+  "group": "group",
+  "control": "control",
+  "alpha": 0.05,
+  "metrics": [
+    {"name": "Конверсия", "column": "converted", "type": "proportion", "primary": true},
+    {"name": "Выручка на пользователя", "column": "revenue", "type": "mean", "covariate": "revenue_before"}
+  ],
+  "sequential": {"planned_units": 100000, "looks": 5, "spending": "obrien_fleming"},
+  "bootstrap": {"iterations": 2000, "seed": 42}
+}
+```
+
+## 13. Результаты анализа
+
+<!-- experiment-results:start -->
+Заполняется командой `python experiment_analysis.py experiment_template.md`
+<!-- experiment-results:end -->
+
 ---
 
 **Дата последнего обновления:** $(date)  
 **Версия документа:** 1.0
+""")
+
+        write_text_file(section_path / 'эксперименты/experiment_analysis.py', """# -*- coding: utf-8 -*-
+\"\"\"
+Анализ A/B экспериментов по спецификации из документа эксперимента
+
+Документ эксперимента (experiment_template.md) содержит JSON-спецификацию
+в разделе «Спецификация анализа»: файл данных, столбцы единицы и группы,
+контрольную группу, метрики, параметры последовательного теста и бутстрепа.
+Строки событий агрегируются до единиц рандомизации, затем каждая тестовая
+группа сравнивается с контролем:
+
+- разница средних (Уэлч) или долей (z-тест): абсолютная и относительная, с ДИ;
+- CUPED: поправка метрики на ковариату до эксперимента, снижение дисперсии;
+- границы последовательного теста (alpha-spending Лана — ДеМетса);
+- бутстреп-ДИ разницы и лифта: повторные выборки пачками NumPy по корзинам
+  единиц (суммы и счетчики случайных корзин), поэтому стоимость не зависит
+  от числа единиц.
+
+Результаты записываются в документ между метками experiment-results.
+Все расчеты векторные: миллионы единиц в группе обрабатываются за секунды.
+Нормальное распределение — statistics.NormalDist, scipy не нужен. Для
+выборок меньше нескольких сотен единиц нормальное приближение неточно.
+
+Пример:
+    python experiment_analysis.py experiment_template.md
+\"\"\"
+
+import argparse
+import json
+import math
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+SPEC_HEADING = re.compile(r'^#+ .*Спецификация анализа.*$', re.M)
+SPEC_BLOCK = re.compile(r'```json\\s*\\n(.*?)\\n```', re.S)
+RESULTS_START = '<!-- experiment-results:start -->'
+RESULTS_END = '<!-- experiment-results:end -->'
+RESULTS_HEADING = '## 13. Результаты анализа'
+
+DEFAULT_ALPHA = 0.05
+METRIC_TYPES = ('mean', 'proportion')
+# Агрегация строк событий до единицы рандомизации
+DEFAULT_AGGREGATES = {'mean': 'sum', 'proportion': 'max'}
+SPENDING_FUNCTIONS = ('obrien_fleming', 'pocock')
+# Точек сетки при численном интегрировании для границ последовательного теста
+SEQUENTIAL_GRID = 801
+DEFAULT_BOOTSTRAP_ITERATIONS = 2000
+# Единицы раскладываются по корзинам; повторные выборки берутся из корзин
+BOOTSTRAP_BUCKETS = 10_000
+# Сколько элементов (повторов × корзин) обрабатывается за одну пачку
+BOOTSTRAP_BATCH_ELEMENTS = 1 << 22
+
+NORMAL = NormalDist()
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    \"\"\"Векторная функция распределения N(0, 1)\"\"\"
+    return 0.5 * _erfc(-np.asarray(x, dtype=float) / math.sqrt(2)).astype(float)
+
+
+def _two_sided_p(z: float) -> float:
+    return 2 * (1 - NORMAL.cdf(abs(z))) if math.isfinite(z) else float('nan')
+
+
+# --- спецификация и данные ---
+
+def read_spec(doc_path: Path) -> Dict[str, Any]:
+    \"\"\"JSON-спецификация из раздела «Спецификация анализа» документа\"\"\"
+    text = Path(doc_path).read_text(encoding='utf-8')
+    heading = SPEC_HEADING.search(text)
+    block = SPEC_BLOCK.search(text, heading.end()) if heading else None
+    if block is None:
+        raise ValueError("В документе нет раздела «Спецификация анализа» с блоком ```json")
+    spec = json.loads(block.group(1))
+    check_spec(spec)
+    return spec
+
+
+def check_spec(spec: Dict[str, Any]) -> None:
+    \"\"\"Проверяет обязательные поля спецификации\"\"\"
+    for key in ('data', 'group', 'control', 'metrics'):
+        if key not in spec:
+            raise ValueError(f"В спецификации нет поля '{key}'")
+    for metric in spec['metrics']:
+        if 'column' not in metric:
+            raise ValueError(f"У метрики нет поля 'column': {metric}")
+        if metric.get('type', 'mean') not in METRIC_TYPES:
+            raise ValueError(f"Тип метрики должен быть одним из {METRIC_TYPES}: {metric}")
+    spending = spec.get('sequential', {}).get('spending', 'obrien_fleming')
+    if spending not in SPENDING_FUNCTIONS:
+        raise ValueError(f"Функция расходования alpha должна быть одной из {SPENDING_FUNCTIONS}")
+
+
+def load_units(spec: Dict[str, Any], data: Any) -> Tuple[pd.DataFrame, int]:
+    \"\"\"Таблица единиц рандомизации: одна строка на единицу
+
+    data — путь к CSV/Parquet или DataFrame. Если задан столбец unit и строк
+    на единицу несколько (события), метрики агрегируются (sum для средних,
+    max для долей или aggregate из метрики), ковариаты — first. Единицы,
+    попавшие в несколько групп, исключаются; их число возвращается вторым.
+    \"\"\"
+    metrics = spec['metrics']
+    columns = [spec['group']] + [metric['column'] for metric in metrics] \\
+        + [metric['covariate'] for metric in metrics if metric.get('covariate')]
+    if spec.get('unit'):
+        columns.append(spec['unit'])
+    columns = list(dict.fromkeys(columns))
+
+    if isinstance(data, pd.DataFrame):
+        frame = data[columns]
+    else:
+        path = Path(data)
+        if path.suffix == '.parquet':
+            frame = pd.read_parquet(path, columns=columns)
+        else:
+            frame = pd.read_csv(path, usecols=columns)
+
+    unit = spec.get('unit')
+    if not unit or frame[unit].is_unique:
+        return frame, 0
+
+    grouped = frame.groupby(unit, sort=False)
+    groups = grouped[spec['group']].agg(['first', 'nunique'])
+    aggregations = {}
+    for metric in metrics:
+        kind = metric.get('type', 'mean')
+        aggregations[metric['column']] = metric.get('aggregate', DEFAULT_AGGREGATES[kind])
+        if metric.get('covariate'):
+            aggregations.setdefault(metric['covariate'], 'first')
+    units = grouped.agg(aggregations)
+    units[spec['group']] = groups['first']
+    mixed = groups['nunique'] > 1
+    return units[~mixed.to_numpy()].reset_index(), int(mixed.sum())
+
+
+# --- статистика ---
+
+def mean_difference(control: np.ndarray, test: np.ndarray, alpha: float = DEFAULT_ALPHA,
+                    proportion: bool = False) -> Dict[str, float]:
+    \"\"\"Разница средних (или долей) тест − контроль с ДИ и p-value
+
+    Для долей p-value считается по объединенной доле (z-тест), ДИ — по
+    раздельным дисперсиям. Относительный лифт — дельта-методом.
+    \"\"\"
+    n0, n1 = len(control), len(test)
+    m0, m1 = float(control.mean()), float(test.mean())
+    v0, v1 = float(control.var(ddof=1)), float(test.var(ddof=1))
+    diff = m1 - m0
+    se = math.sqrt(v0 / n0 + v1 / n1)
+    if proportion:
+        pooled = (m0 * n0 + m1 * n1) / (n0 + n1)
+        se_test = math.sqrt(pooled * (1 - pooled) * (1 / n0 + 1 / n1))
+    else:
+        se_test = se
+    z = diff / se_test if se_test > 0 else float('nan')
+    q = NORMAL.inv_cdf(1 - alpha / 2)
+
+    lift = lift_se = float('nan')
+    if m0 != 0:
+        lift = diff / m0
+        lift_se = math.sqrt(v1 / n1 / m0 ** 2 + m1 ** 2 * v0 / n0 / m0 ** 4)
+    return {
+        'n_control': n0, 'n_test': n1,
+        'control': m0, 'test': m1,
+        'diff': diff, 'ci_low': diff - q * se, 'ci_high': diff + q * se,
+        'lift': lift, 'lift_low': lift - q * lift_se, 'lift_high': lift + q * lift_se,
+        'z': z, 'p_value': _two_sided_p(z),
+    }
+
+
+def cuped_adjust(values: np.ndarray, covariate: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    \"\"\"Метрика с поправкой CUPED: Y − θ(X − mean X), θ = cov(X, Y) / var(X)
+
+    θ и среднее X считаются по обеим группам вместе, поэтому поправка не
+    смещает разницу. Возвращает скорректированные значения, θ и долю
+    снижения дисперсии.
+    \"\"\"
+    x_mean = covariate.mean()
+    x_centered = covariate - x_mean
+    x_var = float(np.dot(x_centered, x_centered))
+    if x_var == 0:
+        return values, 0.0, 0.0
+    theta = float(np.dot(x_centered, values - values.mean())) / x_var
+    adjusted = values - theta * x_centered
+    reduction = 1 - adjusted.var() / values.var() if values.var() > 0 else 0.0
+    return adjusted, theta, float(reduction)
+
+
+def alpha_spent(fraction: float, alpha: float, spending: str) -> float:
+    \"\"\"Доля alpha, израсходованная к доле информации fraction\"\"\"
+    if fraction <= 0:
+        return 0.0
+    fraction = min(fraction, 1.0)
+    if spending == 'pocock':
+        return alpha * math.log(1 + (math.e - 1) * fraction)
+    return 2 * (1 - NORMAL.cdf(NORMAL.inv_cdf(1 - alpha / 2) / math.sqrt(fraction)))
+
+
+def sequential_boundaries(fractions: Sequence[float], alpha: float = DEFAULT_ALPHA,
+                          spending: str = 'obrien_fleming') -> List[float]:
+    \"\"\"Двусторонние границы z для проверок при долях информации fractions
+
+    Граница каждой проверки подбирается так, чтобы вероятность впервые
+    пересечь ее при H0 равнялась приросту израсходованной alpha. Плотность
+    накопленной статистики на области продолжения считается численно
+    на сетке (рекурсия Армитиджа — Макферсона — Роу).
+    \"\"\"
+    boundaries = []
+    spent = 0.0
+    grid = density = None
+    previous = 0.0
+    for fraction in fractions:
+        target = alpha_spent(fraction, alpha, spending) - spent
+        if grid is None:
+            bound = NORMAL.inv_cdf(1 - target / 2)
+            limit = bound * math.sqrt(fraction)
+            grid = np.linspace(-limit, limit, SEQUENTIAL_GRID)
+            density = np.exp(-grid ** 2 / (2 * fraction)) / math.sqrt(2 * math.pi * fraction)
+        else:
+            step = math.sqrt(fraction - previous)
+            weights = density * _trapezoid_weights(grid)
+
+            def crossing(b: float) -> float:
+                c = b * math.sqrt(fraction)
+                tails = _normal_cdf((-c - grid) / step) + 1 - _normal_cdf((c - grid) / step)
+                return float(np.dot(weights, tails))
+
+            low, high = 0.0, 12.0
+            for _ in range(60):
+                middle = (low + high) / 2
+                if crossing(middle) > target:
+                    low = middle
+                else:
+                    high = middle
+            bound = high
+            limit = bound * math.sqrt(fraction)
+            new_grid = np.linspace(-limit, limit, SEQUENTIAL_GRID)
+            kernel = np.exp(-(new_grid[:, None] - grid[None, :]) ** 2 / (2 * step ** 2)) / (math.sqrt(2 * math.pi) * step)
+            density = kernel @ weights
+            grid = new_grid
+        spent += target
+        previous = fraction
+        boundaries.append(bound)
+    return boundaries
+
+
+def _trapezoid_weights(grid: np.ndarray) -> np.ndarray:
+    weights = np.full(len(grid), grid[1] - grid[0])
+    weights[[0, -1]] /= 2
+    return weights
+
+
+def bootstrap_ci(control: np.ndarray, test: np.ndarray, alpha: float = DEFAULT_ALPHA,
+                 iterations: int = DEFAULT_BOOTSTRAP_ITERATIONS, seed: Optional[int] = None,
+                 buckets: int = BOOTSTRAP_BUCKETS) -> Dict[str, float]:
+    \"\"\"Перцентильные бутстреп-ДИ разницы средних и относительного лифта
+
+    Единицы случайно раскладываются по корзинам (суммы и счетчики), повторная
+    выборка берется из корзин — так стоимость O(повторов × корзин) при
+    любом числе единиц. Если единиц не больше корзин, это обычный бутстреп.
+    Повторы считаются пачками, чтобы матрица индексов помещалась в память.
+    \"\"\"
+    rng = np.random.default_rng(seed)
+    control_sums, control_counts = _bucketize(control, buckets, rng)
+    test_sums, test_counts = _bucketize(test, buckets, rng)
+    batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // max(len(control_sums), len(test_sums)))
+
+    diffs, lifts = [], []
+    for start in range(0, iterations, batch):
+        size = min(batch, iterations - start)
+        control_means = _resampled_means(control_sums, control_counts, size, rng)
+        test_means = _resampled_means(test_sums, test_counts, size, rng)
+        diffs.append(test_means - control_means)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lifts.append(test_means / control_means - 1)
+    diffs, lifts = np.concatenate(diffs), np.concatenate(lifts)
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    diff_low, diff_high = np.percentile(diffs, bounds)
+    lift_low, lift_high = np.nanpercentile(lifts, bounds) if np.isfinite(lifts).any() else (np.nan, np.nan)
+    return {'iterations': iterations, 'diff_low': float(diff_low), 'diff_high': float(diff_high),
+            'lift_low': float(lift_low), 'lift_high': float(lift_high)}
+
+
+def _bucketize(values: np.ndarray, buckets: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    if len(values) <= buckets:
+        return values.astype(float), np.ones(len(values))
+    ids = rng.integers(0, buckets, len(values))
+    return np.bincount(ids, weights=values, minlength=buckets), np.bincount(ids, minlength=buckets).astype(float)
+
+
+def _resampled_means(sums: np.ndarray, counts: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    index = rng.integers(0, len(sums), size=(size, len(sums)))
+    return sums[index].sum(axis=1) / counts[index].sum(axis=1)
+
+
+# --- анализ ---
+
+def analyze(spec: Dict[str, Any], data: Any) -> Dict[str, Any]:
+    \"\"\"Результаты эксперимента по спецификации и данным (путь или DataFrame)\"\"\"
+    started = time.perf_counter()
+    check_spec(spec)
+    units, mixed = load_units(spec, data)
+    alpha = spec.get('alpha', DEFAULT_ALPHA)
+    group_column = spec['group']
+    groups = units[group_column].astype(str)
+    sizes = groups.value_counts().sort_index()
+    control_name = str(spec['control'])
+    if control_name not in sizes:
+        raise ValueError(f"В данных нет контрольной группы '{control_name}'")
+    sizes = pd.concat([sizes[[control_name]], sizes.drop(control_name)])
+    control_mask = (groups == control_name).to_numpy()
+
+    bootstrap = spec.get('bootstrap')
+    comparisons = []
+    for group in sizes.index:
+        if group == control_name:
+            continue
+        test_mask = (groups == group).to_numpy()
+        metrics = []
+        for metric in spec['metrics']:
+            metrics.append(_analyze_metric(units, metric, control_mask, test_mask, alpha, bootstrap))
+        comparisons.append({'group': group, 'metrics': metrics})
+
+    results = {
+        'alpha': alpha,
+        'groups': {group: int(count) for group, count in sizes.items()},
+        'control': control_name,
+        'excluded_units': mixed,
+        'comparisons': comparisons,
+    }
+    if spec.get('sequential'):
+        results['sequential'] = _sequential(spec, results)
+    results['duration'] = time.perf_counter() - started
+    return results
+
+
+def _analyze_metric(units: pd.DataFrame, metric: Dict[str, Any], control_mask: np.ndarray,
+                    test_mask: np.ndarray, alpha: float, bootstrap: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    kind = metric.get('type', 'mean')
+    values = units[metric['column']].to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(values)
+    control, test = values[control_mask & valid], values[test_mask & valid]
+    if kind == 'proportion' and not np.isin(values[valid], (0, 1)).all():
+        raise ValueError(f"Метрика-доля '{metric['column']}' должна содержать только 0 и 1")
+
+    result = {'name': metric.get('name', metric['column']), 'column': metric['column'], 'type': kind,
+              'primary': metric.get('primary', False)}
+    result.update(mean_difference(control, test, alpha, proportion=kind == 'proportion'))
+
+    covariate = metric.get('covariate')
+    if covariate:
+        x = units[covariate].to_numpy(dtype=float, na_value=np.nan)
+        both = (control_mask | test_mask) & valid & ~np.isnan(x)
+        adjusted, theta, reduction = cuped_adjust(values[both], x[both])
+        in_control = control_mask[both]
+        cuped = mean_difference(adjusted[in_control], adjusted[~in_control], alpha)
+        # Средние контроля без поправки: лифт относительно реального уровня метрики
+        base = values[both][in_control].mean()
+        if base:
+            cuped['lift'] = cuped['diff'] / base
+            scale = (cuped['ci_high'] - cuped['ci_low']) / 2 / abs(base)
+            cuped['lift_low'], cuped['lift_high'] = cuped['lift'] - scale, cuped['lift'] + scale
+        cuped.update({'covariate': covariate, 'theta': theta, 'variance_reduction': reduction})
+        result['cuped'] = cuped
+
+    if bootstrap is not None:
+        result['bootstrap'] = bootstrap_ci(control, test, alpha, bootstrap.get('iterations', DEFAULT_BOOTSTRAP_ITERATIONS),
+                                           bootstrap.get('seed'), bootstrap.get('buckets', BOOTSTRAP_BUCKETS))
+    return result
+
+
+def _sequential(spec: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    \"\"\"Границы проверок и решение по основной метрике на последней пройденной проверке
+
+    Проверки равномерны по доле информации: k / looks от planned_units
+    (плановое число единиц в группе).
+    \"\"\"
+    settings = spec['sequential']
+    looks = settings.get('looks', 5)
+    spending = settings.get('spending', 'obrien_fleming')
+    fractions = [(k + 1) / looks for k in range(looks)]
+    boundaries = sequential_boundaries(fractions, results['alpha'], spending)
+    planned = settings.get('planned_units')
+
+    decisions = []
+    for comparison in results['comparisons']:
+        metrics = comparison['metrics']
+        primary = next((metric for metric in metrics if metric['primary']), metrics[0])
+        observed = primary.get('cuped', primary)
+        units = min(primary['n_control'], primary['n_test'])
+        fraction = min(units / planned, 1.0) if planned else 1.0
+        reached = sum(1 for value in fractions if value <= fraction + 1e-9)
+        if reached == 0:
+            decision = 'до первой проверки'
+            bound = None
+        else:
+            bound = boundaries[reached - 1]
+            if abs(observed['z']) >= bound:
+                decision = 'остановить: эффект значим'
+            elif reached == looks:
+                decision = 'завершить: эффект не значим'
+            else:
+                decision = 'продолжить'
+        decisions.append({'group': comparison['group'], 'metric': primary['name'], 'fraction': fraction,
+                          'look': reached, 'z': observed['z'], 'boundary': bound, 'decision': decision})
+    return {'looks': looks, 'spending': spending, 'fractions': fractions, 'boundaries': boundaries,
+            'nominal_alpha': [_two_sided_p(bound) for bound in boundaries], 'decisions': decisions}
+
+
+# --- документ ---
+
+def _number(value: float, digits: int = 4) -> str:
+    if value is None or not math.isfinite(value):
+        return '—'
+    return f"{value:.{digits}g}"
+
+
+def _percent(value: float) -> str:
+    return '—' if value is None or not math.isfinite(value) else f"{value * 100:+.2f}%"
+
+
+def _p_value(value: float) -> str:
+    if not math.isfinite(value):
+        return '—'
+    return '< 0.0001' if value < 1e-4 else f"{value:.4f}"
+
+
+def render_results(results: Dict[str, Any]) -> str:
+    \"\"\"Раздел результатов в Markdown\"\"\"
+    alpha = results['alpha']
+    level = f"{(1 - alpha) * 100:g}%"
+    groups = ', '.join(f"{name}: {count:,}".replace(',', ' ') for name, count in results['groups'].items())
+    lines = [f"**Дата расчета:** {datetime.now().strftime('%Y-%m-%d %H:%M')}  ",
+             f"**Единиц по группам:** {groups}  "]
+    if results['excluded_units']:
+        lines.append(f"**Исключено единиц в нескольких группах:** {results['excluded_units']}  ")
+    lines.append(f"**Уровень значимости:** α = {alpha:g}")
+    lines.append('')
+
+    for comparison in results['comparisons']:
+        lines += [f"### {comparison['group']} против {results['control']}", '',
+                  f"| Метрика | Контроль | Тест | Разница | {level} ДИ разницы | Лифт | {level} ДИ лифта | p-value | Значимо |",
+                  "|---------|----------|------|---------|--------------|------|-------------|---------|---------|"]
+        for metric in comparison['metrics']:
+            rows = [(metric['name'], metric)]
+            if 'cuped' in metric:
+                rows.append((f"{metric['name']} (CUPED)", metric['cuped']))
+            for name, values in rows:
+                significant = '✅ да' if values['p_value'] < alpha else 'нет'
+                lines.append(
+                    f"| {name} | {_number(values['control'])} | {_number(values['test'])} | {_number(values['diff'])} "
+                    f"| [{_number(values['ci_low'])}; {_number(values['ci_high'])}] | {_percent(values['lift'])} "
+                    f"| [{_percent(values['lift_low'])}; {_percent(values['lift_high'])}] "
+                    f"| {_p_value(values['p_value'])} | {significant} |")
+        lines.append('')
+
+        cuped = [metric for metric in comparison['metrics'] if 'cuped' in metric]
+        if cuped:
+            lines += ["**CUPED:**", '',
+                      "| Метрика | Ковариата | θ | Снижение дисперсии |",
+                      "|---------|-----------|---|--------------------|"]
+            lines += [f"| {metric['name']} | {metric['cuped']['covariate']} | {_number(metric['cuped']['theta'])} "
+                      f"| {metric['cuped']['variance_reduction'] * 100:.1f}% |" for metric in cuped]
+            lines.append('')
+
+        boot = [metric for metric in comparison['metrics'] if 'bootstrap' in metric]
+        if boot:
+            lines += [f"**Бутстреп ({boot[0]['bootstrap']['iterations']} повторов):**", '',
+                      f"| Метрика | {level} ДИ разницы | {level} ДИ лифта |",
+                      "|---------|--------------|-------------|"]
+            lines += [f"| {metric['name']} | [{_number(metric['bootstrap']['diff_low'])}; "
+                      f"{_number(metric['bootstrap']['diff_high'])}] | [{_percent(metric['bootstrap']['lift_low'])}; "
+                      f"{_percent(metric['bootstrap']['lift_high'])}] |" for metric in boot]
+            lines.append('')
+
+    sequential = results.get('sequential')
+    if sequential:
+        names = {'obrien_fleming': "О'Брайена — Флеминга", 'pocock': 'Покока'}
+        lines += ["### Последовательный тест", '',
+                  f"Функция расходования alpha: {names[sequential['spending']]}, проверок: {sequential['looks']}", '',
+                  "| Проверка | Доля информации | Граница z | Номинальный p |",
+                  "|----------|-----------------|-----------|---------------|"]
+        lines += [f"| {number} | {fraction:.1%} | {bound:.3f} | {_p_value(nominal)} |"
+                  for number, (fraction, bound, nominal)
+                  in enumerate(zip(sequential['fractions'], sequential['boundaries'], sequential['nominal_alpha']), 1)]
+        lines += ['', "| Группа | Метрика | Доля информации | Проверка | z | Граница | Решение |",
+                  "|--------|---------|-----------------|----------|---|---------|---------|"]
+        for item in sequential['decisions']:
+            bound = '—' if item['boundary'] is None else f"{item['boundary']:.3f}"
+            lines.append(f"| {item['group']} | {item['metric']} | {item['fraction']:.1%} | {item['look']} "
+                         f"| {_number(item['z'])} | {bound} | {item['decision']} |")
+        lines.append('')
+    return '\\n'.join(lines).rstrip('\\n') + '\\n'
+
+
+def write_results(doc_path: Path, markdown: str) -> None:
+    \"\"\"Заменяет раздел между метками experiment-results (или добавляет его в конец)\"\"\"
+    doc_path = Path(doc_path)
+    text = doc_path.read_text(encoding='utf-8')
+    block = f"{RESULTS_START}\\n{markdown}{RESULTS_END}"
+    start, end = text.find(RESULTS_START), text.find(RESULTS_END)
+    if start >= 0 and end > start:
+        text = text[:start] + block + text[end + len(RESULTS_END):]
+    else:
+        text = text.rstrip('\\n') + f"\\n\\n{RESULTS_HEADING}\\n\\n{block}\\n"
+    tmp_path = doc_path.with_name(doc_path.name + '.part')
+    tmp_path.write_text(text, encoding='utf-8')
+    tmp_path.replace(doc_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Анализ A/B эксперимента по спецификации из документа')
+    parser.add_argument('document', help='Документ эксперимента (.md) со спецификацией анализа')
+    parser.add_argument('--data', help='Файл данных (по умолчанию — из спецификации)')
+    parser.add_argument('--dry-run', action='store_true', help='Только вывести результаты, не меняя документ')
+
+    args = parser.parse_args()
+    doc_path = Path(args.document)
+    try:
+        spec = read_spec(doc_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    data_path = Path(args.data) if args.data else doc_path.parent / spec['data']
+    if not data_path.exists():
+        print(f"❌ Файл данных не найден: {data_path}")
+        return
+
+    try:
+        results = analyze(spec, data_path)
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    markdown = render_results(results)
+    if args.dry_run:
+        print(markdown)
+    else:
+        write_results(doc_path, markdown)
+        print(f"💾 Результаты записаны в {doc_path}")
+
+    for comparison in results['comparisons']:
+        for metric in comparison['metrics']:
+            mark = '✅' if metric['p_value'] < results['alpha'] else '➖'
+            print(f"{mark} {comparison['group']} / {metric['name']}: лифт {_percent(metric['lift'])}, "
+                  f"p = {_p_value(metric['p_value'])}")
+    for item in results.get('sequential', {}).get('decisions', []):
+        print(f"🧭 {item['group']}: {item['decision']}")
+    print(f"⏱️ Расчет за {results['duration']:.2f} сек")
+
+
+if __name__ == '__main__':
+    main()
 """)
     else:
         # Базовые описания
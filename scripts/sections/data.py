@@ -110,7 +110,12 @@ result = sales.merge(customers, on='customer_id')
 
 ### Для тестирования
 - Используйте эти данные для unit-тестов
-- Проверьте корректность ETL-процессов
+- Проверьте корректность ETL-процессов: `python sql_harness.py` прогоняет
+  `../трансформации/*.sql` на этих данных во встроенной SQLite и показывает
+  время и число строк по каждому выражению (`--data-dir` — на данных synthetic.py)
+- Загружайте измерения инкрементально: `python etl_runner.py` читает только
+  строки новее сохраненного водяного знака (раздел `etl` в data_config.json),
+  `--benchmark` сравнивает повторную загрузку с customer_etl.sql
 - Валидируйте бизнес-правила
 
 ## Требования к данным
@@ -188,7 +193,7 @@ SELECT
     c.customer_id,
     TRIM(UPPER(c.name)) as customer_name,
     LOWER(c.email) as email,
-    REGEXP_REPLACE(c.phone, '[^0-9+]', '') as phone,
+    REGEXP_REPLACE(c.phone, '[^0-9+]', '', 'g') as phone,
     c.registration_date,
     CASE 
         WHEN c.status = 'А' THEN 'active'
@@ -226,9 +231,19 @@ USING (
         phone,
         registration_date,
         status,
-        load_date,
-        ROW_NUMBER() OVER (PARTITION BY source_customer_id ORDER BY load_date DESC) as rn
-    FROM staging.customers
+        load_date
+    FROM (
+        SELECT 
+            source_customer_id,
+            customer_name,
+            email,
+            phone,
+            registration_date,
+            status,
+            load_date,
+            ROW_NUMBER() OVER (PARTITION BY source_customer_id ORDER BY load_date DESC) as rn
+        FROM staging.customers
+    ) ranked
     WHERE rn = 1
 ) AS source
 ON target.source_customer_id = source.source_customer_id 
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Статический анализ SQL-скриптов проекта: антипаттерны производительности
+
+Каждый .sql файл разбирается один раз: текст делится на токены (с номерами
+строк и глубиной скобок) и на выражения по «;», после чего по токенам
+проходят все правила:
+- not_in_subquery — NOT IN (SELECT ...) и <> ALL (SELECT ...): из-за
+  семантики NULL оптимизатор часто не может превратить их в антиджойн;
+- function_on_filter — функция или приведение типа над столбцом в условии
+  WHERE/ON (DATE_TRUNC('month', order_date) = ..., email::text = ...):
+  индекс по столбцу не используется, таблица читается целиком;
+- select_star — SELECT * и alias.* (кроме EXISTS (SELECT * ...));
+- missing_join_predicate — JOIN без ON/USING, CROSS JOIN, ON без сравнения
+  столбцов двух таблиц и таблицы через запятую в FROM без условия
+  соединения в WHERE (декартово произведение).
+
+Относительная стоимость выражения оценивается по простой модели: каждая
+таблица в выражении — один просмотр N строк, найденные антипаттерны
+добавляют свою оценку (N·N для NOT IN и декартова произведения, N для
+полного просмотра вместо поиска по индексу). Коэффициент ×k показывает,
+во сколько раз выражение дороже того же выражения без антипаттернов;
+N задается --rows (по умолчанию 10 000 строк на таблицу).
+
+Используется из quality_check.py (раздел SQL-скриптов в отчете качества)
+и отдельно: python scripts/sql_lint.py <файлы или папки>.
+"""
+
+import argparse
+import re
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_ROWS = 10_000
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>[EeBbXxNn]?'(?:[^']|'')*')
+  | (?P<dollar>\$(?P<tag>[^\W\d]\w*)?\$.*?\$(?P=tag)?\$)
+  | (?P<ident>"(?:[^"]|"")*"|`[^`]*`|\[[^\]\n]*\])
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<op>::|<>|!=|<=|>=|\|\||!~\*|!~|~\*|[-+*/%=<>~!^&|])
+  | (?P<param>[:@$?]\w*)
+  | (?P<punct>[(),;.])
+  | (?P<other>.)
+""", re.X | re.S)
+
+Token = namedtuple('Token', 'kind value line depth')
+
+# Слова, которые не являются столбцами: ключевые слова, литералы и типы
+KEYWORDS = {
+    'ALL', 'AND', 'ANY', 'ARRAY', 'AS', 'ASC', 'BETWEEN', 'BY', 'CASE', 'CAST', 'CROSS', 'CURRENT_DATE',
+    'CURRENT_TIME', 'CURRENT_TIMESTAMP', 'DEFAULT', 'DELETE', 'DESC', 'DISTINCT', 'ELSE', 'END', 'EXCEPT',
+    'EXISTS', 'FALSE', 'FILTER', 'FIRST', 'FOLLOWING', 'FOR', 'FROM', 'FULL', 'GROUP', 'HAVING', 'ILIKE', 'IN',
+    'INNER', 'INSERT', 'INTERSECT', 'INTERVAL', 'INTO', 'IS', 'JOIN', 'LAST', 'LATERAL', 'LEFT', 'LIKE',
+    'LIMIT', 'LOCALTIME', 'LOCALTIMESTAMP', 'MATCHED', 'MERGE', 'NATURAL', 'NOT', 'NULL', 'NULLS', 'OFFSET',
+    'ON', 'OR', 'ORDER', 'OUTER', 'OVER', 'PARTITION', 'PRECEDING', 'RANGE', 'RETURNING', 'RIGHT', 'ROWS',
+    'SELECT', 'SET', 'SIMILAR', 'SOME', 'TABLE', 'THEN', 'TO', 'TRUE', 'UNBOUNDED', 'UNION', 'UNKNOWN',
+    'UPDATE', 'USING', 'VALUES', 'WHEN', 'WHERE', 'WINDOW', 'WITH', 'ZONE',
+    # Части дат в EXTRACT/DATE_PART и единицы INTERVAL
+    'CENTURY', 'DAY', 'DECADE', 'DOW', 'DOY', 'EPOCH', 'HOUR', 'ISODOW', 'MINUTE', 'MONTH', 'QUARTER',
+    'SECOND', 'WEEK', 'YEAR',
+    # Типы в CAST(... AS тип) и ::тип
+    'BIGINT', 'BOOL', 'BOOLEAN', 'CHAR', 'CHARACTER', 'DATE', 'DECIMAL', 'DOUBLE', 'FLOAT', 'INT', 'INTEGER',
+    'JSON', 'JSONB', 'NUMERIC', 'PRECISION', 'REAL', 'SMALLINT', 'TEXT', 'TIME', 'TIMESTAMP', 'TIMESTAMPTZ',
+    'UUID', 'VARCHAR', 'VARYING', 'WITHOUT',
+}
+# Слова перед «(», которые не являются вызовом функции
+NOT_FUNCTIONS = {'AND', 'ALL', 'ANY', 'AS', 'EXISTS', 'FROM', 'IN', 'JOIN', 'NOT', 'ON', 'OR', 'OVER', 'SOME',
+                 'USING', 'VALUES', 'WHERE', 'FILTER', 'SELECT', 'THEN', 'ELSE', 'WHEN'}
+COMPARISONS = {'=', '<>', '!=', '<', '>', '<=', '>=', '~', '~*', '!~', '!~*', 'LIKE', 'ILIKE', 'IN',
+               'BETWEEN', 'IS', 'SIMILAR'}
+# Слова, которые завершают условие WHERE/ON на его уровне скобок
+CLAUSE_END = {'GROUP', 'ORDER', 'LIMIT', 'OFFSET', 'HAVING', 'WINDOW', 'UNION', 'EXCEPT', 'INTERSECT',
+              'RETURNING', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS', 'NATURAL', 'WHEN', 'THEN',
+              'WHERE', 'ON', 'SET', 'VALUES', 'SELECT', 'FETCH', 'FOR'}
+FROM_END = CLAUSE_END - {'JOIN', 'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS', 'NATURAL', 'ON'} | {'USING'}
+
+SEVERITY_ICONS = {'critical': '❌', 'warning': '⚠️', 'info': '💡'}
+RULES = {
+    'not_in_subquery': {
+        'title': 'NOT IN с подзапросом', 'severity': 'warning',
+        'hint': 'NOT EXISTS или LEFT JOIN ... IS NULL: антиджойн по индексу и без ловушки с NULL',
+    },
+    'function_on_filter': {
+        'title': 'Функция над столбцом в фильтре', 'severity': 'warning',
+        'hint': 'Перенесите вычисление на сторону константы (диапазон дат вместо DATE_TRUNC) '
+                'или постройте индекс по выражению',
+    },
+    'select_star': {
+        'title': 'SELECT *', 'severity': 'info',
+        'hint': 'Перечислите нужные столбцы: меньше чтения и схема не меняется вместе с источником',
+    },
+    'missing_join_predicate': {
+        'title': 'Соединение без условия', 'severity': 'critical',
+        'hint': 'Добавьте условие соединения по ключам в ON или WHERE',
+    },
+}
+
+
+def _cost(rule: str, rows: int) -> float:
+    """Добавочная оценка стоимости антипаттерна в строках при N строк в таблице"""
+    if rule in ('not_in_subquery', 'missing_join_predicate'):
+        return float(rows) * rows
+    if rule == 'function_on_filter':
+        return float(rows)
+    return rows * 0.5  # select_star: лишние столбцы читаются и передаются дальше
+
+
+def tokenize(text: str) -> List[Token]:
+    """Значимые токены (без пробелов и комментариев) с номером строки и глубиной скобок"""
+    tokens, line, depth = [], 1, 0
+    for match in TOKEN.finditer(text):
+        kind, value = match.lastgroup, match.group()
+        if kind not in ('space', 'comment'):
+            if value == ')':
+                depth = max(depth - 1, 0)
+            tokens.append(Token(kind, value, line, depth))
+            if value == '(':
+                depth += 1
+        line += value.count('\n')
+    return tokens
+
+
+def _upper(token: Optional[Token]) -> str:
+    return token.value.upper() if token is not None and token.kind == 'word' else ''
+
+
+def split_statements(text: str) -> List[Dict[str, Any]]:
+    """Выражения скрипта: строка начала, комментарий перед ним и токены"""
+    statements, current = [], []
+    labels = _labels(text)
+    for token in tokenize(text):
+        if token.value == ';' and token.depth == 0:
+            if current:
+                statements.append({'line': current[0].line, 'label': labels.get(current[0].line, ''),
+                                   'tokens': current})
+            current = []
+            continue
+        current.append(token)
+    if current:
+        statements.append({'line': current[0].line, 'label': labels.get(current[0].line, ''), 'tokens': current})
+    return statements
+
+
+def _labels(text: str) -> Dict[int, str]:
+    """Комментарий «-- ...», стоящий над строкой, для каждой следующей строки с кодом"""
+    labels, comment = {}, ''
+    for number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if stripped.startswith('--'):
+            comment = stripped.lstrip('- ').strip()
+        elif stripped:
+            labels[number] = comment
+            comment = ''
+    return labels
+
+
+# --- Разбор условий ---
+
+def _is_column(tokens: List[Token], i: int) -> bool:
+    """Ссылка на столбец: слово или идентификатор в кавычках, не ключевое слово, не функция и не тип"""
+    token = tokens[i]
+    if token.kind == 'ident':
+        return True
+    if token.kind != 'word' or token.value.upper() in KEYWORDS:
+        return False
+    following = tokens[i + 1] if i + 1 < len(tokens) else None
+    if following is not None and following.value in ('(', '.'):
+        return False
+    previous = tokens[i - 1] if i > 0 else None
+    return previous is None or previous.value != '::'
+
+
+def _columns(tokens: List[Token]) -> List[str]:
+    """Столбцы в последовательности токенов с квалификатором: ['c.customer_id', 'status']"""
+    columns = []
+    for i, token in enumerate(tokens):
+        if _is_column(tokens, i):
+            if i >= 2 and tokens[i - 1].value == '.' and tokens[i - 2].kind in ('word', 'ident'):
+                columns.append(f"{tokens[i - 2].value}.{token.value}")
+            else:
+                columns.append(token.value)
+    return columns
+
+
+def _region(tokens: List[Token], start: int, stop_words: Set[str]) -> int:
+    """Конец условия/раздела, начатого на позиции start, на его уровне скобок"""
+    depth = tokens[start].depth if start < len(tokens) else 0
+    i = start
+    while i < len(tokens):
+        token = tokens[i]
+        if token.depth < depth or (token.depth == depth and (token.value == ';' or _upper(token) in stop_words)):
+            return i
+        i += 1
+    return i
+
+
+def _split_predicates(tokens: List[Token]) -> List[List[Token]]:
+    """Условия, соединенные AND/OR на верхнем уровне; скобки (a OR b) раскрываются"""
+    if not tokens:
+        return []
+    depth = tokens[0].depth
+    parts, current, between = [], [], False
+    for token in tokens:
+        word = _upper(token) if token.depth == depth else ''
+        if word == 'BETWEEN':
+            between = True
+        if word in ('AND', 'OR') and not (word == 'AND' and between):
+            parts.append(current)
+            current = []
+            continue
+        if word == 'AND':
+            between = False
+        if word == 'NOT' and not current:
+            continue
+        current.append(token)
+    parts.append(current)
+
+    predicates = []
+    for part in parts:
+        if len(part) > 2 and part[0].value == '(' and part[-1].value == ')' \
+                and all(token.depth > depth for token in part[1:-1]) and _upper(part[1]) not in ('SELECT', 'WITH'):
+            predicates.extend(_split_predicates(part[1:-1]))
+        elif part:
+            predicates.append(part)
+    return predicates
+
+
+def _sides(predicate: List[Token]) -> Optional[Tuple[List[Token], List[Token]]]:
+    """Левая и правая части сравнения или None, если сравнения на верхнем уровне нет"""
+    depth = predicate[0].depth
+    for i, token in enumerate(predicate):
+        if token.depth != depth:
+            continue
+        if token.value in COMPARISONS or _upper(token) in COMPARISONS:
+            return predicate[:i], predicate[i + 1:]
+    return None
+
+
+def _function_over_column(side: List[Token]) -> Optional[str]:
+    """Функция или приведение типа над столбцом в части условия: 'LOWER(c.email)', 'o.x::date'"""
+    if not side or (side[0].value == '(' and len(side) > 1 and _upper(side[1]) in ('SELECT', 'WITH')):
+        return None
+    depth = side[0].depth
+    for i, token in enumerate(side):
+        if token.depth != depth:
+            continue
+        if token.kind == 'word' and i + 1 < len(side) and side[i + 1].value == '(' \
+                and token.value.upper() not in NOT_FUNCTIONS:
+            end = i + 2
+            while end < len(side) and side[end].depth > depth:
+                end += 1
+            if _upper(side[i + 2]) in ('SELECT', 'WITH') if i + 2 < len(side) else False:
+                continue
+            columns = _columns(side[i + 2:end])
+            if columns:
+                return f"{token.value.upper()}({columns[0]})"
+        if token.value == '::' and i > 0 and i + 1 < len(side):
+            columns = _columns(side[:i])
+            if columns:
+                return f"{columns[-1]}::{side[i + 1].value}"
+    return None
+
+
+def _qualifiers(tokens: List[Token]) -> Set[str]:
+    return {column.split('.')[0].lower() for column in _columns(tokens) if '.' in column}
+
+
+# --- Правила ---
+
+def _finding(rule: str, token: Token, message: str) -> Dict[str, Any]:
+    return {'rule': rule, 'line': token.line, 'title': RULES[rule]['title'],
+            'severity': RULES[rule]['severity'], 'message': message, 'hint': RULES[rule]['hint']}
+
+
+def check_not_in(tokens: List[Token]) -> List[Dict[str, Any]]:
+    findings = []
+    for i in range(len(tokens) - 3):
+        first, second, paren, inner = tokens[i:i + 4]
+        if paren.value != '(' or _upper(inner) not in ('SELECT', 'WITH'):
+            continue
+        if _upper(first) == 'NOT' and _upper(second) == 'IN':
+            findings.append(_finding('not_in_subquery', first, 'NOT IN (SELECT ...)'))
+        elif first.value in ('<>', '!=') and _upper(second) == 'ALL':
+            findings.append(_finding('not_in_subquery', first, f"{first.value} ALL (SELECT ...)"))
+    return findings
+
+
+def check_filter_functions(tokens: List[Token]) -> List[Dict[str, Any]]:
+    findings = []
+    for i, token in enumerate(tokens):
+        if _upper(token) not in ('WHERE', 'ON') or i + 1 >= len(tokens):
+            continue
+        end = _region(tokens, i + 1, CLAUSE_END)
+        for predicate in _split_predicates(tokens[i + 1:end]):
+            sides = _sides(predicate)
+            for side in sides or ():
+                expression = _function_over_column(side)
+                if expression:
+                    findings.append(_finding('function_on_filter', side[0], f"{token.value.upper()} {expression}"))
+    return findings
+
+
+def check_select_star(tokens: List[Token]) -> List[Dict[str, Any]]:
+    findings = []
+    for i, token in enumerate(tokens):
+        if token.value != '*' or i == 0:
+            continue
+        previous = tokens[i - 1]
+        if previous.value == '.' and i >= 3:
+            previous = tokens[i - 3]
+        if not (_upper(previous) in ('SELECT', 'DISTINCT', 'ALL') or previous.value == ','):
+            continue
+        # SELECT, к которому относится список столбцов
+        j = i - 1
+        while j >= 0 and not (tokens[j].depth == token.depth and _upper(tokens[j]) == 'SELECT'):
+            j -= 1
+        if j < 0:
+            continue
+        if j >= 2 and tokens[j - 1].value == '(' and _upper(tokens[j - 2]) == 'EXISTS':
+            continue
+        star = ''.join(t.value for t in tokens[i - 2:i + 1]) if tokens[i - 1].value == '.' else '*'
+        findings.append(_finding('select_star', token, f"SELECT {star}"))
+    return findings
+
+
+def _from_items(tokens: List[Token], start: int) -> Tuple[List[Tuple[str, Token]], int]:
+    """Элементы FROM через запятую: (псевдоним, первый токен) и конец раздела"""
+    end = _region(tokens, start, FROM_END | {'JOIN', 'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS', 'NATURAL'})
+    depth = tokens[start].depth if start < len(tokens) else 0
+    items, current = [], []
+    for token in tokens[start:end] + [Token('punct', ',', 0, depth)]:
+        if token.value == ',' and token.depth == depth:
+            if current:
+                words = [t for t in current if t.depth == depth and t.kind in ('word', 'ident')
+                         and t.value.upper() not in ('AS', 'ONLY')]
+                lateral = _upper(current[0]) == 'LATERAL' or any(
+                    t.value == '(' and k > 0 and current[k - 1].kind == 'word' for k, t in enumerate(current)
+                    if t.depth == depth)
+                if words and not lateral:
+                    items.append((words[-1].value.strip('"').lower(), current[0]))
+            current = []
+        else:
+            current.append(token)
+    return items, end
+
+
+def check_joins(tokens: List[Token]) -> List[Dict[str, Any]]:
+    findings = []
+    for i, token in enumerate(tokens):
+        word = _upper(token)
+        if word == 'JOIN':
+            prefix = {_upper(t) for t in tokens[max(i - 2, 0):i]}
+            if 'CROSS' in prefix:
+                findings.append(_finding('missing_join_predicate', token, 'CROSS JOIN: декартово произведение'))
+                continue
+            if 'NATURAL' in prefix:
+                continue
+            end = _region(tokens, i + 1, CLAUSE_END - {'ON'} | {'USING', 'ON'})
+            following = _upper(tokens[end]) if end < len(tokens) and tokens[end].depth == token.depth else ''
+            if following not in ('ON', 'USING'):
+                findings.append(_finding('missing_join_predicate', token, 'JOIN без ON/USING'))
+        elif word == 'ON' and i + 1 < len(tokens) and _upper(tokens[i + 1]) not in ('CONFLICT', 'CONSTRAINT'):
+            end = _region(tokens, i + 1, CLAUSE_END)
+            joined = False
+            for predicate in _split_predicates(tokens[i + 1:end]):
+                sides = _sides(predicate)
+                if sides and _columns(sides[0]) and _columns(sides[1]):
+                    joined = True
+            if not joined:
+                findings.append(_finding('missing_join_predicate', token,
+                                         'ON без сравнения столбцов двух таблиц'))
+        elif word == 'FROM' and i + 1 < len(tokens):
+            items, end = _from_items(tokens, i + 1)
+            if len(items) < 2:
+                continue
+            findings.extend(_check_comma_join(tokens, items, end))
+    return findings
+
+
+def _check_comma_join(tokens: List[Token], items: List[Tuple[str, Token]], end: int) -> List[Dict[str, Any]]:
+    """Таблицы через запятую должны быть связаны сравнениями столбцов в WHERE"""
+    aliases = [alias for alias, _ in items]
+    groups = {alias: {alias} for alias in aliases}
+    depth = items[0][1].depth
+    unqualified = False
+    if end < len(tokens) and _upper(tokens[end]) == 'WHERE' and tokens[end].depth == depth:
+        where_end = _region(tokens, end + 1, CLAUSE_END)
+        for predicate in _split_predicates(tokens[end + 1:where_end]):
+            sides = _sides(predicate)
+            if not sides or not _columns(sides[0]) or not _columns(sides[1]):
+                continue
+            left, right = _qualifiers(sides[0]) & set(aliases), _qualifiers(sides[1]) & set(aliases)
+            if not left or not right:
+                unqualified = True  # столбцы без псевдонимов: связь не определить
+            for a in left:
+                for b in right:
+                    merged = groups[a] | groups[b]
+                    for alias in merged:
+                        groups[alias] = merged
+    if unqualified or len({frozenset(group) for group in groups.values()}) == 1:
+        return []
+    first = groups[aliases[0]]
+    return [_finding('missing_join_predicate', token, f"FROM ..., {alias}: нет условия соединения в WHERE")
+            for alias, token in items[1:] if alias not in first]
+
+
+def _table_references(tokens: List[Token]) -> int:
+    """Число просмотров таблиц: имена после FROM/JOIN/UPDATE/INTO/USING и элементы FROM через запятую"""
+    count = 0
+    for i, token in enumerate(tokens[:-1]):
+        if _upper(token) == 'FROM':
+            count += max(len(_from_items(tokens, i + 1)[0]), 1)
+        elif _upper(token) in ('JOIN', 'UPDATE', 'USING', 'MERGE') and tokens[i + 1].kind in ('word', 'ident') \
+                and _upper(tokens[i + 1]) not in KEYWORDS:
+            count += 1
+    return max(count, 1)
+
+
+RULE_CHECKS = (check_not_in, check_filter_functions, check_select_star, check_joins)
+
+
+def lint_statement(statement: Dict[str, Any], rows: int = DEFAULT_ROWS) -> Dict[str, Any]:
+    """Находки правил и относительная стоимость одного выражения"""
+    tokens = statement['tokens']
+    findings = sorted((finding for check in RULE_CHECKS for finding in check(tokens)),
+                      key=lambda finding: finding['line'])
+    base = float(_table_references(tokens)) * rows
+    penalty = 0.0
+    for finding in findings:
+        finding['cost'] = (base + _cost(finding['rule'], rows)) / base
+        penalty += _cost(finding['rule'], rows)
+    return {'line': statement['line'], 'label': statement['label'], 'findings': findings,
+            'cost': base + penalty, 'factor': (base + penalty) / base}
+
+
+def lint_text(text: str, rows: int = DEFAULT_ROWS) -> List[Dict[str, Any]]:
+    return [lint_statement(statement, rows) for statement in split_statements(text)]
+
+
+def lint_file(path: Path, root: Optional[Path] = None, rows: int = DEFAULT_ROWS) -> Dict[str, Any]:
+    """Разбирает файл один раз и проверяет все выражения; доли стоимости — внутри файла"""
+    name = str(path.relative_to(root)) if root else str(path)
+    try:
+        statements = lint_text(path.read_text(encoding='utf-8'), rows)
+    except (OSError, UnicodeDecodeError) as e:
+        return {'file': name, 'error': str(e), 'statements': [], 'findings': [], 'cost': 0.0}
+    total = sum(statement['cost'] for statement in statements) or 1.0
+    findings = []
+    for statement in statements:
+        statement['share'] = statement['cost'] / total
+        findings.extend({**finding, 'file': name, 'statement_line': statement['line'],
+                         'share': statement['share']} for finding in statement['findings'])
+    return {'file': name, 'error': None, 'statements': statements, 'findings': findings, 'cost': total}
+
+
+def find_sql_files(paths: Iterable[Path]) -> List[Path]:
+    """Файлы .sql из списка файлов и папок (скрытые папки пропускаются)"""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(item for item in path.rglob('*.sql')
+                                if not any(part.startswith('.') for part in item.relative_to(path).parts)))
+        elif path.suffix.lower() == '.sql':
+            files.append(path)
+    return files
+
+
+def lint_project(project_path: Path, rows: int = DEFAULT_ROWS) -> List[Dict[str, Any]]:
+    return [lint_file(path, project_path, rows) for path in find_sql_files([project_path])]
+
+
+def format_finding(finding: Dict[str, Any]) -> str:
+    return (f"стр. {finding['line']}: {finding['title']} — {finding['message']} "
+            f"(×{finding['cost']:.1f} к стоимости выражения)")
+
+
+def print_report(reports: List[Dict[str, Any]], verbose: bool = False) -> None:
+    for report in reports:
+        if report['error']:
+            print(f"❌ {report['file']}: {report['error']}")
+            continue
+        icon = '✅' if not report['findings'] else SEVERITY_ICONS[
+            min((finding['severity'] for finding in report['findings']), key=list(SEVERITY_ICONS).index)]
+        print(f"{icon} {report['file']}: выражений {len(report['statements'])}, находок {len(report['findings'])}")
+        for statement in report['statements']:
+            if not statement['findings'] and not verbose:
+                continue
+            label = f" {statement['label']}" if statement['label'] else ''
+            print(f"   📜 стр. {statement['line']}{label}: ×{statement['factor']:.1f}, "
+                  f"{statement['share']:.0%} стоимости файла")
+            for finding in statement['findings']:
+                print(f"      {SEVERITY_ICONS[finding['severity']]} {format_finding(finding)}")
+                print(f"         💡 {finding['hint']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Поиск антипаттернов производительности в SQL-скриптах')
+    parser.add_argument('paths', nargs='+', help='Файлы .sql или папки (например, проект)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Строк в таблице для оценки стоимости')
+    parser.add_argument('--verbose', action='store_true', help='Показывать выражения без находок')
+
+    args = parser.parse_args()
+    paths = [Path(path) for path in args.paths]
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        print(f"❌ Не найдено: {', '.join(missing)}")
+        return
+    files = find_sql_files(paths)
+    if not files:
+        print("⚠️ SQL-скрипты не найдены")
+        return
+    reports = [lint_file(path, rows=args.rows) for path in files]
+    print_report(reports, args.verbose)
+    total = sum(len(report['findings']) for report in reports)
+    print(f"📊 Файлов: {len(reports)}, находок: {total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Скрипты импортируются напрямую, как при запуске из папки scripts"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Тесты мок-сервера API и нагрузочного клиента"""
+
+import asyncio
+import csv
+import io
+import sys
+
+import api_mock
+from api_mock import MockServer, bench, build_requests, parse_spec, run_load
+
+
+SPEC = '''# Спецификация API
+
+## Аутентификация
+Bearer токен в заголовке Authorization.
+
+### GET /api/v1/users/{user_id}
+**Описание:** Пользователь по id
+
+**Ответ:**
+```json
+{"user_id": 42, "name": "Иван"}
+```
+
+### POST /api/v1/reports
+**Тело запроса:**
+```json
+{"type": "sales"}
+```
+
+**Ответ:**
+```json
+{"report_id": 7}
+```
+
+## Коды ошибок
+- `404`: Не найдено
+- `500`: Ошибка сервера
+'''
+
+
+def test_parse_spec_routes():
+    spec = parse_spec(SPEC)
+    assert [route['name'] for route in spec['routes']] == ['GET /api/v1/users/{user_id}', 'POST /api/v1/reports']
+    assert spec['routes'][0]['path_params'] == ['user_id'] and spec['auth']
+    assert 500 in spec['errors']
+
+
+def test_build_requests_host_and_base_path():
+    routes = parse_spec(SPEC)['routes']
+    [get, _] = build_requests(routes, host='api.example.com:8443', base_path='/gateway/')
+    head = get['data'].decode('utf-8').split('\r\n')
+    assert head[0] == 'GET /gateway/api/v1/users/42 HTTP/1.1'
+    assert 'Host: api.example.com:8443' in head
+    [get, _] = build_requests(routes, base_path='/api/v1')
+    assert get['data'].startswith(b'GET /api/v1/users/42 ')
+
+
+def test_bench_against_mock_server():
+    spec = parse_spec(SPEC)
+    summary = asyncio.run(bench(MockServer(spec, seed=1), spec['routes'], 40, 4, None))
+    assert summary['total']['requests'] == 40 and summary['total']['failed'] == 0
+
+
+async def _chunked_server(seen):
+    """Сервер с ответами по частям: клиент должен дочитать их и не сбить keep-alive"""
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            headers = {}
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b''):
+                    break
+                name, _, value = header.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            seen.append((line.split()[1].decode(), headers['host']))
+            writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+                         b'5\r\n{"a":\r\n3;ext=1\r\n1}\n\r\n0\r\nX-Trailer: 1\r\n\r\n')
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def test_load_reads_chunked_responses_with_keep_alive():
+    seen = []
+
+    async def scenario():
+        server = await _chunked_server(seen)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await run_load(f'http://127.0.0.1:{port}/gateway', parse_spec(SPEC)['routes'], 20, 2)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    summary = asyncio.run(scenario())
+    assert summary['total']['requests'] == 20 and summary['total']['failed'] == 0
+    assert len(seen) == 20
+    assert all(path.startswith('/gateway/api/v1/') for path, _ in seen)
+    assert {host for _, host in seen} == {seen[0][1]} and seen[0][1].startswith('127.0.0.1:')
+
+
+def test_bench_csv_to_stdout_has_only_report(tmp_path, monkeypatch, capsys):
+    spec_path = tmp_path / 'api_spec.md'
+    spec_path.write_text(SPEC, encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['api_mock.py', '--spec', str(spec_path), '--bench', '--requests', '20',
+                                      '--clients', '2', '--seed', '1', '--format', 'csv', '--output', '-'])
+    api_mock.main()
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0][:3] == ['Маршрут', 'Запросов', 'Ошибок']
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Тесты проверки гипотез с кэшем результатов и ноутбуков"""
+
+from hypotheses import ANALYTICS_DIR, HypothesisEvaluator, parse_registry
+
+
+NOTEBOOK = '''# %% tags=["parameters"]
+factor = 1
+
+# %%
+total = sum(i * factor for i in range(5))
+'''
+
+REGISTRY = '''### H1: Сумма больше порога
+**Формулировка:** сумма значений больше 5
+
+```json
+{"source": {"notebook": {"path": "ноутбуки/sums.py", "variable": "total"}},
+ "test": {"type": "threshold", "op": ">", "value": 5}}
+```
+'''
+
+
+def hypothesis(hypothesis_id, factor):
+    return {'id': hypothesis_id, 'title': hypothesis_id, 'statement': '',
+            'spec': {'source': {'notebook': {'path': 'ноутбуки/sums.py', 'params': {'factor': factor},
+                                             'variable': 'total'}},
+                     'test': {'type': 'threshold', 'op': '>', 'value': 5}}}
+
+
+def make_project(tmp_path):
+    notebooks = tmp_path / ANALYTICS_DIR / 'ноутбуки'
+    notebooks.mkdir(parents=True)
+    (notebooks / 'sums.py').write_text(NOTEBOOK, encoding='utf-8')
+    return tmp_path
+
+
+def test_parse_registry_reads_spec():
+    [parsed] = parse_registry(REGISTRY)
+    assert parsed['id'] == 'H1' and parsed['title'] == 'Сумма больше порога'
+    assert parsed['spec']['test']['type'] == 'threshold'
+
+
+def test_notebook_with_different_params_cached_between_runs(tmp_path):
+    project = make_project(tmp_path)
+    hypotheses = [hypothesis('H1', 1), hypothesis('H2', 0)]
+
+    first = HypothesisEvaluator(project).evaluate(hypotheses)
+    assert [result['status'] for result in first] == ['confirmed', 'rejected']
+
+    evaluator = HypothesisEvaluator(project)
+    second = evaluator.evaluate(hypotheses)
+    assert [result['status'] for result in second] == ['confirmed', 'rejected']
+    assert all(result['cached'] for result in second)
+    assert len(evaluator._notebooks) == 2
+    assert [summary['executed'] for _, summary in evaluator._notebooks.values()] == [0, 0]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Тесты симулятора синхронизации интеграций"""
+
+from integration_sim import ChangeStream, _verdict, parse_interval, parse_protocol, simulate
+
+
+PROTOCOL = '''## Интеграция с CRM
+- **Система:** CRM
+- **Частота синхронизации:** Каждые 15 минут
+- **Retry policy:** 3 попытки
+
+#### Клиенты (customers)
+| Поле источника | Поле хранилища | Тип | Обязательное |
+|---|---|---|---|
+| id | customer_id | integer | да |
+| name | full_name | string | да |
+| updated | updated_at | datetime | нет |
+'''
+
+
+def integration():
+    [parsed] = parse_protocol(PROTOCOL, 'crm.md')
+    return parsed
+
+
+def test_parse_protocol():
+    parsed = integration()
+    assert parsed['interval'] == 900 and parsed['retries'] == 3
+    [entity] = parsed['entities']
+    assert entity['table'] == 'customers'
+    assert [field['target'] for field in entity['fields']] == ['customer_id', 'full_name', 'updated_at']
+    assert parse_interval('ежечасно') == 3600
+
+
+def test_stream_does_not_depend_on_query_moments():
+    entities = [{**integration()['entities'][0], 'key': 'customer_id'}]
+    coarse = ChangeStream(entities, 120, seed=5).until(600)
+    fine_stream = ChangeStream(entities, 120, seed=5)
+    fine = [event for moment in (0.3, 1.7, 45.2, 45.2, 300, 599.9, 600) for event in fine_stream.until(moment)]
+    assert fine == coarse and len(coarse) > 100
+
+
+def test_configurations_see_same_stream():
+    # Запуски в 0, 600, 1200 и 1800 сек: оба сочетания проигрывают изменения одного потока
+    first = simulate(integration(), 'sqlite', None, interval=60, batch_size=10, duration=1800, seed=3)
+    second = simulate(integration(), 'sqlite', None, interval=600, batch_size=500, duration=1800, seed=3)
+    assert first['events'] == second['events'] > 0
+    assert first['processed'] == second['processed'] == first['events']
+
+
+def test_overloaded_configuration_is_growing():
+    # Одна порция из 10 строк в минуту не успевает за потоком изменений
+    summary = simulate(integration(), 'sqlite', None, interval=60, batch_size=10, duration=1800, seed=3,
+                       max_batches=1)
+    assert summary['growing'] and summary['pending'] > 0
+    assert _verdict(summary, None) == '❌ очередь растет'
+
+
+def test_failed_batches_use_all_attempts_from_protocol():
+    # «3 попытки» — три попытки всего: два повтора на каждую незаписанную порцию
+    summary = simulate(integration(), 'sqlite', None, interval=60, batch_size=10, duration=600, seed=3,
+                       failure_rate=1.0)
+    assert summary['failed_batches'] > 0 and summary['processed'] == 0
+    assert summary['retries'] == 2 * summary['failed_batches']
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Тесты пакетного запуска ноутбуков"""
+
+import time
+
+from generate_status_report import find_projects
+from notebook_batch import NOTEBOOKS_DIR, BatchRunner, find_notebooks
+
+
+NOTEBOOKS = {
+    'fast': "# %%\ntotal = sum(range(10))\n",
+    'broken': "# %%\nraise ValueError('нет данных')\n",
+    'slow': "# %%\nimport time\ntime.sleep(30)\n",
+}
+
+
+def make_portfolio(base):
+    for name, source in NOTEBOOKS.items():
+        project = base / f"project_{name}"
+        (project / '00_Администрирование').mkdir(parents=True)
+        (project / NOTEBOOKS_DIR).mkdir(parents=True)
+        (project / NOTEBOOKS_DIR / f"{name}.py").write_text(source, encoding='utf-8')
+        # Модуль без ячеек не считается ноутбуком
+        (project / NOTEBOOKS_DIR / 'helpers.py').write_text("def helper():\n    pass\n", encoding='utf-8')
+    (base / 'scripts').mkdir()
+
+
+def test_batch_isolates_errors_and_timeouts(tmp_path):
+    make_portfolio(tmp_path)
+    notebooks = find_notebooks(list(find_projects(tmp_path)))
+    assert sorted(path.name for _, path in notebooks) == ['broken.py', 'fast.py', 'slow.py']
+
+    started = time.perf_counter()
+    results = {result['notebook']: result for result in BatchRunner(jobs=2, timeout=2).run(notebooks)}
+    assert time.perf_counter() - started < 15
+
+    assert results['fast.py']['status'] == 'ok' and results['fast.py']['executed'] == 1
+    assert results['broken.py']['status'] == 'error' and 'нет данных' in results['broken.py']['error']
+    assert results['slow.py']['status'] == 'timeout'
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Тесты запуска ноутбуков с кэшем ячеек"""
+
+from notebook_runner import NotebookRunner, parse_cells
+
+
+NOTEBOOK = '''# %% tags=["parameters"]
+factor = 1
+
+# %%
+values = [i * factor for i in range(5)]
+
+# %%
+total = sum(values)
+print(total)
+'''
+
+
+def write_notebook(tmp_path):
+    path = tmp_path / 'notebook.py'
+    path.write_text(NOTEBOOK, encoding='utf-8')
+    return path
+
+
+def run(path, **params):
+    return NotebookRunner(path, params, report=False).run()
+
+
+def test_parse_cells_finds_parameters_cell():
+    cells = parse_cells(NOTEBOOK)
+    assert [cell['parameters'] for cell in cells] == [True, False, False]
+
+
+def test_second_run_uses_cache(tmp_path):
+    path = write_notebook(tmp_path)
+    assert run(path)['executed'] == 3
+    summary = run(path)
+    assert summary['executed'] == 0 and summary['cached'] == 3
+
+
+def test_runs_with_different_params_do_not_evict_each_other(tmp_path):
+    path = write_notebook(tmp_path)
+    run(path, factor=1)
+    run(path, factor=2)
+    assert run(path, factor=1)['executed'] == 0
+    assert run(path, factor=2)['executed'] == 0
+
+
+def test_cache_keeps_only_recent_runs(tmp_path):
+    path = write_notebook(tmp_path)
+    NotebookRunner(path, {'factor': 1}, report=False, keep_runs=1).run()
+    NotebookRunner(path, {'factor': 2}, report=False, keep_runs=1).run()
+    assert NotebookRunner(path, {'factor': 1}, report=False, keep_runs=1).run()['executed'] == 3
+
+
+def test_variables_restored_from_cache(tmp_path):
+    path = write_notebook(tmp_path)
+    runner = NotebookRunner(path, {'factor': 3}, report=False)
+    summary = runner.run()
+    assert runner.variables(summary['key'], ['total']) == {'total': 30}
+
+
+DATA_NOTEBOOK = '''# %% tags=["parameters"]
+DATA_PATH = 'data.csv'
+
+# %%
+offset = 1
+
+# %%
+rows = open(DATA_PATH).read().splitlines()
+
+# %%
+count = len(rows) + offset
+'''
+
+
+def test_data_change_reruns_only_reading_cell_and_later(tmp_path):
+    path = tmp_path / 'data_notebook.py'
+    path.write_text(DATA_NOTEBOOK, encoding='utf-8')
+    data = tmp_path / 'data.csv'
+    data.write_text('a\n1\n', encoding='utf-8')
+    assert run(path)['executed'] == 4
+    data.write_text('a\n1\n2\n', encoding='utf-8')
+    summary = run(path)
+    assert summary['executed'] == 2 and summary['cached'] == 2
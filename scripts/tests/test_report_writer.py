@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Тесты потоковой записи отчетов"""
+
+import csv
+import io
+
+import pytest
+
+from report_writer import ReportWriter, create_writer, open_report
+
+
+def rows(count):
+    for i in range(count):
+        yield [f"строка {i}", i]
+
+
+def test_base_writer_is_abstract():
+    with pytest.raises(TypeError):
+        ReportWriter(io.StringIO())
+
+
+def test_markdown_table_streams_rows_and_escapes_cells():
+    stream = io.StringIO()
+    writer = create_writer('md', stream)
+    writer.begin('Отчет')
+    assert writer.table(['Имя', 'Значение'], rows(3)) == 3
+    writer.table(['A'], [['x|y']])
+    text = stream.getvalue()
+    assert text.startswith('# Отчет\n')
+    assert '| строка 2 | 2 |' in text and 'x\\|y' in text
+
+
+def test_html_escapes_and_converts_inline_markup():
+    stream = io.StringIO()
+    writer = create_writer('html', stream)
+    writer.begin('<Отчет>')
+    writer.paragraph('**важно** и `код` <b>')
+    writer.end()
+    text = stream.getvalue()
+    assert '<title>&lt;Отчет&gt;</title>' in text
+    assert '<strong>важно</strong> и <code>код</code> &lt;b&gt;' in text
+    assert text.rstrip().endswith('</html>')
+
+
+def test_csv_keeps_only_tables_and_lists():
+    stream = io.StringIO()
+    writer = create_writer('csv', stream)
+    writer.begin('Отчет')
+    writer.fields([('Поле', 1)])
+    writer.heading('Проблемы')
+    writer.bullet_list(['нет README'])
+    writer.table(['Имя', 'Значение'], rows(2))
+    blocks = [list(csv.reader(io.StringIO(block))) for block in stream.getvalue().split('\n\n')]
+    assert blocks == [[['Раздел', 'Значение'], ['Проблемы', 'нет README']],
+                      [['Имя', 'Значение'], ['строка 0', '0'], ['строка 1', '1']]]
+
+
+def test_open_report_writes_file(tmp_path):
+    output = tmp_path / 'nested' / 'report.md'
+    with open_report('md', output) as writer:
+        writer.begin('Отчет')
+    assert output.read_text(encoding='utf-8').startswith('# Отчет')
+    with pytest.raises(ValueError):
+        create_writer('pdf', io.StringIO())
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Тесты проверки SQL-скриптов на антипаттерны"""
+
+from sql_lint import lint_text
+
+
+def rules(text):
+    return [finding['rule'] for statement in lint_text(text) for finding in statement['findings']]
+
+
+def test_upsert_on_conflict_is_not_a_join():
+    text = ("INSERT INTO customers (customer_id, email) VALUES (1, 'a@example.com') "
+            "ON CONFLICT (customer_id) DO UPDATE SET email = excluded.email;")
+    assert 'missing_join_predicate' not in rules(text)
+
+
+def test_upsert_on_conflict_on_constraint():
+    text = ("INSERT INTO customers (customer_id) VALUES (1) "
+            "ON CONFLICT ON CONSTRAINT customers_pkey DO NOTHING;")
+    assert 'missing_join_predicate' not in rules(text)
+
+
+def test_join_without_column_comparison():
+    text = "SELECT o.order_id FROM orders o JOIN customers c ON o.amount > 0;"
+    assert 'missing_join_predicate' in rules(text)
+
+
+def test_join_on_columns_is_clean():
+    text = "SELECT o.order_id FROM orders o JOIN customers c ON o.customer_id = c.customer_id;"
+    assert 'missing_join_predicate' not in rules(text)
+
+
+def test_not_in_subquery():
+    text = "SELECT order_id FROM orders WHERE customer_id NOT IN (SELECT customer_id FROM blocked);"
+    assert 'not_in_subquery' in rules(text)
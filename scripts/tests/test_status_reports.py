@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Тесты отчетов о статусе и качестве проектов"""
+
+import csv
+import io
+import sys
+from pathlib import Path
+
+from generate_status_report import generate_report, write_portfolio_report
+import quality_check
+from quality_check import QualityChecker, generate_quality_report, write_quality_report
+from report_writer import create_writer
+
+
+TEMPLATE = Path(__file__).resolve().parents[2] / 'Шаблон_Проекта'
+
+
+def test_status_report_markdown_matches_writer():
+    text = generate_report(TEMPLATE)
+    assert text.startswith('# ')
+    stream = io.StringIO()
+    write_portfolio_report([TEMPLATE, TEMPLATE], create_writer('csv', stream))
+    table = list(csv.reader(io.StringIO(stream.getvalue())))
+    assert table[0] == ['Проект', 'Готовность', 'Файлов', 'Пустых папок']
+    assert [row[0] for row in table[1:]] == [TEMPLATE.name, TEMPLATE.name]
+
+
+def test_quality_report_formats_agree():
+    results = QualityChecker(TEMPLATE).run_all_checks(verbose=False)
+    markdown = generate_quality_report(TEMPLATE, results)
+    stream = io.StringIO()
+    write_quality_report(TEMPLATE, results, create_writer('html', stream))
+    assert str(results['score']) in markdown
+    assert stream.getvalue().startswith('<!DOCTYPE html>')
+
+
+def test_quality_csv_to_stdout_has_only_report(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['quality_check.py', '--project', str(TEMPLATE),
+                                      '--format', 'csv', '--output', '-'])
+    quality_check.main()
+    output = capsys.readouterr().out
+    rows = list(csv.reader(io.StringIO(output)))
+    assert rows[0] == ['Раздел', 'Значение']
+    assert all(len(row) >= 2 for row in rows if row)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Обезличивание выгрузок по правилам test_data.anonymization из data_config.json
+
+Правила задаются по имени столбца:
+- hash_domain — email заменяется ключевым хэшем адреса, домен — хэшем домена
+  в зоне example.com (письма одного домена остаются сгруппированными)
+- mask_digits — все цифры, кроме последних двух, заменяются на *
+- pseudonymize — значение заменяется псевдонимом «Клиент 3FA2B1C49D07E5A8»
+
+Хэши считаются HMAC-SHA256 с секретным ключом из переменной окружения
+ANONYMIZATION_KEY: одно и то же значение в любом файле и на любом процессе
+дает один и тот же результат, а без ключа исходное значение не подобрать.
+Каждое уникальное значение хэшируется один раз (словарь псевдонимов
+кэшируется в процессе), файл читается порциями и обрабатывается
+несколькими процессами.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 200_000
+KEY_ENV = 'ANONYMIZATION_KEY'
+PSEUDONYM_PREFIX = 'Клиент'
+MASK_KEEP_DIGITS = 2
+# Длина хэша в шестнадцатеричных символах: 16 (64 бита) для email и псевдонимов,
+# чтобы совпадения разных значений были практически исключены и на миллионах строк
+TOKEN_LENGTH = 16
+DOMAIN_TOKEN_LENGTH = 8
+# Предел словаря псевдонимов одного процесса (значений на метод)
+CACHE_LIMIT = 1_000_000
+
+
+class Anonymizer:
+    """Применяет правила обезличивания к DataFrame по столбцам"""
+
+    def __init__(self, rules: Dict[str, str], key: bytes):
+        unknown = set(rules.values()) - set(METHODS)
+        if unknown:
+            raise ValueError(f"Неизвестные методы обезличивания: {', '.join(sorted(unknown))}")
+        if not key:
+            raise ValueError(f"Не задан ключ обезличивания: переменная окружения {KEY_ENV}")
+        self.rules = rules
+        self.key = key
+        self._cache: Dict[str, Dict[str, str]] = {method: {} for method in METHODS}
+
+    def token(self, value: str, length: int = TOKEN_LENGTH) -> str:
+        """Детерминированный ключевой хэш значения"""
+        return hmac.new(self.key, value.encode('utf-8'), hashlib.sha256).hexdigest()[:length]
+
+    def tokens(self, values: pd.Series, length: int = TOKEN_LENGTH) -> pd.Series:
+        """Ключевые хэши серии значений"""
+        # Копия подготовленного HMAC дешевле, чем повторная инициализация ключом
+        base = hmac.new(self.key, digestmod=hashlib.sha256)
+        result = []
+        for value in values.to_numpy(dtype=object):
+            digest = base.copy()
+            digest.update(value.encode('utf-8'))
+            result.append(digest.hexdigest()[:length])
+        return pd.Series(result, index=values.index, dtype=object)
+
+    def apply(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Возвращает копию порции с обезличенными столбцами"""
+        frame = frame.copy()
+        for column, method in self.rules.items():
+            if column in frame.columns:
+                frame[column] = self._map_unique(frame[column], method)
+        return frame
+
+    def _map_unique(self, series: pd.Series, method: str) -> pd.Series:
+        """Преобразует только новые уникальные значения и раскладывает результат по строкам"""
+        codes, uniques = pd.factorize(series)
+        if not len(uniques):
+            return series
+
+        cache = self._cache[method]
+        if len(cache) > CACHE_LIMIT:
+            cache.clear()
+
+        uniques = pd.Series(uniques.astype(str), dtype=object)
+        mapped = uniques.map(cache).astype(object)
+        missing = mapped.isna()
+        if missing.any():
+            fresh = METHODS[method](self, uniques[missing])
+            mapped[missing] = fresh
+            cache.update(zip(uniques[missing].to_numpy(), fresh.to_numpy()))
+
+        # Пропуски (код -1) остаются пропусками
+        values = np.where(codes >= 0, mapped.to_numpy(dtype=object)[codes], None)
+        return pd.Series(values, index=series.index, name=series.name)
+
+
+def _hash_domain(anonymizer: Anonymizer, emails: pd.Series) -> pd.Series:
+    emails = emails.str.strip().str.lower()
+    parts = emails.str.rpartition('@')
+    has_domain = parts[1] == '@'
+    domains = 'd' + anonymizer.tokens(parts[2], DOMAIN_TOKEN_LENGTH) + '.example.com'
+    return 'u' + anonymizer.tokens(emails) + '@' + domains.where(has_domain, 'example.com')
+
+
+def _mask_digits(anonymizer: Anonymizer, phones: pd.Series) -> pd.Series:
+    # Цифра маскируется, если после нее есть еще MASK_KEEP_DIGITS цифр
+    return phones.str.replace(rf'\d(?=(?:\D*\d){{{MASK_KEEP_DIGITS}}})', '*', regex=True)
+
+
+def _pseudonymize(anonymizer: Anonymizer, names: pd.Series) -> pd.Series:
+    return f"{PSEUDONYM_PREFIX} " + anonymizer.tokens(names.str.strip()).str.upper()
+
+
+METHODS: Dict[str, Callable[[Anonymizer, pd.Series], pd.Series]] = {
+    'hash_domain': _hash_domain,
+    'mask_digits': _mask_digits,
+    'pseudonymize': _pseudonymize,
+}
+
+
+# Обезличиватель процесса-исполнителя: создается один раз, его кэш живет между порциями
+_worker: Optional[Anonymizer] = None
+
+
+def _init_worker(rules: Dict[str, str], key: bytes) -> None:
+    global _worker
+    _worker = Anonymizer(rules, key)
+
+
+def _apply_worker(frame: pd.DataFrame) -> pd.DataFrame:
+    return _worker.apply(frame)
+
+
+def anonymize_file(input_path: Path, output_path: Path, rules: Dict[str, str], key: bytes,
+                   chunksize: int = DEFAULT_CHUNKSIZE, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Обезличивает CSV порциями, сохраняя порядок строк; возвращает статистику"""
+    input_path, output_path = Path(input_path), Path(output_path)
+    workers = workers or os.cpu_count() or 1
+    # Проверяет правила и ключ до запуска процессов
+    anonymizer = Anonymizer(rules, key)
+    started = time.time()
+    rows = chunks = 0
+
+    # Все столбцы читаются как строки: обезличивание не должно менять формат остальных
+    reader = pd.read_csv(input_path, chunksize=chunksize, dtype=str, keep_default_na=False, na_values=[''])
+    tmp_output = output_path.with_name(output_path.name + '.part')
+
+    def write(frame: pd.DataFrame) -> None:
+        nonlocal rows, chunks
+        frame.to_csv(f, index=False, header=chunks == 0)
+        rows += len(frame)
+        chunks += 1
+
+    try:
+        with open(tmp_output, 'w', encoding='utf-8', newline='') as f:
+            if workers == 1:
+                for chunk in reader:
+                    write(anonymizer.apply(chunk))
+            else:
+                with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rules, key)) as pool:
+                    # Не больше двух порций на процесс в работе: память не зависит от размера файла
+                    pending = deque()
+                    for chunk in reader:
+                        pending.append(pool.submit(_apply_worker, chunk))
+                        if len(pending) >= workers * 2:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+    except Exception:
+        tmp_output.unlink(missing_ok=True)
+        raise
+    tmp_output.replace(output_path)
+
+    return {
+        'input': str(input_path),
+        'output': str(output_path),
+        'rows': rows,
+        'chunks': chunks,
+        'workers': workers,
+        'time_s': round(time.time() - started, 3),
+    }
+
+
+def load_rules(data_dir: Path) -> Dict[str, str]:
+    """Правила test_data.anonymization из data_config.json"""
+    config_path = Path(data_dir) / 'data_config.json'
+    if not config_path.exists():
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('test_data', {}).get('anonymization', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обезличивание CSV по правилам test_data.anonymization')
+    parser.add_argument('input', help='Исходный CSV')
+    parser.add_argument('--output', help='Результат (по умолчанию <имя>_anon.csv)')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Строк в порции')
+    parser.add_argument('--workers', type=int, help='Число процессов (по умолчанию — по числу ядер)')
+
+    args = parser.parse_args()
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_anon.csv")
+
+    rules = load_rules(Path(args.data_dir))
+    if not rules:
+        print("❌ В data_config.json нет правил test_data.anonymization")
+        return
+
+    key = os.environ.get(KEY_ENV, '').encode('utf-8')
+    try:
+        stats = anonymize_file(input_path, output_path, rules, key, args.chunksize, args.workers)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"✅ Обезличено {stats['rows']} строк за {stats['time_s']} с "
+          f"({stats['chunks']} порций, процессов: {stats['workers']}): {stats['output']}")
+
+
+if __name__ == '__main__':
+    main()
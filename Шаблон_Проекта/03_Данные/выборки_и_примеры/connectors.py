@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Коннекторы к источникам данных из data_config.json
+
+Каждый коннектор держит пул соединений и читает результат запроса порциями:
+PostgreSQL — через серверный (именованный) курсор, SQLite и DuckDB — через
+fetchmany. Для тестов и офлайн-работы URL источника подменяется локальной
+базой: переменной окружения DATA_SOURCE_<ИМЯ>_URL (например,
+DATA_SOURCE_CRM_URL=sqlite:///crm.db) или словарем connectors в DataLoader.
+
+Необязательные параметры источника в data_config.json:
+- pool_size — максимум одновременных соединений (по умолчанию 4)
+- fetch_size — строк в одной порции (по умолчанию 50000)
+"""
+
+import argparse
+import queue
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+import pandas as pd
+
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_FETCH_SIZE = 50_000
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+SCHEMA_COLUMNS = ['table', 'column', 'type', 'nullable', 'max_length']
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений с ограничением размера"""
+
+    def __init__(self, factory: Callable[[], Any], max_size: int = DEFAULT_POOL_SIZE,
+                 reset: Optional[Callable[[Any], None]] = None):
+        self.factory = factory
+        self.reset = reset
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Выдает соединение из пула (создает новое, если свободных нет)"""
+        if self._closed:
+            raise RuntimeError("Пул соединений закрыт")
+
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self.factory()
+
+            try:
+                yield conn
+                if self.reset:
+                    self.reset(conn)
+            except BaseException:
+                # Соединение в неизвестном состоянии (ошибка, прерывание или
+                # закрытый раньше времени генератор fetch) — не возвращаем его в пул
+                _close_quietly(conn)
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Закрывает все свободные соединения"""
+        self._closed = True
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+class Connector(ABC):
+    """Базовый коннектор: пул соединений и порционное чтение"""
+
+    # Плейсхолдер параметров драйвера для условий where
+    placeholder = '?'
+
+    def __init__(self, url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 fetch_size: int = DEFAULT_FETCH_SIZE):
+        self.url = url
+        self.fetch_size = fetch_size
+        self.pool = ConnectionPool(self._connect, pool_size, reset=self._reset)
+
+    @abstractmethod
+    def _connect(self) -> Any:
+        """Новое соединение с источником (вызывается пулом)"""
+
+    def _reset(self, conn: Any) -> None:
+        """Завершает транзакцию перед возвратом соединения в пул"""
+        conn.rollback()
+
+    def _cursor(self, conn: Any) -> Any:
+        """Курсор для потокового чтения"""
+        return conn.cursor()
+
+    def fetch(self, query: str, params: Optional[Sequence[Any]] = None,
+              chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Выполняет запрос и возвращает результат порциями DataFrame"""
+        chunksize = chunksize or self.fetch_size
+        with self.pool.connection() as conn:
+            cursor = self._cursor(conn)
+            try:
+                cursor.execute(query, params or ())
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if columns is None and cursor.description:
+                        columns = [col[0] for col in cursor.description]
+                    if not rows:
+                        break
+                    yield pd.DataFrame.from_records(rows, columns=columns)
+            finally:
+                cursor.close()
+
+    def read_table(self, table: str, columns: Optional[List[str]] = None,
+                   where: Optional[str] = None, params: Optional[Sequence[Any]] = None,
+                   chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Читает таблицу порциями; where — SQL-условие с плейсхолдерами драйвера"""
+        query = f"SELECT {', '.join(_identifier(col) for col in columns) if columns else '*'} FROM {_identifier(table)}"
+        if where:
+            query += f" WHERE {where}"
+        return self.fetch(query, params, chunksize)
+
+    def describe_columns(self, tables: Optional[List[str]] = None) -> pd.DataFrame:
+        """Схема таблиц одним запросом к information_schema
+
+        Столбцы результата: table, column, type, nullable, max_length
+        (в порядке столбцов таблицы). tables — ограничить список таблиц.
+        """
+        query = ("SELECT table_name, column_name, data_type, is_nullable, character_maximum_length "
+                 "FROM information_schema.columns "
+                 "WHERE table_schema NOT IN ('information_schema', 'pg_catalog')")
+        names = sorted({table.rsplit('.', 1)[-1] for table in tables or []})
+        if names:
+            query += f" AND table_name IN ({', '.join([self.placeholder] * len(names))})"
+        query += " ORDER BY table_name, ordinal_position"
+        frame = _concat(self.fetch(query, names), SCHEMA_COLUMNS)
+        frame.columns = SCHEMA_COLUMNS
+        frame['nullable'] = frame['nullable'].astype(str).str.upper().eq('YES')
+        return frame
+
+    def execute(self, statement: str, params: Optional[Sequence[Any]] = None) -> int:
+        """Выполняет команду и фиксирует транзакцию, возвращает число строк"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(statement, params or ())
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def __enter__(self) -> 'Connector':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PostgresConnector(Connector):
+    """PostgreSQL через psycopg2 с серверными курсорами"""
+
+    placeholder = '%s'
+
+    def _connect(self) -> Any:
+        try:
+            import psycopg2
+        except ImportError:
+            raise ImportError("Для PostgreSQL установите psycopg2: pip install psycopg2-binary")
+        return psycopg2.connect(self.url)
+
+    def _cursor(self, conn: Any) -> Any:
+        # Именованный курсор живет на сервере: клиент получает строки порциями
+        cursor = conn.cursor(name=f"loader_{uuid.uuid4().hex[:12]}")
+        cursor.itersize = self.fetch_size
+        return cursor
+
+
+class SQLiteConnector(Connector):
+    """SQLite (stdlib) — локальная замена источника для тестов"""
+
+    placeholder = '?'
+
+    def __init__(self, url: str, **options):
+        super().__init__(url, **options)
+        self.path = _local_path(url)
+
+    def _connect(self) -> Any:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def describe_columns(self, tables: Optional[List[str]] = None) -> pd.DataFrame:
+        """Схема таблиц из pragma_table_info (в SQLite нет information_schema)"""
+        query = ("SELECT m.name, p.name, p.type, p.\"notnull\" = 0 AND p.pk = 0, NULL "
+                 "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+                 "WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%'")
+        names = sorted({table.rsplit('.', 1)[-1] for table in tables or []})
+        if names:
+            query += f" AND m.name IN ({', '.join('?' * len(names))})"
+        query += " ORDER BY m.name, p.cid"
+        frame = _concat(self.fetch(query, names), SCHEMA_COLUMNS)
+        frame.columns = SCHEMA_COLUMNS
+        frame['nullable'] = frame['nullable'].astype(bool)
+        # Длина строк объявлена в типе: VARCHAR(100)
+        size = frame['type'].str.extract(r'(?i)char\s*\(\s*(\d+)', expand=False)
+        frame['max_length'] = pd.to_numeric(size).astype('Int64')
+        frame['type'] = frame['type'].str.replace(r'\s*\(.*\)', '', regex=True)
+        return frame
+
+
+class DuckDBConnector(Connector):
+    """DuckDB — локальная аналитическая база"""
+
+    placeholder = '?'
+
+    def __init__(self, url: str, **options):
+        super().__init__(url, **options)
+        self.path = _local_path(url)
+
+    def _connect(self) -> Any:
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("Для DuckDB установите пакет: pip install duckdb")
+        return duckdb.connect(self.path)
+
+    def _reset(self, conn: Any) -> None:
+        pass
+
+
+CONNECTORS = {
+    'postgresql': PostgresConnector,
+    'postgres': PostgresConnector,
+    'sqlite': SQLiteConnector,
+    'duckdb': DuckDBConnector,
+}
+
+
+def create_connector(url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                     fetch_size: int = DEFAULT_FETCH_SIZE) -> Connector:
+    """Создает коннектор по схеме URL (postgresql://, sqlite:///, duckdb:///)"""
+    scheme = urlparse(url).scheme.split('+')[0]
+    if scheme not in CONNECTORS:
+        raise ValueError(f"Неподдерживаемый тип источника: {scheme} (доступны: {', '.join(CONNECTORS)})")
+    return CONNECTORS[scheme](url, pool_size=pool_size, fetch_size=fetch_size)
+
+
+def _local_path(url: str) -> str:
+    """Путь к файлу базы из URL: sqlite:///rel.db, sqlite:////abs/path.db, sqlite:// — в памяти"""
+    rest = url.split('://', 1)[1].split('?', 1)[0]
+    if rest.startswith('/'):
+        rest = rest[1:]
+    return unquote(rest) or ':memory:'
+
+
+def _identifier(name: str) -> str:
+    """Проверяет имя таблицы/столбца, чтобы не допустить SQL-инъекции"""
+    if not IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Недопустимое имя: {name}")
+    return name
+
+
+def _concat(chunks: Iterator[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    frames = list(chunks)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Выгрузка таблицы источника в CSV порциями')
+    parser.add_argument('source', help='Источник из data_sources (например, crm)')
+    parser.add_argument('table', help='Таблица источника')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--output', help='Файл CSV (по умолчанию <table>.csv)')
+    parser.add_argument('--chunksize', type=int, help='Строк в порции')
+
+    args = parser.parse_args()
+
+    from data_loader import DataLoader
+    loader = DataLoader(args.data_dir)
+    try:
+        path, rows = loader.export_table(args.source, args.table, args.output, chunksize=args.chunksize)
+        print(f"✅ Выгружено {rows} строк: {path}")
+    except (ImportError, KeyError, ValueError) as e:
+        print(f"❌ {e}")
+    finally:
+        loader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,18 +4,69 @@
 Утилиты для загрузки и валидации тестовых данных
 """
 
+import numpy as np
 import pandas as pd
+import hashlib
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Parquet требует pyarrow; без него кэш хранится в pickle (типы тоже сохраняются)
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+CACHE_DIR_NAME = '.cache'
+
+# Строковый столбец становится category, если уникальных значений в выборке
+# меньше этой доли; остальные строки хранятся в Arrow (если есть pyarrow)
+CATEGORY_RATIO = 0.5
+DTYPE_SAMPLE_ROWS = 100_000
+STRING_DTYPE = 'string[pyarrow]' if CACHE_FORMAT == 'parquet' else 'string'
+
+# Встроенные таблицы load_customers()/load_sales(): файл, разбор и правила
+BUILTIN_TABLES = {
+    'customers': {'file_name': 'sample_customers.csv', 'date_columns': ['registration_date'],
+                  'numeric_columns': [], 'table': 'customers'},
+    'sales': {'file_name': 'sample_sales.csv', 'date_columns': ['order_date'],
+              'numeric_columns': ['price'], 'table': 'orders'},
+}
 
 
 class DataLoader:
-    """Класс для загрузки и валидации тестовых данных"""
+    """Класс для загрузки и валидации тестовых данных
+    
+    CSV разбирается один раз: типизированный снимок сохраняется в `.cache/`
+    (Parquet или pickle) и пересобирается только при изменении исходного файла.
+    Загруженные таблицы запоминаются в экземпляре, поэтому повторные вызовы
+    load_*, validate_data() и get_summary() не читают файлы заново.
+    Возвращаемые DataFrame общие для всех вызовов — не изменяйте их на месте.
     
-    def __init__(self, data_dir: str = '.'):
+    При optimize_dtypes=True столбцы получают компактные типы (см.
+    optimize_dtypes()): category, уменьшенные целые, Arrow-строки.
+    Сэкономленная память доступна через memory_report().
+    
+    Таблицы источников из data_sources читаются порциями через коннекторы
+    (см. connectors.py). Для тестов коннектор подменяется аргументом
+    connectors, например {'crm': SQLiteConnector('sqlite:///crm.db')}.
+    """
+    
+    def __init__(self, data_dir: str = '.', use_cache: bool = True,
+                 connectors: Optional[Dict[str, Any]] = None, optimize_dtypes: bool = True):
         self.data_dir = Path(data_dir)
+        self.cache_dir = self.data_dir / CACHE_DIR_NAME
+        self.use_cache = use_cache
+        self.optimize_dtypes = optimize_dtypes
+        self._memory: Dict[str, Dict[str, Any]] = {}
         self.config = self._load_config()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._connectors: Dict[str, Any] = dict(connectors or {})
+        # Коннектор создается один раз, даже если потоки запрашивают его одновременно
+        self._connectors_lock = threading.Lock()
     
     def _load_config(self) -> Dict[str, Any]:
         """Загружает конфигурацию данных"""
@@ -27,27 +78,282 @@ class DataLoader:
     
     def load_customers(self) -> pd.DataFrame:
         """Загружает данные клиентов"""
-        file_path = self.data_dir / 'sample_customers.csv'
+        return self._load_csv(**BUILTIN_TABLES['customers'])
+    
+    def load_sales(self) -> pd.DataFrame:
+        """Загружает данные продаж"""
+        return self._load_csv(**BUILTIN_TABLES['sales'])
+    
+    def load_table(self, table: str) -> pd.DataFrame:
+        """Загружает таблицу из local_files конфигурации с типами из quality_rules"""
+        if table not in self.config.get('local_files', {}):
+            raise KeyError(f"Таблица {table} не описана в local_files data_config.json")
+        return self._load_csv(**self._table_options(table))
+    
+    def scan(self, table: str):
+        """Ленивый запрос к таблице: столбцы и фильтры применяются при чтении файла
+        
+        Пример: loader.scan('sales').sum('price') читает только столбец price.
+        Таблица — из local_files или встроенная ('customers', 'sales'). См. query.py.
+        """
+        from query import LazyFrame
+        return LazyFrame(self, table)
+    
+    def table_path(self, table: str) -> Path:
+        """Путь к файлу таблицы из local_files или встроенной (например, для отпечатка данных)"""
+        return self.data_dir / self._table_options(table)['file_name']
+    
+    def running_aggregate(self, table: str, spec: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Агрегаты таблицы, которая только дописывается (см. incremental.py)
+        
+        Состояние хранится в .cache/ вместе со смещением в файле: при каждом
+        вызове читаются только добавленные строки. Формат spec — как в
+        LazyFrame.aggregate(), например {'price': ['sum'], '*': ['count']}.
+        """
+        from incremental import RunningAggregates
+        options = self._table_options(table)
+        file_path = self.data_dir / options['file_name']
         if not file_path.exists():
             raise FileNotFoundError(f"Файл {file_path} не найден")
         
-        df = pd.read_csv(file_path)
-        df['registration_date'] = pd.to_datetime(df['registration_date'])
-        return df
+        variant = hashlib.sha1(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+        state_path = self.cache_dir / f"{file_path.stem}.{variant}.running.json"
+        aggregates = RunningAggregates(file_path, state_path, spec,
+                                       options['date_columns'], options['numeric_columns'])
+        return aggregates.result()
     
-    def load_sales(self) -> pd.DataFrame:
-        """Загружает данные продаж"""
-        file_path = self.data_dir / 'sample_sales.csv'
+    def _table_options(self, table: str) -> Dict[str, Any]:
+        """Файл и параметры разбора таблицы (local_files или встроенной)"""
+        files = self.config.get('local_files', {})
+        if table not in files:
+            if table in BUILTIN_TABLES:
+                return dict(BUILTIN_TABLES[table])
+            raise KeyError(f"Таблица {table} не описана в local_files data_config.json")
+        
+        data_types = self.config.get('quality_rules', {}).get(table, {}).get('data_types', {})
+        return {
+            'file_name': files[table],
+            'date_columns': [col for col, kind in data_types.items() if kind in ('date', 'datetime', 'timestamp')],
+            'numeric_columns': [col for col, kind in data_types.items() if kind in ('numeric', 'float', 'decimal')],
+            'table': table,
+        }
+    
+    def _parse_key(self, date_columns: List[str], numeric_columns: List[str],
+                   table: Optional[str]) -> Tuple[str, Optional[Dict[str, str]]]:
+        """Ключ варианта разбора (для кэша) и data_types для оптимизации типов"""
+        rules = self.config.get('quality_rules', {}).get(table, {}) if table else {}
+        data_types = rules.get('data_types', {}) if self.optimize_dtypes else None
+        # Параметры разбора входят в ключ кэша: у каждого варианта свой снимок
+        parse_key = json.dumps({'dates': sorted(date_columns), 'numeric': sorted(numeric_columns),
+                                'optimize': data_types if self.optimize_dtypes else False}, sort_keys=True)
+        return parse_key, data_types
+    
+    def validate_rules(self, tables: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Проверяет таблицы по quality_rules: нарушения и время по каждому правилу"""
+        from validation import RuleEngine
+        engine = RuleEngine(self.config.get('quality_rules', {}), self.load_table)
+        return engine.run(tables)
+    
+    def get_connector(self, source: str):
+        """Возвращает коннектор источника (создается один раз на экземпляр)
+        
+        URL берется из переменной окружения DATA_SOURCE_<ИМЯ>_URL, если она
+        задана, иначе из data_sources.<source>.connection.
+        """
+        with self._connectors_lock:
+            if source not in self._connectors:
+                from connectors import DEFAULT_FETCH_SIZE, DEFAULT_POOL_SIZE, create_connector
+                settings = self.config.get('data_sources', {}).get(source)
+                if settings is None:
+                    raise KeyError(f"Источник {source} не описан в data_sources data_config.json")
+                
+                url = os.environ.get(f"DATA_SOURCE_{source.upper()}_URL", settings['connection'])
+                self._connectors[source] = create_connector(
+                    url,
+                    pool_size=settings.get('pool_size', DEFAULT_POOL_SIZE),
+                    fetch_size=settings.get('fetch_size', DEFAULT_FETCH_SIZE),
+                )
+            return self._connectors[source]
+    
+    def fetch_table(self, source: str, table: str, columns: Optional[List[str]] = None,
+                    where: Optional[str] = None, params: Optional[list] = None,
+                    chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Читает таблицу источника порциями DataFrame"""
+        tables = self.config.get('data_sources', {}).get(source, {}).get('tables', [])
+        if tables and table not in tables:
+            raise KeyError(f"Таблица {table} не указана в data_sources.{source}.tables")
+        return self.get_connector(source).read_table(table, columns, where, params, chunksize)
+    
+    def export_table(self, source: str, table: str, file_name: Optional[str] = None,
+                     chunksize: Optional[int] = None, **kwargs) -> Tuple[Path, int]:
+        """Выгружает таблицу источника в CSV порциями, возвращает путь и число строк"""
+        output = self.data_dir / (file_name or f"{table}.csv")
+        tmp_output = output.with_name(output.name + '.part')
+        rows = 0
+        try:
+            with open(tmp_output, 'w', encoding='utf-8', newline='') as f:
+                for chunk in self.fetch_table(source, table, chunksize=chunksize, **kwargs):
+                    chunk.to_csv(f, index=False, header=rows == 0)
+                    rows += len(chunk)
+        except Exception:
+            tmp_output.unlink(missing_ok=True)
+            raise
+        # Файл заменяется целиком только после успешной выгрузки
+        tmp_output.replace(output)
+        return output, rows
+    
+    def load_snapshot(self, source: str, table: str) -> pd.DataFrame:
+        """Загружает локальный снимок таблицы источника (см. refresh.py)
+
+        Снимок запоминается в экземпляре и перечитывается, только если
+        планировщик обновил его файлы.
+        """
+        from refresh import list_snapshot_parts, read_snapshot
+        parts = list_snapshot_parts(self.data_dir, source, table)
+        version = ','.join(f"{path.name}:{path.stat().st_mtime_ns}" for path in parts)
+        memo_key = f"snapshot:{source}.{table}:{version}"
+        if memo_key not in self._frames:
+            incremental = self.config.get('data_sources', {}).get(source, {}).get('incremental', {})
+            key = incremental.get(table, {}).get('key')
+            self._frames[memo_key] = read_snapshot(self.data_dir, source, table,
+                                                   [key] if isinstance(key, str) else key)
+        return self._frames[memo_key]
+
+    def close(self) -> None:
+        """Закрывает пулы соединений источников"""
+        with self._connectors_lock:
+            for connector in self._connectors.values():
+                connector.close()
+            self._connectors.clear()
+    
+    def clear_cache(self) -> None:
+        """Сбрасывает запомненные таблицы и удаляет файлы кэша"""
+        self._frames.clear()
+        if self.cache_dir.exists():
+            for path in self.cache_dir.iterdir():
+                if path.is_file():
+                    path.unlink()
+    
+    def memory_report(self) -> Dict[str, Dict[str, Any]]:
+        """Память загруженных таблиц до и после оптимизации типов"""
+        return dict(self._memory)
+    
+    def _load_csv(self, file_name: str, date_columns: Optional[List[str]] = None,
+                  numeric_columns: Optional[List[str]] = None, table: Optional[str] = None) -> pd.DataFrame:
+        """Загружает CSV с приведением типов через кэш"""
+        date_columns = sorted(date_columns or [])
+        numeric_columns = sorted(numeric_columns or [])
+        parse_key, data_types = self._parse_key(date_columns, numeric_columns, table)
+        memo_key = f"{file_name}:{parse_key}"
+        if memo_key in self._frames:
+            return self._frames[memo_key]
+        
+        file_path = self.data_dir / file_name
         if not file_path.exists():
             raise FileNotFoundError(f"Файл {file_path} не найден")
         
-        df = pd.read_csv(file_path)
-        df['order_date'] = pd.to_datetime(df['order_date'])
-        df['price'] = pd.to_numeric(df['price'])
+        cached = self._read_cache(file_path, parse_key) if self.use_cache else None
+        if cached is None:
+            df = pd.read_csv(file_path, parse_dates=date_columns)
+            for column in numeric_columns:
+                df[column] = pd.to_numeric(df[column])
+            memory = None
+            if self.optimize_dtypes:
+                df, memory = optimize_dtypes(df, data_types)
+            if self.use_cache:
+                self._write_cache(file_path, parse_key, df, memory)
+        else:
+            df, memory = cached
+        
+        if memory:
+            self._memory[file_name] = memory
+        self._frames[memo_key] = df
         return df
     
-    def validate_data(self) -> Dict[str, list]:
-        """Валидирует загруженные данные"""
+    def _cache_paths(self, file_path: Path, parse_key: str):
+        """Пути к снимку таблицы и его метаданным"""
+        suffix = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+        variant = hashlib.sha1(parse_key.encode('utf-8')).hexdigest()[:8]
+        return (self.cache_dir / f"{file_path.stem}.{variant}.{suffix}",
+                self.cache_dir / f"{file_path.stem}.{variant}.meta.json")
+    
+    def _fresh_cache(self, file_path: Path, parse_key: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Путь к снимку и его метаданные, если снимок соответствует исходному файлу"""
+        data_path, meta_path = self._cache_paths(file_path, parse_key)
+        if not data_path.exists() or not meta_path.exists():
+            return None
+        
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        
+        if meta.get('format') != CACHE_FORMAT or meta.get('parse_key') != parse_key:
+            return None
+        
+        stat = file_path.stat()
+        if (meta.get('mtime_ns'), meta.get('size')) != (stat.st_mtime_ns, stat.st_size):
+            # Время изменения сменилось: сверяем содержимое по хэшу
+            if meta.get('size') != stat.st_size or meta.get('sha256') != _file_sha256(file_path):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            meta_path.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+        return data_path, meta
+    
+    def _read_cache(self, file_path: Path, parse_key: str) -> Optional[Tuple[pd.DataFrame, Optional[Dict[str, Any]]]]:
+        """Читает снимок и отчет о памяти, если снимок соответствует исходному файлу"""
+        fresh = self._fresh_cache(file_path, parse_key)
+        if fresh is None:
+            return None
+        data_path, meta = fresh
+        
+        try:
+            if CACHE_FORMAT == 'parquet':
+                return pd.read_parquet(data_path), meta.get('memory')
+            return pd.read_pickle(data_path), meta.get('memory')
+        except Exception:
+            return None
+    
+    def _write_cache(self, file_path: Path, parse_key: str, df: pd.DataFrame,
+                     memory: Optional[Dict[str, Any]] = None) -> None:
+        """Сохраняет типизированный снимок таблицы"""
+        data_path, meta_path = self._cache_paths(file_path, parse_key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(data_path, index=False)
+        else:
+            df.to_pickle(data_path)
+        
+        stat = file_path.stat()
+        meta = {
+            'source': file_path.name,
+            'format': CACHE_FORMAT,
+            'parse_key': parse_key,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': _file_sha256(file_path),
+            'memory': memory,
+        }
+        meta_path.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    
+    def validate_data(self, streaming: bool = False, chunksize: int = 100_000,
+                      bloom: bool = False) -> Dict[str, list]:
+        """Валидирует загруженные данные: ошибки по ключам customers и sales
+        
+        Проверки по quality_rules из data_config.json выполняет validate_rules().
+        
+        При streaming=True файлы читаются порциями по chunksize строк
+        (см. validation.StreamingValidator) — так проверяются выгрузки,
+        которые не помещаются в память; в сообщения попадают номера строк.
+        """
+        if streaming:
+            from validation import StreamingValidator
+            validator = StreamingValidator(self.data_dir / 'sample_customers.csv',
+                                           self.data_dir / 'sample_sales.csv',
+                                           chunksize=chunksize, bloom=bloom)
+            return validator.validate()
+        
         errors = {'customers': [], 'sales': []}
         
         try:
@@ -65,10 +371,15 @@ class DataLoader:
             if sales['order_id'].duplicated().any():
                 errors['sales'].append('Найдены дублирующиеся order_id')
             
-            # Проверка референциальной целостности
-            missing_customers = set(sales['customer_id']) - set(customers['customer_id'])
-            if missing_customers:
-                errors['sales'].append(f'Клиенты не найдены: {missing_customers}')
+            # Проверка референциальной целостности (сортированные ключи + бинарный поиск)
+            from validation import check_foreign_key
+            fk = check_foreign_key(sales, customers, ['customer_id'])
+            if fk['violations']:
+                examples = ', '.join(str(key) for key in fk['examples'])
+                errors['sales'].append(
+                    f"Клиенты не найдены: {fk['missing_keys']} id в {fk['violations']} строках "
+                    f"(примеры: {examples}{' …' if fk['sampled'] else ''})"
+                )
             
             # Проверка бизнес-правил
             if (sales['price'] <= 0).any():
@@ -83,34 +394,114 @@ class DataLoader:
         return errors
     
     def get_summary(self) -> Dict[str, Any]:
-        """Возвращает сводную информацию о данных"""
+        """Возвращает сводную информацию о данных
+        
+        Агрегаты накапливаются в .cache/ и дополняются только новыми
+        строками файлов (см. running_aggregate()); без кэша считаются
+        ленивыми запросами (см. scan()), которые читают только столбцы
+        дат, статуса и цены.
+        """
+        customers_spec = {
+            '*': ['count'],
+            'registration_date': ['min', 'max'],
+            'status': ['value_counts'],
+        }
+        sales_spec = {
+            '*': ['count'],
+            'order_date': ['min', 'max'],
+            'price': ['sum', 'mean'],
+        }
         try:
-            customers = self.load_customers()
-            sales = self.load_sales()
+            if self.use_cache:
+                customers = self.running_aggregate('customers', customers_spec)
+                sales = self.running_aggregate('sales', sales_spec)
+            else:
+                customers = self.scan('customers').aggregate(customers_spec)
+                sales = self.scan('sales').aggregate(sales_spec)
             
             return {
                 'customers': {
-                    'count': len(customers),
+                    'count': customers['*']['count'],
                     'date_range': {
-                        'from': customers['registration_date'].min().strftime('%Y-%m-%d'),
-                        'to': customers['registration_date'].max().strftime('%Y-%m-%d')
+                        'from': customers['registration_date']['min'].strftime('%Y-%m-%d'),
+                        'to': customers['registration_date']['max'].strftime('%Y-%m-%d')
                     },
-                    'status_distribution': customers['status'].value_counts().to_dict()
+                    'status_distribution': customers['status']['value_counts']
                 },
                 'sales': {
-                    'count': len(sales),
+                    'count': sales['*']['count'],
                     'date_range': {
-                        'from': sales['order_date'].min().strftime('%Y-%m-%d'),
-                        'to': sales['order_date'].max().strftime('%Y-%m-%d')
+                        'from': sales['order_date']['min'].strftime('%Y-%m-%d'),
+                        'to': sales['order_date']['max'].strftime('%Y-%m-%d')
                     },
-                    'total_revenue': float(sales['price'].sum()),
-                    'avg_order_value': float(sales['price'].mean())
+                    'total_revenue': float(sales['price']['sum']),
+                    'avg_order_value': float(sales['price']['mean'])
                 }
             }
         except Exception as e:
             return {'error': str(e)}
 
 
+def optimize_dtypes(df: pd.DataFrame, data_types: Optional[Dict[str, str]] = None,
+                    sample_rows: int = DTYPE_SAMPLE_ROWS) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Переводит столбцы в компактные типы и возвращает отчет об экономии памяти
+    
+    Столбцы enum из data_types становятся category; целые уменьшаются до
+    наименьшего подходящего типа, дробные — до float32, если это без потерь.
+    Для остальных строковых столбцов доля уникальных значений оценивается
+    по первым sample_rows строкам: редкие значения — category, иначе Arrow-строки.
+    """
+    data_types = data_types or {}
+    before = int(df.memory_usage(deep=True).sum())
+    sample = df.head(sample_rows)
+    result = {}
+    changes = {}
+    
+    for column in df.columns:
+        series = df[column]
+        old_dtype = str(series.dtype)
+        if data_types.get(column) == 'enum':
+            series = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            pass
+        elif pd.api.types.is_integer_dtype(series):
+            series = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            if np.array_equal(values.astype(np.float32).astype(values.dtype), values, equal_nan=True):
+                series = series.astype(np.float32)
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            present = sample[column].dropna()
+            if len(present) and present.nunique() / len(present) < CATEGORY_RATIO:
+                series = series.astype('category')
+            elif series.dtype == object:
+                # В pandas 3 строки уже хранятся в Arrow — переводим только object
+                series = series.astype(STRING_DTYPE)
+        result[column] = series
+        if str(series.dtype) != old_dtype:
+            changes[column] = {'from': old_dtype, 'to': str(series.dtype)}
+    
+    optimized = pd.DataFrame(result, index=df.index)
+    after = int(optimized.memory_usage(deep=True).sum())
+    return optimized, {
+        'rows': len(df),
+        'bytes_before': before,
+        'bytes_after': after,
+        'saved_bytes': before - after,
+        'ratio': round(before / after, 2) if after else None,
+        'columns': changes,
+    }
+
+
+def _file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Считает SHA-256 файла блоками"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 if __name__ == '__main__':
     # Пример использования
     loader = DataLoader()
@@ -119,6 +510,13 @@ if __name__ == '__main__':
     summary = loader.get_summary()
     print(json.dumps(summary, indent=2, ensure_ascii=False))
     
+    # Сводка читает файлы порциями; память таблиц видна после полной загрузки
+    loader.load_customers()
+    loader.load_sales()
+    for name, memory in loader.memory_report().items():
+        print(f"💾 {name}: {memory['bytes_before'] / 1e6:.2f} → {memory['bytes_after'] / 1e6:.2f} МБ "
+              f"(в {memory['ratio']} раза меньше)")
+    
     print("\n🔍 Результаты валидации:")
     errors = loader.validate_data()
     for table, table_errors in errors.items():
@@ -126,3 +524,12 @@ if __name__ == '__main__':
             print(f"❌ {table}: {'; '.join(table_errors)}")
         else:
             print(f"✅ {table}: Ошибок не найдено")
+    
+    if loader.config.get('quality_rules') and loader.config.get('local_files'):
+        from validation import rule_errors
+        print("\n📋 Проверка по quality_rules:")
+        for table, table_errors in rule_errors(loader.validate_rules()).items():
+            if table_errors:
+                print(f"❌ {table}: {'; '.join(table_errors)}")
+            else:
+                print(f"✅ {table}: Ошибок не найдено")
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Словари данных из схем источников
+
+Схема каждой таблицы читается из источника без загрузки данных:
+- CSV из local_files — заголовок и первые строки (типы угадываются,
+  уточняются по quality_rules.data_types);
+- Parquet из local_files — схема файла (нужен pyarrow);
+- таблицы data_sources — information_schema одним запросом на источник
+  через коннекторы (см. connectors.py), сотни таблиц за один проход.
+
+Словари в словари_данных обновляются, а не перезаписываются: в таблице
+полей меняются только тип, размер и обязательность изменившихся столбцов,
+новые столбцы добавляются в конец, описания, примеры и остальные разделы
+файла остаются как есть. Столбцы, которых больше нет в источнике, не
+удаляются — о них выводится предупреждение. Изменения записываются в
+раздел «История изменений»; файлы без изменений не перезаписываются.
+"""
+
+import argparse
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data_loader import DataLoader
+
+
+DICTIONARIES_DIR_NAME = 'словари_данных'
+DICTIONARY_COLUMNS = ['Поле', 'Тип', 'Размер', 'Обязательное', 'Описание', 'Пример', 'Источник']
+HISTORY_HEADING = '## История изменений'
+# Строк CSV для определения типов и примеров
+SAMPLE_ROWS = 1000
+EMPTY = '-'
+
+# Типы information_schema и Parquet -> типы словаря
+TYPE_NAMES = {
+    'character varying': 'VARCHAR', 'varchar': 'VARCHAR', 'character': 'CHAR', 'char': 'CHAR',
+    'text': 'TEXT', 'string': 'VARCHAR', 'large_string': 'VARCHAR',
+    'integer': 'INTEGER', 'int': 'INTEGER', 'int4': 'INTEGER', 'int32': 'INTEGER',
+    'bigint': 'BIGINT', 'int8': 'BIGINT', 'int64': 'BIGINT', 'smallint': 'SMALLINT', 'int16': 'SMALLINT',
+    'numeric': 'NUMERIC', 'decimal': 'NUMERIC', 'real': 'REAL', 'float': 'REAL',
+    'double precision': 'DOUBLE', 'double': 'DOUBLE',
+    'boolean': 'BOOLEAN', 'bool': 'BOOLEAN',
+    'date': 'DATE', 'date32': 'DATE', 'date32[day]': 'DATE',
+    'timestamp': 'TIMESTAMP', 'timestamp without time zone': 'TIMESTAMP',
+    'timestamp with time zone': 'TIMESTAMPTZ', 'timestamptz': 'TIMESTAMPTZ',
+    'decimal128': 'NUMERIC', 'decimal256': 'NUMERIC', 'dictionary': 'VARCHAR',
+}
+# quality_rules.data_types -> типы словаря
+RULE_TYPES = {
+    'integer': 'INTEGER', 'numeric': 'NUMERIC', 'float': 'NUMERIC', 'decimal': 'NUMERIC',
+    'date': 'DATE', 'datetime': 'TIMESTAMP', 'timestamp': 'TIMESTAMP',
+    'enum': 'VARCHAR', 'string': 'VARCHAR', 'boolean': 'BOOLEAN',
+}
+
+TABLE_HEADING = re.compile(r'^##\s+Таблица:\s*`?([\w.]+)`?\s*$', re.MULTILINE)
+CELL_SEPARATOR = re.compile(r'(?<!\\)\|')
+
+
+def normalize_type(name: Any) -> str:
+    """Название типа в словаре: character varying -> VARCHAR, timestamp[ns] -> TIMESTAMP"""
+    name = str(name).strip().lower()
+    base = re.sub(r'\s*[\[(<].*$', '', name)
+    return TYPE_NAMES.get(name, TYPE_NAMES.get(base, base.upper()))
+
+
+def _column(name: str, type_name: str, size: Any = None, required: Optional[bool] = None,
+            example: Any = None, origin: str = EMPTY, inferred: bool = False) -> Dict[str, Any]:
+    """Описание столбца из схемы; None — сведений нет (значение в словаре не меняется)
+
+    inferred — тип угадан по значениям CSV: он заполняется только для новых полей.
+    """
+    return {'name': name, 'type': type_name, 'size': None if pd.isna(size) else int(size),
+            'required': required, 'example': example, 'origin': origin, 'inferred': inferred}
+
+
+def _apply_rules(columns: List[Dict[str, Any]], rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Уточняет обязательность и угаданные типы по quality_rules таблицы"""
+    data_types = rules.get('data_types', {})
+    required = set(rules.get('required_fields', []))
+    for column in columns:
+        # Тип из схемы базы или Parquet точнее класса из правил (BIGINT, а не integer)
+        if column['inferred'] and data_types.get(column['name']) in RULE_TYPES:
+            column['type'] = RULE_TYPES[data_types[column['name']]]
+            column['inferred'] = False
+        if column['name'] in required:
+            column['required'] = True
+    return columns
+
+
+def csv_schema(path: Path, rules: Dict[str, Any], origin: str) -> List[Dict[str, Any]]:
+    """Схема CSV по заголовку и первым строкам"""
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS)
+    # Примеры — в исходной записи файла (1500.00, а не 1500.0)
+    raw = pd.read_csv(path, nrows=SAMPLE_ROWS, dtype=str)
+    columns = []
+    for name in sample.columns:
+        values = sample[name].dropna()
+        examples = raw[name].dropna()
+        columns.append(_column(name, _infer_type(values), example=examples.iloc[0] if len(examples) else None,
+                               origin=origin, inferred=True))
+    return _apply_rules(columns, rules)
+
+
+def _infer_type(values: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(values.dtype):
+        return 'NUMERIC'
+    if len(values):
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+        if parsed.notna().all():
+            return 'DATE' if (parsed == parsed.dt.normalize()).all() else 'TIMESTAMP'
+    return 'VARCHAR'
+
+
+def parquet_schema(path: Path, rules: Dict[str, Any], origin: str) -> List[Dict[str, Any]]:
+    """Схема Parquet из метаданных файла (данные не читаются)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Для Parquet установите pyarrow: pip install pyarrow")
+    schema = pq.read_schema(path)
+    columns = [_column(field.name, normalize_type(field.type), required=not field.nullable, origin=origin)
+               for field in schema]
+    return _apply_rules(columns, rules)
+
+
+def source_schemas(loader: DataLoader, source: str, tables: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Схемы таблиц источника одним запросом к information_schema"""
+    frame = loader.get_connector(source).describe_columns(tables)
+    rules = loader.config.get('quality_rules', {})
+    schemas = {}
+    for table in tables:
+        rows = frame[frame['table'] == table.rsplit('.', 1)[-1]]
+        if rows.empty:
+            continue
+        columns = [_column(row.column, normalize_type(row.type), row.max_length, not row.nullable,
+                           origin=source)
+                   for row in rows.itertuples(index=False)]
+        schemas[table] = _apply_rules(columns, rules.get(table, {}))
+    return schemas
+
+
+def collect_schemas(loader: DataLoader, sources: Optional[List[str]] = None,
+                    include_files: bool = True) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+    """Схемы всех таблиц конфигурации и список ошибок
+
+    Схема источника важнее схемы локального файла той же таблицы.
+    """
+    schemas: Dict[str, List[Dict[str, Any]]] = {}
+    errors = []
+    rules = loader.config.get('quality_rules', {})
+
+    if include_files:
+        for table, file_name in loader.config.get('local_files', {}).items():
+            path = loader.data_dir / file_name
+            try:
+                if not path.exists():
+                    raise FileNotFoundError(f"Файл {path} не найден")
+                reader = parquet_schema if path.suffix == '.parquet' else csv_schema
+                schemas[table] = reader(path, rules.get(table, {}), file_name)
+            except (ImportError, ValueError, FileNotFoundError) as e:
+                errors.append(f"{table}: {e}")
+
+    for source, settings in loader.config.get('data_sources', {}).items():
+        if sources is not None and source not in sources:
+            continue
+        try:
+            schemas.update(source_schemas(loader, source, settings.get('tables', [])))
+        except Exception as e:
+            # Недоступный источник не мешает обновить остальные словари
+            errors.append(f"{source}: {e}")
+
+    return schemas, errors
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in CELL_SEPARATOR.split(line.strip().strip('|'))]
+
+
+def _cell(value: Any) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return EMPTY
+    return str(value).replace('|', '\\|').replace('\n', ' ')
+
+
+def find_table(lines: List[str], table: str) -> Optional[Tuple[int, int]]:
+    """Строки Markdown-таблицы полей [start, end) в разделе «## Таблица: table»"""
+    heading = None
+    for index, line in enumerate(lines):
+        match = TABLE_HEADING.match(line)
+        if match and match.group(1).rsplit('.', 1)[-1] == table.rsplit('.', 1)[-1]:
+            heading = index
+            break
+    if heading is None:
+        return None
+
+    for start in range(heading + 1, len(lines)):
+        if lines[start].startswith('## '):
+            return None
+        if lines[start].lstrip().startswith('|') and 'Поле' in _split_row(lines[start]):
+            end = start
+            while end < len(lines) and lines[end].lstrip().startswith('|'):
+                end += 1
+            return start, end
+    return None
+
+
+def merge_columns(header: List[str], rows: List[List[str]],
+                  columns: List[Dict[str, Any]]) -> Tuple[List[List[str]], List[str], List[str]]:
+    """Обновляет строки таблицы полей по схеме
+
+    Возвращает новые строки, список изменений и столбцы словаря, которых нет в схеме.
+    """
+    position = {name: index for index, name in enumerate(header)}
+    by_name = {row[position['Поле']].strip('`'): row for row in rows}
+    changes = []
+    added = []
+
+    for column in columns:
+        row = by_name.get(column['name'])
+        values = {
+            'Тип': None if column['inferred'] and row is not None else column['type'],
+            'Размер': None if column['size'] is None else str(column['size']),
+            'Обязательное': None if column['required'] is None else ('Да' if column['required'] else 'Нет'),
+        }
+        if row is None:
+            new = {'Поле': column['name'], 'Тип': column['type'], 'Размер': values['Размер'] or EMPTY,
+                   'Обязательное': values['Обязательное'] or EMPTY, 'Описание': EMPTY,
+                   'Пример': _cell(column['example']), 'Источник': column['origin']}
+            rows.append([new.get(name, EMPTY) for name in header])
+            added.append(column['name'])
+            continue
+
+        # Меняются только известные из схемы свойства, остальные ячейки — ручные
+        changed = []
+        for name, value in values.items():
+            if value is None or name not in position:
+                continue
+            current = row[position[name]]
+            if current.upper() != value.upper():
+                row[position[name]] = value
+                changed.append(f"{name.lower()} {current} → {value}")
+        if changed:
+            changes.append(f"{column['name']} ({', '.join(changed)})")
+
+    if changes:
+        changes = [f"изменены {', '.join(changes)}"]
+    if added:
+        changes.insert(0, f"добавлены поля {', '.join(added)}")
+    names = {column['name'] for column in columns}
+    missing = [name for name in by_name if name not in names]
+    return rows, changes, missing
+
+
+def _render_rows(header: List[str], rows: List[List[str]]) -> List[str]:
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '|'.join('-' * (len(name) + 2) for name in header) + '|']
+    return lines + ['| ' + ' | '.join(row) + ' |' for row in rows]
+
+
+def _add_history(lines: List[str], entry: str) -> List[str]:
+    """Добавляет запись в начало раздела «История изменений» (или создает раздел)"""
+    for index, line in enumerate(lines):
+        if line.strip() == HISTORY_HEADING:
+            insert = index + 1
+            while insert < len(lines) and not lines[insert].strip():
+                insert += 1
+            return lines[:insert] + [entry] + lines[insert:]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return lines + ['', HISTORY_HEADING, entry]
+
+
+def render_dictionary(table: str, columns: List[Dict[str, Any]]) -> str:
+    """Новый словарь таблицы"""
+    rows, _, _ = merge_columns(DICTIONARY_COLUMNS, [], columns)
+    lines = [f"# Словарь данных: {table}", "", f"## Таблица: {table}", ""]
+    lines += _render_rows(DICTIONARY_COLUMNS, rows)
+    lines += ["", HISTORY_HEADING, f"- {date.today().isoformat()}: Создан по схеме источника"]
+    return "\n".join(lines) + "\n"
+
+
+def dictionary_index(output_dir: Path) -> Dict[str, Path]:
+    """Какой файл описывает какую таблицу (по заголовкам «## Таблица: ...»)"""
+    index = {}
+    for path in sorted(Path(output_dir).glob('*.md')):
+        for match in TABLE_HEADING.finditer(path.read_text(encoding='utf-8')):
+            index.setdefault(match.group(1).rsplit('.', 1)[-1], path)
+    return index
+
+
+def update_dictionary(path: Path, table: str, columns: List[Dict[str, Any]]) -> Tuple[str, List[str], List[str]]:
+    """Создает или обновляет словарь таблицы
+
+    Возвращает статус (created, updated, unchanged), изменения и столбцы, которых нет в схеме.
+    """
+    if not path.exists():
+        _write(path, render_dictionary(table, columns))
+        return 'created', [], []
+
+    text = path.read_text(encoding='utf-8')
+    lines = text.split('\n')
+    bounds = find_table(lines, table)
+    if bounds is None:
+        # В файле нет таблицы полей — раздел добавляется в конец
+        rows, _, _ = merge_columns(DICTIONARY_COLUMNS, [], columns)
+        while lines and not lines[-1].strip():
+            lines.pop()
+        lines += ['', f"## Таблица: {table}", ''] + _render_rows(DICTIONARY_COLUMNS, rows)
+        lines = _add_history(lines, f"- {date.today().isoformat()}: Добавлена таблица {table}")
+        _write(path, "\n".join(lines) + "\n")
+        return 'updated', [f"добавлена таблица {table}"], []
+
+    start, end = bounds
+    header = _split_row(lines[start])
+    if 'Поле' not in header:
+        return 'unchanged', [], []
+    rows = [_split_row(line) for line in lines[start + 2:end]]
+    rows = [row + [EMPTY] * (len(header) - len(row)) for row in rows]
+    rows, changes, missing = merge_columns(header, rows, columns)
+    if not changes:
+        return 'unchanged', [], missing
+
+    lines = lines[:start] + _render_rows(header, rows) + lines[end:]
+    entry = '; '.join(changes)
+    lines = _add_history(lines, f"- {date.today().isoformat()}: {entry[0].upper()}{entry[1:]}")
+    _write(path, "\n".join(lines))
+    return 'updated', changes, missing
+
+
+def _write(path: Path, content: str) -> None:
+    tmp_path = path.with_name(path.name + '.part')
+    tmp_path.write_text(content, encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def update_dictionaries(loader: DataLoader, output_dir: Path, sources: Optional[List[str]] = None,
+                        include_files: bool = True) -> Tuple[Dict[str, Tuple[str, List[str], List[str]]], List[str]]:
+    """Обновляет словари всех таблиц; возвращает результаты по таблицам и ошибки"""
+    schemas, errors = collect_schemas(loader, sources, include_files)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index = dictionary_index(output_dir)
+
+    results = {}
+    for table, columns in schemas.items():
+        path = index.get(table.rsplit('.', 1)[-1], output_dir / f"{table.rsplit('.', 1)[-1]}_dictionary.md")
+        results[table] = update_dictionary(path, table, columns)
+    return results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Создание и обновление словарей данных по схемам источников')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--output-dir', help=f'Папка словарей (по умолчанию ../{DICTIONARIES_DIR_NAME})')
+    parser.add_argument('--source', action='append', help='Только эти источники data_sources (можно несколько раз)')
+    parser.add_argument('--no-files', action='store_true', help='Не читать схемы файлов local_files')
+
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    output_dir = Path(args.output_dir) if args.output_dir else Path(args.data_dir).resolve().parent / DICTIONARIES_DIR_NAME
+    try:
+        results, errors = update_dictionaries(loader, output_dir, args.source, not args.no_files)
+    finally:
+        loader.close()
+
+    for error in errors:
+        print(f"❌ {error}")
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+    for table, (status, changes, missing) in results.items():
+        counts[status] += 1
+        if status == 'created':
+            print(f"✅ {table}: создан словарь")
+        elif status == 'updated':
+            print(f"✅ {table}: {'; '.join(changes)}")
+        if missing:
+            print(f"⚠️ {table}: в словаре есть поля, которых нет в источнике: {', '.join(missing)}")
+    print(f"📚 Словари: создано {counts['created']}, обновлено {counts['updated']}, без изменений {counts['unchanged']}")
+
+
+if __name__ == '__main__':
+    main()
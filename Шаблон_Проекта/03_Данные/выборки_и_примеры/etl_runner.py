@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Инкрементальная загрузка измерений: водяные знаки, хэши строк и пакетная запись
+
+В ../трансформации/customer_etl.sql строки источника отбираются условием
+updated_at >= CURRENT_DATE - INTERVAL '1 day' OR customer_id NOT IN
+(SELECT ... FROM dwh.dim_customers): из-за NOT IN каждый запуск просматривает
+всю таблицу источника и все измерение, даже если изменилась одна строка.
+
+Здесь для каждой загрузки хранится водяной знак — максимум столбца watermark
+из прошлого запуска (таблица etl_watermarks в хранилище, обновляется в той же
+транзакции, что и данные). Источник читается с условием watermark >= знак,
+которое выполняется по индексу источника; без столбца-знака таблица
+читается целиком. Каждая порция строк:
+1. пишется во временную таблицу и преобразуется выражениями columns;
+2. получает хэш преобразованных значений;
+3. сравнивается с текущими версиями измерения антиджойном по ключу
+   (частичный уникальный индекс по is_current = 1): неизменные строки
+   отбрасываются, у измененных закрывается текущая версия (SCD Type 2),
+   новые и измененные вставляются одним INSERT ... SELECT.
+При "history": false измерение хранит одну версию строки, изменения
+применяются через INSERT ... ON CONFLICT DO UPDATE.
+
+Граница водяного знака читается повторно (>=), поэтому строки с тем же
+значением, дописанные после прошлого запуска, не теряются, а повтор уже
+загруженных отсекается сравнением хэшей.
+
+Загрузки описываются в разделе etl data_config.json; выражения columns —
+SQL PostgreSQL, переводимый в SQLite через sql_harness (REGEXP_REPLACE, ::,
+INTERVAL). Хранилище — файл SQLite (--warehouse). Источник читается через
+коннекторы data_sources (URL подменяется DATA_SOURCE_<ИМЯ>_URL) или из
+local_files (--from-files). --benchmark сравнивает повторную загрузку
+с прогоном customer_etl.sql на синтетической таблице.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from sql_harness import (MISSING_COLUMN, SQL_DIR, SqlHarness, _sql_value, register_functions,
+                         translate_expression)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet-таблицы без pyarrow не читаются
+    pq = None
+
+
+DEFAULT_WAREHOUSE = 'warehouse.db'
+DEFAULT_BATCH_ROWS = 50_000
+WATERMARKS_TABLE = 'etl_watermarks'
+BATCH_TABLE = 'etl_batch'
+ROWS_TABLE = 'etl_rows'
+CHANGED_TABLE = 'etl_changed'
+# Конец действия текущей версии, как '2099-12-31'::timestamp в customer_etl.sql
+OPEN_END = '2099-12-31 00:00:00'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+BENCHMARK_SPEC = 'dim_customers'
+BENCHMARK_SQL = 'customer_etl.sql'
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _json_value(value: Any) -> Any:
+    """Водяной знак в виде, пригодном для JSON и SQL-параметра"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if hasattr(value, 'isoformat'):
+        # Через пробел, как хранятся даты в SQLite и CSV: сравнение строк остается верным
+        return _sql_value(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def row_hash(*values: Any) -> str:
+    """Хэш преобразованной строки: меняется при изменении любого значения"""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        digest.update(b'\x00' if value is None else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def check_spec(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Проверяет описание загрузки и находит столбец измерения с ключом источника"""
+    missing = [field for field in ('source', 'table', 'key', 'columns') if not spec.get(field)]
+    if missing:
+        raise ValueError(f"etl.{name}: не заданы {', '.join(missing)}")
+    keys = [column for column, expression in spec['columns'].items() if expression.strip() == spec['key']]
+    if not keys:
+        raise ValueError(f"etl.{name}: в columns нет столбца со значением ключа {spec['key']}")
+    return {**spec, 'target_key': keys[0], 'history': spec.get('history', True)}
+
+
+class IncrementalETL:
+    """Загрузка таблиц источников в измерения хранилища SQLite только по изменившимся строкам"""
+
+    def __init__(self, loader: DataLoader, warehouse: Path, batch_rows: int = DEFAULT_BATCH_ROWS,
+                 from_files: bool = False):
+        self.loader = loader
+        self.batch_rows = batch_rows
+        self.from_files = from_files
+        self.specs = loader.config.get('etl', {})
+        self.conn = sqlite3.connect(str(warehouse), isolation_level=None)
+        register_functions(self.conn)
+        self.conn.create_function('etl_hash', -1, row_hash, deterministic=True)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {WATERMARKS_TABLE} (name TEXT PRIMARY KEY, "
+                          "source TEXT, watermark TEXT, rows INTEGER, loaded_at TEXT)")
+        self.warnings: List[str] = []
+
+    def watermark(self, name: str) -> Any:
+        row = self.conn.execute(f"SELECT watermark FROM {WATERMARKS_TABLE} WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def _ensure_target(self, name: str, spec: Dict[str, Any]) -> None:
+        columns = [_quote(column) for column in spec['columns']]
+        key = _quote(spec['target_key'])
+        if spec['history']:
+            columns += ['valid_from TEXT', 'valid_to TEXT', 'is_current INTEGER', 'row_hash TEXT']
+            # Антиджойн по ключу затрагивает только текущие версии
+            index = f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(name + '_current')} ON {_quote(name)} ({key}) " \
+                    "WHERE is_current = 1"
+        else:
+            columns += ['loaded_at TEXT', 'row_hash TEXT']
+            index = f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(name + '_key')} ON {_quote(name)} ({key})"
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(name)} ({', '.join(columns)})")
+        self.conn.execute(index)
+
+    def _read_source(self, spec: Dict[str, Any], watermark: Any) -> Iterator[pd.DataFrame]:
+        """Порции строк источника, начиная с водяного знака"""
+        column = spec.get('watermark')
+        if not self.from_files:
+            where, params = None, None
+            if column and watermark is not None:
+                where, params = f"{column} >= {self.loader.get_connector(spec['source']).placeholder}", [watermark]
+            yield from self.loader.fetch_table(spec['source'], spec['table'], where=where, params=params,
+                                               chunksize=self.batch_rows)
+            return
+
+        files = self.loader.config.get('local_files', {})
+        if spec['table'] not in files:
+            raise KeyError(f"Таблица {spec['table']} не описана в local_files data_config.json")
+        path = self.loader.data_dir / files[spec['table']]
+        if path.suffix == '.parquet':
+            if pq is None:
+                raise ImportError("Для Parquet нужен pyarrow: pip install pyarrow")
+            chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=self.batch_rows))
+        else:
+            chunks = pd.read_csv(path, chunksize=self.batch_rows)
+        warned = False
+        for chunk in chunks:
+            if column and column not in chunk:
+                if not warned:
+                    self.warnings.append(f"{path.name}: нет столбца {column}, файл читается целиком")
+                    warned = True
+            elif column and watermark is not None:
+                bound = pd.Timestamp(watermark) if pd.api.types.is_datetime64_any_dtype(chunk[column]) else watermark
+                chunk = chunk[chunk[column].notna() & (chunk[column] >= bound)]
+            yield chunk
+
+    def run(self, name: str, full: bool = False, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Загружает изменения одной таблицы; full — без водяного знака (перечитать источник)"""
+        if name not in self.specs:
+            raise KeyError(f"Загрузка {name} не описана в разделе etl data_config.json")
+        spec = check_spec(name, self.specs[name])
+        now = (now or datetime.now()).replace(microsecond=0)
+        started = time.perf_counter()
+        self._ensure_target(name, spec)
+
+        previous = None if full else self.watermark(name)
+        watermark = previous
+        stats = {'read': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+        self.conn.execute('BEGIN')
+        try:
+            # Версии этого запуска получают rowid больше текущего максимума: по нему,
+            # а не по valid_from с точностью до секунды, они отличаются от прошлых загрузок
+            run_rowid = self.conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {_quote(name)}").fetchone()[0]
+            batch_columns = None
+            for chunk in self._read_source(spec, previous):
+                if not len(chunk):
+                    continue
+                column = spec.get('watermark')
+                if column in chunk and chunk[column].notna().any():
+                    chunk_max = _json_value(chunk[column].max())
+                    watermark = chunk_max if watermark is None else max(watermark, chunk_max)
+                    chunk = chunk.sort_values(column, kind='stable')
+                # Из нескольких версий строки в порции остается последняя
+                chunk = chunk.drop_duplicates(spec['key'], keep='last')
+                if batch_columns is None:
+                    batch_columns = list(chunk.columns)
+                    self._prepare_batch(spec, batch_columns)
+                self._apply(name, spec, chunk[batch_columns], now, run_rowid, stats)
+                stats['read'] += len(chunk)
+            self.conn.execute(
+                f"INSERT INTO {WATERMARKS_TABLE} (name, source, watermark, rows, loaded_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET watermark = excluded.watermark, rows = excluded.rows, "
+                "loaded_at = excluded.loaded_at",
+                (name, f"{spec['source']}.{spec['table']}", json.dumps(_json_value(watermark)), stats['read'],
+                 now.strftime(TIMESTAMP_FORMAT)))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return {'name': name, 'mode': 'full' if previous is None else 'incremental', 'watermark_from': previous,
+                'watermark_to': _json_value(watermark), **stats, 'seconds': time.perf_counter() - started}
+
+    def _prepare_batch(self, spec: Dict[str, Any], columns: List[str]) -> None:
+        """Временные таблицы порции: сырые строки, преобразованные строки и измененные ключи"""
+        self.conn.execute(f"DROP TABLE IF EXISTS temp.{BATCH_TABLE}")
+        self.conn.execute(f"CREATE TEMP TABLE {BATCH_TABLE} ({', '.join(map(_quote, columns))})")
+        self.conn.execute(f"DROP TABLE IF EXISTS temp.{ROWS_TABLE}")
+        self.conn.execute(f"CREATE TEMP TABLE {ROWS_TABLE} ({', '.join(map(_quote, spec['columns']))}, row_hash)")
+        self.conn.execute(f"DROP TABLE IF EXISTS temp.{CHANGED_TABLE}")
+        self.conn.execute(f"CREATE TEMP TABLE {CHANGED_TABLE} (key PRIMARY KEY)")
+
+    def _transform(self, spec: Dict[str, Any], now: datetime) -> None:
+        """Преобразует порцию выражениями columns; недостающие столбцы источника — NULL с предупреждением"""
+        expressions = [translate_expression(expression, now) for expression in spec['columns'].values()]
+        target = ', '.join(map(_quote, spec['columns']))
+        statement = f"INSERT INTO temp.{ROWS_TABLE} ({target}, row_hash) SELECT {', '.join(expressions)}, " \
+                    f"etl_hash({', '.join(expressions)}) FROM temp.{BATCH_TABLE}"
+        while True:
+            try:
+                self.conn.execute(statement)
+                return
+            except sqlite3.OperationalError as e:
+                match = MISSING_COLUMN.search(str(e))
+                if match is None:
+                    raise
+                self.conn.execute(f"ALTER TABLE temp.{BATCH_TABLE} ADD COLUMN {_quote(match.group(2))}")
+                self.warnings.append(f"{spec['source']}.{spec['table']}.{match.group(2)}: нет в источнике, "
+                                     "считается NULL")
+
+    def _apply(self, name: str, spec: Dict[str, Any], chunk: pd.DataFrame, now: datetime, run_rowid: int,
+               stats: Dict[str, int]) -> None:
+        """Записывает в измерение новые и измененные строки порции; run_rowid — максимальный rowid до запуска"""
+        target, key = _quote(name), _quote(spec['target_key'])
+        columns = ', '.join(map(_quote, spec['columns']))
+        stamp = now.strftime(TIMESTAMP_FORMAT)
+        for table in (BATCH_TABLE, ROWS_TABLE, CHANGED_TABLE):
+            self.conn.execute(f"DELETE FROM temp.{table}")
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for column in chunk.columns[[pd.api.types.is_datetime64_any_dtype(dtype) for dtype in chunk.dtypes]]:
+            values[column] = values[column].map(_sql_value)
+        self.conn.executemany(f"INSERT INTO temp.{BATCH_TABLE} ({', '.join(map(_quote, chunk.columns))}) "
+                              f"VALUES ({', '.join('?' * len(chunk.columns))})",
+                              values.itertuples(index=False, name=None))
+        self._transform(spec, now)
+
+        current = f"t.is_current = 1 AND " if spec['history'] else ''
+        changed = self.conn.execute(
+            f"INSERT INTO temp.{CHANGED_TABLE} SELECT r.{key} FROM temp.{ROWS_TABLE} r JOIN {target} t "
+            f"ON {current}t.{key} = r.{key} WHERE t.row_hash <> r.row_hash").rowcount
+
+        if spec['history']:
+            closing = f"is_current = 1 AND {key} IN (SELECT key FROM temp.{CHANGED_TABLE})"
+            # Версия, вставленная этим же запуском из предыдущей порции, заменяется, а не закрывается
+            self.conn.execute(f"DELETE FROM {target} WHERE rowid > ? AND {closing}", (run_rowid,))
+            self.conn.execute(f"UPDATE {target} SET is_current = 0, valid_to = ? WHERE {closing}",
+                              ((now - timedelta(seconds=1)).strftime(TIMESTAMP_FORMAT),))
+            inserted = self.conn.execute(
+                f"INSERT INTO {target} ({columns}, valid_from, valid_to, is_current, row_hash) "
+                f"SELECT {columns}, ?, ?, 1, row_hash FROM temp.{ROWS_TABLE} r "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE t.is_current = 1 AND t.{key} = r.{key})",
+                (stamp, OPEN_END)).rowcount
+        else:
+            assignments = ', '.join(f"{column} = excluded.{column}" for column in map(_quote, spec['columns']))
+            written = self.conn.execute(
+                f"INSERT INTO {target} ({columns}, loaded_at, row_hash) "
+                f"SELECT {columns}, ?, row_hash FROM temp.{ROWS_TABLE} WHERE true "
+                f"ON CONFLICT ({key}) DO UPDATE SET {assignments}, loaded_at = excluded.loaded_at, "
+                f"row_hash = excluded.row_hash WHERE {target}.row_hash <> excluded.row_hash", (stamp,)).rowcount
+            inserted = written - changed
+
+        stats['inserted'] += inserted - changed if spec['history'] else inserted
+        stats['updated'] += changed
+        stats['unchanged'] += len(chunk) - inserted - (0 if spec['history'] else changed)
+
+    def run_all(self, names: Optional[List[str]] = None, full: bool = False) -> List[Dict[str, Any]]:
+        results = []
+        for name in names or list(self.specs):
+            try:
+                results.append({'status': 'ok', **self.run(name, full)})
+            except (ImportError, KeyError, ValueError, OSError, sqlite3.Error) as e:
+                results.append({'status': 'error', 'name': name, 'error': str(e)})
+        return results
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# --- Сравнение с customer_etl.sql ---
+
+def _synthetic_customers(first_id: int, rows: int, updated_at: Optional[str],
+                         rng: np.random.Generator) -> List[tuple]:
+    """Строки customers; без updated_at — случайные моменты изменения в 2023 году"""
+    ids = np.arange(first_id, first_id + rows)
+    phones = rng.integers(9_000_000_000, 9_999_999_999, rows)
+    statuses = np.array(['А', 'Н', 'П'])[rng.integers(0, 3, rows)]
+    days = rng.integers(0, 365, rows)
+    registered = (np.datetime64('2023-01-01') + days).astype(str)
+    if updated_at is None:
+        seconds = rng.integers(0, 365 * 24 * 3600, rows)
+        updated = (np.datetime64('2023-01-01T00:00:00') + seconds).astype(str)
+        updated = [stamp.replace('T', ' ') for stamp in updated]
+    else:
+        updated = [updated_at] * rows
+    return [(int(i), f"Клиент {i}", f"client{i}@example.com", f"+7 ({str(p)[:3]}) {str(p)[3:]}", reg, status,
+             stamp) for i, p, reg, status, stamp in zip(ids, phones, registered, statuses, updated)]
+
+
+def _build_source(path: Path, rows: int, rng: np.random.Generator) -> None:
+    """Таблица customers источника с индексами по ключу и водяному знаку"""
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, "
+                     "registration_date TEXT, status TEXT, updated_at TEXT)")
+        conn.execute("CREATE INDEX customers_updated_at ON customers (updated_at)")
+        conn.executemany("INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         _synthetic_customers(1, rows, None, rng))
+
+
+def _change_source(path: Path, rows: int, changed: int, new: int, now: datetime,
+                   rng: np.random.Generator) -> None:
+    """Изменяет email у changed строк и добавляет new новых строк с updated_at = now"""
+    stamp = now.strftime(TIMESTAMP_FORMAT)
+    ids = rng.choice(np.arange(1, rows + 1), size=changed, replace=False)
+    with sqlite3.connect(str(path)) as conn:
+        conn.executemany("UPDATE customers SET email = 'new.' || email, updated_at = ? WHERE customer_id = ?",
+                         [(stamp, int(i)) for i in ids])
+        conn.executemany("INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         _synthetic_customers(rows + 1, new, stamp, rng))
+
+
+def _dimension_counts(conn: sqlite3.Connection, table: str) -> Dict[str, int]:
+    total, current = conn.execute(f"SELECT COUNT(*), SUM(is_current = 1) FROM {table}").fetchone()
+    return {'versions': total, 'current': current or 0}
+
+
+def benchmark(data_dir: str, rows: int, changed: int, new: int, sql_path: Path,
+              batch_rows: int = DEFAULT_BATCH_ROWS, seed: int = 0) -> Dict[str, Any]:
+    """Первая и повторная загрузка: customer_etl.sql (NOT IN) против водяного знака и хэшей
+
+    Обе загрузки читают одну и ту же базу источника SQLite. Повторная загрузка
+    выполняется после изменения changed строк и добавления new строк.
+    """
+    rng = np.random.default_rng(seed)
+    first_run = datetime(2024, 1, 1, 3, 0)
+    second_run = first_run + timedelta(days=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = Path(tmp) / 'crm.db'
+        _build_source(source_path, rows, rng)
+
+        from connectors import SQLiteConnector
+        loader = DataLoader(data_dir, connectors={'crm': SQLiteConnector(f"sqlite:///{source_path}")})
+        etl = IncrementalETL(loader, Path(tmp) / DEFAULT_WAREHOUSE, batch_rows)
+        # Водяной знак источника бенчмарка — updated_at, даже если в data_config другой
+        etl.specs = {BENCHMARK_SPEC: {**loader.config.get('etl', {}).get(BENCHMARK_SPEC, {}),
+                                      'source': 'crm', 'table': 'customers', 'watermark': 'updated_at'}}
+        sql_runs = []
+        try:
+            for now in (first_run, second_run):
+                if now is second_run:
+                    _change_source(source_path, rows, changed, new, now, rng)
+                harness = SqlHarness([sql_path], data_dir, now, attach={'crm': str(source_path)})
+                if now is first_run:
+                    conn, _ = harness.connect()
+                started = time.perf_counter()
+                results = [harness.execute(conn, statement) for statement in harness.scripts[0]['statements']]
+                errors = [result['error'] for result in results if result['error']]
+                if errors:
+                    raise RuntimeError(f"{sql_path.name}: {errors[0]}")
+                sql_runs.append({'seconds': time.perf_counter() - started, 'statements': results})
+                harness.close()
+                etl_result = etl.run(BENCHMARK_SPEC, now=now)
+                sql_runs[-1]['etl'] = etl_result
+            dimensions = {'sql': _dimension_counts(conn, 'dwh.dim_customers'),
+                          'etl': _dimension_counts(etl.conn, _quote(BENCHMARK_SPEC))}
+            conn.close()
+        finally:
+            etl.close()
+            loader.close()
+    return {'rows': rows, 'changed': changed, 'new': new, 'runs': sql_runs, 'dimensions': dimensions}
+
+
+def print_benchmark(result: Dict[str, Any]) -> None:
+    first, second = result['runs']
+    print(f"📊 Источник: {result['rows']} строк; перед повторной загрузкой изменено {result['changed']}, "
+          f"добавлено {result['new']}")
+    print(f"   {BENCHMARK_SQL} (NOT IN, полный просмотр): первая {first['seconds']:.3f} сек, "
+          f"повторная {second['seconds']:.3f} сек")
+    print(f"   etl_runner (водяной знак + хэши):           первая {first['etl']['seconds']:.3f} сек, "
+          f"повторная {second['etl']['seconds']:.3f} сек")
+    slowest = max(second['statements'], key=lambda statement: statement['seconds'])
+    print(f"   Самое долгое выражение SQL: стр. {slowest['line']} {slowest['label'] or slowest['kind']} — "
+          f"{slowest['seconds']:.3f} сек")
+    etl = second['etl']
+    print(f"   Повторная загрузка etl_runner: прочитано {etl['read']}, новых {etl['inserted']}, "
+          f"изменено {etl['updated']}, без изменений {etl['unchanged']}")
+    if etl['seconds'] > 0:
+        print(f"⚡ Ускорение повторной загрузки: ×{second['seconds'] / etl['seconds']:.1f}")
+    sql, etl_dim = result['dimensions']['sql'], result['dimensions']['etl']
+    status = '✅' if sql == etl_dim else '⚠️'
+    print(f"{status} Измерение: версий {sql['versions']} / {etl_dim['versions']}, "
+          f"текущих {sql['current']} / {etl_dim['current']} (SQL / etl_runner)")
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    if result['status'] != 'ok':
+        print(f"❌ {result['name']}: {result['error']}")
+        return
+    print(f"✅ {result['name']}: {result['mode']}, прочитано {result['read']}, новых {result['inserted']}, "
+          f"изменено {result['updated']}, без изменений {result['unchanged']} за {result['seconds']:.3f} сек "
+          f"(знак: {result['watermark_from']} → {result['watermark_to']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Инкрементальная загрузка измерений по водяным знакам и хэшам')
+    parser.add_argument('names', nargs='*', help='Загрузки из раздела etl (по умолчанию все)')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--warehouse', help=f'Файл хранилища SQLite (по умолчанию <data-dir>/{DEFAULT_WAREHOUSE})')
+    parser.add_argument('--from-files', action='store_true', help='Читать источники из local_files')
+    parser.add_argument('--full', action='store_true', help='Игнорировать водяные знаки')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS, help='Строк в порции')
+    parser.add_argument('--benchmark', action='store_true', help=f'Сравнить с {BENCHMARK_SQL} на синтетике')
+    parser.add_argument('--rows', type=int, default=200_000, help='Строк источника в бенчмарке')
+    parser.add_argument('--changed', type=int, default=2_000, help='Измененных строк в бенчмарке')
+    parser.add_argument('--new', type=int, default=1_000, help='Новых строк в бенчмарке')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sql_path = SQL_DIR / BENCHMARK_SQL
+        try:
+            result = benchmark(args.data_dir, args.rows, args.changed, args.new, sql_path, args.batch_rows)
+        except (ImportError, KeyError, ValueError, OSError, RuntimeError, sqlite3.Error) as e:
+            print(f"❌ {e}")
+            return
+        print_benchmark(result)
+        return
+
+    loader = DataLoader(args.data_dir)
+    etl = IncrementalETL(loader, Path(args.warehouse) if args.warehouse else loader.data_dir / DEFAULT_WAREHOUSE,
+                         args.batch_rows, args.from_files)
+    try:
+        if not etl.specs:
+            print("❌ В data_config.json нет раздела etl")
+            return
+        results = etl.run_all(args.names, args.full)
+    finally:
+        etl.close()
+        loader.close()
+    for result in results:
+        _print_result(result)
+    for warning in dict.fromkeys(etl.warnings):
+        print(f"⚠️ {warning}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Накопительные агрегаты для файлов, которые только дописываются
+
+Выгрузки продаж растут добавлением новых дней в конец файла. Агрегаты
+(число строк, суммы, min/max, распределения) хранятся в .cache/ вместе со
+смещением в байтах, до которого файл уже учтен. При следующем запросе
+читаются только новые полные строки после смещения, поэтому сводка по
+годам данных обновляется за миллисекунды.
+
+Последняя строка без перевода строки учитывается в результате, но не
+в сохраненном состоянии: она может быть еще не дописана.
+
+Если файл переписан (стал короче или изменились байты в начале или перед
+смещением), агрегаты пересчитываются с нуля.
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from query import ROWS, check_spec, finalize, fold
+
+
+DEFAULT_CHUNKSIZE = 500_000
+# Сколько байт в начале файла и перед смещением сверяется с сохраненным отпечатком
+FINGERPRINT_BYTES = 64 * 1024
+STATE_VERSION = 1
+
+
+class _BoundedReader(io.RawIOBase):
+    """Читает файл от текущей позиции не дальше заданного числа байт"""
+
+    def __init__(self, f, limit: int):
+        self.f = f
+        self.remaining = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.remaining <= 0:
+            return 0
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+class RunningAggregates:
+    """Агрегаты CSV, обновляемые только по дописанным строкам"""
+
+    def __init__(self, file_path: Path, state_path: Path, spec: Dict[str, List[str]],
+                 date_columns: Optional[List[str]] = None, numeric_columns: Optional[List[str]] = None,
+                 chunksize: int = DEFAULT_CHUNKSIZE):
+        check_spec(spec)
+        self.file_path = Path(file_path)
+        self.state_path = Path(state_path)
+        self.spec = spec
+        self.columns = [column for column in spec if column != ROWS]
+        self.date_columns = [col for col in (date_columns or []) if col in self.columns]
+        self.numeric_columns = [col for col in (numeric_columns or []) if col in self.columns]
+        self.chunksize = chunksize
+        # Сколько байт прочитано при последнем обновлении (0 — ничего нового)
+        self.last_read_bytes = 0
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        """Актуальные агрегаты: дочитывает новые строки и сохраняет состояние"""
+        state = self._load_state()
+        stat = self.file_path.stat()
+
+        if state and (state['size'], state['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            self.last_read_bytes = stat.st_size - state['offset']
+            return self._with_open_line(state, _decode(state['aggregates']), stat.st_size)
+
+        if not state or not self._is_append(state, stat.st_size):
+            state = self._empty_state()
+
+        aggregates = _decode(state['aggregates'])
+        with open(self.file_path, 'rb') as f:
+            end = _last_line_end(f, stat.st_size)
+            start = state['offset']
+            if end > start:
+                rows = self._fold_range(f, start, end, aggregates, header=start == 0)
+                state['rows'] += rows
+                state['offset'] = end
+            self.last_read_bytes = max(end - start, 0)
+            state['head'] = _digest(f, 0, min(FINGERPRINT_BYTES, state['offset']))
+            state['tail'] = _digest(f, max(state['offset'] - FINGERPRINT_BYTES, 0), state['offset'])
+
+        state.update({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                      'aggregates': _encode(aggregates)})
+        self._save_state(state)
+        self.last_read_bytes += stat.st_size - state['offset']
+        return self._with_open_line(state, aggregates, stat.st_size)
+
+    def _with_open_line(self, state: Dict[str, Any], aggregates: Dict[str, Dict[str, Any]],
+                        size: int) -> Dict[str, Dict[str, Any]]:
+        """Итог с учетом последней строки без перевода строки (в состояние она не попадает)"""
+        rows = state['rows']
+        if size > state['offset']:
+            # Состояние уже сохранено — последнюю строку можно добавить прямо к нему
+            # Строка может быть оборвана на середине: C-парсер берет число полей из
+            # первой строки и падает, python-парсер дополняет пропусками
+            with open(self.file_path, 'rb') as f:
+                rows += self._fold_range(f, state['offset'], size, aggregates,
+                                         header=state['offset'] == 0, engine='python')
+        return finalize(self.spec, aggregates, rows)
+
+    def _fold_range(self, f, start: int, end: int, aggregates: Dict[str, Dict[str, Any]],
+                    header: bool, engine: str = 'c') -> int:
+        """Добавляет к агрегатам строки из диапазона байт [start, end)"""
+        f.seek(start)
+        reader = io.BufferedReader(_BoundedReader(f, end - start))
+        names = None if header else self._header()
+        rows = 0
+        for chunk in pd.read_csv(reader, names=names, header=0 if header else None,
+                                 usecols=self.columns or [0], chunksize=self.chunksize,
+                                 dtype={column: str for column in self.date_columns}, engine=engine):
+            # Недописанная последняя строка не должна ломать тип столбца дат
+            for column in self.date_columns:
+                chunk[column] = pd.to_datetime(chunk[column], errors='coerce')
+            for column in self.numeric_columns:
+                chunk[column] = pd.to_numeric(chunk[column])
+            rows += len(chunk)
+            for column in self.columns:
+                fold(aggregates.setdefault(column, {}), chunk[column], self.spec[column])
+        return rows
+
+    def _header(self) -> List[str]:
+        return list(pd.read_csv(self.file_path, nrows=0).columns)
+
+    def _is_append(self, state: Dict[str, Any], size: int) -> bool:
+        """Файл только дописан: не короче и совпадают отпечатки начала и конца учтенной части"""
+        if state.get('version') != STATE_VERSION or size < state['offset']:
+            return False
+        with open(self.file_path, 'rb') as f:
+            return (state['head'] == _digest(f, 0, min(FINGERPRINT_BYTES, state['offset']))
+                    and state['tail'] == _digest(f, max(state['offset'] - FINGERPRINT_BYTES, 0), state['offset']))
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {'version': STATE_VERSION, 'spec': self.spec, 'offset': 0, 'rows': 0,
+                'size': 0, 'mtime_ns': 0, 'head': '', 'tail': '', 'aggregates': {}}
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        if not self.state_path.exists():
+            return None
+        try:
+            state = json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return state if state.get('spec') == self.spec else None
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(self.state_path)
+
+
+def _last_line_end(f, size: int, block: int = 64 * 1024) -> int:
+    """Позиция сразу после последнего перевода строки: недописанная строка не учитывается"""
+    position = size
+    while position > 0:
+        start = max(position - block, 0)
+        f.seek(start)
+        data = f.read(position - start)
+        index = data.rfind(b'\n')
+        if index >= 0:
+            return start + index + 1
+        position = start
+    return 0
+
+
+def _digest(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha256(f.read(max(end - start, 0))).hexdigest()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, pd.Timestamp):
+        return {'timestamp': value.isoformat()}
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and 'timestamp' in value:
+        return pd.Timestamp(value['timestamp'])
+    return value
+
+
+def _encode(aggregates: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Состояние агрегатов в JSON-совместимом виде"""
+    encoded = {}
+    for column, values in aggregates.items():
+        encoded[column] = {}
+        for name, value in values.items():
+            if name == 'value_counts':
+                encoded[column][name] = {str(key): int(count) for key, count in value.items() if count}
+            else:
+                encoded[column][name] = _encode_value(value)
+    return encoded
+
+
+def _decode(encoded: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    aggregates = {}
+    for column, values in encoded.items():
+        aggregates[column] = {}
+        for name, value in values.items():
+            if name == 'value_counts':
+                aggregates[column][name] = pd.Series(value, dtype='int64')
+            else:
+                aggregates[column][name] = _decode_value(value)
+    return aggregates
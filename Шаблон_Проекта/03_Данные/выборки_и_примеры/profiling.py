@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Профиль таблиц data_config.json за один потоковый проход
+
+Для каждого столбца считаются доля пропусков, число уникальных значений
+(HyperLogLog), квантили и гистограмма (t-digest), частые значения (top-k),
+для чисел — среднее и стандартное отклонение, для строк — максимальная длина.
+Все оценки хранятся в компактных структурах фиксированного размера, поэтому
+память не зависит от числа строк и профиль таблицы на сотни миллионов строк
+строится порциями.
+
+Результат сохраняется в словари_данных: {таблица}_profile.md и .json.
+
+Пример:
+    python profiling.py orders
+    python profiling.py            # все таблицы local_files
+"""
+
+import argparse
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import BUILTIN_TABLES, DataLoader
+
+
+DEFAULT_CHUNKSIZE = 500_000
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+HISTOGRAM_BINS = 20
+TOP_K = 10
+# HyperLogLog: 2^14 регистров, стандартная ошибка ~0.8%
+HLL_PRECISION = 14
+TDIGEST_COMPRESSION = 200
+# Сколько значений хранит top-k: запас нужен, чтобы частые значения не вытеснялись
+TOP_K_CAPACITY = 1000
+DICTIONARIES_DIR_NAME = 'словари_данных'
+DAY_NS = 86_400 * 10**9
+
+
+class HyperLogLog:
+    """Оценка числа уникальных значений в фиксированной памяти"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values) -> None:
+        """Добавляет значения Series или Index (повторы не меняют оценку)"""
+        if not len(values):
+            return
+        hashes = self._hashes(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Позиция первой единицы в следующих 32 битах хэша (33 — все нули)
+        rest = ((hashes >> np.uint64(32 - self.precision)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        rank = np.full(len(rest), 33, dtype=np.uint8)
+        nonzero = rest > 0
+        rank[nonzero] = 32 - np.floor(np.log2(rest[nonzero])).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    @staticmethod
+    def _hashes(values) -> np.ndarray:
+        """64-битные хэши значений в едином представлении
+
+        Хэш одного и того же числа зависит от dtype, поэтому целые, логические
+        и целочисленные float хэшируются как int64, даты — как int64 в
+        наносекундах UTC, строки и прочие значения — как есть.
+        """
+        values = pd.Series(values, copy=False).reset_index(drop=True)
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+        if pd.api.types.is_datetime64_dtype(values.dtype):
+            values = values.astype('datetime64[ns]').astype('int64')
+        elif pd.api.types.is_bool_dtype(values.dtype) or pd.api.types.is_signed_integer_dtype(values.dtype):
+            values = values.astype('int64')
+        elif pd.api.types.is_unsigned_integer_dtype(values.dtype) or pd.api.types.is_float_dtype(values.dtype):
+            numbers = values.to_numpy(dtype=np.float64)
+            integral = np.isfinite(numbers) & (np.floor(numbers) == numbers) & (np.abs(numbers) < 2.0 ** 63)
+            hashes = pd.util.hash_pandas_object(pd.Series(numbers), index=False).to_numpy().copy()
+            if integral.any():
+                hashes[integral] = pd.util.hash_pandas_object(
+                    pd.Series(numbers[integral].astype(np.int64)), index=False).to_numpy()
+            return hashes
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Для малых значений точнее линейный подсчет по пустым регистрам
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TDigest:
+    """Приближенные квантили: отсортированные центроиды, мелкие на хвостах"""
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        """Добавляет значения (weights — сколько раз встречается каждое)"""
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values)) if weights is None else weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Центроиды объединяются в пределах единицы шкалы k(q) ~ asin(2q - 1)
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Опорные точки функции распределения: накопленный вес -> значение"""
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return np.r_[0.0, positions, self.count], np.r_[self.min, self.means, self.max]
+
+    def quantile(self, q: float) -> float:
+        if not len(self.weights):
+            return math.nan
+        positions, values = self._points()
+        return float(np.interp(q * self.count, positions, values))
+
+    def histogram_edges(self, bins: int = HISTOGRAM_BINS, step: Optional[float] = None) -> np.ndarray:
+        """Границы интервалов равной ширины от min до max
+
+        step — шаг значений (1 для целых, сутки для дат): если различных шагов
+        меньше bins, каждый шаг становится своим интервалом, иначе ширина
+        интервала кратна шагу.
+        """
+        if step is None:
+            return np.linspace(self.min, self.max, bins + 1)
+        start = math.floor(self.min / step) * step
+        steps = math.floor(self.max / step) - math.floor(self.min / step) + 1
+        width = math.ceil(steps / bins) * step
+        return start + width * np.arange(math.ceil(steps * step / width) + 1)
+
+    def histogram(self, edges: np.ndarray) -> np.ndarray:
+        """Число значений в интервалах [edges[i], edges[i + 1]) по оценке функции распределения"""
+        if not len(self.weights):
+            return np.empty(0, dtype=np.int64)
+        positions, values = self._points()
+        cumulative = np.round(np.interp(edges, values, positions)).astype(np.int64)
+        cumulative[0], cumulative[-1] = 0, round(self.count)
+        return np.diff(cumulative)
+
+
+class TopK:
+    """Частые значения: счетчики не более capacity значений
+
+    Когда значений больше, редкие отбрасываются; max_error — верхняя граница
+    недосчета любого из оставшихся значений.
+    """
+
+    def __init__(self, capacity: int = TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.max_error = 0
+
+    def add(self, counts: pd.Series) -> None:
+        """Добавляет частоты порции (результат value_counts)"""
+        counts = self._prune(counts)
+        self.counts = counts if self.counts.empty else self.counts.add(counts, fill_value=0).astype('int64')
+        self.counts = self._prune(self.counts)
+
+    def _prune(self, counts: pd.Series) -> pd.Series:
+        if len(counts) <= self.capacity:
+            return counts
+        counts = counts.sort_values(ascending=False, kind='stable')
+        self.max_error += int(counts.iloc[self.capacity])
+        return counts.iloc[:self.capacity]
+
+    def top(self, k: int = TOP_K) -> List[Tuple[Any, int]]:
+        counts = self.counts.sort_values(ascending=False, kind='stable').head(k)
+        return list(counts.items())
+
+
+class ColumnProfile:
+    """Накопление статистик одного столбца по порциям"""
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.rows = 0
+        self.nulls = 0
+        self.invalid = 0
+        self.hll = HyperLogLog()
+        self.top = TopK()
+        self.digest = TDigest() if kind in ('numeric', 'date') else None
+        # Среднее и сумма квадратов отклонений (объединение по Чану)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_length = 0
+        # Шаг значений для гистограммы: целые числа или даты без времени
+        self.step = 1 if kind == 'numeric' else DAY_NS
+
+    def add(self, values: pd.Series) -> None:
+        self.rows += len(values)
+        missing = values.isna()
+        self.nulls += int(missing.sum())
+        values = values[~missing]
+
+        if self.kind == 'numeric':
+            converted = pd.to_numeric(values, errors='coerce')
+        elif self.kind == 'date':
+            converted = pd.to_datetime(values, errors='coerce')
+        else:
+            converted = values if pd.api.types.is_string_dtype(values.dtype) else values.astype(str)
+        if self.kind != 'string':
+            # Нераспознанные числа и даты учитываются отдельно от пропусков
+            invalid = converted.isna()
+            self.invalid += int(invalid.sum())
+            converted = converted[~invalid]
+
+        if not len(converted):
+            return
+        # Частоты считаются один раз: дальше обрабатываются только различные значения
+        counts = converted.value_counts(sort=False)
+        self.hll.add(counts.index)
+        self.top.add(counts)
+
+        if self.kind == 'string':
+            self.max_length = max(self.max_length, int(counts.index.str.len().max()))
+            return
+
+        uniques = self._numbers(counts.index)
+        self.digest.add(uniques, counts.to_numpy(dtype=np.float64))
+        if self.step and np.any(np.mod(uniques, self.step)):
+            self.step = None
+        if self.kind == 'numeric':
+            numbers = converted.to_numpy(dtype=np.float64)
+            count, mean = len(numbers), float(numbers.mean())
+            m2 = float(((numbers - mean) ** 2).sum())
+            total = self.count + count
+            delta = mean - self.mean
+            self.m2 += m2 + delta * delta * self.count * count / total
+            self.mean += delta * count / total
+            self.count = total
+
+    def _numbers(self, values: pd.Index) -> np.ndarray:
+        """Числа для t-digest: даты — в наносекундах"""
+        if self.kind == 'date':
+            return values.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        return values.to_numpy(dtype=np.float64)
+
+    def result(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'kind': self.kind,
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'null_rate': round(self.nulls / self.rows, 6) if self.rows else 0.0,
+            'distinct': self.hll.estimate(),
+            'top': [{'value': _json_value(value, self.kind), 'count': int(count)}
+                    for value, count in self.top.top()],
+            'top_max_error': self.top.max_error,
+        }
+        if self.invalid:
+            result['invalid'] = self.invalid
+        if self.kind == 'string':
+            result['max_length'] = self.max_length
+            return result
+
+        convert = _from_nanoseconds if self.kind == 'date' else float
+        has_values = bool(len(self.digest.weights))
+        result['min'] = convert(self.digest.min) if has_values else None
+        result['max'] = convert(self.digest.max) if has_values else None
+        edges = self.digest.histogram_edges(step=self.step) if has_values else np.empty(0)
+        # Если top-k ни разу не отбрасывал значения, в нем все частоты — распределение точное
+        exact = has_values and self.top.max_error == 0
+        if exact:
+            values = self._numbers(self.top.counts.index)
+            order = np.argsort(values)
+            values, weights = values[order], self.top.counts.to_numpy(dtype=np.int64)[order]
+            cumulative = np.cumsum(weights)
+            result['quantiles'] = {str(q): convert(values[np.searchsorted(cumulative, q * cumulative[-1])])
+                                   for q in QUANTILES}
+            bins = np.searchsorted(edges, values, side='right') - 1
+            counts = np.bincount(np.minimum(bins, len(edges) - 2), weights=weights, minlength=len(edges) - 1)
+        else:
+            result['quantiles'] = {str(q): convert(self.digest.quantile(q)) for q in QUANTILES} if has_values else {}
+            # Дискретные значения попадают в интервал целиком: граница сдвигается на полшага
+            counts = self.digest.histogram(edges - self.step / 2 if self.step else edges)
+        result['exact_distribution'] = exact
+        result['histogram'] = [{'from': convert(edges[i]), 'to': convert(edges[i + 1]), 'count': int(counts[i])}
+                               for i in range(len(counts))]
+        if self.kind == 'numeric':
+            result['mean'] = self.mean if self.count else None
+            result['std'] = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+        return result
+
+
+def _from_nanoseconds(value: float) -> str:
+    return pd.Timestamp(int(round(value))).isoformat()
+
+
+def _json_value(value: Any, kind: str) -> Any:
+    if kind == 'date':
+        return pd.Timestamp(value).isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def column_kind(values: pd.Series, date_columns: List[str], numeric_columns: List[str]) -> str:
+    """Тип столбца для профиля: date, numeric или string"""
+    if values.name in date_columns or pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return 'date'
+    if values.name in numeric_columns or (pd.api.types.is_numeric_dtype(values.dtype)
+                                          and not pd.api.types.is_bool_dtype(values.dtype)):
+        return 'numeric'
+    return 'string'
+
+
+def iter_chunks(loader: DataLoader, table: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Порции таблицы: файл local_files (или встроенный) либо таблица источника"""
+    if table in loader.config.get('local_files', {}) or table in BUILTIN_TABLES:
+        file_path = loader.table_path(table)
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл {file_path} не найден")
+        yield from pd.read_csv(file_path, chunksize=chunksize)
+        return
+
+    for source, settings in loader.config.get('data_sources', {}).items():
+        if table in settings.get('tables', []):
+            yield from loader.fetch_table(source, table, chunksize=chunksize)
+            return
+    raise KeyError(f"Таблица {table} не описана в local_files или data_sources data_config.json")
+
+
+def profile_table(loader: DataLoader, table: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Dict[str, Any]:
+    """Профиль таблицы за один проход по порциям"""
+    data_types = loader.config.get('quality_rules', {}).get(
+        BUILTIN_TABLES[table]['table'] if table in BUILTIN_TABLES else table, {}).get('data_types', {})
+    date_columns = [col for col, kind in data_types.items() if kind in ('date', 'datetime', 'timestamp')]
+    numeric_columns = [col for col, kind in data_types.items() if kind in ('integer', 'numeric', 'float', 'decimal')]
+
+    columns: Dict[str, ColumnProfile] = {}
+    rows = 0
+    for chunk in iter_chunks(loader, table, chunksize):
+        rows += len(chunk)
+        for name in chunk.columns:
+            if name not in columns:
+                columns[name] = ColumnProfile(name, column_kind(chunk[name], date_columns, numeric_columns))
+                # Столбец, которого не было в первых порциях, пуст в предыдущих строках
+                columns[name].rows = columns[name].nulls = rows - len(chunk)
+            columns[name].add(chunk[name])
+
+    return {
+        'table': table,
+        'rows': rows,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'columns': {name: profile.result() for name, profile in columns.items()},
+    }
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() and abs(value) < 1e15 else f"{value:.6g}"
+    if isinstance(value, str) and 'T00:00:00' in value:
+        return value.replace('T00:00:00', '')
+    return str(value).replace('|', '\\|')
+
+
+def render_markdown(profile: Dict[str, Any]) -> str:
+    """Профиль в Markdown для словаря данных"""
+    lines = [
+        f"# Профиль данных: {profile['table']}",
+        "",
+        f"**Строк:** {profile['rows']}  ",
+        f"**Построен:** {profile['generated_at']}  ",
+        "**Уникальные значения оцениваются HyperLogLog; квантили и гистограммы точные, "
+        f"если различных значений не больше {TOP_K_CAPACITY}, иначе — оценка t-digest**",
+        "",
+        "| Поле | Тип | Пропуски | Уникальных (≈) | Мин | Медиана | Макс |",
+        "|------|-----|----------|----------------|-----|---------|------|",
+    ]
+    for name, column in profile['columns'].items():
+        median = column.get('quantiles', {}).get('0.5')
+        lines.append(f"| {name} | {column['kind']} | {column['null_rate']:.2%} | {column['distinct']} | "
+                     f"{_format(column.get('min'))} | {_format(median)} | {_format(column.get('max'))} |")
+
+    for name, column in profile['columns'].items():
+        lines += ["", f"## {name}", ""]
+        details = [f"- Пропусков: {column['nulls']} из {column['rows']}"]
+        if column.get('invalid'):
+            details.append(f"- Нераспознанных значений: {column['invalid']}")
+        if column['kind'] == 'string':
+            details.append(f"- Максимальная длина: {column['max_length']}")
+        if column.get('mean') is not None:
+            details.append(f"- Среднее: {_format(column['mean'])}, стандартное отклонение: {_format(column['std'])}")
+        if column.get('quantiles'):
+            details.append("- Распределение: " + ("точное" if column['exact_distribution'] else "приближенное (t-digest)"))
+            details.append("- Квантили: " + ", ".join(f"p{float(q) * 100:g} = {_format(value)}"
+                                                      for q, value in column['quantiles'].items()))
+        lines += details
+
+        # Для почти уникальных столбцов (идентификаторы) частые значения не показательны
+        if column['top'] and column['distinct'] < 0.9 * (column['rows'] - column['nulls']):
+            error = f" (погрешность счетчиков до {column['top_max_error']})" if column['top_max_error'] else ""
+            lines += ["", f"**Частые значения{error}:**", "", "| Значение | Строк |", "|----------|-------|"]
+            lines += [f"| {_format(item['value'])} | {item['count']} |" for item in column['top']]
+
+        if column.get('histogram'):
+            peak = max(item['count'] for item in column['histogram']) or 1
+            lines += ["", "**Гистограмма:**", "", "```"]
+            for item in column['histogram']:
+                bar = '█' * round(30 * item['count'] / peak)
+                lines.append(f"{_format(item['from']):>12} – {_format(item['to']):<12} {bar} {item['count']}")
+            lines.append("```")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_profile(profile: Dict[str, Any], output_dir: Path) -> Tuple[Path, Path]:
+    """Сохраняет профиль в {таблица}_profile.md и .json"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for suffix, content in (('.md', render_markdown(profile)),
+                            ('.json', json.dumps(profile, indent=2, ensure_ascii=False))):
+        output = output_dir / f"{profile['table']}_profile{suffix}"
+        tmp_output = output.with_name(output.name + '.part')
+        tmp_output.write_text(content, encoding='utf-8')
+        tmp_output.replace(output)
+        written.append(output)
+    return written[0], written[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Профиль таблиц: пропуски, уникальные, квантили, частые значения')
+    parser.add_argument('tables', nargs='*', help='Таблицы (по умолчанию все из local_files)')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--output-dir', help=f'Куда сохранить профили (по умолчанию ../{DICTIONARIES_DIR_NAME})')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Строк в порции')
+
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    tables = args.tables or list(loader.config.get('local_files', {})) or list(BUILTIN_TABLES)
+    output_dir = Path(args.output_dir) if args.output_dir else Path(args.data_dir).resolve().parent / DICTIONARIES_DIR_NAME
+
+    try:
+        for table in tables:
+            try:
+                profile = profile_table(loader, table, args.chunksize)
+            except (ImportError, KeyError, ValueError, FileNotFoundError) as e:
+                print(f"❌ {table}: {e}")
+                continue
+            md_path, json_path = write_profile(profile, output_dir)
+            print(f"✅ {table}: {profile['rows']} строк, {len(profile['columns'])} столбцов → {md_path.name}, {json_path.name}")
+    finally:
+        loader.close()
+
+
+if __name__ == '__main__':
+    main()
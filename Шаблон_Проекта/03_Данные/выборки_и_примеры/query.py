@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ленивые запросы к таблицам DataLoader
+
+LazyFrame накапливает выбор столбцов и фильтры, а читает данные только при
+вызове итоговой операции (collect, count, sum, aggregate...). Из файла
+читаются лишь нужные столбцы, фильтры применяются при чтении:
+- таблица уже загружена в DataLoader — запрос выполняется в памяти;
+- есть свежий Parquet-снимок в .cache/ — pyarrow читает только нужные
+  столбцы и отбрасывает группы строк по фильтрам;
+- иначе CSV читается порциями с usecols, память не зависит от размера файла.
+
+Пример:
+    loader.scan('sales').filter('order_date', '>=', '2024-01-01').sum('price')
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_loader import CACHE_FORMAT
+
+
+DEFAULT_CHUNKSIZE = 500_000
+FILTER_OPERATORS = ('==', '!=', '>', '>=', '<', '<=', 'in', 'not in')
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max', 'value_counts')
+# Псевдостолбец для подсчета строк в aggregate()
+ROWS = '*'
+
+Predicate = Tuple[str, str, Any]
+
+
+class LazyFrame:
+    """Отложенный запрос к таблице: столбцы и фильтры применяются при чтении"""
+
+    def __init__(self, loader, table: str, columns: Optional[Sequence[str]] = None,
+                 predicates: Sequence[Predicate] = (), chunksize: int = DEFAULT_CHUNKSIZE):
+        self.loader = loader
+        self.table = table
+        self.options = loader._table_options(table)
+        self.columns = list(columns) if columns is not None else None
+        self.predicates = list(predicates)
+        self.chunksize = chunksize
+        # Способ и столбцы последнего чтения — для проверки, что читалось
+        self.last_scan: Dict[str, Any] = {}
+
+    def select(self, *columns: str) -> 'LazyFrame':
+        """Оставляет только указанные столбцы"""
+        return LazyFrame(self.loader, self.table, columns, self.predicates, self.chunksize)
+
+    def filter(self, column: str, op: str, value: Any) -> 'LazyFrame':
+        """Добавляет условие column <op> value (op: ==, !=, >, >=, <, <=, in, not in)"""
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Неизвестный оператор фильтра: {op} (доступны: {', '.join(FILTER_OPERATORS)})")
+        if column in self.options['date_columns']:
+            value = [pd.Timestamp(v) for v in value] if op in ('in', 'not in') else pd.Timestamp(value)
+        return LazyFrame(self.loader, self.table, self.columns,
+                         self.predicates + [(column, op, value)], self.chunksize)
+
+    def collect(self) -> pd.DataFrame:
+        """Выполняет запрос и возвращает DataFrame"""
+        chunks = list(self._scan(self.columns))
+        if not chunks:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0].reset_index(drop=True)
+
+    def count(self) -> int:
+        return self.aggregate({ROWS: ['count']})[ROWS]['count']
+
+    def sum(self, column: str) -> Any:
+        return self.aggregate({column: ['sum']})[column]['sum']
+
+    def mean(self, column: str) -> Any:
+        return self.aggregate({column: ['mean']})[column]['mean']
+
+    def min(self, column: str) -> Any:
+        return self.aggregate({column: ['min']})[column]['min']
+
+    def max(self, column: str) -> Any:
+        return self.aggregate({column: ['max']})[column]['max']
+
+    def value_counts(self, column: str) -> Dict[Any, int]:
+        return self.aggregate({column: ['value_counts']})[column]['value_counts']
+
+    def aggregate(self, spec: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Несколько агрегатов за одно чтение, например {'price': ['sum', 'mean'], '*': ['count']}"""
+        check_spec(spec)
+        columns = [column for column in spec if column != ROWS]
+        state: Dict[str, Dict[str, Any]] = {column: {} for column in spec}
+        rows = 0
+        for chunk in self._scan(columns):
+            rows += len(chunk)
+            for column in columns:
+                fold(state[column], chunk[column], spec[column])
+
+        return finalize(spec, state, rows)
+
+    def _needed_columns(self, columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+        """Столбцы для чтения: запрошенные и участвующие в фильтрах (None — все)"""
+        if columns is None:
+            return None
+        return list(dict.fromkeys(list(columns) + [column for column, _, _ in self.predicates]))
+
+    def _scan(self, columns: Optional[Sequence[str]]) -> Iterator[pd.DataFrame]:
+        """Порции отфильтрованной таблицы с нужными столбцами"""
+        loader, options = self.loader, self.options
+        parse_key, _ = loader._parse_key(options['date_columns'], options['numeric_columns'], options['table'])
+        needed = self._needed_columns(columns)
+        file_path = loader.data_dir / options['file_name']
+
+        memo = loader._frames.get(f"{options['file_name']}:{parse_key}")
+        if memo is not None:
+            self.last_scan = {'backend': 'memory', 'columns': needed}
+            frame = memo if needed is None else memo[needed]
+            yield self._project(frame[self._mask(frame)] if self.predicates else frame, columns)
+            return
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл {file_path} не найден")
+
+        fresh = loader._fresh_cache(file_path, parse_key) if loader.use_cache and CACHE_FORMAT == 'parquet' else None
+        if fresh is not None:
+            data_path, _ = fresh
+            read_columns = needed if needed else (None if needed is None else self._first_column(file_path))
+            self.last_scan = {'backend': 'parquet', 'columns': read_columns}
+            filters = [(column, '=' if op == '==' else op, value) for column, op, value in self.predicates]
+            frame = pd.read_parquet(data_path, columns=read_columns, filters=filters or None)
+            yield self._project(frame, columns)
+            return
+
+        read_columns = needed if needed else (None if needed is None else self._first_column(file_path))
+        self.last_scan = {'backend': 'csv', 'columns': read_columns}
+        date_columns = [col for col in options['date_columns'] if read_columns is None or col in read_columns]
+        numeric_columns = [col for col in options['numeric_columns'] if read_columns is None or col in read_columns]
+        for chunk in pd.read_csv(file_path, usecols=read_columns, parse_dates=date_columns,
+                                 chunksize=self.chunksize):
+            for column in numeric_columns:
+                chunk[column] = pd.to_numeric(chunk[column])
+            if self.predicates:
+                chunk = chunk[self._mask(chunk)]
+            yield self._project(chunk, columns)
+
+    def _mask(self, frame: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(True, index=frame.index)
+        for column, op, value in self.predicates:
+            values = frame[column]
+            if op == 'in':
+                mask &= values.isin(value)
+            elif op == 'not in':
+                mask &= ~values.isin(value)
+            else:
+                mask &= _COMPARE[op](values, value).fillna(False).astype(bool)
+        return mask
+
+    @staticmethod
+    def _project(frame: pd.DataFrame, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        if columns is None or list(frame.columns) == list(columns):
+            return frame
+        return frame[list(columns)]
+
+    @staticmethod
+    def _first_column(file_path) -> List[str]:
+        """Для подсчета строк без столбцов читается только первый столбец"""
+        return [pd.read_csv(file_path, nrows=0).columns[0]]
+
+
+_COMPARE = {
+    '==': lambda values, value: values == value,
+    '!=': lambda values, value: values != value,
+    '>': lambda values, value: values > value,
+    '>=': lambda values, value: values >= value,
+    '<': lambda values, value: values < value,
+    '<=': lambda values, value: values <= value,
+}
+
+
+def check_spec(spec: Dict[str, List[str]]) -> None:
+    for column, functions in spec.items():
+        unknown = set(functions) - set(AGGREGATES)
+        if unknown:
+            raise ValueError(f"Неизвестные агрегаты для {column}: {', '.join(sorted(unknown))}")
+
+
+def finalize(spec: Dict[str, List[str]], state: Dict[str, Dict[str, Any]], rows: int) -> Dict[str, Dict[str, Any]]:
+    """Итоговые значения агрегатов из накопленного состояния"""
+    result: Dict[str, Dict[str, Any]] = {}
+    for column, functions in spec.items():
+        if column == ROWS:
+            result[column] = {'count': rows}
+            continue
+        values = state.get(column, {})
+        result[column] = {}
+        for function in functions:
+            if function == 'mean':
+                count = values.get('count', 0)
+                result[column][function] = values.get('sum', 0) / count if count else float('nan')
+            elif function == 'value_counts':
+                counts = values.get('value_counts', pd.Series(dtype='int64'))
+                counts = counts[counts > 0].astype('int64').sort_values(ascending=False, kind='stable')
+                result[column][function] = counts.to_dict()
+            elif function in ('min', 'max'):
+                result[column][function] = values.get(function)
+            else:
+                result[column][function] = values.get(function, 0)
+    return result
+
+
+def fold(state: Dict[str, Any], values: pd.Series, functions: Sequence[str]) -> None:
+    """Добавляет порцию значений к накопленным агрегатам столбца"""
+    if 'sum' in functions or 'mean' in functions:
+        state['sum'] = state.get('sum', 0) + values.sum()
+    if 'count' in functions or 'mean' in functions:
+        state['count'] = state.get('count', 0) + int(values.count())
+    for function in ('min', 'max'):
+        if function in functions and values.notna().any():
+            value = getattr(values, function)()
+            current = state.get(function)
+            if current is None or (value < current if function == 'min' else value > current):
+                state[function] = value
+    if 'value_counts' in functions:
+        counts = values.value_counts()
+        if 'value_counts' in state:
+            counts = state['value_counts'].add(counts, fill_value=0)
+        state['value_counts'] = counts
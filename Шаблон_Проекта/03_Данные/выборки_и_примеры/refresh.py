@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Планировщик обновления локальных снимков таблиц источников
+
+Для каждой таблицы из data_sources поддерживается локальный снимок в
+snapshots/<источник>/<таблица>/ — ноутбуки читают его мгновенно через
+DataLoader.load_snapshot(), не обращаясь к источнику. Снимок обновляется,
+когда истек срок refresh_frequency ("hourly", "daily", "weekly", "15min", "2h").
+
+Если для таблицы задан столбец-водяной знак, забираются только новые строки:
+    "incremental": {"customers": {"watermark": "updated_at", "key": "customer_id"}}
+С ключом забираются строки с водяным знаком >= последнего (строки с тем же
+значением, появившиеся после выгрузки, не теряются; повторы убираются по
+ключу), без ключа — строго больше. Водяной знак — время изменения или число,
+растущие с каждой правкой строки; текстовые номера не подходят ('999' > '1000'
+при сравнении строк). Без водяного знака таблица перечитывается целиком.
+Параметр источника max_concurrency ограничивает число одновременных выгрузок
+из него (по умолчанию 2).
+Итоги обновлений хранятся в snapshots/manifest.json.
+"""
+
+import argparse
+import json
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data_loader import CACHE_FORMAT, DataLoader
+
+
+SNAPSHOT_DIR_NAME = 'snapshots'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_MAX_CONCURRENCY = 2
+# Строк в одном файле снимка: выгрузка держит в памяти не больше одной части
+PART_ROWS = 1_000_000
+# Снимок с ключом сжимается в один файл после стольких частей
+COMPACT_AFTER_PARTS = 20
+
+FREQUENCIES = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+}
+FREQUENCY_PATTERN = re.compile(r'^(\d+)\s*(min|m|h|d)$')
+FREQUENCY_UNITS = {'min': 60, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def frequency_seconds(frequency: str) -> int:
+    """Переводит refresh_frequency в секунды"""
+    frequency = str(frequency).strip().lower()
+    if frequency in FREQUENCIES:
+        return FREQUENCIES[frequency]
+    match = FREQUENCY_PATTERN.match(frequency)
+    if not match:
+        raise ValueError(f"Неизвестная частота обновления: {frequency}")
+    return int(match.group(1)) * FREQUENCY_UNITS[match.group(2)]
+
+
+def snapshot_dir(data_dir: Path, source: str, table: str) -> Path:
+    return Path(data_dir) / SNAPSHOT_DIR_NAME / source / table
+
+
+def _write_part(frame: pd.DataFrame, path: Path) -> None:
+    if CACHE_FORMAT == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_pickle(path)
+
+
+def _read_part(path: Path) -> pd.DataFrame:
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _part_paths(directory: Path) -> List[Path]:
+    return sorted(p for p in directory.glob('part-*') if p.suffix in ('.parquet', '.pkl'))
+
+
+def list_snapshot_parts(data_dir: Path, source: str, table: str) -> List[Path]:
+    """Файлы частей снимка таблицы по порядку выгрузки (пусто, если снимка нет)"""
+    return _part_paths(snapshot_dir(data_dir, source, table))
+
+
+def read_snapshot(data_dir: Path, source: str, table: str,
+                  key: Optional[List[str]] = None) -> pd.DataFrame:
+    """Читает снимок таблицы; при заданном ключе оставляет последнюю версию строк"""
+    parts = list_snapshot_parts(data_dir, source, table)
+    if not parts:
+        raise FileNotFoundError(f"Снимок {source}.{table} еще не создан: запустите refresh.py")
+
+    frame = pd.concat([_read_part(path) for path in parts], ignore_index=True)
+    if key and len(parts) > 1:
+        frame = frame.drop_duplicates(subset=key, keep='last').reset_index(drop=True)
+    return frame
+
+
+class RefreshScheduler:
+    """Обновляет снимки таблиц источников по их refresh_frequency"""
+
+    def __init__(self, loader: DataLoader, max_workers: int = 4):
+        self.loader = loader
+        self.data_dir = loader.data_dir
+        self.max_workers = max_workers
+        self.manifest_path = self.data_dir / SNAPSHOT_DIR_NAME / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+        self._source_slots: Dict[str, threading.Semaphore] = {}
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        return {}
+
+    def _save_manifest(self) -> None:
+        """Сохраняет манифест атомарно (вызывается под блокировкой)"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False, default=str),
+                            encoding='utf-8')
+        tmp_path.replace(self.manifest_path)
+
+    def due_tables(self, sources: Optional[List[str]] = None, force: bool = False,
+                   now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Таблицы, снимки которых устарели"""
+        now = now or time.time()
+        due = []
+        for source, settings in self.loader.config.get('data_sources', {}).items():
+            if sources and source not in sources:
+                continue
+            interval = frequency_seconds(settings.get('refresh_frequency', 'daily'))
+            for table in settings.get('tables', []):
+                entry = self.manifest.get(source, {}).get(table, {})
+                last = entry.get('last_success_ts')
+                if force or last is None or now - last >= interval:
+                    due.append((source, table))
+        return due
+
+    def run_once(self, sources: Optional[List[str]] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Обновляет все устаревшие снимки, соблюдая лимиты по источникам"""
+        due = self.due_tables(sources, force)
+        results = []
+        if not due:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._refresh_guarded, source, table) for source, table in due]
+            for future in as_completed(futures):
+                results.append(future.result())
+        return results
+
+    def run_forever(self, poll_seconds: int = 60, sources: Optional[List[str]] = None) -> None:
+        """Периодически проверяет сроки и обновляет снимки"""
+        while True:
+            for result in self.run_once(sources):
+                _print_result(result)
+            time.sleep(poll_seconds)
+
+    def _refresh_guarded(self, source: str, table: str) -> Dict[str, Any]:
+        """Обновление с ограничением параллельности внутри источника"""
+        with self._lock:
+            if source not in self._source_slots:
+                limit = self.loader.config['data_sources'][source].get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+                self._source_slots[source] = threading.Semaphore(limit)
+        with self._source_slots[source]:
+            return self.refresh_table(source, table)
+
+    def refresh_table(self, source: str, table: str) -> Dict[str, Any]:
+        """Забирает новые строки таблицы (или всю таблицу) в снимок"""
+        settings = self.loader.config['data_sources'][source]
+        incremental = settings.get('incremental', {}).get(table, {})
+        watermark_column = incremental.get('watermark')
+        key = incremental.get('key')
+        key = [key] if isinstance(key, str) else key
+
+        with self._lock:
+            previous = dict(self.manifest.get(source, {}).get(table, {}))
+
+        directory = snapshot_dir(self.data_dir, source, table)
+        directory.mkdir(parents=True, exist_ok=True)
+        started = time.time()
+        watermark = previous.get('watermark')
+        full = not watermark_column or watermark is None or not _part_paths(directory)
+
+        suffix = '.parquet' if CACHE_FORMAT == 'parquet' else '.pkl'
+        staging_dir = directory / 'staging'
+        try:
+            where, params = None, None
+            if not full:
+                placeholder = self.loader.get_connector(source).placeholder
+                # Строки с тем же водяным знаком могли появиться после прошлой выгрузки:
+                # с ключом берем их снова, повторы убираются при чтении и сжатии снимка
+                comparison = '>=' if key else '>'
+                where, params = f"{watermark_column} {comparison} {placeholder}", [watermark]
+
+            # Новые строки пишутся во временную папку частями по PART_ROWS строк,
+            # снимок подменяется только после успешной выгрузки
+            staged = self._stage(source, table, where, params, staging_dir, suffix, watermark_column)
+            rows, new_watermark = staged['rows'], staged['watermark']
+            if new_watermark is None:
+                new_watermark = watermark
+
+            if full:
+                for path in _part_paths(directory):
+                    path.unlink()
+            next_number = len(_part_paths(directory)) + 1
+            for i, path in enumerate(_part_paths(staging_dir)):
+                path.replace(directory / f"part-{next_number + i:05d}{suffix}")
+            staging_dir.rmdir()
+
+            if key and len(_part_paths(directory)) > COMPACT_AFTER_PARTS:
+                self._compact(directory, key, suffix)
+
+            entry = {
+                'status': 'ok',
+                'mode': 'full' if full else 'incremental',
+                'rows': rows,
+                'watermark': _json_value(new_watermark),
+                'last_refresh': datetime.now().isoformat(timespec='seconds'),
+                'last_success_ts': time.time(),
+                'duration_s': round(time.time() - started, 3),
+            }
+        except Exception as e:
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
+            entry = {**previous, 'status': 'error', 'error': str(e),
+                     'last_refresh': datetime.now().isoformat(timespec='seconds')}
+
+        with self._lock:
+            self.manifest.setdefault(source, {})[table] = entry
+            self._save_manifest()
+        return {'source': source, 'table': table, **entry}
+
+    def _stage(self, source: str, table: str, where: Optional[str], params: Optional[list],
+               staging_dir: Path, suffix: str, watermark_column: Optional[str]) -> Dict[str, Any]:
+        """Выгружает строки во временные части, возвращает число строк и новый водяной знак"""
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging_dir.mkdir()
+
+        rows, watermark, buffer, buffered, number = 0, None, [], 0, 0
+
+        def flush():
+            nonlocal buffer, buffered, number
+            if buffer:
+                number += 1
+                _write_part(pd.concat(buffer, ignore_index=True), staging_dir / f"part-{number:05d}{suffix}")
+                buffer, buffered = [], 0
+
+        for chunk in self.loader.fetch_table(source, table, where=where, params=params):
+            rows += len(chunk)
+            if watermark_column and len(chunk):
+                chunk_max = chunk[watermark_column].max()
+                if watermark is None or chunk_max > watermark:
+                    watermark = chunk_max
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= PART_ROWS:
+                flush()
+        flush()
+        return {'rows': rows, 'watermark': watermark}
+
+    def _compact(self, directory: Path, key: Optional[List[str]], suffix: str) -> None:
+        """Сливает части снимка в одну, оставляя последние версии строк"""
+        parts = _part_paths(directory)
+        frame = pd.concat([_read_part(path) for path in parts], ignore_index=True)
+        if key:
+            frame = frame.drop_duplicates(subset=key, keep='last')
+        staging = directory / f"compact{suffix}"
+        _write_part(frame.reset_index(drop=True), staging)
+        for path in parts:
+            path.unlink()
+        staging.replace(directory / f"part-00001{suffix}")
+
+
+def _json_value(value: Any) -> Any:
+    """Приводит значение водяного знака к виду, пригодному для JSON и SQL-параметра"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    if result['status'] == 'ok':
+        print(f"✅ {result['source']}.{result['table']}: {result['mode']}, "
+              f"{result['rows']} строк за {result['duration_s']} с")
+    else:
+        print(f"❌ {result['source']}.{result['table']}: {result['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обновление локальных снимков таблиц источников')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--source', action='append', help='Обновлять только указанные источники')
+    parser.add_argument('--force', action='store_true', help='Обновить независимо от refresh_frequency')
+    parser.add_argument('--loop', action='store_true', help='Работать постоянно, проверяя сроки')
+    parser.add_argument('--poll', type=int, default=60, help='Интервал проверки в режиме --loop, с')
+    parser.add_argument('--workers', type=int, default=4, help='Всего параллельных выгрузок')
+
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    scheduler = RefreshScheduler(loader, max_workers=args.workers)
+    try:
+        if args.loop:
+            scheduler.run_forever(args.poll, args.source)
+            return
+
+        results = scheduler.run_once(args.source, args.force)
+        if not results:
+            print("✅ Все снимки актуальны")
+        for result in results:
+            _print_result(result)
+    except KeyboardInterrupt:
+        print("\n⏹️ Остановлено")
+    finally:
+        loader.close()
+
+
+if __name__ == '__main__':
+    main()
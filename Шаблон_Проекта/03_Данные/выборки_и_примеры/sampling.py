@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Выборки из больших файлов и таблиц источников за один проход
+
+Каждой строке назначается случайный ключ, и в памяти хранятся только строки
+с наименьшими ключами (bottom-k, вариант reservoir sampling) — это
+равномерная выборка, а память ограничена размером выборки, а не источника.
+Для стратифицированной выборки (например, по status или по месяцу
+order_date) такой резервуар ведется в каждой страте, а квоты страт
+распределяются пропорционально их размеру в конце прохода.
+
+Связанные таблицы выбираются согласованно по foreign_keys из quality_rules:
+если основная таблица — клиенты, берутся продажи только этих клиентов;
+если основная — продажи, берутся все клиенты, на которых они ссылаются.
+Размер выборки по умолчанию — test_data.sample_size из data_config.json.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from validation import _split_columns
+
+
+DEFAULT_CHUNKSIZE = 200_000
+DEFAULT_SAMPLE_SIZE = 1000
+KEY_SEPARATOR = '\x1f'
+# Преобразования столбца для страт: "order_date:month"
+# (strftime по строкам медленный — период считается векторно)
+STRATUM_TRANSFORMS = {
+    'month': lambda values: pd.to_datetime(values, errors='coerce').dt.to_period('M').astype(str),
+    'year': lambda values: pd.to_datetime(values, errors='coerce').dt.year.astype('Int64').astype(str),
+}
+
+
+class ReservoirSampler:
+    """Равномерная (или стратифицированная) выборка фиксированного размера за один проход"""
+
+    def __init__(self, size: int, stratify: Optional[str] = None, seed: int = 0):
+        self.size = size
+        self.stratify = stratify
+        self.rng = np.random.default_rng(seed)
+        self.kept: Optional[pd.DataFrame] = None
+        self.strata_counts: Dict[Any, int] = {}
+        self.rows = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Добавляет порцию: в резервуаре остаются строки с наименьшими ключами"""
+        if not len(chunk):
+            return
+        self.rows += len(chunk)
+        chunk = chunk.assign(_sample_key=self.rng.random(len(chunk)))
+
+        if self.stratify:
+            chunk['_stratum'] = stratum_values(chunk, self.stratify)
+            for stratum, count in chunk['_stratum'].value_counts(dropna=False).items():
+                self.strata_counts[stratum] = self.strata_counts.get(stratum, 0) + count
+
+        combined = chunk if self.kept is None else pd.concat([self.kept, chunk], ignore_index=True)
+        if self.stratify:
+            # Каждая страта хранит size строк: итоговая квота страты не больше выборки
+            combined = combined.sort_values('_sample_key', kind='stable')
+            self.kept = combined.groupby('_stratum', dropna=False, sort=False).head(self.size)
+        elif len(combined) > self.size:
+            keep = np.argpartition(combined['_sample_key'].to_numpy(), self.size - 1)[:self.size]
+            self.kept = combined.iloc[keep]
+        else:
+            self.kept = combined
+
+    def result(self) -> pd.DataFrame:
+        """Итоговая выборка в порядке случайных ключей"""
+        if self.kept is None:
+            return pd.DataFrame()
+
+        kept = self.kept.sort_values('_sample_key', kind='stable')
+        if self.stratify:
+            quotas = _allocate(self.strata_counts, self.size)
+            kept = pd.concat([
+                group.head(quotas.get(stratum, 0))
+                for stratum, group in kept.groupby('_stratum', dropna=False, sort=True)
+            ], ignore_index=True)
+        return kept.drop(columns=['_sample_key', '_stratum'], errors='ignore').reset_index(drop=True)
+
+
+def stratum_values(frame: pd.DataFrame, spec: str) -> pd.Series:
+    """Значения страт по описанию "column" или "column:month" """
+    column, _, transform = spec.partition(':')
+    if column not in frame.columns:
+        raise KeyError(f"Нет столбца для стратификации: {column}")
+    if not transform:
+        return frame[column].astype(str)
+    if transform not in STRATUM_TRANSFORMS:
+        raise ValueError(f"Неизвестное преобразование страты: {transform} (доступны: {', '.join(STRATUM_TRANSFORMS)})")
+    return STRATUM_TRANSFORMS[transform](frame[column])
+
+
+def _allocate(counts: Dict[Any, int], size: int) -> Dict[Any, int]:
+    """Пропорциональные квоты страт методом наибольшего остатка"""
+    total = sum(counts.values())
+    if total <= size:
+        return dict(counts)
+
+    exact = {stratum: size * count / total for stratum, count in counts.items()}
+    quotas = {stratum: int(value) for stratum, value in exact.items()}
+    remainder = size - sum(quotas.values())
+    for stratum in sorted(exact, key=lambda s: exact[s] - quotas[s], reverse=True)[:remainder]:
+        quotas[stratum] += 1
+    return quotas
+
+
+def key_values(frame: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """Ключ строк (в том числе составной) в виде строк"""
+    if len(columns) == 1:
+        return frame[columns[0]].astype(str).str.strip()
+    return frame[columns].astype(str).apply(lambda col: col.str.strip()).agg(KEY_SEPARATOR.join, axis=1)
+
+
+def iter_table_chunks(loader: DataLoader, table: str, path: Optional[Path] = None,
+                      chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Порции таблицы из файла или из источника data_sources, где она объявлена"""
+    if path is not None:
+        # Строки читаются как текст, чтобы выборка сохранила исходный формат значений
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+        return
+
+    for source, settings in loader.config.get('data_sources', {}).items():
+        if table in settings.get('tables', []):
+            yield from loader.fetch_table(source, table, chunksize=chunksize)
+            return
+    raise KeyError(f"Таблица {table} не найдена: укажите файл через --input {table}=путь")
+
+
+def relations(config: Dict[str, Any], table: str) -> Tuple[List[Tuple[str, List[str], List[str]]],
+                                                            List[Tuple[str, List[str], List[str]]]]:
+    """Связи таблицы из foreign_keys: (дочерние, родительские) как (таблица, столбцы, столбцы)"""
+    children, parents = [], []
+    for other, rules in config.get('quality_rules', {}).items():
+        for column, reference in rules.get('foreign_keys', {}).items():
+            parent_table, parent_columns = reference.split('.', 1)
+            if parent_table == table and other != table:
+                children.append((other, _split_columns(column), _split_columns(parent_columns)))
+            if other == table and parent_table != table:
+                parents.append((parent_table, _split_columns(parent_columns), _split_columns(column)))
+    return children, parents
+
+
+def sample_tables(loader: DataLoader, table: str, size: Optional[int] = None,
+                  stratify: Optional[str] = None, inputs: Optional[Dict[str, Path]] = None,
+                  related_size: Optional[int] = None, seed: int = 0,
+                  chunksize: int = DEFAULT_CHUNKSIZE) -> Dict[str, pd.DataFrame]:
+    """Выбирает строки основной таблицы и согласованные строки связанных таблиц"""
+    inputs = inputs or {}
+    size = size or loader.config.get('test_data', {}).get('sample_size', DEFAULT_SAMPLE_SIZE)
+    related_size = related_size or size
+
+    sampler = ReservoirSampler(size, stratify, seed)
+    for chunk in iter_table_chunks(loader, table, inputs.get(table), chunksize):
+        sampler.add(chunk)
+    samples = {table: sampler.result()}
+
+    children, parents = relations(loader.config, table)
+
+    # Дочерние строки — только для выбранных родителей, тоже не больше related_size
+    for child, child_columns, parent_columns in children:
+        keys: Set[str] = set(key_values(samples[table], parent_columns))
+        child_sampler = ReservoirSampler(related_size, seed=seed + 1)
+        for chunk in iter_table_chunks(loader, child, inputs.get(child), chunksize):
+            child_sampler.add(chunk[key_values(chunk, child_columns).isin(keys).to_numpy()])
+        samples[child] = child_sampler.result()
+
+    # Родительские строки — все, на которые ссылается выборка (их не больше size)
+    for parent, parent_columns, child_columns in parents:
+        keys = set(key_values(samples[table], child_columns))
+        found = [chunk[key_values(chunk, parent_columns).isin(keys).to_numpy()]
+                 for chunk in iter_table_chunks(loader, parent, inputs.get(parent), chunksize)]
+        samples[parent] = pd.concat(found, ignore_index=True) if found else pd.DataFrame()
+
+    return samples
+
+
+def write_samples(samples: Dict[str, pd.DataFrame], output_dir: Path,
+                  file_names: Dict[str, str]) -> List[Tuple[Path, int]]:
+    """Сохраняет выборки в CSV (по умолчанию — в файлы local_files)"""
+    written = []
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    for table, frame in samples.items():
+        output = Path(output_dir) / file_names.get(table, f"sample_{table}.csv")
+        tmp_output = output.with_name(output.name + '.part')
+        frame.to_csv(tmp_output, index=False)
+        tmp_output.replace(output)
+        written.append((output, len(frame)))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reservoir/стратифицированная выборка с согласованными связями')
+    parser.add_argument('table', help='Основная таблица (например, customers или orders)')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json')
+    parser.add_argument('--input', action='append', default=[], metavar='ТАБЛИЦА=ФАЙЛ',
+                        help='CSV вместо таблицы источника (можно несколько раз)')
+    parser.add_argument('--size', type=int, help='Размер выборки (по умолчанию test_data.sample_size)')
+    parser.add_argument('--related-size', type=int, help='Предел строк дочерних таблиц (по умолчанию --size)')
+    parser.add_argument('--stratify', help='Страты: столбец или столбец:month, например status, order_date:month')
+    parser.add_argument('--output-dir', help='Куда сохранить выборки (по умолчанию --data-dir)')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно генератора')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Строк в порции')
+
+    args = parser.parse_args()
+
+    inputs = {}
+    for item in args.input:
+        table, sep, path = item.partition('=')
+        if not sep:
+            print(f"❌ Ожидается ТАБЛИЦА=ФАЙЛ: {item}")
+            return
+        inputs[table] = Path(path)
+
+    loader = DataLoader(args.data_dir)
+    try:
+        samples = sample_tables(loader, args.table, args.size, args.stratify, inputs,
+                                args.related_size, args.seed, args.chunksize)
+        written = write_samples(samples, Path(args.output_dir or args.data_dir),
+                                loader.config.get('local_files', {}))
+    except (ImportError, KeyError, ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        return
+    finally:
+        loader.close()
+
+    for path, rows in written:
+        print(f"✅ {path}: {rows} строк")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальный прогон SQL-трансформаций на тестовых данных
+
+Скрипты из ../трансформации/*.sql выполняются во встроенной SQLite над
+таблицами local_files: образцами sample_*.csv или результатом synthetic.py
+(--data-dir). Для каждого выражения выводятся время и число затронутых
+строк, поэтому ETL можно проверить и сравнить по скорости до передачи
+в продуктив. С --repeat время усредняется по медиане нескольких прогонов.
+
+Диалект PostgreSQL приводится к SQLite прослойкой:
+- схемы (crm., staging., dwh.) — отдельные базы в памяти (ATTACH);
+- TRUNCATE → DELETE, x::type и CAST → date()/datetime()/CAST,
+  ± INTERVAL → interval_add(), EXTRACT → strftime(), ~ и !~ → regexp_like(),
+  ILIKE → LIKE, GREATEST/LEAST → MAX/MIN;
+- REGEXP_REPLACE, DATE_TRUNC и CONCAT — функции Python;
+- MERGE раскладывается на UPDATE ... FROM, DELETE и INSERT ... SELECT;
+- CURRENT_TIMESTAMP, CURRENT_DATE и NOW() фиксируются на начало прогона
+  (--now), как внутри одной транзакции PostgreSQL.
+
+Таблицы источников загружаются из local_files по имени таблицы (crm.customers
+→ customers), типы столбцов — по quality_rules.data_types. Таблицы назначения
+создаются по спискам столбцов INSERT, MERGE и UPDATE SET. Столбцы источника,
+которых нет в тестовых данных (phone, updated_at), добавляются как NULL
+с предупреждением; --strict отключает это.
+"""
+
+import argparse
+import calendar
+import csv
+import re
+import sqlite3
+import statistics
+import string
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from data_loader import DataLoader
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet-таблицы без pyarrow не загружаются
+    pq = None
+
+
+SQL_DIR_NAME = 'трансформации'
+# Скрипты лежат рядом с папкой модуля, а не рядом с --data-dir (synthetic/ и т. п.)
+SQL_DIR = Path(__file__).resolve().parent.parent / SQL_DIR_NAME
+INSERT_BATCH_ROWS = 50_000
+MERGE_SOURCE = '_merge_source'
+MERGE_FLAG = '_merge_matched'
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<name>[^\W\d]\w*)
+  | (?P<op>::|!~\*?|~\*?|<>|!=|>=|<=|\|\||.)
+""", re.S | re.X)
+
+# Слова, которые не могут быть псевдонимом таблицы или именем функции
+KEYWORDS = {
+    'ALL', 'AND', 'ANY', 'AS', 'ASC', 'BETWEEN', 'BY', 'CASCADE', 'CASE', 'CONTINUE', 'CROSS', 'DEFAULT',
+    'DELETE', 'DESC', 'DISTINCT', 'DO', 'ELSE', 'END', 'EXCEPT', 'EXISTS', 'FETCH', 'FILTER', 'FOR', 'FROM',
+    'FULL', 'GROUP', 'HAVING', 'IN', 'INNER', 'INSERT', 'INTERSECT', 'INTO', 'IS', 'JOIN', 'LEFT', 'LIKE',
+    'LIMIT', 'MATCHED', 'MERGE', 'NATURAL', 'NOT', 'NULL', 'OFFSET', 'ON', 'OR', 'ORDER', 'OUTER', 'OVER',
+    'RESTART', 'RESTRICT', 'RETURNING', 'RIGHT', 'SELECT', 'SET', 'TABLE', 'THEN', 'UNION', 'UPDATE',
+    'USING', 'VALUES', 'WHEN', 'WHERE', 'WINDOW', 'WITH',
+}
+TABLE_KEYWORDS = {'FROM', 'JOIN', 'INTO', 'UPDATE', 'TABLE', 'MERGE', 'USING', 'TRUNCATE'}
+TRANSACTION_KEYWORDS = {'BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'START'}
+
+# Время прогона вместо функций текущего времени
+CLOCK_FORMATS = {'CURRENT_TIMESTAMP': '%Y-%m-%d %H:%M:%S', 'LOCALTIMESTAMP': '%Y-%m-%d %H:%M:%S',
+                 'NOW': '%Y-%m-%d %H:%M:%S', 'CURRENT_DATE': '%Y-%m-%d', 'CURRENT_TIME': '%H:%M:%S'}
+# Приведения типов: функции даты SQLite или класс хранения
+CAST_FUNCTIONS = {'DATE': 'date', 'TIMESTAMP': 'datetime', 'TIMESTAMPTZ': 'datetime', 'TIME': 'time',
+                  'BOOLEAN': 'to_boolean', 'BOOL': 'to_boolean'}
+CAST_AFFINITY = {
+    **dict.fromkeys(('INT', 'INT2', 'INT4', 'INT8', 'INTEGER', 'BIGINT', 'SMALLINT'), 'INTEGER'),
+    **dict.fromkeys(('NUMERIC', 'DECIMAL', 'REAL', 'FLOAT', 'FLOAT4', 'FLOAT8', 'DOUBLE', 'MONEY'), 'REAL'),
+    **dict.fromkeys(('TEXT', 'VARCHAR', 'CHAR', 'CHARACTER', 'UUID', 'JSON', 'JSONB'), 'TEXT'),
+}
+TYPE_WORDS = {'PRECISION', 'VARYING', 'WITH', 'WITHOUT', 'TIME', 'ZONE'}
+EXTRACT_FORMATS = {'YEAR': '%Y', 'MONTH': '%m', 'DAY': '%d', 'HOUR': '%H', 'MINUTE': '%M', 'SECOND': '%S',
+                   'DOW': '%w', 'DOY': '%j', 'EPOCH': '%s'}
+FUNCTION_NAMES = {'GREATEST': 'MAX', 'LEAST': 'MIN'}
+REGEX_OPERATORS = {'~': (False, None), '~*': (False, 'i'), '!~': (True, None), '!~*': (True, 'i')}
+
+# Класс хранения столбцов источника по quality_rules.data_types
+RULE_AFFINITY = {'integer': 'INTEGER', 'numeric': 'REAL', 'float': 'REAL', 'decimal': 'REAL', 'boolean': 'INTEGER'}
+TRUE_VALUES = {'t', 'true', 'y', 'yes', 'on', '1'}
+FALSE_VALUES = {'f', 'false', 'n', 'no', 'off', '0'}
+
+INTERVAL_PART = re.compile(r'([-+]?\d+(?:\.\d+)?)\s*([^\W\d_]+)')
+# Единица интервала (без окончания s) → (месяцы, секунды) на единицу
+INTERVAL_UNITS = {
+    'second': (0, 1), 'sec': (0, 1), 'minute': (0, 60), 'min': (0, 60), 'hour': (0, 3600), 'hr': (0, 3600),
+    'day': (0, 86400), 'week': (0, 7 * 86400), 'month': (1, 0), 'mon': (1, 0), 'year': (12, 0), 'yr': (12, 0),
+}
+POSIX_CLASSES = {
+    '[:alpha:]': 'a-zA-Zа-яА-ЯёЁ', '[:upper:]': 'A-ZА-ЯЁ', '[:lower:]': 'a-zа-яё', '[:digit:]': '0-9',
+    '[:alnum:]': 'a-zA-Zа-яА-ЯёЁ0-9', '[:space:]': r'\s', '[:word:]': r'\w',
+    '[:punct:]': re.escape(string.punctuation),
+}
+MISSING_COLUMN = re.compile(r'no such column: (?:(\w+)\.)?(\w+)')
+
+Token = Tuple[str, str]
+
+
+# --- Лексемы ---
+
+def tokenize(sql: str) -> List[Token]:
+    """Лексемы SQL (вид, текст), включая пробелы и комментарии"""
+    return [(match.lastgroup, match.group()) for match in TOKEN.finditer(sql)]
+
+
+def _sql(text: str) -> List[Token]:
+    return [token for token in tokenize(text) if token[0] not in ('space', 'comment')]
+
+
+def _word(token: Token) -> str:
+    """Слово в верхнем регистре ('' для строк, чисел и операторов)"""
+    return token[1].upper() if token[0] == 'name' else ''
+
+
+def _name(token: Token) -> str:
+    if token[0] == 'quoted':
+        return token[1][1:-1].replace('""', '"')
+    return token[1].lower()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> Token:
+    return ('string', "'" + value.replace("'", "''") + "'")
+
+
+def join_tokens(tokens: List[Token]) -> str:
+    """Текст SQL из лексем без пробелов вокруг точек и скобок"""
+    parts, previous = [], None
+    for _, text in tokens:
+        if parts and text not in ('.', ',', ')') and previous not in ('.', '('):
+            parts.append(' ')
+        parts.append(text)
+        previous = text
+    return ''.join(parts)
+
+
+def _matching(tokens: List[Token], start: int) -> int:
+    """Индекс закрывающей скобки для открывающей в позиции start"""
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i][1] == '(':
+            depth += 1
+        elif tokens[i][1] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("не закрыта скобка")
+
+
+def _top_level(tokens: List[Token], words: Tuple[str, ...]) -> List[int]:
+    """Позиции слов вне скобок и CASE ... END"""
+    depth, found = 0, []
+    for i, token in enumerate(tokens):
+        word = _word(token)
+        if token[1] == '(' or word == 'CASE':
+            depth += 1
+        elif token[1] == ')' or word == 'END':
+            depth -= 1
+        elif depth == 0 and word in words:
+            found.append(i)
+    return found
+
+
+def _operand_start(tokens: List[Token], end: int) -> int:
+    """Начало операнда, который заканчивается лексемой end"""
+    i = end
+    if tokens[i][1] == ')':
+        depth = 0
+        while i >= 0:
+            if tokens[i][1] == ')':
+                depth += 1
+            elif tokens[i][1] == '(':
+                depth -= 1
+                if depth == 0:
+                    break
+            i -= 1
+        # Вызов функции: имя перед скобкой
+        if i > 0 and tokens[i - 1][0] == 'name' and _word(tokens[i - 1]) not in KEYWORDS:
+            i -= 1
+        return i
+    while i >= 2 and tokens[i - 1][1] == '.' and tokens[i - 2][0] in ('name', 'quoted'):
+        i -= 2
+    return i
+
+
+def _operand_end(tokens: List[Token], start: int) -> int:
+    """Конец операнда, который начинается лексемой start"""
+    i = start
+    if tokens[i][1] == '(':
+        return _matching(tokens, i)
+    if tokens[i][0] in ('name', 'quoted'):
+        while i + 2 < len(tokens) and tokens[i + 1][1] == '.' and tokens[i + 2][0] in ('name', 'quoted'):
+            i += 2
+        if i + 1 < len(tokens) and tokens[i + 1][1] == '(':
+            i = _matching(tokens, i + 1)
+    return i
+
+
+def split_statements(sql: str) -> List[Dict[str, Any]]:
+    """Выражения скрипта: лексемы без комментариев, строка начала и подпись
+
+    Подпись — комментарий непосредственно перед выражением ("-- Загрузка из источника").
+    """
+    statements, tokens, label, start, line = [], [], None, 1, 1
+    for kind, text in tokenize(sql):
+        if kind == 'comment':
+            if not tokens:
+                label = text[2:].strip() if text.startswith('--') else text[2:-2].strip()
+        elif kind != 'space':
+            if text == ';':
+                if tokens:
+                    statements.append({'line': start, 'label': label, 'tokens': tokens})
+                tokens, label = [], None
+            else:
+                if not tokens:
+                    start = line
+                tokens.append((kind, text))
+        line += text.count('\n')
+    if tokens:
+        statements.append({'line': start, 'label': label, 'tokens': tokens})
+    return statements
+
+
+# --- Таблицы выражения ---
+
+def _chain(tokens: List[Token], i: int) -> Optional[Tuple[str, int]]:
+    """Имя [схема.]таблица с позиции i: ключ вида crm.customers и индекс последней лексемы"""
+    if i >= len(tokens) or tokens[i][0] not in ('name', 'quoted') or _word(tokens[i]) in KEYWORDS:
+        return None
+    parts, end = [_name(tokens[i])], i
+    while end + 2 < len(tokens) and tokens[end + 1][1] == '.' and tokens[end + 2][0] in ('name', 'quoted'):
+        parts.append(_name(tokens[end + 2]))
+        end += 2
+    return '.'.join(parts[-2:]), end
+
+
+def _table_sql(key: str) -> str:
+    return '.'.join(_quote(part) for part in key.split('.'))
+
+
+def _alias(tokens: List[Token], i: int) -> Tuple[Optional[Token], int]:
+    """Псевдоним после имени таблицы или подзапроса: (лексема, следующая позиция)"""
+    if i < len(tokens) and _word(tokens[i]) == 'AS':
+        return tokens[i + 1], i + 2
+    if i < len(tokens) and tokens[i][0] in ('name', 'quoted') and _word(tokens[i]) not in KEYWORDS:
+        return tokens[i], i + 1
+    return None, i
+
+
+def _column_list(tokens: List[Token], start: int) -> List[str]:
+    end = _matching(tokens, start)
+    return [_name(token) for token in tokens[start + 1:end] if token[0] in ('name', 'quoted')]
+
+
+def _set_columns(tokens: List[Token], start: int) -> List[str]:
+    """Столбцы присваиваний SET a = ..., b = ... с позиции после SET"""
+    columns, depth, expect = [], 0, True
+    for i in range(start, len(tokens)):
+        text, word = tokens[i][1], _word(tokens[i])
+        if text == '(' or word == 'CASE':
+            depth += 1
+        elif text == ')' or word == 'END':
+            depth -= 1
+        if depth < 0 or (depth == 0 and word in ('FROM', 'WHERE', 'WHEN', 'RETURNING')):
+            break
+        if depth == 0 and text == ',':
+            expect = True
+        elif depth == 0 and expect:
+            if tokens[i][0] in ('name', 'quoted') and i + 1 < len(tokens) and tokens[i + 1][1] == '=':
+                columns.append(_name(tokens[i]))
+            expect = False
+    return columns
+
+
+def analyze_statement(tokens: List[Token]) -> Dict[str, Any]:
+    """Чтение и запись таблиц выражением, псевдонимы и известные столбцы таблиц назначения"""
+    info = {'reads': [], 'writes': [], 'created': [], 'inserted': [], 'columns': {}, 'aliases': {}}
+
+    def add(kind: str, key: str) -> None:
+        if key not in info[kind]:
+            info[kind].append(key)
+
+    def add_columns(key: str, columns: List[str]) -> None:
+        known = info['columns'].setdefault(key, [])
+        known.extend(column for column in columns if column not in known)
+
+    merge_target = None
+    for i, token in enumerate(tokens):
+        word = _word(token)
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else ''
+        # Действия MERGE: THEN INSERT (...) и THEN UPDATE SET ...
+        if merge_target and word == 'INSERT' and following == '(':
+            add('inserted', merge_target)
+            add_columns(merge_target, _column_list(tokens, i + 1))
+        elif merge_target and word == 'UPDATE' and following.upper() == 'SET':
+            add_columns(merge_target, _set_columns(tokens, i + 2))
+        if word not in TABLE_KEYWORDS:
+            continue
+
+        j = i + 1
+        while j < len(tokens) and _word(tokens[j]) in ('IF', 'NOT', 'EXISTS', 'ONLY', 'INTO', 'TABLE'):
+            j += 1
+        chain = _chain(tokens, j)
+        if chain is None:
+            continue
+        key, end = chain
+        previous = _word(tokens[i - 1]) if i else ''
+        if word == 'TABLE' and previous in ('CREATE', 'TEMP', 'TEMPORARY', 'UNLOGGED'):
+            add('created', key)
+            continue
+        if word == 'TABLE' and previous != 'TRUNCATE':
+            continue  # ALTER TABLE, DROP TABLE
+        if word in ('INTO', 'UPDATE', 'MERGE', 'TRUNCATE', 'TABLE') or (word == 'FROM' and previous == 'DELETE'):
+            add('writes', key)
+        else:
+            add('reads', key)
+
+        alias, _ = _alias(tokens, end + 1)
+        info['aliases'][key.rsplit('.', 1)[-1]] = key
+        if alias is not None:
+            info['aliases'][_name(alias)] = key
+        if word == 'MERGE':
+            merge_target = key
+        elif word == 'INTO' and end + 1 < len(tokens) and tokens[end + 1][1] == '(' and previous != 'MERGE':
+            add('inserted', key)
+            add_columns(key, _column_list(tokens, end + 1))
+        elif word == 'UPDATE':
+            set_index = end + 1 if alias is None else _alias(tokens, end + 1)[1]
+            if set_index < len(tokens) and _word(tokens[set_index]) == 'SET':
+                add_columns(key, _set_columns(tokens, set_index + 1))
+    return info
+
+
+def statement_kind(tokens: List[Token]) -> str:
+    word = _word(tokens[0])
+    if word == 'WITH':
+        for i in _top_level(tokens, ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')):
+            return _word(tokens[i])
+    return word or tokens[0][1]
+
+
+# --- Перевод диалекта ---
+
+def _rewrite_clock(tokens: List[Token], now: datetime) -> List[Token]:
+    result, i = [], 0
+    while i < len(tokens):
+        word = _word(tokens[i])
+        qualified = i > 0 and tokens[i - 1][1] == '.'
+        if word in CLOCK_FORMATS and not qualified:
+            has_call = i + 2 < len(tokens) and tokens[i + 1][1] == '(' and tokens[i + 2][1] == ')'
+            if word != 'NOW' or has_call:
+                result.append(_literal(now.strftime(CLOCK_FORMATS[word])))
+                i += 3 if has_call else 1
+                continue
+        result.append(tokens[i])
+        i += 1
+    return result
+
+
+def _rewrite_extract(tokens: List[Token]) -> List[Token]:
+    result = list(tokens)
+    # Справа налево: вложенные EXTRACT переводятся раньше внешних
+    for i in range(len(result) - 1, -1, -1):
+        if _word(result[i]) != 'EXTRACT' or i + 1 >= len(result) or result[i + 1][1] != '(':
+            continue
+        end = _matching(result, i + 1)
+        inner = result[i + 2:end]
+        field = _word(inner[0]) or inner[0][1].strip("'").upper()
+        if len(inner) < 3 or _word(inner[1]) != 'FROM':
+            continue
+        value = inner[2:]
+        if field == 'QUARTER':
+            replacement = (_sql("((CAST(strftime('%m',") + value + _sql(") AS INTEGER) + 2) / 3)"))
+        elif field in EXTRACT_FORMATS:
+            replacement = _sql(f"CAST(strftime('{EXTRACT_FORMATS[field]}',") + value + _sql(") AS INTEGER)")
+        else:
+            raise ValueError(f"EXTRACT({field}) не поддерживается")
+        result[i:end + 1] = replacement
+    return result
+
+
+def _type_name(tokens: List[Token], start: int) -> Tuple[str, int]:
+    """Имя типа с позиции start (double precision, varchar(20)): (первое слово, индекс конца)"""
+    end = start
+    while end + 1 < len(tokens) and _word(tokens[end + 1]) in TYPE_WORDS:
+        end += 1
+    if end + 1 < len(tokens) and tokens[end + 1][1] == '(':
+        end = _matching(tokens, end + 1)
+    return _word(tokens[start]), end
+
+
+def _cast(value: List[Token], type_tokens: List[Token]) -> List[Token]:
+    type_name = _word(type_tokens[0])
+    if type_name in CAST_FUNCTIONS:
+        return [('name', CAST_FUNCTIONS[type_name]), ('op', '(')] + value + [('op', ')')]
+    target = [('name', CAST_AFFINITY[type_name])] if type_name in CAST_AFFINITY else type_tokens
+    return [('name', 'CAST'), ('op', '(')] + value + [('name', 'AS')] + target + [('op', ')')]
+
+
+def _rewrite_casts(tokens: List[Token]) -> List[Token]:
+    result, i = list(tokens), 0
+    while i < len(result):
+        if result[i][1] == '::' and i > 0:
+            start = _operand_start(result, i - 1)
+            _, end = _type_name(result, i + 1)
+            replacement = _cast(result[start:i], result[i + 1:end + 1])
+            result[start:end + 1] = replacement
+            i = start + len(replacement)
+        elif _word(result[i]) == 'CAST' and i + 1 < len(result) and result[i + 1][1] == '(':
+            end = _matching(result, i + 1)
+            inner = result[i + 2:end]
+            positions = _top_level(inner, ('AS',))
+            if positions:
+                _, type_end = _type_name(inner, positions[-1] + 1)
+                result[i:end + 1] = _cast(inner[:positions[-1]], inner[positions[-1] + 1:type_end + 1])
+            # Следующий проход начинается внутри замены: там могут быть свои приведения
+            i += 1
+        else:
+            i += 1
+    return result
+
+
+def _rewrite_intervals(tokens: List[Token]) -> List[Token]:
+    result, i = list(tokens), 0
+    while i < len(result):
+        if _word(result[i]) == 'INTERVAL' and i + 1 < len(result) and result[i + 1][0] == 'string':
+            text, end = result[i + 1][1][1:-1].replace("''", "'"), i + 1
+            # INTERVAL '1' DAY
+            if end + 1 < len(result) and re.fullmatch(r'\s*[-+]?\d+(\.\d+)?\s*', text) \
+                    and _word(result[end + 1]).lower().rstrip('s') in INTERVAL_UNITS:
+                text += ' ' + result[end + 1][1]
+                end += 1
+            parse_interval(text)
+            if i >= 2 and result[i - 1][1] in ('+', '-'):
+                start = _operand_start(result, i - 2)
+                sign = '1' if result[i - 1][1] == '+' else '-1'
+                replacement = ([('name', 'interval_add'), ('op', '(')] + result[start:i - 1]
+                               + [('op', ','), _literal(text), ('op', ','), ('number', sign), ('op', ')')])
+                result[start:end + 1] = replacement
+                i = start + len(replacement)
+                continue
+            raise ValueError(f"INTERVAL '{text}' поддерживается только после + или -")
+        i += 1
+    return result
+
+
+def _rewrite_operators(tokens: List[Token]) -> List[Token]:
+    result, i = list(tokens), 0
+    while i < len(result):
+        token, word = result[i], _word(result[i])
+        qualified = i > 0 and result[i - 1][1] == '.'
+        if token[0] == 'op' and token[1] in REGEX_OPERATORS and i > 0:
+            negate, flags = REGEX_OPERATORS[token[1]]
+            start, end = _operand_start(result, i - 1), _operand_end(result, i + 1)
+            arguments = result[start:i] + [('op', ',')] + result[i + 1:end + 1]
+            if flags:
+                arguments += [('op', ','), _literal(flags)]
+            replacement = ([('name', 'NOT')] if negate else []) + [('name', 'regexp_like'), ('op', '(')] \
+                + arguments + [('op', ')')]
+            result[start:end + 1] = replacement
+            i = start + len(replacement)
+            continue
+        if word == 'ILIKE':
+            result[i] = ('name', 'LIKE')
+        elif word in FUNCTION_NAMES and not qualified and i + 1 < len(result) and result[i + 1][1] == '(':
+            result[i] = ('name', FUNCTION_NAMES[word])
+        i += 1
+    return result
+
+
+def rewrite_dialect(tokens: List[Token], now: datetime) -> List[Token]:
+    """Выражения PostgreSQL в лексемах SQLite"""
+    tokens = _rewrite_clock(tokens, now)
+    tokens = _rewrite_extract(tokens)
+    tokens = _rewrite_casts(tokens)
+    tokens = _rewrite_intervals(tokens)
+    return _rewrite_operators(tokens)
+
+
+def translate_expression(expression: str, now: datetime) -> str:
+    """Выражение PostgreSQL (например, столбец SELECT) в SQL SQLite"""
+    return join_tokens(rewrite_dialect(_sql(expression), now))
+
+
+def _truncate(tokens: List[Token]) -> List[Tuple[str, bool]]:
+    """TRUNCATE [TABLE] a, b → DELETE FROM по каждой таблице"""
+    parts, i = [], 1
+    while i < len(tokens):
+        if _word(tokens[i]) in ('TABLE', 'ONLY') or tokens[i][1] == ',':
+            i += 1
+            continue
+        chain = _chain(tokens, i)
+        if chain is None:
+            break  # RESTART IDENTITY, CASCADE
+        parts.append((f"DELETE FROM {_table_sql(chain[0])}", True))
+        i = chain[1] + 1
+    return parts
+
+
+def _expect(tokens: List[Token], i: int, word: str) -> int:
+    if i >= len(tokens) or _word(tokens[i]) != word:
+        raise ValueError(f"MERGE: ожидается {word}")
+    return i + 1
+
+
+def translate_merge(tokens: List[Token]) -> List[Tuple[str, bool]]:
+    """MERGE → временная таблица источника с признаком совпадения, UPDATE, DELETE и INSERT
+
+    Признак совпадения считается до изменений, как в MERGE: строки, обновленные
+    в WHEN MATCHED, не попадают повторно в WHEN NOT MATCHED. Из нескольких
+    условий одного вида срабатывает первое.
+    """
+    i = 2 if _word(tokens[1]) == 'INTO' else 1
+    chain = _chain(tokens, i)
+    if chain is None:
+        raise ValueError("MERGE: не найдена целевая таблица")
+    target, i = _table_sql(chain[0]), chain[1] + 1
+    target_alias, i = _alias(tokens, i)
+    target_alias = join_tokens([target_alias]) if target_alias else _quote(chain[0].rsplit('.', 1)[-1])
+
+    i = _expect(tokens, i, 'USING')
+    if tokens[i][1] == '(':
+        end = _matching(tokens, i)
+        source = join_tokens(tokens[i:end + 1])
+        source_alias, i = _alias(tokens, end + 1)
+        if source_alias is None:
+            raise ValueError("MERGE: у подзапроса источника нет псевдонима")
+        source_alias = join_tokens([source_alias])
+    else:
+        chain = _chain(tokens, i)
+        if chain is None:
+            raise ValueError("MERGE: не найден источник")
+        source = _table_sql(chain[0])
+        source_alias, i = _alias(tokens, chain[1] + 1)
+        source_alias = join_tokens([source_alias]) if source_alias else _quote(chain[0].rsplit('.', 1)[-1])
+
+    i = _expect(tokens, i, 'ON')
+    whens = [i + position for position in _top_level(tokens[i:], ('WHEN',))]
+    if not whens:
+        raise ValueError("MERGE: нет условий WHEN")
+    on = join_tokens(tokens[i:whens[0]])
+
+    parts = [
+        (f"DROP TABLE IF EXISTS temp.{MERGE_SOURCE}", False),
+        (f"CREATE TEMP TABLE {MERGE_SOURCE} AS SELECT {source_alias}.*, EXISTS (SELECT 1 FROM {target} AS "
+         f"{target_alias} WHERE {on}) AS {MERGE_FLAG} FROM {source} AS {source_alias}", False),
+    ]
+    previous = {True: [], False: []}
+    for start, end in zip(whens, whens[1:] + [len(tokens)]):
+        clause = tokens[start + 1:end]
+        matched = _word(clause[0]) != 'NOT'
+        k = _expect(clause, 0 if matched else 1, 'MATCHED')
+        if k < len(clause) and _word(clause[k]) == 'BY':
+            if _word(clause[k + 1]) == 'SOURCE':
+                raise ValueError("MERGE: WHEN NOT MATCHED BY SOURCE не поддерживается")
+            k += 2
+        then = _top_level(clause, ('THEN',))[0]
+        condition = join_tokens(clause[k + 1:then]) if _word(clause[k]) == 'AND' else None
+        action = clause[then + 1:]
+        if None in previous[matched]:
+            continue  # предыдущее условие без AND забирает все строки
+
+        flag = f"{source_alias}.{MERGE_FLAG}" if matched else f"NOT {source_alias}.{MERGE_FLAG}"
+        where = [flag] + [f"NOT (({other}) IS TRUE)" for other in previous[matched]]
+        if condition:
+            where.append(f"({condition}) IS TRUE")
+        previous[matched].append(condition)
+        where = ' AND '.join(where)
+        verb = _word(action[0])
+
+        if verb == 'DO':
+            continue
+        if matched and verb == 'UPDATE':
+            assignments = join_tokens(action[2:])
+            parts.append((f"UPDATE {target} AS {target_alias} SET {assignments} FROM {MERGE_SOURCE} AS "
+                          f"{source_alias} WHERE {where} AND ({on})", True))
+        elif matched and verb == 'DELETE':
+            parts.append((f"DELETE FROM {target} WHERE rowid IN (SELECT {target_alias}.rowid FROM {target} AS "
+                          f"{target_alias} JOIN {MERGE_SOURCE} AS {source_alias} ON {on} WHERE {where})", True))
+        elif not matched and verb == 'INSERT':
+            k = 1
+            columns = ''
+            if action[k][1] == '(':
+                columns = ' ' + join_tokens(action[k:_matching(action, k) + 1])
+                k = _matching(action, k) + 1
+            k = _expect(action, k, 'VALUES')
+            values = join_tokens(action[k + 1:_matching(action, k)])
+            parts.append((f"INSERT INTO {target}{columns} SELECT {values} FROM {MERGE_SOURCE} AS {source_alias} "
+                          f"WHERE {where}", True))
+        else:
+            raise ValueError(f"MERGE: действие {' '.join(token[1] for token in action[:2])} не поддерживается")
+    parts.append((f"DROP TABLE temp.{MERGE_SOURCE}", False))
+    return parts
+
+
+def translate(tokens: List[Token], now: datetime) -> List[Tuple[str, bool]]:
+    """Выражение PostgreSQL → части для SQLite: (SQL, учитывать ли строки в итоге)"""
+    word = _word(tokens[0])
+    if word in TRANSACTION_KEYWORDS:
+        return []
+    tokens = rewrite_dialect(tokens, now)
+    if word == 'MERGE':
+        return translate_merge(tokens)
+    if word == 'TRUNCATE':
+        return _truncate(tokens)
+    return [(join_tokens(tokens), True)]
+
+
+# --- Функции PostgreSQL ---
+
+@lru_cache(maxsize=256)
+def _regex(pattern: str, flags: Optional[str]) -> 're.Pattern':
+    for name, members in POSIX_CLASSES.items():
+        pattern = pattern.replace(name, members)
+    return re.compile(pattern, re.I if flags and 'i' in flags else 0)
+
+
+def regexp_like(value: Any, pattern: Optional[str], flags: Optional[str] = None) -> Optional[int]:
+    if value is None or pattern is None:
+        return None
+    return int(_regex(pattern, flags).search(str(value)) is not None)
+
+
+def regexp_replace(value: Any, pattern: Optional[str], replacement: Optional[str],
+                   flags: Optional[str] = None) -> Optional[str]:
+    """REGEXP_REPLACE PostgreSQL: без флага 'g' заменяется только первое совпадение"""
+    if value is None or pattern is None or replacement is None:
+        return None
+    replacement = replacement.replace('\\&', '\\g<0>')
+    return _regex(pattern, flags).sub(replacement, str(value), count=0 if flags and 'g' in flags else 1)
+
+
+def _parse_moment(value: Any) -> Optional[Tuple[datetime, bool]]:
+    """Дата или время из текста ISO: (значение, только дата)"""
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    try:
+        return datetime.fromisoformat(text), len(text) == 10
+    except ValueError:
+        return None
+
+
+def _format_moment(moment: datetime, date_only: bool) -> str:
+    return moment.date().isoformat() if date_only else moment.isoformat(sep=' ')
+
+
+@lru_cache(maxsize=256)
+def parse_interval(text: str) -> Tuple[int, timedelta]:
+    """Интервал PostgreSQL ('1 day', '2 hours 30 minutes'): (месяцы, остальное)"""
+    parts = INTERVAL_PART.findall(text)
+    if not parts or INTERVAL_PART.sub('', text).strip():
+        raise ValueError(f"Непонятный интервал: '{text}'")
+    months, seconds = 0, 0.0
+    for amount, unit in parts:
+        unit = unit.lower()
+        unit = INTERVAL_UNITS.get(unit) or INTERVAL_UNITS.get(unit.rstrip('s'))
+        if unit is None:
+            raise ValueError(f"Непонятный интервал: '{text}'")
+        months += int(float(amount) * unit[0])
+        seconds += float(amount) * unit[1]
+    return months, timedelta(seconds=seconds)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    """Сдвиг на месяцы с ограничением дня, как в PostgreSQL (31.01 + 1 месяц = 29.02)"""
+    if not months:
+        return moment
+    index = moment.month - 1 + months
+    year, month = moment.year + index // 12, index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def interval_add(value: Any, interval: str, sign: int) -> Optional[str]:
+    """Дата ± интервал; дата без времени остается датой, если интервал в целых днях"""
+    parsed = _parse_moment(value)
+    if parsed is None:
+        return None
+    moment, date_only = parsed
+    months, delta = parse_interval(interval)
+    if sign < 0:
+        months, delta = -months, -delta
+    moment = _add_months(moment, months) + delta
+    return _format_moment(moment, date_only and not (delta.seconds or delta.microseconds))
+
+
+def date_trunc(unit: str, value: Any) -> Optional[str]:
+    parsed = _parse_moment(value)
+    if parsed is None or unit is None:
+        return None
+    moment, date_only = parsed
+    unit = unit.lower()
+    if unit in ('year', 'quarter', 'month', 'week', 'day'):
+        moment = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        if unit == 'year':
+            moment = moment.replace(month=1, day=1)
+        elif unit == 'quarter':
+            moment = moment.replace(month=(moment.month - 1) // 3 * 3 + 1, day=1)
+        elif unit == 'month':
+            moment = moment.replace(day=1)
+        elif unit == 'week':
+            moment -= timedelta(days=moment.weekday())
+        return _format_moment(moment, date_only)
+    fields = {'hour': dict(minute=0, second=0, microsecond=0), 'minute': dict(second=0, microsecond=0),
+              'second': dict(microsecond=0)}
+    if unit not in fields:
+        raise ValueError(f"DATE_TRUNC: неизвестная единица {unit}")
+    return _format_moment(moment.replace(**fields[unit]), False)
+
+
+def to_boolean(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return 1
+    if text in FALSE_VALUES:
+        return 0
+    raise ValueError(f"Не логическое значение: {value}")
+
+
+def concat(*values: Any) -> str:
+    return ''.join(str(value) for value in values if value is not None)
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Функции PostgreSQL, которых нет в SQLite"""
+    for arity in (2, 3):
+        conn.create_function('regexp_like', arity, regexp_like, deterministic=True)
+    for arity in (3, 4):
+        conn.create_function('regexp_replace', arity, regexp_replace, deterministic=True)
+    # Оператор SQLite x REGEXP 'шаблон'
+    conn.create_function('regexp', 2, lambda pattern, value: regexp_like(value, pattern), deterministic=True)
+    conn.create_function('interval_add', 3, interval_add, deterministic=True)
+    conn.create_function('date_trunc', 2, date_trunc, deterministic=True)
+    conn.create_function('to_boolean', 1, to_boolean, deterministic=True)
+    conn.create_function('concat', -1, concat, deterministic=True)
+
+
+# --- Прогон ---
+
+def _sql_value(value: Any) -> Any:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+class SqlHarness:
+    """Прогон SQL-скриптов в SQLite над тестовыми таблицами проекта"""
+
+    def __init__(self, scripts: List[Path], data_dir: str = '.', now: Optional[datetime] = None,
+                 strict: bool = False, attach: Optional[Dict[str, str]] = None):
+        self.loader = DataLoader(data_dir)
+        self.now = (now or datetime.now()).replace(microsecond=0)
+        self.strict = strict
+        # Схемы из готовых файлов SQLite вместо загрузки local_files: {'crm': 'crm.db'}
+        self.attach = attach or {}
+        self.files = self.loader.config.get('local_files', {})
+        self.rules = self.loader.config.get('quality_rules', {})
+        # Столбцы, добавленные как NULL: {таблица: [столбцы]}
+        self.missing: Dict[str, List[str]] = {}
+        self.warnings: List[str] = []
+        self.scripts = [self._prepare(Path(path)) for path in scripts]
+        self._plan_tables()
+
+    def _prepare(self, path: Path) -> Dict[str, Any]:
+        statements = []
+        for index, statement in enumerate(split_statements(path.read_text(encoding='utf-8')), 1):
+            tokens = statement['tokens']
+            info = analyze_statement(tokens)
+            touched = info['writes'] or info['created'] or info['reads']
+            statement.update(info, index=index, kind=statement_kind(tokens),
+                             table=touched[0] if touched else '', error=None)
+            try:
+                statement['parts'] = translate(tokens, self.now)
+            except (ValueError, IndexError) as e:
+                statement['parts'], statement['error'] = [], f"перевод в SQLite: {e or 'неполное выражение'}"
+            statements.append(statement)
+        return {'path': path, 'name': path.name, 'statements': statements}
+
+    def _plan_tables(self) -> None:
+        """Схемы, таблицы источников для загрузки и таблицы назначения для создания"""
+        statements = [statement for script in self.scripts for statement in script['statements']]
+        created = {key for statement in statements for key in statement['created']}
+        inserted = {key for statement in statements for key in statement['inserted']}
+        keys = []
+        for statement in statements:
+            keys.extend(key for kind in ('reads', 'writes', 'created') for key in statement[kind] if key not in keys)
+
+        self.schemas = sorted({key.split('.')[0] for key in keys if '.' in key} - {'main', 'temp'})
+        # Источник — таблица local_files, которую скрипты не создают и не наполняют по списку столбцов
+        self.sources = [key for key in keys if key.rsplit('.', 1)[-1] in self.files
+                        and key not in created and key not in inserted and key.split('.')[0] not in self.attach]
+        self.targets: Dict[str, List[str]] = {}
+        for statement in statements:
+            for key, columns in statement['columns'].items():
+                if key in created or key in self.sources:
+                    continue
+                known = self.targets.setdefault(key, [])
+                known.extend(column for column in columns if column not in known)
+
+    def connect(self) -> Tuple[sqlite3.Connection, List[Dict[str, Any]]]:
+        """Новая база в памяти: функции, схемы, загруженные источники и пустые таблицы назначения"""
+        conn = sqlite3.connect(':memory:', isolation_level=None)
+        register_functions(conn)
+        for schema in self.schemas:
+            conn.execute(f"ATTACH DATABASE ? AS {_quote(schema)}", (str(self.attach.get(schema, ':memory:')),))
+        loads = [self._load(conn, key) for key in self.sources]
+        for key, columns in self.targets.items():
+            conn.execute(f"CREATE TABLE {_table_sql(key)} ({', '.join(_quote(column) for column in columns)})")
+        return conn, loads
+
+    def _read_rows(self, path: Path) -> Tuple[List[str], Any]:
+        """Заголовок и итератор порций строк файла"""
+        if path.suffix == '.parquet':
+            if pq is None:
+                raise ImportError("Для Parquet нужен pyarrow: pip install pyarrow")
+            parquet = pq.ParquetFile(path)
+
+            def batches():
+                for batch in parquet.iter_batches(batch_size=INSERT_BATCH_ROWS):
+                    columns = [[_sql_value(value) for value in column.to_pylist()] for column in batch.columns]
+                    yield list(zip(*columns))
+            return parquet.schema_arrow.names, batches()
+
+        f = open(path, encoding='utf-8-sig', newline='')
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        def batches():
+            with f:
+                batch = []
+                for row in reader:
+                    # Пустое поле CSV — NULL, как при чтении через pandas
+                    batch.append([value if value != '' else None for value in row])
+                    if len(batch) >= INSERT_BATCH_ROWS:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+        return header, batches()
+
+    def _load(self, conn: sqlite3.Connection, key: str) -> Dict[str, Any]:
+        table = key.rsplit('.', 1)[-1]
+        path = self.loader.data_dir / self.files[table]
+        started = time.perf_counter()
+        header, batches = self._read_rows(path)
+        data_types = self.rules.get(table, {}).get('data_types', {})
+        columns = [f"{_quote(column)} {RULE_AFFINITY.get(data_types.get(column), 'TEXT')}" for column in header]
+        columns += [_quote(column) for column in self.missing.get(key, [])]
+        conn.execute(f"CREATE TABLE {_table_sql(key)} ({', '.join(columns)})")
+
+        booleans = [i for i, column in enumerate(header) if data_types.get(column) == 'boolean']
+        insert = f"INSERT INTO {_table_sql(key)} ({', '.join(map(_quote, header))}) " \
+                 f"VALUES ({', '.join('?' * len(header))})"
+        rows = 0
+        conn.execute('BEGIN')
+        for batch in batches:
+            if booleans:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for i in booleans:
+                        row[i] = to_boolean(row[i])
+            conn.executemany(insert, batch)
+            rows += len(batch)
+        conn.execute('COMMIT')
+        return {'table': key, 'file': path.name, 'rows': rows, 'seconds': time.perf_counter() - started}
+
+    def execute(self, conn: sqlite3.Connection, statement: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполняет выражение атомарно (SAVEPOINT); отсутствующие столбцы источников добавляются как NULL"""
+        result = {key: statement[key] for key in ('index', 'line', 'label', 'kind', 'table', 'error')}
+        result.update(rows=None, seconds=0.0, warnings=[])
+        if statement['error']:
+            return result
+        if not statement['parts']:
+            result['warnings'].append("управление транзакцией пропущено: каждое выражение выполняется атомарно")
+            return result
+        while True:
+            started = time.perf_counter()
+            try:
+                result['rows'] = self._execute_parts(conn, statement['parts'])
+            except sqlite3.Error as e:
+                added = self._add_missing_column(conn, statement, str(e))
+                if added:
+                    result['warnings'].append(added)
+                    continue
+                result['error'] = str(e)
+            result['seconds'] = time.perf_counter() - started
+            return result
+
+    @staticmethod
+    def _execute_parts(conn: sqlite3.Connection, parts: List[Tuple[str, bool]]) -> Optional[int]:
+        rows = None
+        conn.execute('SAVEPOINT statement')
+        try:
+            for sql, counted in parts:
+                cursor = conn.execute(sql)
+                count = len(cursor.fetchall()) if cursor.description is not None else cursor.rowcount
+                if counted and count >= 0:
+                    rows = (rows or 0) + count
+        except sqlite3.Error:
+            conn.execute('ROLLBACK TO statement')
+            conn.execute('RELEASE statement')
+            raise
+        conn.execute('RELEASE statement')
+        return rows
+
+    def _add_missing_column(self, conn: sqlite3.Connection, statement: Dict[str, Any], message: str) -> Optional[str]:
+        if self.strict:
+            return None
+        match = MISSING_COLUMN.search(message)
+        if match is None:
+            return None
+        qualifier, column = match.groups()
+        if qualifier:
+            candidates = [statement['aliases'].get(qualifier.lower())]
+        else:
+            candidates = statement['reads']
+        candidates = [key for key in candidates if key in self.sources]
+        if len(candidates) != 1 or column in self.missing.get(candidates[0], []):
+            return None
+        key = candidates[0]
+        conn.execute(f"ALTER TABLE {_table_sql(key)} ADD COLUMN {_quote(column)}")
+        self.missing.setdefault(key, []).append(column)
+        warning = f"{key}.{column}: нет в тестовых данных, добавлен как NULL"
+        self.warnings.append(warning)
+        return warning
+
+    def _table_rows(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """Строки в таблицах, которые скрипты создают или наполняют"""
+        keys = []
+        for script in self.scripts:
+            for statement in script['statements']:
+                keys.extend(key for key in statement['writes'] + statement['created'] if key not in keys)
+        tables = []
+        for key in keys:
+            try:
+                rows = conn.execute(f"SELECT COUNT(*) FROM {_table_sql(key)}").fetchone()[0]
+            except sqlite3.Error:
+                continue
+            tables.append({'table': key, 'rows': rows})
+        return tables
+
+    def run(self, repeat: int = 1, stop_on_error: bool = False) -> Dict[str, Any]:
+        """Прогоняет скрипты repeat раз на свежей базе; время — медиана по прогонам"""
+        runs = []
+        for _ in range(max(repeat, 1)):
+            conn, loads = self.connect()
+            try:
+                scripts, stopped = [], False
+                for script in self.scripts:
+                    results = []
+                    for statement in script['statements']:
+                        if stopped:
+                            break
+                        results.append(self.execute(conn, statement))
+                        stopped = stop_on_error and results[-1]['error'] is not None
+                    scripts.append({'name': script['name'], 'statements': results})
+                tables = self._table_rows(conn)
+            finally:
+                conn.close()
+            runs.append((loads, scripts, tables))
+
+        loads, scripts, tables = runs[0]
+        for i, load in enumerate(loads):
+            load['seconds'] = statistics.median(run[0][i]['seconds'] for run in runs)
+        for i, script in enumerate(scripts):
+            for j, result in enumerate(script['statements']):
+                result['seconds'] = statistics.median(run[1][i]['statements'][j]['seconds'] for run in runs)
+                # Предупреждения о столбцах появляются только в первом прогоне
+                result['warnings'] = runs[0][1][i]['statements'][j]['warnings']
+            script['seconds'] = sum(result['seconds'] for result in script['statements'])
+            script['errors'] = sum(result['error'] is not None for result in script['statements'])
+        return {'now': self.now, 'repeat': len(runs), 'loads': loads, 'scripts': scripts, 'tables': tables,
+                'warnings': self.warnings}
+
+    def close(self) -> None:
+        self.loader.close()
+
+
+def _milliseconds(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} мс"
+
+
+def _rows(rows: Optional[int]) -> str:
+    return '—' if rows is None else str(rows)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for load in report['loads']:
+        print(f"📥 {load['table']} ← {load['file']}: {load['rows']} строк, {_milliseconds(load['seconds'])}")
+    for script in report['scripts']:
+        print(f"\n📜 {script['name']}")
+        for result in script['statements']:
+            status = '❌' if result['error'] else '✅'
+            label = f"  {result['label']}" if result['label'] else ''
+            print(f"   {status} {result['index']:>2}. стр. {result['line']:<4} {result['kind']:<9} "
+                  f"{result['table']:<22} {_rows(result['rows']):>8} строк {_milliseconds(result['seconds']):>10}{label}")
+            for warning in result['warnings']:
+                print(f"      ⚠️ {warning}")
+            if result['error']:
+                print(f"      ❌ {result['error']}")
+        print(f"   ⏱️ {_milliseconds(script['seconds'])}, ошибок: {script['errors']}")
+    if report['tables']:
+        print("\n📊 Таблицы после прогона: "
+              + ', '.join(f"{table['table']} — {table['rows']}" for table in report['tables']))
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    lines = [
+        "# Прогон SQL-трансформаций",
+        "",
+        f"**Время прогона (CURRENT_TIMESTAMP):** {report['now']:%Y-%m-%d %H:%M:%S}  ",
+        f"**Прогонов:** {report['repeat']} (время — медиана)",
+        "",
+        "## Загрузка источников",
+        "",
+        "| Таблица | Файл | Строк | Время |",
+        "|---------|------|-------|-------|",
+    ]
+    lines.extend(f"| {load['table']} | {load['file']} | {load['rows']} | {_milliseconds(load['seconds'])} |"
+                 for load in report['loads'])
+    for script in report['scripts']:
+        lines += ["", f"## {script['name']}", "",
+                  f"Время: {_milliseconds(script['seconds'])}, ошибок: {script['errors']}", "",
+                  "| № | Строка | Выражение | Тип | Таблица | Строк | Время | Результат |",
+                  "|---|--------|-----------|-----|---------|-------|-------|-----------|"]
+        for result in script['statements']:
+            notes = [f"❌ {result['error']}"] if result['error'] else ['✅']
+            notes += [f"⚠️ {warning}" for warning in result['warnings']]
+            lines.append(f"| {result['index']} | {result['line']} | {result['label'] or ''} | {result['kind']} | "
+                         f"{result['table']} | {_rows(result['rows'])} | {_milliseconds(result['seconds'])} | "
+                         f"{'<br>'.join(notes).replace('|', '/')} |")
+    if report['tables']:
+        lines += ["", "## Таблицы после прогона", "", "| Таблица | Строк |", "|---------|-------|"]
+        lines.extend(f"| {table['table']} | {table['rows']} |" for table in report['tables'])
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Прогон SQL-трансформаций на тестовых данных (SQLite)')
+    parser.add_argument('scripts', nargs='*', help=f'SQL-файлы (по умолчанию все *.sql из ../{SQL_DIR_NAME})')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json (образцы или синтетика)')
+    parser.add_argument('--repeat', type=int, default=1, help='Число прогонов для замера времени')
+    parser.add_argument('--now', help='Время прогона для CURRENT_TIMESTAMP, например "2024-02-01 09:00:00"')
+    parser.add_argument('--strict', action='store_true', help='Не добавлять отсутствующие столбцы источников')
+    parser.add_argument('--stop-on-error', action='store_true', help='Остановиться на первой ошибке')
+    parser.add_argument('--output', help='Сохранить отчет в Markdown')
+
+    args = parser.parse_args()
+
+    scripts = [Path(path) for path in args.scripts]
+    if not scripts:
+        scripts = sorted(SQL_DIR.glob('*.sql'))
+        if not scripts:
+            print(f"❌ Нет SQL-файлов в {SQL_DIR}")
+            return
+    try:
+        now = datetime.fromisoformat(args.now) if args.now else None
+    except ValueError:
+        print(f"❌ Непонятное время --now: {args.now}")
+        return
+
+    harness = None
+    try:
+        harness = SqlHarness(scripts, args.data_dir, now, args.strict)
+        report = harness.run(args.repeat, args.stop_on_error)
+    except (ImportError, KeyError, OSError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        return
+    finally:
+        if harness is not None:
+            harness.close()
+
+    print_report(report)
+    if args.output:
+        output = Path(args.output)
+        tmp_output = output.with_name(output.name + '.tmp')
+        tmp_output.write_text(render_markdown(report), encoding='utf-8')
+        tmp_output.replace(output)
+        print(f"💾 Отчет: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Генератор синтетических данных по схеме data_config.json
+
+Столбцы таблиц берутся из файлов local_files (или из quality_rules, если
+файла нет), а значения генерируются векторно по правилам:
+- unique_fields — последовательные ключи в формате образца (1001, O-2024-001)
+- data_types — целые, дробные, даты, enum_values, email
+- foreign_keys — ссылки только на существующие строки родительской таблицы
+- business_rules — границы значений ("> 0")
+Строки без описанного типа выбираются из значений файла-образца.
+
+Таблицы пишутся порциями прямо на диск (CSV или Parquet), поэтому 10+ млн
+строк генерируются в постоянном объеме памяти. Рядом кладется копия
+data_config.json: для CSV — с новыми local_files, и результат сразу читается
+через DataLoader(<папка>).load_table(). DataLoader читает local_files только
+как CSV, поэтому для Parquet раздел local_files в копию не попадает.
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from validation import RULE_PATTERN, _split_columns
+
+
+DEFAULT_CHUNKSIZE = 1_000_000
+FORMATS = ('csv', 'parquet')
+KEY_PATTERN = re.compile(r'^(.*?)(\d+)$')
+
+# Генератор столбца: (rng, номера строк) -> значения
+Generator = Callable[[np.random.Generator, np.ndarray], Any]
+
+
+class TableSpec:
+    """Описание генерируемой таблицы: столбцы, генераторы и ключи"""
+
+    def __init__(self, name: str, file_name: str, columns: List[str]):
+        self.name = name
+        self.file_name = file_name
+        self.columns = columns
+        self.generators: Dict[str, Generator] = {}
+        # Ключ таблицы по номеру строки — для ссылок из дочерних таблиц
+        self.keys: Dict[str, Callable[[np.ndarray], Any]] = {}
+        self.parents: List[str] = []
+        self.optional: List[str] = []
+        self.rows = 0
+
+
+def _bounds(expressions: List[str]) -> Tuple[Optional[float], Optional[float], bool]:
+    """Нижняя и верхняя границы из правил вида "> 0"; признак строгой нижней границы"""
+    low, high, strict = None, None, False
+    for expression in expressions:
+        match = RULE_PATTERN.match(str(expression))
+        if not match:
+            continue
+        try:
+            value = float(match.group(2))
+        except ValueError:
+            continue
+        op = match.group(1)
+        if op in ('>', '>='):
+            low, strict = value, op == '>'
+        elif op in ('<', '<='):
+            high = value
+    return low, high, strict
+
+
+def _key_formatter(sample: pd.Series) -> Tuple[Callable[[np.ndarray], Any], bool]:
+    """Ключ по номеру строки в формате образца; признак числового ключа"""
+    values = sample.dropna().astype(str)
+    numeric = pd.to_numeric(values, errors='coerce')
+    if len(values) and numeric.notna().all():
+        start = int(numeric.min())
+        return (lambda idx: idx + start), True
+
+    match = KEY_PATTERN.match(values.iloc[0]) if len(values) else None
+    if match:
+        prefix, digits = match.group(1), match.group(2)
+        start, width = int(digits), len(digits)
+        return (lambda idx: prefix + pd.Series(idx + start).astype(str).str.zfill(width).to_numpy()), False
+    name = sample.name
+    return (lambda idx: f"{name}_" + pd.Series(idx + 1).astype(str).to_numpy()), False
+
+
+def _column_generator(column: str, data_type: Optional[str], sample: pd.Series,
+                      enum_values: List[Any], rules: List[str], unique: bool) -> Generator:
+    """Строит векторный генератор значений столбца"""
+    low, high, strict = _bounds(rules)
+    present = sample.dropna()
+
+    if data_type == 'enum' and enum_values:
+        choices = np.array(enum_values, dtype=object)
+        return lambda rng, idx: choices[rng.integers(0, len(choices), len(idx))]
+
+    if data_type == 'email' or column == 'email':
+        return lambda rng, idx: 'user' + pd.Series(idx + 1).astype(str).to_numpy() + '@example.com'
+
+    if unique:
+        formatter, _ = _key_formatter(sample.rename(column))
+        return lambda rng, idx: formatter(idx)
+
+    if data_type == 'integer':
+        numbers = pd.to_numeric(present, errors='coerce').dropna()
+        if low is not None:
+            int_low = int(low) + 1 if strict else int(low)
+        else:
+            int_low = int(numbers.min()) if len(numbers) else 0
+        if high is not None:
+            int_high = int(high)
+        else:
+            int_high = max(int(numbers.max()) * 2 if len(numbers) else 0, int_low + 10)
+        return lambda rng, idx: rng.integers(int_low, int_high + 1, len(idx))
+
+    if data_type in ('numeric', 'float', 'decimal'):
+        numbers = pd.to_numeric(present, errors='coerce').dropna()
+        if low is not None:
+            num_low = low + 0.01 if strict else low
+        else:
+            num_low = float(numbers.min()) / 2 if len(numbers) else 0.0
+        if high is not None:
+            num_high = high
+        else:
+            num_high = float(numbers.max()) * 2 if len(numbers) else num_low + 1000
+        return lambda rng, idx: np.round(rng.uniform(num_low, num_high, len(idx)), 2)
+
+    if data_type in ('date', 'datetime', 'timestamp'):
+        dates = pd.to_datetime(present, errors='coerce').dropna()
+        start = dates.min() if len(dates) else pd.Timestamp('2024-01-01')
+        days = max((dates.max() - start).days if len(dates) else 0, 365)
+        return lambda rng, idx: (start + pd.to_timedelta(rng.integers(0, days + 1, len(idx)), unit='D')).to_numpy()
+
+    vocabulary = present.astype(str).unique()
+    if not len(vocabulary):
+        return lambda rng, idx: f"{column}_" + pd.Series(idx + 1).astype(str).to_numpy()
+    vocabulary = np.array(vocabulary, dtype=object)
+    return lambda rng, idx: vocabulary[rng.integers(0, len(vocabulary), len(idx))]
+
+
+def build_schema(config: Dict[str, Any], data_dir: Path) -> Dict[str, TableSpec]:
+    """Строит описания таблиц из data_config.json и файлов-образцов"""
+    files = config.get('local_files', {})
+    quality_rules = config.get('quality_rules', {})
+    specs: Dict[str, TableSpec] = {}
+
+    for table in list(dict.fromkeys(list(files) + list(quality_rules))):
+        rules = quality_rules.get(table, {})
+        file_name = files.get(table, f"{table}.csv")
+        sample_path = Path(data_dir) / file_name
+        sample = pd.read_csv(sample_path, dtype=str) if sample_path.exists() else pd.DataFrame()
+
+        columns = list(sample.columns)
+        if not columns:
+            columns = list(dict.fromkeys(
+                rules.get('required_fields', []) + rules.get('unique_fields', [])
+                + list(rules.get('data_types', {}))
+                + [col for spec in rules.get('foreign_keys', {}) for col in _split_columns(spec)]
+            ))
+
+        spec = TableSpec(table, Path(file_name).with_suffix('').name, columns)
+        spec.optional = [col for col in columns if col not in rules.get('required_fields', [])]
+        data_types = rules.get('data_types', {})
+        enum_values = rules.get('enum_values', {})
+        business_rules = rules.get('business_rules', {})
+        unique_fields = rules.get('unique_fields', [])
+
+        for column in columns:
+            values = sample[column] if column in sample.columns else pd.Series(dtype=str, name=column)
+            spec.generators[column] = _column_generator(
+                column, data_types.get(column), values, enum_values.get(column, []),
+                [business_rules[column]] if column in business_rules else [],
+                column in unique_fields,
+            )
+            if column in unique_fields:
+                spec.keys[column], _ = _key_formatter(values.rename(column))
+        specs[table] = spec
+
+    # Ссылки на родителей заменяют генераторы столбцов внешних ключей
+    for table, rules in quality_rules.items():
+        for column_spec, reference in rules.get('foreign_keys', {}).items():
+            parent, parent_columns = reference.split('.', 1)
+            columns, parent_columns = _split_columns(column_spec), _split_columns(parent_columns)
+            if table not in specs or parent not in specs or len(columns) != 1:
+                continue
+            key = specs[parent].keys.get(parent_columns[0])
+            if key is None:
+                key, _ = _key_formatter(pd.Series(dtype=str, name=parent_columns[0]))
+            specs[table].parents.append(parent)
+            specs[table].generators[columns[0]] = _foreign_key(specs[parent], key)
+            if columns[0] in specs[table].optional:
+                specs[table].optional.remove(columns[0])
+    return specs
+
+
+def _foreign_key(parent: TableSpec, key: Callable[[np.ndarray], Any]) -> Generator:
+    # Число строк родителя известно к моменту генерации дочерней таблицы
+    return lambda rng, idx: key(rng.integers(0, max(parent.rows, 1), len(idx)))
+
+
+def generation_order(specs: Dict[str, TableSpec]) -> List[str]:
+    """Родительские таблицы раньше дочерних"""
+    order: List[str] = []
+
+    def visit(table: str, path: Tuple[str, ...] = ()) -> None:
+        if table in order or table in path:
+            return
+        for parent in specs[table].parents:
+            visit(parent, path + (table,))
+        order.append(table)
+
+    for table in specs:
+        visit(table)
+    return order
+
+
+def generate_chunks(spec: TableSpec, rows: int, chunksize: int = DEFAULT_CHUNKSIZE,
+                    seed: int = 0, null_rate: float = 0.0):
+    """Порции синтетической таблицы"""
+    table_seed = sum(spec.name.encode('utf-8'))
+    for number, start in enumerate(range(0, rows, chunksize)):
+        rng = np.random.default_rng([seed, table_seed, number])
+        idx = np.arange(start, min(start + chunksize, rows), dtype=np.int64)
+        frame = pd.DataFrame({column: spec.generators[column](rng, idx) for column in spec.columns})
+        if null_rate:
+            for column in spec.optional:
+                values = frame[column]
+                # Целые с пропусками остаются целыми (Int64), а не превращаются в float
+                if pd.api.types.is_integer_dtype(values):
+                    values = values.astype('Int64')
+                frame[column] = values.mask(rng.random(len(frame)) < null_rate)
+        yield frame
+
+
+def write_table(spec: TableSpec, rows: int, output_dir: Path, fmt: str = 'csv',
+                chunksize: int = DEFAULT_CHUNKSIZE, seed: int = 0, null_rate: float = 0.0) -> Path:
+    """Генерирует таблицу и пишет ее на диск порциями"""
+    spec.rows = rows
+    output = Path(output_dir) / f"{spec.file_name}.{fmt}"
+    tmp_output = output.with_name(output.name + '.part')
+    chunks = generate_chunks(spec, rows, chunksize, seed, null_rate)
+
+    try:
+        if fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            writer = None
+            try:
+                for frame in chunks:
+                    batch = pa.Table.from_pandas(frame, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_output, batch.schema)
+                    writer.write_table(batch.cast(writer.schema))
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(tmp_output, 'w', encoding='utf-8', newline='') as f:
+                for number, frame in enumerate(chunks):
+                    frame.to_csv(f, index=False, header=number == 0, date_format='%Y-%m-%d')
+    except Exception:
+        tmp_output.unlink(missing_ok=True)
+        raise
+    tmp_output.replace(output)
+    return output
+
+
+def generate(data_dir: Path, output_dir: Path, rows: Dict[str, int], fmt: str = 'csv',
+             chunksize: int = DEFAULT_CHUNKSIZE, seed: int = 0, null_rate: float = 0.0) -> List[Dict[str, Any]]:
+    """Генерирует все таблицы схемы; возвращает путь, строки и время по каждой"""
+    config_path = Path(data_dir) / 'data_config.json'
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    specs = build_schema(config, data_dir)
+    unknown = set(rows) - set(specs)
+    if unknown:
+        raise KeyError(f"Таблицы нет в схеме: {', '.join(sorted(unknown))}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    default_rows = config.get('test_data', {}).get('sample_size', 1000)
+
+    # DataLoader(output_dir) находит CSV-результат; Parquet он не читает
+    output_config = dict(config)
+    if fmt == 'csv':
+        output_config['local_files'] = {table: f"{specs[table].file_name}.{fmt}" for table in specs}
+    else:
+        output_config.pop('local_files', None)
+    with open(output_dir / 'data_config.json', 'w', encoding='utf-8') as f:
+        json.dump(output_config, f, indent=2, ensure_ascii=False)
+
+    results = []
+    for table in generation_order(specs):
+        started = time.time()
+        count = rows.get(table, default_rows)
+        path = write_table(specs[table], count, output_dir, fmt, chunksize, seed, null_rate)
+        results.append({'table': table, 'path': str(path), 'rows': count,
+                        'time_s': round(time.time() - started, 2)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Синтетические данные по схеме data_config.json')
+    parser.add_argument('--data-dir', default='.', help='Папка с data_config.json и файлами-образцами')
+    parser.add_argument('--output-dir', default='synthetic', help='Куда записать таблицы')
+    parser.add_argument('--rows', action='append', default=[], metavar='ТАБЛИЦА=N',
+                        help='Строк в таблице, например orders=10000000 (по умолчанию test_data.sample_size)')
+    parser.add_argument('--format', choices=FORMATS, default='csv', help='Формат файлов')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Строк в порции')
+    parser.add_argument('--null-rate', type=float, default=0.0, help='Доля пропусков в необязательных столбцах')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно генератора')
+
+    args = parser.parse_args()
+
+    rows = {}
+    for item in args.rows:
+        table, sep, count = item.partition('=')
+        if not sep or not count.replace('_', '').isdigit():
+            print(f"❌ Ожидается ТАБЛИЦА=N: {item}")
+            return
+        rows[table] = int(count.replace('_', ''))
+
+    if args.format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Для Parquet установите pyarrow: pip install pyarrow")
+            return
+
+    if Path(args.output_dir).resolve() == Path(args.data_dir).resolve():
+        print("❌ Папка результата совпадает с папкой образцов: файлы-образцы будут перезаписаны")
+        return
+
+    try:
+        results = generate(Path(args.data_dir), Path(args.output_dir), rows, args.format,
+                           args.chunksize, args.seed, args.null_rate)
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    for result in results:
+        print(f"✅ {result['table']}: {result['rows']} строк за {result['time_s']} с → {result['path']}")
+    if args.format == 'parquet':
+        print("⚠️ DataLoader читает local_files только как CSV: "
+              "в data_config.json результата раздел local_files не записан")
+
+
+if __name__ == '__main__':
+    main()
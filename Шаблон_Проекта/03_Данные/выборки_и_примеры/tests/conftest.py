@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Модули выборки_и_примеры импортируются напрямую, как в скриптах"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Тесты обезличивания: детерминированность и формат результатов"""
+
+import pandas as pd
+
+from anonymize import TOKEN_LENGTH, Anonymizer, anonymize_file
+
+
+RULES = {'email': 'hash_domain', 'phone': 'mask_digits', 'name': 'pseudonymize'}
+KEY = b'test-key'
+
+
+def test_identifying_fields_use_long_tokens():
+    anonymizer = Anonymizer(RULES, KEY)
+    frame = anonymizer.apply(pd.DataFrame({'email': ['Ivan@Mail.ru'], 'name': ['Иван Петров']}))
+    local, domain = frame.loc[0, 'email'].split('@')
+    assert TOKEN_LENGTH >= 16
+    assert len(local) == 1 + TOKEN_LENGTH
+    assert domain.endswith('.example.com')
+    assert len(frame.loc[0, 'name'].split()[-1]) == TOKEN_LENGTH
+
+
+def test_same_value_same_token_and_missing_kept():
+    anonymizer = Anonymizer(RULES, KEY)
+    frame = anonymizer.apply(pd.DataFrame({'email': ['a@x.ru', ' A@X.RU', None, 'b@x.ru']}))
+    assert frame.loc[0, 'email'] == frame.loc[1, 'email'] != frame.loc[3, 'email']
+    assert frame.loc[0, 'email'].split('@')[1] == frame.loc[3, 'email'].split('@')[1]
+    assert pd.isna(frame.loc[2, 'email'])
+    other = Anonymizer(RULES, b'other-key').apply(pd.DataFrame({'email': ['a@x.ru']}))
+    assert other.loc[0, 'email'] != frame.loc[0, 'email']
+
+
+def test_mask_digits_keeps_last_two():
+    frame = Anonymizer(RULES, KEY).apply(pd.DataFrame({'phone': ['+7 (912) 345-67-89']}))
+    assert frame.loc[0, 'phone'] == '+* (***) ***-**-89'
+
+
+def test_anonymize_file_matches_in_memory(tmp_path):
+    source = pd.DataFrame({'email': [f'user{i}@example.org' for i in range(50)],
+                           'amount': [str(i) for i in range(50)]})
+    source.to_csv(tmp_path / 'in.csv', index=False)
+    stats = anonymize_file(tmp_path / 'in.csv', tmp_path / 'out.csv', RULES, KEY, chunksize=7, workers=1)
+    result = pd.read_csv(tmp_path / 'out.csv', dtype=str)
+    assert stats['rows'] == 50
+    pd.testing.assert_frame_equal(result, Anonymizer(RULES, KEY).apply(source))
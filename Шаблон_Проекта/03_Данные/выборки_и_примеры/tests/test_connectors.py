@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Тесты пула соединений и порционного чтения"""
+
+import sqlite3
+
+import pytest
+
+from connectors import ConnectionPool, Connector, SQLiteConnector, create_connector
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(max_size=1):
+    created = []
+
+    def factory():
+        created.append(FakeConnection())
+        return created[-1]
+
+    return ConnectionPool(factory, max_size=max_size), created
+
+
+def test_pool_reuses_connection():
+    pool, created = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second and len(created) == 1
+
+
+def test_pool_closes_connection_after_error():
+    pool, created = make_pool()
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError
+    assert created[0].closed
+    with pool.connection() as conn:
+        assert conn is not created[0]
+
+
+def test_pool_closes_connection_when_generator_closed_early():
+    pool, created = make_pool()
+
+    def rows():
+        with pool.connection():
+            yield 1
+            yield 2
+
+    chunks = rows()
+    next(chunks)
+    chunks.close()
+    assert created[0].closed
+    assert pool._idle.empty()
+
+
+def test_fetch_closed_early_does_not_leak(tmp_path):
+    path = tmp_path / 'source.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE orders (order_id INTEGER)")
+        conn.executemany("INSERT INTO orders VALUES (?)", [(i,) for i in range(10)])
+
+    connector = SQLiteConnector(f'sqlite:///{path}', pool_size=1, fetch_size=2)
+    chunks = connector.read_table('orders')
+    next(chunks)
+    chunks.close()
+    assert sum(len(chunk) for chunk in connector.read_table('orders')) == 10
+    connector.close()
+
+
+def test_connector_requires_connect():
+    with pytest.raises(TypeError):
+        Connector('sqlite://')
+
+
+def test_sqlite_connector_reads_chunks_and_schema(tmp_path):
+    path = tmp_path / 'source.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, status VARCHAR(20) NOT NULL, amount REAL)")
+        conn.executemany("INSERT INTO orders VALUES (?, ?, ?)", [(i, 'new', i * 1.5) for i in range(7)])
+
+    with create_connector(f'sqlite:///{path}', fetch_size=3) as connector:
+        chunks = list(connector.read_table('orders', ['order_id', 'amount'], where='order_id >= ?', params=[2]))
+        assert [len(chunk) for chunk in chunks] == [3, 2]
+        schema = connector.describe_columns(['orders']).set_index('column')
+        assert schema.loc['status', 'max_length'] == 20 and not schema.loc['status', 'nullable']
+        with pytest.raises(ValueError):
+            list(connector.read_table('orders; DROP TABLE orders'))
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Тесты DataLoader"""
+
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import connectors
+from data_loader import DataLoader, optimize_dtypes
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+
+
+def write_config(path, config):
+    (path / 'data_config.json').write_text(json.dumps(config), encoding='utf-8')
+
+
+def test_cached_snapshot_reused_until_csv_changes(tmp_path, monkeypatch):
+    shutil.copy(EXAMPLES_DIR / 'sample_sales.csv', tmp_path)
+    first = DataLoader(str(tmp_path)).load_sales()
+    assert list((tmp_path / '.cache').glob('sample_sales.*.meta.json'))
+
+    def no_csv(*args, **kwargs):
+        raise AssertionError("CSV прочитан повторно")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pd, 'read_csv', no_csv)
+        cached = DataLoader(str(tmp_path)).load_sales()
+    pd.testing.assert_frame_equal(cached, first)
+    assert pd.api.types.is_datetime64_any_dtype(cached['order_date'])
+
+    lines = (tmp_path / 'sample_sales.csv').read_text(encoding='utf-8').splitlines()
+    (tmp_path / 'sample_sales.csv').write_text('\n'.join(lines[:-1]) + '\n', encoding='utf-8')
+    assert len(DataLoader(str(tmp_path)).load_sales()) == len(first) - 1
+
+
+def test_table_path_for_local_and_builtin_tables(tmp_path):
+    write_config(tmp_path, {'local_files': {'orders': 'orders.csv'}})
+    loader = DataLoader(str(tmp_path))
+    assert loader.table_path('orders') == loader.data_dir / 'orders.csv'
+    assert loader.table_path('sales') == loader.data_dir / 'sample_sales.csv'
+
+
+def test_get_connector_created_once_across_threads(tmp_path, monkeypatch):
+    write_config(tmp_path, {'data_sources': {'crm': {'connection': f'sqlite:///{tmp_path}/crm.db'}}})
+    created = []
+    original = connectors.create_connector
+
+    def slow_create(url, **options):
+        time.sleep(0.05)
+        created.append(original(url, **options))
+        return created[-1]
+
+    monkeypatch.setattr(connectors, 'create_connector', slow_create)
+    loader = DataLoader(str(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(loader.get_connector('crm')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+    loader.close()
+
+
+def test_validate_data_keeps_customers_and_sales_keys():
+    loader = DataLoader(str(EXAMPLES_DIR), use_cache=False)
+    assert loader.config.get('quality_rules') and loader.config.get('local_files')
+    errors = loader.validate_data()
+    assert set(errors) == {'customers', 'sales'}
+    assert all(isinstance(table_errors, list) for table_errors in errors.values())
+
+
+def test_validate_rules_reports_configured_tables():
+    loader = DataLoader(str(EXAMPLES_DIR), use_cache=False)
+    tables = {item['table'] for item in loader.validate_rules()['rules']}
+    assert {'customers', 'orders'} <= tables
+
+
+def test_optimize_dtypes_keeps_values():
+    frame = pd.DataFrame({'quantity': np.arange(1_000, dtype='int64') % 7,
+                          'price': np.full(1_000, 12.5),
+                          'status': np.array(['active', 'inactive'], dtype=object)[np.arange(1_000) % 2]})
+    optimized, memory = optimize_dtypes(frame, {'status': 'enum'})
+    assert str(optimized['quantity'].dtype) == 'int8'
+    assert str(optimized['status'].dtype) == 'category'
+    assert memory['bytes_after'] < memory['bytes_before']
+    pd.testing.assert_frame_equal(optimized.astype(frame.dtypes.to_dict()), frame)
+
+
+def test_memory_report_after_loading_tables():
+    loader = DataLoader(str(EXAMPLES_DIR), use_cache=False)
+    assert loader.memory_report() == {}
+    loader.load_sales()
+    assert 'sample_sales.csv' in loader.memory_report()
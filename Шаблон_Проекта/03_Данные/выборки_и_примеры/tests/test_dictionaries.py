@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Тесты словарей данных по схемам источников"""
+
+import json
+import sqlite3
+
+from data_loader import DataLoader
+from dictionaries import csv_schema, update_dictionaries
+
+
+def make_source(tmp_path):
+    path = tmp_path / 'crm.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE clients (client_id INTEGER PRIMARY KEY, email VARCHAR(100) NOT NULL)")
+    config = {'data_sources': {'crm': {'connection': f'sqlite:///{path}', 'tables': ['clients']}}}
+    (tmp_path / 'data_config.json').write_text(json.dumps(config), encoding='utf-8')
+    return path
+
+
+def test_dictionary_update_keeps_manual_descriptions(tmp_path):
+    db_path = make_source(tmp_path)
+    output = tmp_path / 'словари_данных'
+    loader = DataLoader(str(tmp_path))
+    results, errors = update_dictionaries(loader, output)
+    assert not errors and results['clients'][0] == 'created'
+
+    path = output / 'clients_dictionary.md'
+    text = path.read_text(encoding='utf-8')
+    assert '| email | VARCHAR | 100 | Да |' in text
+    path.write_text(text.replace('| email | VARCHAR | 100 | Да | - |', '| email | VARCHAR | 100 | Да | Рабочая почта |'),
+                    encoding='utf-8')
+    assert update_dictionaries(loader, output)[0]['clients'][0] == 'unchanged'
+
+    loader.close()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("ALTER TABLE clients ADD COLUMN segment VARCHAR(20)")
+    loader = DataLoader(str(tmp_path))
+    status, changes, missing = update_dictionaries(loader, output)[0]['clients']
+    loader.close()
+    assert status == 'updated' and changes == ['добавлены поля segment'] and missing == []
+    text = path.read_text(encoding='utf-8')
+    assert 'Рабочая почта' in text and '| segment | VARCHAR | 20 | Нет |' in text
+    assert 'Добавлены поля segment' in text
+
+
+def test_csv_schema_uses_quality_rules(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text('order_id,price,order_date\nO-1,1500.00,2024-01-10\nO-2,,2024-01-11\n', encoding='utf-8')
+    columns = {column['name']: column for column in csv_schema(path, {'required_fields': ['order_id']}, 'orders.csv')}
+    assert [columns[name]['type'] for name in ('order_id', 'price', 'order_date')] == ['VARCHAR', 'NUMERIC', 'DATE']
+    assert columns['order_id']['required'] and columns['price']['example'] == '1500.00'
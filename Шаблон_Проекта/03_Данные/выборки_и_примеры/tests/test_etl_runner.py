@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Тесты инкрементальной загрузки измерений"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from data_loader import DataLoader
+from etl_runner import IncrementalETL, _build_source, _change_source, _dimension_counts
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+ROWS = 500
+NOW = datetime(2024, 3, 1, 12)
+
+
+@pytest.fixture
+def project(tmp_path):
+    spec = json.loads((EXAMPLES_DIR / 'data_config.json').read_text(encoding='utf-8'))['etl']['dim_customers']
+    source = tmp_path / 'crm.db'
+    _build_source(source, ROWS, np.random.default_rng(0))
+    config = {'data_sources': {'crm': {'connection': f'sqlite:///{source}', 'tables': ['customers']}},
+              'etl': {'dim_customers': spec, 'customers_latest': {**spec, 'history': False}}}
+    (tmp_path / 'data_config.json').write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return tmp_path
+
+
+def run(project, name, now):
+    loader = DataLoader(str(project))
+    etl = IncrementalETL(loader, project / 'warehouse.db', batch_rows=64)
+    try:
+        return etl.run(name, now=now), _dimension_counts(etl.conn, name) if name == 'dim_customers' else None
+    finally:
+        etl.close()
+        loader.close()
+
+
+def test_scd2_load_writes_only_changed_rows(project):
+    result, counts = run(project, 'dim_customers', NOW)
+    assert result['mode'] == 'full' and result['inserted'] == ROWS
+    assert counts == {'versions': ROWS, 'current': ROWS}
+
+    # Повторный запуск перечитывает только границу водяного знака
+    result, counts = run(project, 'dim_customers', NOW)
+    assert result['mode'] == 'incremental' and result['read'] < 5
+    assert result['inserted'] == result['updated'] == 0
+    assert counts == {'versions': ROWS, 'current': ROWS}
+
+    _change_source(project / 'crm.db', ROWS, changed=7, new=3, now=NOW, rng=np.random.default_rng(1))
+    result, counts = run(project, 'dim_customers', NOW.replace(hour=13))
+    assert (result['inserted'], result['updated']) == (3, 7)
+    # Строки на прежней границе знака перечитываются и отсекаются по хэшу
+    assert result['unchanged'] == result['read'] - 10 > 0
+    assert counts == {'versions': ROWS + 10, 'current': ROWS + 3}
+    assert result['watermark_to'] == NOW.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def test_second_load_in_same_second_keeps_history(project):
+    run(project, 'dim_customers', NOW)
+    _change_source(project / 'crm.db', ROWS, changed=7, new=3, now=NOW, rng=np.random.default_rng(1))
+    # Версии первой загрузки с тем же valid_from закрываются, а не удаляются
+    result, counts = run(project, 'dim_customers', NOW)
+    assert (result['inserted'], result['updated']) == (3, 7)
+    assert counts == {'versions': ROWS + 10, 'current': ROWS + 3}
+
+
+def test_load_without_history_updates_in_place(project):
+    run(project, 'customers_latest', NOW)
+    _change_source(project / 'crm.db', ROWS, changed=4, new=2, now=NOW, rng=np.random.default_rng(1))
+    result, _ = run(project, 'customers_latest', NOW.replace(hour=13))
+    assert (result['inserted'], result['updated']) == (2, 4)
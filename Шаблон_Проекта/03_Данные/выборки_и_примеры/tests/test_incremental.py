@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Тесты накопительных агрегатов для дописываемых файлов"""
+
+import pandas as pd
+import pytest
+
+from incremental import RunningAggregates
+from query import finalize, fold
+
+
+SPEC = {'*': ['count'], 'price': ['sum', 'max'], 'order_date': ['min', 'max'], 'status': ['value_counts']}
+
+
+def aggregates(path, state_path):
+    return RunningAggregates(path, state_path, SPEC, date_columns=['order_date'], numeric_columns=['price'])
+
+
+def full_scan(path):
+    frame = pd.read_csv(path, parse_dates=['order_date'])
+    state = {column: {} for column in SPEC if column != '*'}
+    for column in state:
+        fold(state[column], frame[column], SPEC[column])
+    return finalize(SPEC, state, len(frame))
+
+
+def rows(start, count):
+    return ''.join(f"{i},{i * 1.5},2024-01-{1 + i % 28:02d},{'active' if i % 3 else 'blocked'}\n"
+                   for i in range(start, start + count))
+
+
+def test_appended_rows_are_read_once(tmp_path):
+    path, state_path = tmp_path / 'sales.csv', tmp_path / '.cache' / 'sales.running.json'
+    path.write_text('order_id,price,order_date,status\n' + rows(0, 100), encoding='utf-8')
+    assert aggregates(path, state_path).result() == full_scan(path)
+
+    size = path.stat().st_size
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(rows(100, 10))
+    running = aggregates(path, state_path)
+    assert running.result() == full_scan(path)
+    assert running.last_read_bytes == path.stat().st_size - size
+
+    # Недописанная строка входит в итог, но не в сохраненное состояние
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('110,1000')
+    assert aggregates(path, state_path).result()['*']['count'] == 111
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('5.0,2024-02-01,active\n')
+    result = aggregates(path, state_path).result()
+    assert result['price']['max'] == pytest.approx(10005.0)
+    assert result == full_scan(path)
+
+
+def test_rewritten_file_is_recounted(tmp_path):
+    path, state_path = tmp_path / 'sales.csv', tmp_path / 'sales.running.json'
+    path.write_text('order_id,price,order_date,status\n' + rows(0, 50), encoding='utf-8')
+    aggregates(path, state_path).result()
+
+    path.write_text('order_id,price,order_date,status\n' + rows(1000, 60), encoding='utf-8')
+    running = aggregates(path, state_path)
+    assert running.result() == full_scan(path)
+    assert running.last_read_bytes == path.stat().st_size
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Тесты потокового профиля: оценки не зависят от типа порции"""
+
+import numpy as np
+import pandas as pd
+
+from profiling import ColumnProfile, HyperLogLog
+
+
+def test_hll_same_values_in_int_and_float_chunks():
+    values = np.arange(5_000)
+    hll = HyperLogLog()
+    hll.add(pd.Series(values, dtype='int64'))
+    before = hll.estimate()
+    hll.add(pd.Series(values, dtype='float64'))
+    assert hll.estimate() == before
+
+
+def test_hll_mixed_float_chunk_keeps_integral_values():
+    hll = HyperLogLog()
+    hll.add(pd.Series([1, 2, 3], dtype='int64'))
+    hll.add(pd.Series([1.0, 2.0, 3.5]))
+    assert hll.estimate() == 4
+
+
+def test_hll_dates_any_unit():
+    dates = pd.Series(pd.date_range('2024-01-01', periods=100, freq='D'))
+    hll = HyperLogLog()
+    hll.add(dates)
+    hll.add(dates.astype('datetime64[s]'))
+    assert hll.estimate() == 100
+
+
+def test_column_distinct_unchanged_by_chunk_dtype():
+    values = pd.Series(np.arange(2_000), dtype='int64')
+    column = ColumnProfile('amount', 'numeric')
+    column.add(values)
+    distinct = column.result()['distinct']
+    column.add(values.astype('float64'))
+    assert column.result()['distinct'] == distinct
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Тесты ленивых запросов LazyFrame"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import CACHE_FORMAT, DataLoader
+
+
+def write_sales(path, rows=1_000):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'order_id': [f"O-{i:05d}" for i in range(rows)],
+        'customer_id': rng.integers(1000, 1010, rows),
+        'product_name': rng.choice(['A', 'B', 'C'], rows),
+        'quantity': rng.integers(1, 5, rows),
+        'price': rng.integers(100, 5000, rows) / 2,
+        'order_date': pd.date_range('2024-01-01', periods=rows, freq='h').strftime('%Y-%m-%d'),
+    }).to_csv(path / 'sample_sales.csv', index=False)
+
+
+def run_query(loader):
+    query = loader.scan('sales').filter('order_date', '>=', '2024-01-20').filter('product_name', 'in', ['A', 'B'])
+    query.chunksize = 64
+    return query, query.aggregate({'price': ['sum', 'mean', 'max'], 'product_name': ['value_counts'], '*': ['count']})
+
+
+def test_csv_scan_reads_only_needed_columns(tmp_path):
+    write_sales(tmp_path)
+    loader = DataLoader(str(tmp_path), use_cache=False)
+    query, result = run_query(loader)
+    assert query.last_scan == {'backend': 'csv', 'columns': ['price', 'product_name', 'order_date']}
+
+    sales = loader.load_sales()
+    expected = sales[(sales['order_date'] >= '2024-01-20') & sales['product_name'].isin(['A', 'B'])]
+    assert result['*']['count'] == len(expected)
+    assert result['price']['sum'] == pytest.approx(expected['price'].sum())
+    assert result['price']['max'] == expected['price'].max()
+    counts = expected['product_name'].value_counts()
+    assert result['product_name']['value_counts'] == counts[counts > 0].to_dict()
+
+    memory_query, memory_result = run_query(loader)
+    assert memory_query.last_scan['backend'] == 'memory'
+    assert memory_result['*'] == result['*']
+    assert memory_result['product_name'] == result['product_name']
+
+
+@pytest.mark.skipif(CACHE_FORMAT != 'parquet', reason="нужен pyarrow")
+def test_parquet_snapshot_matches_csv_scan(tmp_path):
+    write_sales(tmp_path)
+    _, from_csv = run_query(DataLoader(str(tmp_path), use_cache=False))
+    DataLoader(str(tmp_path)).load_sales()
+
+    query, from_parquet = run_query(DataLoader(str(tmp_path)))
+    assert query.last_scan['backend'] == 'parquet'
+    assert from_parquet['*'] == from_csv['*']
+    assert from_parquet['price']['sum'] == pytest.approx(from_csv['price']['sum'])
+    assert from_parquet['product_name']['value_counts'] == from_csv['product_name']['value_counts']
+    assert DataLoader(str(tmp_path)).scan('sales').count() == 1_000
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Тесты обновления снимков таблиц источников"""
+
+import json
+import sqlite3
+
+from data_loader import DataLoader
+from refresh import RefreshScheduler, frequency_seconds, list_snapshot_parts
+
+
+def make_source(tmp_path, key=True):
+    database = tmp_path / 'crm.db'
+    with sqlite3.connect(database) as conn:
+        conn.execute("CREATE TABLE customers (customer_id INTEGER, name TEXT, updated_at TEXT)")
+        conn.executemany("INSERT INTO customers VALUES (?, ?, ?)",
+                         [(1, 'a', '2024-01-01'), (2, 'b', '2024-01-02')])
+    incremental = {'watermark': 'updated_at'}
+    if key:
+        incremental['key'] = 'customer_id'
+    config = {'data_sources': {'crm': {'connection': f'sqlite:///{database}', 'tables': ['customers'],
+                                       'incremental': {'customers': incremental}}}}
+    (tmp_path / 'data_config.json').write_text(json.dumps(config), encoding='utf-8')
+    return database
+
+
+def test_frequency_seconds():
+    assert frequency_seconds('daily') == 86400
+    assert frequency_seconds('15min') == 900
+    assert frequency_seconds('2h') == 7200
+
+
+def test_incremental_refresh_keeps_rows_with_same_watermark(tmp_path):
+    database = make_source(tmp_path)
+    loader = DataLoader(str(tmp_path))
+    scheduler = RefreshScheduler(loader)
+    assert scheduler.refresh_table('crm', 'customers')['mode'] == 'full'
+
+    # Строка с тем же водяным знаком, что и у последней выгруженной
+    with sqlite3.connect(database) as conn:
+        conn.execute("INSERT INTO customers VALUES (3, 'c', '2024-01-02')")
+    result = scheduler.refresh_table('crm', 'customers')
+    assert result['mode'] == 'incremental' and result['status'] == 'ok'
+
+    snapshot = loader.load_snapshot('crm', 'customers')
+    assert sorted(snapshot['customer_id']) == [1, 2, 3]
+    assert len(list_snapshot_parts(tmp_path, 'crm', 'customers')) == 2
+    loader.close()
+
+
+def test_incremental_refresh_without_key_does_not_duplicate(tmp_path):
+    make_source(tmp_path, key=False)
+    loader = DataLoader(str(tmp_path))
+    scheduler = RefreshScheduler(loader)
+    scheduler.refresh_table('crm', 'customers')
+    assert scheduler.refresh_table('crm', 'customers')['rows'] == 0
+    assert len(loader.load_snapshot('crm', 'customers')) == 2
+    loader.close()
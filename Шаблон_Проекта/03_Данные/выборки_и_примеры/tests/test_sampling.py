@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Тесты выборок за один проход"""
+
+import json
+
+import pandas as pd
+
+from data_loader import DataLoader
+from sampling import ReservoirSampler, sample_tables
+
+
+def feed(sampler, frame, chunksize):
+    for start in range(0, len(frame), chunksize):
+        sampler.add(frame.iloc[start:start + chunksize])
+    return sampler.result()
+
+
+def test_sample_does_not_depend_on_chunking():
+    frame = pd.DataFrame({'id': range(10_000)})
+    one_pass = feed(ReservoirSampler(100, seed=7), frame, len(frame))
+    chunked = feed(ReservoirSampler(100, seed=7), frame, 333)
+    assert len(one_pass) == 100 and one_pass['id'].is_unique
+    pd.testing.assert_frame_equal(one_pass, chunked)
+
+
+def test_stratified_quotas_are_proportional():
+    frame = pd.DataFrame({'status': ['active'] * 700 + ['inactive'] * 200 + ['blocked'] * 100,
+                          'id': range(1_000)})
+    result = feed(ReservoirSampler(50, stratify='status', seed=1), frame, 128)
+    assert result['status'].value_counts().to_dict() == {'active': 35, 'inactive': 10, 'blocked': 5}
+
+
+def test_related_rows_follow_sampled_parents(tmp_path):
+    rules = {'customers': {}, 'orders': {'foreign_keys': {'customer_id': 'customers.customer_id'}}}
+    (tmp_path / 'data_config.json').write_text(json.dumps({'quality_rules': rules}), encoding='utf-8')
+    pd.DataFrame({'customer_id': range(100)}).to_csv(tmp_path / 'customers.csv', index=False)
+    pd.DataFrame({'order_id': range(1_000),
+                  'customer_id': [i % 100 for i in range(1_000)]}).to_csv(tmp_path / 'orders.csv', index=False)
+
+    samples = sample_tables(DataLoader(str(tmp_path), use_cache=False), 'customers', size=10,
+                            inputs={'customers': tmp_path / 'customers.csv', 'orders': tmp_path / 'orders.csv'},
+                            related_size=1_000, chunksize=64)
+    assert len(samples['customers']) == 10
+    assert set(samples['orders']['customer_id']) == set(samples['customers']['customer_id'])
+    assert len(samples['orders']) == 100
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Тесты локального прогона SQL-трансформаций"""
+
+import json
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import sql_harness
+from sql_harness import SqlHarness, register_functions, translate_expression
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+CUSTOMER_ETL = EXAMPLES_DIR.parent / 'трансформации' / 'customer_etl.sql'
+NOW = datetime(2024, 3, 1)
+
+
+def run(scripts, data_dir, **options):
+    harness = SqlHarness(scripts, str(data_dir), now=NOW, **options)
+    try:
+        return harness.run()
+    finally:
+        harness.close()
+
+
+def errors(report):
+    return [result['error'] for script in report['scripts'] for result in script['statements'] if result['error']]
+
+
+def test_customer_etl_runs_on_sample_data():
+    report = run([CUSTOMER_ETL], EXAMPLES_DIR)
+    assert errors(report) == []
+    tables = {item['table']: item['rows'] for item in report['tables']}
+    assert tables['staging.customers'] == tables['dwh.dim_customers'] == 5
+    # В образцах нет phone и updated_at — без --strict они добавляются как NULL
+    assert report['warnings']
+    assert errors(run([CUSTOMER_ETL], EXAMPLES_DIR, strict=True))
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ("'2024-01-31'::date + INTERVAL '1 month'", '2024-02-29'),
+    ("EXTRACT(YEAR FROM '2024-05-06'::date)", 2024),
+    ("'abc' ~ '^a'", 1),
+    ("'ABC' ILIKE 'ab%'", 1),
+    ("GREATEST(1, 3, 2)", 3),
+    ("DATE_TRUNC('month', '2024-05-06 10:00:00'::timestamp)", '2024-05-01 00:00:00'),
+    ("CURRENT_DATE", '2024-03-01'),
+])
+def test_postgres_dialect_is_translated(expression, expected):
+    conn = sqlite3.connect(':memory:')
+    register_functions(conn)
+    assert conn.execute(f"SELECT {translate_expression(expression, NOW)}").fetchone()[0] == expected
+
+
+def test_merge_updates_matched_and_inserts_new_rows(tmp_path):
+    (tmp_path / 'data_config.json').write_text(json.dumps({'local_files': {'prices': 'prices.csv'}}), encoding='utf-8')
+    (tmp_path / 'prices.csv').write_text('sku,price\nA,10\nB,20\nC,30\n', encoding='utf-8')
+    script = tmp_path / 'merge.sql'
+    script.write_text("""
+        INSERT INTO dwh.prices (sku, price) VALUES ('A', 1), ('Z', 99);
+        MERGE INTO dwh.prices t
+        USING crm.prices s ON t.sku = s.sku
+        WHEN MATCHED THEN UPDATE SET price = s.price
+        WHEN NOT MATCHED THEN INSERT (sku, price) VALUES (s.sku, s.price);
+    """, encoding='utf-8')
+
+    report = run([script], tmp_path)
+    assert errors(report) == []
+    assert [result['rows'] for result in report['scripts'][0]['statements']] == [2, 3]
+    assert report['tables'] == [{'table': 'dwh.prices', 'rows': 4}]
+
+
+def test_cli_finds_scripts_for_any_data_dir(tmp_path, monkeypatch, capsys):
+    # Как после synthetic.py: данные в подпапке, рядом с ней нет трансформации/
+    data_dir = tmp_path / 'synthetic'
+    data_dir.mkdir()
+    for name in ('data_config.json', 'sample_customers.csv', 'sample_sales.csv'):
+        shutil.copy(EXAMPLES_DIR / name, data_dir)
+    monkeypatch.setattr(sys, 'argv', ['sql_harness.py', '--data-dir', str(data_dir), '--now', '2024-03-01'])
+    sql_harness.main()
+    output = capsys.readouterr().out
+    assert 'Нет SQL-файлов' not in output
+    assert CUSTOMER_ETL.name in output
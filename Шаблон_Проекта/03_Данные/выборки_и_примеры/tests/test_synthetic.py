@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Тесты генератора синтетических данных по схеме data_config.json"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader
+from synthetic import generate
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_csv_output_loads_and_passes_rules(tmp_path):
+    results = generate(EXAMPLES_DIR, tmp_path, {'customers': 50, 'orders': 500}, chunksize=64, seed=1)
+    assert {result['table']: result['rows'] for result in results} == {'customers': 50, 'orders': 500}
+
+    loader = DataLoader(str(tmp_path), use_cache=False)
+    orders = loader.load_table('orders')
+    customers = loader.load_table('customers')
+    assert len(orders) == 500 and orders['order_id'].is_unique
+    assert orders['customer_id'].isin(customers['customer_id']).all()
+    failed = [item for item in loader.validate_rules()['rules'] if item['status'] == 'failed']
+    assert failed == []
+
+
+def test_same_seed_same_data(tmp_path):
+    generate(EXAMPLES_DIR, tmp_path / 'a', {'orders': 200}, chunksize=64, seed=7)
+    generate(EXAMPLES_DIR, tmp_path / 'b', {'orders': 200}, chunksize=64, seed=7)
+    name = json.loads((tmp_path / 'a' / 'data_config.json').read_text(encoding='utf-8'))['local_files']['orders']
+    assert (tmp_path / 'a' / name).read_bytes() == (tmp_path / 'b' / name).read_bytes()
+
+
+def test_parquet_output_has_no_local_files(tmp_path):
+    pytest.importorskip('pyarrow')
+    results = generate(EXAMPLES_DIR, tmp_path, {'customers': 20, 'orders': 100}, fmt='parquet', chunksize=64)
+    config = json.loads((tmp_path / 'data_config.json').read_text(encoding='utf-8'))
+    assert 'local_files' not in config
+    orders = [result for result in results if result['table'] == 'orders'][0]
+    assert len(pd.read_parquet(orders['path'])) == 100
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Тесты потоковой валидации, внешних ключей и правил quality_rules"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import validation
+from validation import RuleEngine, StreamingValidator, check_foreign_key
+
+
+def write_tables(tmp_path, customer_ids, emails, order_ids, order_customers):
+    customers = tmp_path / 'customers.csv'
+    sales = tmp_path / 'sales.csv'
+    pd.DataFrame({'customer_id': customer_ids, 'email': emails}).to_csv(customers, index=False)
+    pd.DataFrame({'order_id': order_ids, 'customer_id': order_customers,
+                  'price': 10, 'quantity': 1}).to_csv(sales, index=False)
+    return customers, sales
+
+
+@pytest.fixture
+def tables(tmp_path):
+    ids = list(range(1, 201))
+    emails = [f'user{i}@example.com' for i in ids]
+    emails[150] = emails[7]
+    orders = list(range(1000, 1300)) + [1005]
+    buyers = [ids[i % 200] for i in range(300)] + [999]
+    return write_tables(tmp_path, ids, emails, orders, buyers)
+
+
+@pytest.mark.parametrize('bloom', [False, True])
+def test_streaming_finds_duplicates_and_missing_customers(tables, bloom):
+    validator = StreamingValidator(*tables, chunksize=64, bloom=bloom)
+    errors = validator.validate()
+    report = {item['check']: item for item in validator.report()}
+    assert set(errors) == {'customers', 'sales'}
+    assert report['unique:email']['count'] == 1 and report['unique:email']['rows'] == [152]
+    assert report['unique:order_id']['count'] == 1 and report['unique:order_id']['rows'] == [302]
+    assert report['fk:customer_id']['rows'] == [302]
+
+
+
+def test_streaming_fk_skips_blank_keys_like_batch_check(tmp_path):
+    ids = list(range(1, 11))
+    buyers = pd.array([1, None, 3, None, 42], dtype='Int64')
+    customers, sales = write_tables(tmp_path, ids, [f'user{i}@example.com' for i in ids],
+                                    list(range(100, 105)), buyers)
+    validator = StreamingValidator(customers, sales, chunksize=2)
+    validator.validate()
+    report = {item['check']: item for item in validator.report()}
+    assert report['fk:customer_id']['count'] == 1 and report['fk:customer_id']['rows'] == [6]
+
+    batch = check_foreign_key(pd.read_csv(sales), pd.read_csv(customers), ['customer_id'])
+    assert batch['violations'] == report['fk:customer_id']['count']
+
+
+def test_bloom_recheck_ignores_hash_collisions(tables, monkeypatch):
+    # Все ключи получают один хэш: подозрительны все, но дубликатом считается только равное значение
+    monkeypatch.setattr(validation, 'hash_keys', lambda frame, columns: np.zeros(len(frame), dtype=np.uint64))
+    validator = StreamingValidator(*tables, chunksize=64, bloom=True)
+    validator._check_unique_bloom('customers', tables[0], ['email'], 'дубликаты')
+    [item] = validator.report()
+    assert item['count'] == 1 and item['rows'] == [152]
+
+
+def test_rule_engine_reports_violations_per_rule():
+    frame = pd.DataFrame({'order_id': [1, 2, 2], 'price': [10.0, -1.0, 5.0]})
+    rules = {'orders': {'required_fields': ['order_id'], 'unique_fields': ['order_id'],
+                        'business_rules': {'price': '> 0'}}}
+    results = RuleEngine(rules, lambda table: frame).run()
+    by_rule = {item['rule']: item for item in results['rules']}
+    assert by_rule['required']['status'] == 'ok'
+    assert by_rule['unique']['violations'] == 1
+    assert [item['violations'] for item in results['rules'] if item['columns'] == ['price']] == [1]
+
+
+def test_foreign_key_string_and_composite():
+    parent = pd.DataFrame({'region': ['A', 'A', 'B'], 'code': ['x', 'y', 'x']})
+    child = pd.DataFrame({'region': ['A', 'B', 'B', None], 'code': ['y', 'y', 'x', 'x']})
+    result = check_foreign_key(child, parent, ['region', 'code'])
+    assert result['violations'] == 1 and result['missing_keys'] == 1
+
+
+def test_foreign_key_numeric_ignores_missing():
+    parent = pd.DataFrame({'customer_id': [1, 2, 3]})
+    child = pd.DataFrame({'customer_id': [1.0, np.nan, 4.0, 4.0]})
+    result = check_foreign_key(child, parent, ['customer_id'])
+    assert result['violations'] == 2 and result['missing_keys'] == 1
@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Валидация данных: потоковые проверки и правила из data_config.json
+
+StreamingValidator читает CSV порциями (chunks), поэтому объем памяти не
+зависит от размера файла. Для проверки дубликатов и внешних ключей хранятся
+только 64-битные хэши ключей (8 байт на значение), а в режиме Bloom-фильтра —
+битовый массив фиксированного размера и значения ключей-кандидатов, которые
+перепроверяются точным сравнением.
+
+RuleEngine компилирует quality_rules из data_config.json в векторные
+выражения pandas/numpy и проверяет каждую таблицу за один проход.
+"""
+
+import argparse
+import json
+import math
+import operator
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 100_000
+MAX_EXAMPLES = 20
+# Номер строки файла = номер строки данных + 2 (заголовок и отсчет с единицы)
+HEADER_LINES = 1
+
+
+def hash_keys(frame: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Вычисляет 64-битные хэши ключа (в том числе составного) по строкам"""
+    values = frame[list(columns)].astype(str)
+    if len(columns) == 1:
+        return pd.util.hash_array(values[columns[0]].str.strip().to_numpy(dtype=object))
+    return pd.util.hash_pandas_object(values.apply(lambda col: col.str.strip()), index=False).to_numpy()
+
+
+def _key_values(frame: pd.DataFrame, columns: Sequence[str]) -> List[Any]:
+    """Значения ключа по строкам в том же виде, что и для hash_keys (строки без пробелов по краям)"""
+    values = frame[list(columns)].astype(str).apply(lambda col: col.str.strip())
+    if len(columns) == 1:
+        return values[columns[0]].tolist()
+    return list(values.itertuples(index=False, name=None))
+
+
+class SortedHashSet:
+    """Множество 64-битных хэшей в виде отсортированных серий numpy
+
+    Новые значения добавляются серией; серии одного размера сливаются,
+    как в LSM-дереве, поэтому поиск стоит O(log² n), а память — 8 байт
+    на значение против ~70 байт у set() с int.
+    """
+
+    def __init__(self):
+        self.runs: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Маска значений, уже присутствующих во множестве"""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Добавляет уникальные значения, отсутствующие во множестве"""
+        if not len(hashes):
+            return
+        run = np.unique(hashes)
+        # Сливаем серии, пока последняя не станет заметно больше новой
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.union1d(self.runs.pop(), run)
+        self.runs.append(run)
+
+
+class BloomFilter:
+    """Bloom-фильтр на numpy с двойным хэшированием"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes.astype(np.uint64)
+        h2 = (h1 >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.size)
+
+    def add_and_check(self, hashes: np.ndarray) -> np.ndarray:
+        """Добавляет значения и возвращает маску «возможно, уже были»"""
+        if not len(hashes):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(hashes)
+        byte_idx, bit_idx = positions // np.uint64(8), (positions % np.uint64(8)).astype(np.uint8)
+        seen = np.all(self.bits[byte_idx] & (np.uint8(1) << bit_idx), axis=1)
+        np.bitwise_or.at(self.bits, byte_idx.ravel(), (np.uint8(1) << bit_idx).ravel())
+        # Повторы внутри одной порции фильтр не видит до записи — отмечаем их явно
+        _, first = np.unique(hashes, return_index=True)
+        repeated = np.ones(len(hashes), dtype=bool)
+        repeated[first] = False
+        return seen | repeated
+
+
+class StreamingValidator:
+    """Порционная проверка клиентов и продаж с номерами строк нарушений"""
+
+    def __init__(self, customers_path: Path, sales_path: Path,
+                 chunksize: int = DEFAULT_CHUNKSIZE, bloom: bool = False,
+                 expected_rows: Optional[int] = None, max_examples: int = MAX_EXAMPLES):
+        self.customers_path = Path(customers_path)
+        self.sales_path = Path(sales_path)
+        self.chunksize = chunksize
+        self.bloom = bloom
+        self.expected_rows = expected_rows
+        self.max_examples = max_examples
+        self.violations: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def validate(self) -> Dict[str, list]:
+        """Проверяет обе таблицы и возвращает ошибки в формате DataLoader.validate_data()"""
+        self.violations = {}
+        errors = {'customers': [], 'sales': []}
+
+        try:
+            customer_ids = self._check_unique('customers', self.customers_path, ['customer_id'], keep_keys=True)
+            self._check_unique('customers', self.customers_path, ['email'])
+            self._check_unique('sales', self.sales_path, ['order_id'])
+            self._check_sales(customer_ids)
+        except Exception as e:
+            errors['general'] = [f'Ошибка валидации: {str(e)}']
+            return errors
+
+        for (table, _), item in self.violations.items():
+            rows = ', '.join(str(row) for row in item['rows'])
+            more = ' …' if item['count'] > len(item['rows']) else ''
+            errors[table].append(f"{item['message']}: {item['count']} (строки {rows}{more})")
+        return errors
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Нарушения в структурированном виде (таблица, проверка, количество, строки)"""
+        return [
+            {'table': table, 'check': check, **item}
+            for (table, check), item in self.violations.items()
+        ]
+
+    def _read_chunks(self, path: Path, columns: Sequence[str]) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Читает выбранные столбцы порциями, возвращает номер первой строки файла"""
+        if not path.exists():
+            raise FileNotFoundError(f"Файл {path} не найден")
+
+        first_line = HEADER_LINES + 1
+        reader = pd.read_csv(path, usecols=list(columns), dtype=str,
+                             chunksize=self.chunksize, keep_default_na=False)
+        for chunk in reader:
+            yield first_line, chunk
+            first_line += len(chunk)
+
+    def _record(self, table: str, check: str, message: str, lines: np.ndarray) -> None:
+        """Запоминает нарушение: общее количество и первые номера строк"""
+        if not len(lines):
+            return
+        item = self.violations.setdefault((table, check), {'message': message, 'count': 0, 'rows': []})
+        item['count'] += int(len(lines))
+        free = self.max_examples - len(item['rows'])
+        if free > 0:
+            item['rows'].extend(int(line) for line in lines[:free])
+
+    def _check_unique(self, table: str, path: Path, columns: List[str],
+                      keep_keys: bool = False) -> Optional[SortedHashSet]:
+        """Ищет дубликаты ключа; при keep_keys возвращает множество хэшей ключа"""
+        name = '+'.join(columns)
+        message = f'Найдены дублирующиеся {name}'
+
+        if self.bloom and not keep_keys:
+            self._check_unique_bloom(table, path, columns, message)
+            return None
+
+        seen = SortedHashSet()
+        for first_line, chunk in self._read_chunks(path, columns):
+            hashes = hash_keys(chunk, columns)
+            duplicated = seen.contains(hashes)
+            # Повторы внутри порции
+            _, first = np.unique(hashes, return_index=True)
+            in_chunk = np.ones(len(hashes), dtype=bool)
+            in_chunk[first] = False
+            duplicated |= in_chunk
+            self._record(table, f'unique:{name}', message, first_line + np.flatnonzero(duplicated))
+            seen.add(hashes)
+        return seen
+
+    def _check_unique_bloom(self, table: str, path: Path, columns: List[str], message: str) -> None:
+        """Дубликаты через Bloom-фильтр: кандидаты перепроверяются по значениям ключа
+
+        Первый проход отбирает хэши, которые фильтр, возможно, уже видел.
+        Во втором проходе для строк с такими хэшами сравниваются сами значения
+        ключа, поэтому ни ложные срабатывания фильтра, ни совпадения 64-битных
+        хэшей разных ключей не попадают в результат. В памяти хранятся только
+        значения подозрительных ключей.
+        """
+        capacity = self.expected_rows or _estimate_rows(path)
+        bloom = BloomFilter(capacity)
+        candidates = []
+        for _, chunk in self._read_chunks(path, columns):
+            hashes = hash_keys(chunk, columns)
+            candidates.append(hashes[bloom.add_and_check(hashes)])
+
+        suspects = np.unique(np.concatenate(candidates)) if candidates else np.zeros(0, dtype=np.uint64)
+        if not len(suspects):
+            return
+
+        # Второй проход: точное сравнение значений только подозрительных ключей
+        seen = set()
+        for first_line, chunk in self._read_chunks(path, columns):
+            mask = np.isin(hash_keys(chunk, columns), suspects)
+            if not mask.any():
+                continue
+            lines = first_line + np.flatnonzero(mask)
+            duplicated = np.zeros(len(lines), dtype=bool)
+            for position, key in enumerate(_key_values(chunk[mask], columns)):
+                if key in seen:
+                    duplicated[position] = True
+                else:
+                    seen.add(key)
+            self._record(table, f'unique:{"+".join(columns)}', message, lines[duplicated])
+
+    def _check_sales(self, customer_ids: SortedHashSet) -> None:
+        """Внешний ключ и бизнес-правила продаж за один проход"""
+        for first_line, chunk in self._read_chunks(self.sales_path, ['customer_id', 'price', 'quantity']):
+            # Пустой customer_id — не нарушение внешнего ключа, как в check_foreign_key()
+            missing = ~customer_ids.contains(hash_keys(chunk, ['customer_id'])) & ~_is_blank(chunk['customer_id'])
+            self._record('sales', 'fk:customer_id', 'Клиенты не найдены',
+                         first_line + np.flatnonzero(missing))
+
+            price = pd.to_numeric(chunk['price'], errors='coerce')
+            self._record('sales', 'rule:price', 'Найдены цены <= 0',
+                         first_line + np.flatnonzero((price <= 0).to_numpy()))
+
+            quantity = pd.to_numeric(chunk['quantity'], errors='coerce')
+            self._record('sales', 'rule:quantity', 'Найдены количества <= 0',
+                         first_line + np.flatnonzero((quantity <= 0).to_numpy()))
+
+
+def _join_codes(child: pd.DataFrame, parent: pd.DataFrame, child_columns: Sequence[str],
+                parent_columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Приводит ключи к нативным массивам numpy для сравнения
+
+    Числовой ключ из одного столбца сравнивается как есть. Строковые и
+    составные ключи кодируются через pd.factorize по объединению значений
+    родителя и потомка, а коды столбцов сворачиваются в один int64.
+    Возвращает (ключи потомка, ключи родителя, маску пустых ключей потомка).
+    """
+    child_null = child[list(child_columns)].isna().any(axis=1).to_numpy()
+
+    if len(child_columns) == 1:
+        child_values = child[child_columns[0]]
+        parent_values = parent[parent_columns[0]].dropna()
+        if (pd.api.types.is_numeric_dtype(child_values) and pd.api.types.is_numeric_dtype(parent_values)
+                and not pd.api.types.is_bool_dtype(child_values)):
+            dtype = np.float64 if (pd.api.types.is_float_dtype(child_values)
+                                   or pd.api.types.is_float_dtype(parent_values)) else np.int64
+            # Пустые ключи потомка заменяются нулем и отбрасываются маской child_null
+            child_keys = child_values.fillna(0).to_numpy(dtype=dtype)
+            parent_keys = parent_values.to_numpy(dtype=dtype)
+            if dtype is np.float64 and not (np.any(child_keys % 1) or np.any(parent_keys % 1)):
+                # id, прочитанные как float из-за пропусков, сравниваем как целые
+                child_keys, parent_keys = child_keys.astype(np.int64), parent_keys.astype(np.int64)
+            return child_keys, parent_keys, child_null
+
+    child_codes = np.zeros(len(child), dtype=np.int64)
+    parent_codes = np.zeros(len(parent), dtype=np.int64)
+    radix = 1
+    for child_column, parent_column in zip(child_columns, parent_columns):
+        codes, uniques = pd.factorize(pd.concat([child[child_column], parent[parent_column]],
+                                                ignore_index=True))
+        size = len(uniques) + 1
+        if radix > np.iinfo(np.int64).max // size:
+            # Слишком много сочетаний для int64 — переходим на 64-битные хэши
+            return (hash_keys(child, child_columns).view(np.int64),
+                    hash_keys(parent, parent_columns).view(np.int64), child_null)
+        child_codes = child_codes * size + codes[:len(child)] + 1
+        parent_codes = parent_codes * size + codes[len(child):] + 1
+        radix *= size
+
+    parent_null = parent[list(parent_columns)].isna().any(axis=1).to_numpy()
+    return child_codes, parent_codes[~parent_null], child_null
+
+
+def check_foreign_key(child: pd.DataFrame, parent: pd.DataFrame, child_columns: Sequence[str],
+                      parent_columns: Optional[Sequence[str]] = None, max_examples: int = 10,
+                      seed: int = 0) -> Dict[str, Any]:
+    """Проверяет внешний (в том числе составной) ключ без перевода значений в set()
+
+    Целочисленные ключи (в том числе коды строковых и составных ключей)
+    проверяются np.isin — для плотного диапазона numpy использует таблицу
+    присутствия. Остальные (float, хэши) ищутся бинарным поиском
+    np.searchsorted по отсортированным ключам родителя — O(n log m).
+    Пустые ключи потомка нарушением не считаются. В результат попадает
+    не более max_examples строк и ключей: если нарушений больше, примеры
+    выбираются случайно (с фиксированным seed для воспроизводимости).
+    """
+    child_columns = list(child_columns)
+    parent_columns = list(parent_columns or child_columns)
+    if len(child_columns) != len(parent_columns):
+        raise ValueError("Количество столбцов внешнего ключа и ключа родителя не совпадает")
+
+    child_keys, parent_keys, child_null = _join_codes(child, parent, child_columns, parent_columns)
+
+    if np.issubdtype(child_keys.dtype, np.integer):
+        found = np.isin(child_keys, parent_keys)
+    elif len(parent_keys):
+        if np.any(parent_keys[1:] < parent_keys[:-1]):
+            parent_keys = np.sort(parent_keys)
+        pos = np.searchsorted(parent_keys, child_keys)
+        pos[pos == len(parent_keys)] = 0
+        found = parent_keys[pos] == child_keys
+    else:
+        found = np.zeros(len(child_keys), dtype=bool)
+    missing = ~found & ~child_null
+
+    positions = np.flatnonzero(missing)
+    if len(positions) > max_examples:
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(positions, size=max_examples, replace=False))
+    else:
+        sample = positions
+
+    examples = child.iloc[sample][child_columns].drop_duplicates()
+    return {
+        'violations': int(len(positions)),
+        'missing_keys': int(len(pd.unique(child_keys[positions]))),
+        'rows': [int(pos) + HEADER_LINES + 1 for pos in sample],
+        'examples': [tuple(row) if len(child_columns) > 1 else row[0]
+                     for row in examples.itertuples(index=False, name=None)],
+        'sampled': bool(len(positions) > max_examples),
+        'mask': missing,
+    }
+
+
+# Операторы бизнес-правил вида "> 0", "<= 100", "!= 'test'"
+RULE_OPERATORS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '!=': operator.ne,
+    '==': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+RULE_PATTERN = re.compile(r'^\s*(>=|<=|!=|==|>|<)\s*(.+?)\s*$')
+
+# Проверка значения — функция от столбца, возвращающая маску нарушений
+Check = Callable[[pd.DataFrame], np.ndarray]
+
+
+def _is_blank(series: pd.Series) -> np.ndarray:
+    """Маска пустых значений: NaN и строки из пробелов"""
+    blank = series.isna()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if not len(series.cat.categories):
+            return blank.to_numpy()
+        # Проверяются только категории, а не каждая строка
+        codes = series.cat.codes.to_numpy()
+        blank_categories = series.cat.categories.astype(str).str.strip().to_numpy() == ''
+        return blank.to_numpy() | ((codes >= 0) & blank_categories[np.maximum(codes, 0)])
+    if series.dtype == object or pd.api.types.is_string_dtype(series):
+        blank |= series.astype(str).str.strip().eq('')
+    return blank.to_numpy()
+
+
+def _type_check(column: str, data_type: str, allowed: Optional[Sequence[Any]]) -> Optional[Check]:
+    """Векторная проверка типа столбца; None — тип не проверяется"""
+    def present(df: pd.DataFrame) -> pd.Series:
+        return df[column].notna()
+
+    if data_type == 'integer':
+        def check(df):
+            values = pd.to_numeric(df[column], errors='coerce')
+            return (present(df) & (values.isna() | (values % 1 != 0))).to_numpy()
+    elif data_type in ('numeric', 'float', 'decimal'):
+        def check(df):
+            return (present(df) & pd.to_numeric(df[column], errors='coerce').isna()).to_numpy()
+    elif data_type in ('date', 'datetime', 'timestamp'):
+        def check(df):
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                return np.zeros(len(df), dtype=bool)
+            return (present(df) & pd.to_datetime(df[column], errors='coerce').isna()).to_numpy()
+    elif data_type == 'enum' and allowed:
+        def check(df):
+            return (present(df) & ~df[column].isin(list(allowed))).to_numpy()
+    elif data_type == 'email':
+        def check(df):
+            valid = df[column].astype(str).str.match(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+            return (present(df) & ~valid).to_numpy()
+    else:
+        return None
+    return check
+
+
+def _business_check(column: str, expression: str) -> Check:
+    """Компилирует правило вида "> 0" в векторную проверку"""
+    match = RULE_PATTERN.match(str(expression))
+    if not match:
+        raise ValueError(f"Не удалось разобрать правило '{expression}' для {column}")
+
+    op = RULE_OPERATORS[match.group(1)]
+    raw_value = match.group(2)
+    try:
+        value: Any = float(raw_value)
+        numeric = True
+    except ValueError:
+        value = raw_value.strip('\'"')
+        numeric = False
+
+    def check(df):
+        series = pd.to_numeric(df[column], errors='coerce') if numeric else df[column]
+        # Пустые значения — забота required_fields, здесь не считаются нарушением
+        return (series.notna() & ~op(series, value)).to_numpy()
+    return check
+
+
+class RuleEngine:
+    """Проверка таблиц по quality_rules из data_config.json
+
+    Правила компилируются один раз; каждая таблица загружается один раз,
+    и все ее правила вычисляются над одним DataFrame. Для каждого правила
+    возвращаются число нарушений, примеры номеров строк и время в мс.
+    """
+
+    def __init__(self, quality_rules: Dict[str, Dict[str, Any]],
+                 load_table: Callable[[str], pd.DataFrame], max_examples: int = 5):
+        self.quality_rules = quality_rules
+        self.load_table = load_table
+        self.max_examples = max_examples
+        self.compiled = {table: self._compile(rules) for table, rules in quality_rules.items()}
+
+    def _compile(self, rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Превращает правила таблицы в список проверок"""
+        compiled = []
+        for column in rules.get('required_fields', []):
+            compiled.append({'rule': 'required', 'columns': [column],
+                             'check': lambda df, c=column: _is_blank(df[c])})
+
+        for column in rules.get('unique_fields', []):
+            columns = column if isinstance(column, list) else [column]
+            compiled.append({'rule': 'unique', 'columns': columns,
+                             'check': lambda df, c=columns: df.duplicated(subset=c).to_numpy()})
+
+        enum_values = rules.get('enum_values', {})
+        for column, data_type in rules.get('data_types', {}).items():
+            check = _type_check(column, data_type, enum_values.get(column))
+            if check is None:
+                compiled.append({'rule': f'type:{data_type}', 'columns': [column], 'check': None,
+                                 'note': 'тип не проверяется (нет enum_values или неизвестный тип)'})
+            else:
+                compiled.append({'rule': f'type:{data_type}', 'columns': [column], 'check': check})
+
+        # Составной ключ записывается через запятую: "a,b": "parent.a,b"
+        for column, reference in rules.get('foreign_keys', {}).items():
+            parent_table, parent_columns = reference.split('.', 1)
+            compiled.append({'rule': f'fk:{reference}', 'columns': _split_columns(column),
+                             'reference': (parent_table, _split_columns(parent_columns)), 'check': None})
+
+        for column, expression in rules.get('business_rules', {}).items():
+            compiled.append({'rule': f'rule:{expression}', 'columns': [column],
+                             'check': _business_check(column, expression)})
+        return compiled
+
+    def run(self, tables: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Проверяет таблицы и возвращает результаты по каждому правилу"""
+        results = []
+        frames: Dict[str, pd.DataFrame] = {}
+
+        def frame(table: str) -> pd.DataFrame:
+            if table not in frames:
+                frames[table] = self.load_table(table)
+            return frames[table]
+
+        started = time.perf_counter()
+        for table in tables or list(self.compiled):
+            try:
+                df = frame(table)
+            except Exception as e:
+                results.append({'table': table, 'rule': 'load', 'columns': [], 'status': 'error',
+                                'violations': 0, 'rows': [], 'time_ms': 0.0, 'message': str(e)})
+                continue
+
+            for rule in self.compiled[table]:
+                results.append(self._evaluate(table, df, rule, frame))
+
+        return {
+            'rules': results,
+            'total_violations': sum(item['violations'] for item in results),
+            'time_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _evaluate(self, table: str, df: pd.DataFrame, rule: Dict[str, Any],
+                  frame: Callable[[str], pd.DataFrame]) -> Dict[str, Any]:
+        """Вычисляет одно правило над загруженной таблицей"""
+        result = {'table': table, 'rule': rule['rule'], 'columns': rule['columns'],
+                  'status': 'ok', 'violations': 0, 'rows': [], 'time_ms': 0.0}
+
+        missing = [column for column in rule['columns'] if column not in df.columns]
+        if missing:
+            result.update(status='skipped', message=f"нет столбцов: {', '.join(missing)}")
+            return result
+        if rule.get('note'):
+            result.update(status='skipped', message=rule['note'])
+            return result
+
+        started = time.perf_counter()
+        try:
+            if 'reference' in rule:
+                parent_table, parent_columns = rule['reference']
+                fk = check_foreign_key(df, frame(parent_table), rule['columns'], parent_columns,
+                                       max_examples=self.max_examples)
+                mask = fk['mask']
+                result['examples'] = fk['examples']
+            else:
+                mask = rule['check'](df)
+        except Exception as e:
+            result.update(status='error', message=str(e))
+            return result
+
+        positions = np.flatnonzero(mask)
+        result['time_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        result['violations'] = int(len(positions))
+        result['rows'] = [int(pos) + HEADER_LINES + 1 for pos in positions[:self.max_examples]]
+        if len(positions):
+            result['status'] = 'failed'
+        return result
+
+
+def _split_columns(spec: str) -> List[str]:
+    """Разбирает список столбцов вида "a,b" """
+    return [column.strip() for column in spec.split(',') if column.strip()]
+
+
+def rule_errors(results: Dict[str, Any]) -> Dict[str, list]:
+    """Переводит результаты RuleEngine в словарь {таблица: [ошибки]}, как у DataLoader.validate_data()"""
+    errors: Dict[str, list] = {}
+    for item in results['rules']:
+        table_errors = errors.setdefault(item['table'], [])
+        if item['status'] == 'failed':
+            rows = ', '.join(str(row) for row in item['rows'])
+            more = ' …' if item['violations'] > len(item['rows']) else ''
+            table_errors.append(f"{item['rule']} {'+'.join(item['columns'])}: "
+                                f"{item['violations']} (строки {rows}{more})")
+        elif item['status'] == 'error':
+            table_errors.append(f"{item['rule']} {'+'.join(item['columns'])}: ошибка — {item['message']}")
+    return errors
+
+
+def _estimate_rows(path: Path, sample_bytes: int = 1 << 20) -> int:
+    """Оценивает число строк файла по средней длине строки в начале файла"""
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    lines = max(sample.count(b'\n'), 1)
+    return max(int(size / (len(sample) / lines)), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Потоковая валидация выгрузок клиентов и продаж')
+    parser.add_argument('--data-dir', default='.', help='Папка с CSV файлами')
+    parser.add_argument('--customers', default='sample_customers.csv', help='Файл клиентов')
+    parser.add_argument('--sales', default='sample_sales.csv', help='Файл продаж')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Строк в порции')
+    parser.add_argument('--bloom', action='store_true', help='Bloom-фильтр для дубликатов (меньше памяти, два прохода)')
+    parser.add_argument('--json', action='store_true', help='Вывести нарушения в JSON')
+
+    args = parser.parse_args()
+    data_dir = Path(args.data_dir)
+
+    validator = StreamingValidator(data_dir / args.customers, data_dir / args.sales,
+                                   chunksize=args.chunksize, bloom=args.bloom)
+    errors = validator.validate()
+
+    if args.json:
+        print(json.dumps(validator.report(), indent=2, ensure_ascii=False))
+        return
+
+    print("🔍 Результаты потоковой валидации:")
+    for table, table_errors in errors.items():
+        if table_errors:
+            print(f"❌ {table}: {'; '.join(table_errors)}")
+        else:
+            print(f"✅ {table}: Ошибок не найдено")
+
+
+if __name__ == '__main__':
+    main()
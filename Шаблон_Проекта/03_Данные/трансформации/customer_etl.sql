@@ -18,7 +18,7 @@ SELECT
     c.customer_id,
     TRIM(UPPER(c.name)) as customer_name,
     LOWER(c.email) as email,
-    REGEXP_REPLACE(c.phone, '[^0-9+]', '') as phone,
+    REGEXP_REPLACE(c.phone, '[^0-9+]', '', 'g') as phone,
     c.registration_date,
     CASE 
         WHEN c.status = 'А' THEN 'active'
@@ -56,9 +56,19 @@ USING (
         phone,
         registration_date,
         status,
-        load_date,
-        ROW_NUMBER() OVER (PARTITION BY source_customer_id ORDER BY load_date DESC) as rn
-    FROM staging.customers
+        load_date
+    FROM (
+        SELECT 
+            source_customer_id,
+            customer_name,
+            email,
+            phone,
+            registration_date,
+            status,
+            load_date,
+            ROW_NUMBER() OVER (PARTITION BY source_customer_id ORDER BY load_date DESC) as rn
+        FROM staging.customers
+    ) ranked
     WHERE rn = 1
 ) AS source
 ON target.source_customer_id = source.source_customer_id 
@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+"""
+Исследовательский анализ больших таблиц по агрегатам
+
+Таблица читается порциями один раз, в памяти остаются только агрегаты:
+- гистограммы — счетчики в заранее размеченных интервалах; если значение
+  выходит за границы, ширина интервалов удваивается (соседние объединяются),
+  поэтому счет точный, а размер не зависит от числа строк;
+- корреляции — суммы и попарные произведения по порциям (точный Пирсон с
+  попарным исключением пропусков, как DataFrame.corr) с доверительными
+  границами по Фишеру; для очень широких таблиц — по выборке;
+- равномерная выборка строк (reservoir) для осмотра и диаграмм рассеяния.
+
+Графики строятся из агрегатов, поэтому ноутбук работает и на таблицах
+в сотни миллионов строк.
+
+Пример:
+    from eda import profile
+    stats = profile('data/sample_data.csv', parse_dates=['date'])
+    stats.summary()
+    stats.plot_histograms()
+"""
+
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 500_000
+DEFAULT_BINS = 50
+DEFAULT_SAMPLE_SIZE = 10_000
+# Больше столбцов — корреляции по выборке: попарные суммы стоят O(строк × столбцов²)
+MAX_CHUNKED_CORRELATION_COLUMNS = 50
+
+Source = Union[str, Path, pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+class StreamingHistogram:
+    """Гистограмма с точными счетчиками и фиксированным числом интервалов
+
+    Границы задаются первой порцией (или value_range); значения за их
+    пределами расширяют диапазон удвоением ширины интервалов. Если диапазон
+    задан явно, выбросы считаются отдельно (below, above) и не расширяют его.
+    """
+
+    def __init__(self, bins: int = DEFAULT_BINS, integer: bool = False,
+                 value_range: Optional[Tuple[float, float]] = None):
+        self.bins = bins + bins % 2
+        self.integer = integer
+        self.fixed = value_range is not None
+        self.origin: Optional[float] = None
+        self.width = 1.0
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+        if value_range is not None:
+            self.origin = float(value_range[0])
+            self.width = (float(value_range[1]) - self.origin) / self.bins
+
+    def add(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.origin is None:
+            self._start(low, high)
+
+        if self.fixed:
+            below = values < self.origin
+            above = values > self.origin + self.bins * self.width
+            self.below += int(np.count_nonzero(below))
+            self.above += int(np.count_nonzero(above))
+            values = values[~below & ~above]
+        else:
+            while high >= self.origin + self.bins * self.width:
+                self._grow(left=False)
+            while low < self.origin:
+                self._grow(left=True)
+
+        index = ((values - self.origin) / self.width).astype(np.int64)
+        np.clip(index, 0, self.bins - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def _start(self, low: float, high: float) -> None:
+        if self.integer:
+            # Целые значения — в центрах интервалов целой ширины
+            self.width = float(max(1, math.ceil((high - low + 1) / self.bins)))
+            self.origin = low - 0.5
+        else:
+            self.width = (high - low) / self.bins if high > low else (abs(low) or 1.0) / self.bins
+            self.origin = low
+
+    def _grow(self, left: bool) -> None:
+        """Удваивает ширину интервалов, расширяя диапазон влево или вправо"""
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        empty = np.zeros(self.bins // 2, dtype=np.int64)
+        if left:
+            self.origin -= self.bins * self.width
+            self.counts = np.concatenate([empty, merged])
+        else:
+            self.counts = np.concatenate([merged, empty])
+        self.width *= 2
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы и счетчики без пустых интервалов по краям"""
+        if self.origin is None or not self.counts.any():
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        nonzero = np.flatnonzero(self.counts)
+        first, last = (0, self.bins - 1) if self.fixed else (nonzero[0], nonzero[-1])
+        edges = self.origin + self.width * np.arange(first, last + 2)
+        return edges, self.counts[first:last + 1]
+
+    def quantile(self, q: float) -> float:
+        """Квантиль по гистограмме (линейно внутри интервала)"""
+        edges, counts = self.result()
+        if not len(counts):
+            return math.nan
+        cumulative = np.r_[0, np.cumsum(counts)]
+        return float(np.interp(q * cumulative[-1], cumulative, edges))
+
+
+class EDA:
+    """Агрегаты для EDA, накапливаемые по порциям таблицы"""
+
+    def __init__(self, bins: int = DEFAULT_BINS, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                 correlation: str = 'auto', seed: int = 0):
+        if correlation not in ('auto', 'chunked', 'sample'):
+            raise ValueError(f"Неизвестный способ корреляции: {correlation} (доступны: auto, chunked, sample)")
+        self.bins = bins
+        self.sample_size = sample_size
+        self.ranges = ranges or {}
+        self.correlation_mode = correlation
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.nulls: Dict[str, int] = {}
+        self.numeric: List[str] = []
+        self.dates: List[str] = []
+        self.histograms: Dict[str, StreamingHistogram] = {}
+        self.extremes: Dict[str, List[Any]] = {}
+        self._sample: Optional[pd.DataFrame] = None
+
+        # Попарные суммы (значения сдвинуты на среднее первой порции — меньше потеря точности)
+        self.shift: Optional[np.ndarray] = None
+        self.n = self.sx = self.sxx = self.sxy = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Добавляет порцию строк"""
+        if not len(chunk):
+            return
+        if not self.columns:
+            self._start(chunk)
+        self.rows += len(chunk)
+
+        for column in self.columns:
+            self.nulls[column] += int(chunk[column].isna().sum())
+
+        for column in self.dates:
+            values = pd.to_datetime(chunk[column], errors='coerce').dropna()
+            if len(values):
+                low, high = values.min(), values.max()
+                current = self.extremes.get(column)
+                self.extremes[column] = [low, high] if current is None else [min(current[0], low), max(current[1], high)]
+
+        matrix = self._numeric_matrix(chunk)
+        finite = np.isfinite(matrix)
+        for index, column in enumerate(self.numeric):
+            values = matrix[finite[:, index], index]
+            self.histograms[column].add(values)
+            if len(values):
+                low, high = float(values.min()), float(values.max())
+                current = self.extremes.get(column)
+                self.extremes[column] = [low, high] if current is None else [min(current[0], low), max(current[1], high)]
+
+        if self._chunked_correlation and self.numeric:
+            self._add_moments(matrix, finite)
+        self._add_sample(chunk)
+
+    def _start(self, chunk: pd.DataFrame) -> None:
+        self.columns = list(chunk.columns)
+        self.dtypes = {column: str(dtype) for column, dtype in chunk.dtypes.items()}
+        self.nulls = {column: 0 for column in self.columns}
+        self.dates = [column for column in self.columns
+                      if pd.api.types.is_datetime64_any_dtype(chunk[column].dtype)]
+        self.numeric = [column for column in self.columns
+                        if pd.api.types.is_numeric_dtype(chunk[column].dtype)
+                        and not pd.api.types.is_bool_dtype(chunk[column].dtype)]
+        self.histograms = {
+            column: StreamingHistogram(self.bins, pd.api.types.is_integer_dtype(chunk[column].dtype),
+                                       self.ranges.get(column))
+            for column in self.numeric
+        }
+        self._chunked_correlation = (self.correlation_mode == 'chunked' or (
+            self.correlation_mode == 'auto' and len(self.numeric) <= MAX_CHUNKED_CORRELATION_COLUMNS))
+
+    def _numeric_matrix(self, chunk: pd.DataFrame) -> np.ndarray:
+        if not self.numeric:
+            return np.empty((len(chunk), 0))
+        frame = chunk[self.numeric]
+        # В следующих порциях CSV числовой столбец может прочитаться как текст
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            frame = frame.apply(pd.to_numeric, errors='coerce')
+        return frame.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _add_moments(self, matrix: np.ndarray, finite: np.ndarray) -> None:
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                counts = finite.sum(axis=0)
+                self.shift = np.where(counts > 0, np.where(finite, matrix, 0).sum(axis=0) / np.maximum(counts, 1), 0)
+            size = len(self.numeric)
+            self.n, self.sx, self.sxx, self.sxy = (np.zeros((size, size)) for _ in range(4))
+        present = finite.astype(np.float64)
+        values = np.where(finite, matrix - self.shift, 0.0)
+        self.n += present.T @ present
+        # sx[i, j] — сумма столбца i по строкам, где заполнены и i, и j
+        self.sx += values.T @ present
+        self.sxx += (values * values).T @ present
+        self.sxy += values.T @ values
+
+    def _add_sample(self, chunk: pd.DataFrame) -> None:
+        """Равномерная выборка: строки с наименьшими случайными ключами"""
+        if not self.sample_size:
+            return
+        chunk = chunk.assign(_sample_key=self.rng.random(len(chunk)))
+        combined = chunk if self._sample is None else pd.concat([self._sample, chunk], ignore_index=True)
+        if len(combined) > self.sample_size:
+            keep = np.argpartition(combined['_sample_key'].to_numpy(), self.sample_size - 1)[:self.sample_size]
+            combined = combined.iloc[keep]
+        self._sample = combined
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        """Равномерная выборка строк (не больше sample_size)"""
+        if self._sample is None:
+            return pd.DataFrame(columns=self.columns)
+        return self._sample.sort_values('_sample_key').drop(columns='_sample_key').reset_index(drop=True)
+
+    def min(self, column: str) -> Any:
+        return self.extremes.get(column, [None, None])[0]
+
+    def max(self, column: str) -> Any:
+        return self.extremes.get(column, [None, None])[1]
+
+    def missing(self) -> pd.Series:
+        """Число пропусков по столбцам (как data.isnull().sum())"""
+        return pd.Series(self.nulls, dtype='int64').reindex(self.columns)
+
+    def summary(self) -> pd.DataFrame:
+        """Характеристики столбцов (вместо info() и describe())
+
+        Среднее и стандартное отклонение точные, квартили — по гистограмме.
+        """
+        records = []
+        for column in self.columns:
+            record: Dict[str, Any] = {'column': column, 'dtype': self.dtypes[column],
+                                      'count': self.rows - self.nulls[column], 'nulls': self.nulls[column],
+                                      'null_rate': self.nulls[column] / self.rows if self.rows else 0.0}
+            if column in self.histograms:
+                histogram = self.histograms[column]
+                record.update({'mean': self._mean(column), 'std': self._std(column), 'min': self.min(column),
+                               '25%': histogram.quantile(0.25), '50%': histogram.quantile(0.5),
+                               '75%': histogram.quantile(0.75), 'max': self.max(column)})
+            elif column in self.dates:
+                record.update({'min': self.min(column), 'max': self.max(column)})
+            records.append(record)
+        return pd.DataFrame(records).set_index('column')
+
+    def _diagonal(self, column: str) -> Tuple[float, float, float]:
+        index = self.numeric.index(column)
+        if self.n is not None:
+            return self.n[index, index], self.sx[index, index], self.sxx[index, index]
+        # Корреляции по выборке: среднее и разброс тоже оцениваются по ней
+        values = pd.to_numeric(self.sample[column], errors='coerce').dropna().to_numpy(dtype=np.float64)
+        return float(len(values)), float(values.sum()), float((values ** 2).sum())
+
+    def _mean(self, column: str) -> float:
+        count, total, _ = self._diagonal(column)
+        shift = self.shift[self.numeric.index(column)] if self.n is not None else 0.0
+        return shift + total / count if count else math.nan
+
+    def _std(self, column: str) -> float:
+        count, total, squares = self._diagonal(column)
+        return math.sqrt(max(squares - total * total / count, 0.0) / (count - 1)) if count > 1 else math.nan
+
+    def histogram(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы интервалов и счетчики числового столбца"""
+        return self.histograms[column].result()
+
+    def correlation(self, from_sample: bool = False) -> pd.DataFrame:
+        """Матрица корреляций Пирсона числовых столбцов
+
+        По умолчанию точная по всем строкам (если таблица не слишком широкая),
+        from_sample=True — по выборке.
+        """
+        r, _ = self._correlation(from_sample)
+        return r
+
+    def correlation_bounds(self, confidence: float = 0.95,
+                           from_sample: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Нижняя и верхняя доверительные границы корреляций (преобразование Фишера)"""
+        r, n = self._correlation(from_sample)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            center = np.arctanh(np.clip(r.to_numpy(), -0.999999, 0.999999))
+            spread = z / np.sqrt(n - 3)
+            low = np.where(n > 3, np.tanh(center - spread), -1.0)
+            high = np.where(n > 3, np.tanh(center + spread), 1.0)
+        low[np.isnan(r.to_numpy())] = np.nan
+        high[np.isnan(r.to_numpy())] = np.nan
+        return (pd.DataFrame(low, index=r.index, columns=r.columns),
+                pd.DataFrame(high, index=r.index, columns=r.columns))
+
+    def _correlation(self, from_sample: bool) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Корреляции и число пар, по которым они посчитаны"""
+        if from_sample or self.n is None:
+            sample = self.sample[self.numeric].apply(pd.to_numeric, errors='coerce')
+            present = sample.notna().to_numpy(dtype=np.float64)
+            return sample.corr(), present.T @ present
+
+        n, sx, sxx, sxy = self.n, self.sx, self.sxx, self.sxy
+        sy, syy = sx.T, sxx.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(np.diag(n) > 1, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.numeric, columns=self.numeric), n
+
+    def plot_histograms(self, columns: Optional[Sequence[str]] = None, ncols: int = 3):
+        """Гистограммы числовых столбцов по накопленным счетчикам"""
+        import matplotlib.pyplot as plt
+
+        columns = list(columns or self.numeric)
+        nrows = max((len(columns) + ncols - 1) // ncols, 1)
+        fig, axes = plt.subplots(nrows, ncols, figsize=(5 * ncols, 4 * nrows), squeeze=False)
+        axes = axes.flatten()
+        for ax, column in zip(axes, columns):
+            edges, counts = self.histogram(column)
+            ax.stairs(counts, edges, fill=True)
+            ax.set_title(f'Распределение {column}')
+            ax.set_xlabel(column)
+            ax.set_ylabel('Частота')
+        # Скрываем лишние subplot'ы
+        for ax in axes[len(columns):]:
+            ax.set_visible(False)
+        fig.tight_layout()
+        return fig
+
+    def plot_correlation(self, from_sample: bool = False, annotate: Optional[bool] = None):
+        """Тепловая карта корреляций"""
+        import matplotlib.pyplot as plt
+
+        matrix = self.correlation(from_sample)
+        size = len(matrix)
+        annotate = size <= 15 if annotate is None else annotate
+        fig, ax = plt.subplots(figsize=(max(6, 0.6 * size + 4), max(5, 0.6 * size + 3)))
+        image = ax.imshow(matrix.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1)
+        ax.set_xticks(range(size), matrix.columns, rotation=90)
+        ax.set_yticks(range(size), matrix.index)
+        if annotate:
+            for i in range(size):
+                for j in range(size):
+                    value = matrix.iat[i, j]
+                    if not np.isnan(value):
+                        ax.text(j, i, f'{value:.2f}', ha='center', va='center', fontsize=9)
+        fig.colorbar(image, ax=ax)
+        ax.set_title('Корреляционная матрица' + (' (по выборке)' if from_sample or self.n is None else ''))
+        fig.tight_layout()
+        return fig
+
+
+def iter_chunks(source: Source, chunksize: int = DEFAULT_CHUNKSIZE, columns: Optional[List[str]] = None,
+                parse_dates: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Порции таблицы: CSV, Parquet, DataFrame или готовый итератор порций
+    (например, DataLoader.fetch_table)"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize] if columns is None else source[columns].iloc[start:start + chunksize]
+        return
+
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Файл {path} не найден")
+        if path.suffix == '.parquet':
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Для Parquet установите pyarrow: pip install pyarrow")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+            return
+        usecols = None if columns is None else list(dict.fromkeys(columns + (parse_dates or [])))
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=usecols, parse_dates=parse_dates)
+        return
+
+    for chunk in source:
+        if parse_dates:
+            chunk = chunk.assign(**{column: pd.to_datetime(chunk[column], errors='coerce') for column in parse_dates})
+        yield chunk if columns is None else chunk[columns]
+
+
+def profile(source: Source, columns: Optional[List[str]] = None, parse_dates: Optional[List[str]] = None,
+            chunksize: int = DEFAULT_CHUNKSIZE, date_range: Optional[Tuple[str, Any, Any]] = None,
+            **options) -> EDA:
+    """Агрегаты EDA за один проход по таблице
+
+    date_range — (столбец, начало, конец): только строки периода, границы
+    включительно, None — без границы.
+    options — параметры EDA: bins, sample_size, ranges ({'price': (0, 5000)}),
+    correlation ('auto', 'chunked', 'sample'), seed.
+    """
+    if date_range is not None and date_range[0] not in (parse_dates or []):
+        parse_dates = list(parse_dates or []) + [date_range[0]]
+    stats = EDA(**options)
+    for chunk in iter_chunks(source, chunksize, columns, parse_dates):
+        if date_range is not None:
+            chunk = chunk[_in_period(chunk[date_range[0]], date_range[1], date_range[2])]
+        stats.update(chunk)
+    return stats
+
+
+def _in_period(values: pd.Series, start: Any, end: Any) -> pd.Series:
+    # Без границ строки с пропущенной датой остаются; сравнение с NaT ложно
+    mask = pd.Series(True, index=values.index)
+    if start is not None:
+        mask &= values >= pd.Timestamp(start)
+    if end is not None:
+        mask &= values <= pd.Timestamp(end)
+    return mask
@@ -42,59 +42,56 @@ pd.set_option('display.max_rows', 100)
 
 print("✅ Библиотеки загружены")
 
+# %% Параметры tags=["parameters"]
+# Значения по умолчанию; при запуске через scripts/notebook_runner.py
+# переопределяются ключами -p, например: -p DATE_FROM=2024-01-01
+DATA_PATH = 'data/sample_data.csv'
+DATE_FROM = None
+DATE_TO = None
+
 # %% [markdown]
 # ## 1. Загрузка и первичный осмотр данных
 
 # %% Загрузка данных
-# Замените на ваши источники данных
-data = pd.read_csv('data/sample_data.csv')
+# Замените на ваши источники данных (CSV, Parquet, DataFrame или порции
+# DataLoader.fetch_table). Таблица читается порциями: в памяти остаются
+# только агрегаты и выборка строк, поэтому подходит и для 100M строк (см. eda.py)
+from eda import profile
 
-print(f"Размер данных: {data.shape}")
-print(f"Период данных: {data['date'].min()} - {data['date'].max()}")
+stats = profile(DATA_PATH, parse_dates=['date'], date_range=('date', DATE_FROM, DATE_TO))
+# Равномерная выборка строк для осмотра и точечных графиков
+data = stats.sample
 
-# %% Первичный анализ
-print("Информация о данных:")
-data.info()
+print(f"Размер данных: ({stats.rows}, {len(stats.columns)})")
+print(f"Период данных: {stats.min('date')} - {stats.max('date')}")
 
-print("\nСтатистические характеристики:")
-data.describe()
+# %% Первичный анализ
+print("Характеристики столбцов:")
+print(stats.summary())
 
 print("\nПропущенные значения:")
-missing = data.isnull().sum()
+missing = stats.missing()
 print(missing[missing > 0])
 
 # %% [markdown]
 # ## 2. Исследовательский анализ данных (EDA)
 
 # %% Распределения числовых переменных
-numeric_cols = data.select_dtypes(include=[np.number]).columns
-n_cols = len(numeric_cols)
-n_rows = (n_cols + 2) // 3
-
-fig, axes = plt.subplots(n_rows, 3, figsize=(15, 5*n_rows))
-axes = axes.flatten() if n_rows > 1 else [axes]
-
-for i, col in enumerate(numeric_cols):
-    if i < len(axes):
-        data[col].hist(bins=30, ax=axes[i])
-        axes[i].set_title(f'Распределение {col}')
-        axes[i].set_xlabel(col)
-        axes[i].set_ylabel('Частота')
-
-# Скрываем лишние subplot'ы
-for i in range(len(numeric_cols), len(axes)):
-    axes[i].set_visible(False)
-
-plt.tight_layout()
+# Гистограммы по счетчикам, накопленным при чтении всех строк
+numeric_cols = stats.numeric
+stats.plot_histograms(numeric_cols)
 plt.show()
 
 # %% Корреляционная матрица
-plt.figure(figsize=(10, 8))
-correlation_matrix = data[numeric_cols].corr()
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-plt.title('Корреляционная матрица')
+# Точные корреляции по всем строкам; для таблиц шире 50 числовых столбцов —
+# по выборке (profile(..., correlation='sample'))
+correlation_matrix = stats.correlation()
+stats.plot_correlation()
 plt.show()
 
+# Границы 95% доверительного интервала (для корреляций по выборке — шире)
+correlation_low, correlation_high = stats.correlation_bounds()
+
 # %% [markdown]
 # ## 3. Проверка гипотез
 
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Тесты потокового EDA: агрегаты по порциям совпадают с pandas"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda import profile
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(0)
+    dates = pd.Series(pd.date_range('2024-01-01', periods=1_000, freq='h'))
+    dates[::10] = pd.NaT
+    return pd.DataFrame({'order_date': dates, 'amount': rng.normal(100, 20, 1_000),
+                         'quantity': rng.integers(1, 10, 1_000)})
+
+
+def test_profile_matches_pandas_across_chunks(orders):
+    stats = profile(orders, chunksize=128)
+    summary = stats.summary()
+    assert stats.rows == len(orders)
+    assert summary.loc['amount', 'mean'] == pytest.approx(orders['amount'].mean())
+    assert summary.loc['amount', 'std'] == pytest.approx(orders['amount'].std())
+    assert stats.missing().to_dict() == orders.isna().sum().to_dict()
+    assert stats.correlation().loc['amount', 'quantity'] == pytest.approx(
+        orders[['amount', 'quantity']].corr().loc['amount', 'quantity'])
+
+
+def test_date_range_without_bounds_keeps_missing_dates(orders):
+    stats = profile(orders, chunksize=128, date_range=('order_date', None, None))
+    assert stats.rows == len(orders)
+
+
+def test_date_range_bounds_are_inclusive(orders):
+    start, end = pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-03')
+    stats = profile(orders, chunksize=128, date_range=('order_date', start, end))
+    expected = orders['order_date'].between(start, end)
+    assert stats.rows == int(expected.sum())
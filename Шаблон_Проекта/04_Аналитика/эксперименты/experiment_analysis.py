@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""
+Анализ A/B экспериментов по спецификации из документа эксперимента
+
+Документ эксперимента (experiment_template.md) содержит JSON-спецификацию
+в разделе «Спецификация анализа»: файл данных, столбцы единицы и группы,
+контрольную группу, метрики, параметры последовательного теста и бутстрепа.
+Строки событий агрегируются до единиц рандомизации, затем каждая тестовая
+группа сравнивается с контролем:
+
+- разница средних (Уэлч) или долей (z-тест): абсолютная и относительная, с ДИ;
+- CUPED: поправка метрики на ковариату до эксперимента, снижение дисперсии;
+- границы последовательного теста (alpha-spending Лана — ДеМетса);
+- бутстреп-ДИ разницы и лифта: повторные выборки пачками NumPy по корзинам
+  единиц (суммы и счетчики случайных корзин), поэтому стоимость не зависит
+  от числа единиц.
+
+Результаты записываются в документ между метками experiment-results.
+Все расчеты векторные: миллионы единиц в группе обрабатываются за секунды.
+Нормальное распределение — statistics.NormalDist, scipy не нужен. Для
+выборок меньше нескольких сотен единиц нормальное приближение неточно.
+
+Пример:
+    python experiment_analysis.py experiment_template.md
+"""
+
+import argparse
+import json
+import math
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+SPEC_HEADING = re.compile(r'^#+ .*Спецификация анализа.*$', re.M)
+SPEC_BLOCK = re.compile(r'```json\s*\n(.*?)\n```', re.S)
+RESULTS_START = '<!-- experiment-results:start -->'
+RESULTS_END = '<!-- experiment-results:end -->'
+RESULTS_HEADING = '## 13. Результаты анализа'
+
+DEFAULT_ALPHA = 0.05
+METRIC_TYPES = ('mean', 'proportion')
+# Агрегация строк событий до единицы рандомизации
+DEFAULT_AGGREGATES = {'mean': 'sum', 'proportion': 'max'}
+SPENDING_FUNCTIONS = ('obrien_fleming', 'pocock')
+# Точек сетки при численном интегрировании для границ последовательного теста
+SEQUENTIAL_GRID = 801
+DEFAULT_BOOTSTRAP_ITERATIONS = 2000
+# Единицы раскладываются по корзинам; повторные выборки берутся из корзин
+BOOTSTRAP_BUCKETS = 10_000
+# Сколько элементов (повторов × корзин) обрабатывается за одну пачку
+BOOTSTRAP_BATCH_ELEMENTS = 1 << 22
+
+NORMAL = NormalDist()
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Векторная функция распределения N(0, 1)"""
+    return 0.5 * _erfc(-np.asarray(x, dtype=float) / math.sqrt(2)).astype(float)
+
+
+def _two_sided_p(z: float) -> float:
+    return 2 * (1 - NORMAL.cdf(abs(z))) if math.isfinite(z) else float('nan')
+
+
+# --- спецификация и данные ---
+
+def read_spec(doc_path: Path) -> Dict[str, Any]:
+    """JSON-спецификация из раздела «Спецификация анализа» документа"""
+    text = Path(doc_path).read_text(encoding='utf-8')
+    heading = SPEC_HEADING.search(text)
+    block = SPEC_BLOCK.search(text, heading.end()) if heading else None
+    if block is None:
+        raise ValueError("В документе нет раздела «Спецификация анализа» с блоком ```json")
+    spec = json.loads(block.group(1))
+    check_spec(spec)
+    return spec
+
+
+def check_spec(spec: Dict[str, Any]) -> None:
+    """Проверяет обязательные поля спецификации"""
+    for key in ('data', 'group', 'control', 'metrics'):
+        if key not in spec:
+            raise ValueError(f"В спецификации нет поля '{key}'")
+    for metric in spec['metrics']:
+        if 'column' not in metric:
+            raise ValueError(f"У метрики нет поля 'column': {metric}")
+        if metric.get('type', 'mean') not in METRIC_TYPES:
+            raise ValueError(f"Тип метрики должен быть одним из {METRIC_TYPES}: {metric}")
+    spending = spec.get('sequential', {}).get('spending', 'obrien_fleming')
+    if spending not in SPENDING_FUNCTIONS:
+        raise ValueError(f"Функция расходования alpha должна быть одной из {SPENDING_FUNCTIONS}")
+
+
+def load_units(spec: Dict[str, Any], data: Any) -> Tuple[pd.DataFrame, int]:
+    """Таблица единиц рандомизации: одна строка на единицу
+
+    data — путь к CSV/Parquet или DataFrame. Если задан столбец unit и строк
+    на единицу несколько (события), метрики агрегируются (sum для средних,
+    max для долей или aggregate из метрики), ковариаты — first. Единицы,
+    попавшие в несколько групп, исключаются; их число возвращается вторым.
+    """
+    metrics = spec['metrics']
+    columns = [spec['group']] + [metric['column'] for metric in metrics] \
+        + [metric['covariate'] for metric in metrics if metric.get('covariate')]
+    if spec.get('unit'):
+        columns.append(spec['unit'])
+    columns = list(dict.fromkeys(columns))
+
+    if isinstance(data, pd.DataFrame):
+        frame = data[columns]
+    else:
+        path = Path(data)
+        if path.suffix == '.parquet':
+            frame = pd.read_parquet(path, columns=columns)
+        else:
+            frame = pd.read_csv(path, usecols=columns)
+
+    unit = spec.get('unit')
+    if not unit or frame[unit].is_unique:
+        return frame, 0
+
+    grouped = frame.groupby(unit, sort=False)
+    groups = grouped[spec['group']].agg(['first', 'nunique'])
+    aggregations = {}
+    for metric in metrics:
+        kind = metric.get('type', 'mean')
+        aggregations[metric['column']] = metric.get('aggregate', DEFAULT_AGGREGATES[kind])
+        if metric.get('covariate'):
+            aggregations.setdefault(metric['covariate'], 'first')
+    units = grouped.agg(aggregations)
+    units[spec['group']] = groups['first']
+    mixed = groups['nunique'] > 1
+    return units[~mixed.to_numpy()].reset_index(), int(mixed.sum())
+
+
+# --- статистика ---
+
+def mean_difference(control: np.ndarray, test: np.ndarray, alpha: float = DEFAULT_ALPHA,
+                    proportion: bool = False) -> Dict[str, float]:
+    """Разница средних (или долей) тест − контроль с ДИ и p-value
+
+    Для долей p-value считается по объединенной доле (z-тест), ДИ — по
+    раздельным дисперсиям. Относительный лифт — дельта-методом.
+    """
+    n0, n1 = len(control), len(test)
+    m0, m1 = float(control.mean()), float(test.mean())
+    v0, v1 = float(control.var(ddof=1)), float(test.var(ddof=1))
+    diff = m1 - m0
+    se = math.sqrt(v0 / n0 + v1 / n1)
+    if proportion:
+        pooled = (m0 * n0 + m1 * n1) / (n0 + n1)
+        se_test = math.sqrt(pooled * (1 - pooled) * (1 / n0 + 1 / n1))
+    else:
+        se_test = se
+    z = diff / se_test if se_test > 0 else float('nan')
+    q = NORMAL.inv_cdf(1 - alpha / 2)
+
+    lift = lift_se = float('nan')
+    if m0 != 0:
+        lift = diff / m0
+        lift_se = math.sqrt(v1 / n1 / m0 ** 2 + m1 ** 2 * v0 / n0 / m0 ** 4)
+    return {
+        'n_control': n0, 'n_test': n1,
+        'control': m0, 'test': m1,
+        'diff': diff, 'ci_low': diff - q * se, 'ci_high': diff + q * se,
+        'lift': lift, 'lift_low': lift - q * lift_se, 'lift_high': lift + q * lift_se,
+        'z': z, 'p_value': _two_sided_p(z),
+    }
+
+
+def cuped_adjust(values: np.ndarray, covariate: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    """Метрика с поправкой CUPED: Y − θ(X − mean X), θ = cov(X, Y) / var(X)
+
+    θ и среднее X считаются по обеим группам вместе, поэтому поправка не
+    смещает разницу. Возвращает скорректированные значения, θ и долю
+    снижения дисперсии.
+    """
+    x_mean = covariate.mean()
+    x_centered = covariate - x_mean
+    x_var = float(np.dot(x_centered, x_centered))
+    if x_var == 0:
+        return values, 0.0, 0.0
+    theta = float(np.dot(x_centered, values - values.mean())) / x_var
+    adjusted = values - theta * x_centered
+    reduction = 1 - adjusted.var() / values.var() if values.var() > 0 else 0.0
+    return adjusted, theta, float(reduction)
+
+
+def alpha_spent(fraction: float, alpha: float, spending: str) -> float:
+    """Доля alpha, израсходованная к доле информации fraction"""
+    if fraction <= 0:
+        return 0.0
+    fraction = min(fraction, 1.0)
+    if spending == 'pocock':
+        return alpha * math.log(1 + (math.e - 1) * fraction)
+    return 2 * (1 - NORMAL.cdf(NORMAL.inv_cdf(1 - alpha / 2) / math.sqrt(fraction)))
+
+
+def sequential_boundaries(fractions: Sequence[float], alpha: float = DEFAULT_ALPHA,
+                          spending: str = 'obrien_fleming') -> List[float]:
+    """Двусторонние границы z для проверок при долях информации fractions
+
+    Граница каждой проверки подбирается так, чтобы вероятность впервые
+    пересечь ее при H0 равнялась приросту израсходованной alpha. Плотность
+    накопленной статистики на области продолжения считается численно
+    на сетке (рекурсия Армитиджа — Макферсона — Роу).
+    """
+    boundaries = []
+    spent = 0.0
+    grid = density = None
+    previous = 0.0
+    for fraction in fractions:
+        target = alpha_spent(fraction, alpha, spending) - spent
+        if grid is None:
+            bound = NORMAL.inv_cdf(1 - target / 2)
+            limit = bound * math.sqrt(fraction)
+            grid = np.linspace(-limit, limit, SEQUENTIAL_GRID)
+            density = np.exp(-grid ** 2 / (2 * fraction)) / math.sqrt(2 * math.pi * fraction)
+        else:
+            step = math.sqrt(fraction - previous)
+            weights = density * _trapezoid_weights(grid)
+
+            def crossing(b: float) -> float:
+                c = b * math.sqrt(fraction)
+                tails = _normal_cdf((-c - grid) / step) + 1 - _normal_cdf((c - grid) / step)
+                return float(np.dot(weights, tails))
+
+            low, high = 0.0, 12.0
+            for _ in range(60):
+                middle = (low + high) / 2
+                if crossing(middle) > target:
+                    low = middle
+                else:
+                    high = middle
+            bound = high
+            limit = bound * math.sqrt(fraction)
+            new_grid = np.linspace(-limit, limit, SEQUENTIAL_GRID)
+            kernel = np.exp(-(new_grid[:, None] - grid[None, :]) ** 2 / (2 * step ** 2)) / (math.sqrt(2 * math.pi) * step)
+            density = kernel @ weights
+            grid = new_grid
+        spent += target
+        previous = fraction
+        boundaries.append(bound)
+    return boundaries
+
+
+def _trapezoid_weights(grid: np.ndarray) -> np.ndarray:
+    weights = np.full(len(grid), grid[1] - grid[0])
+    weights[[0, -1]] /= 2
+    return weights
+
+
+def bootstrap_ci(control: np.ndarray, test: np.ndarray, alpha: float = DEFAULT_ALPHA,
+                 iterations: int = DEFAULT_BOOTSTRAP_ITERATIONS, seed: Optional[int] = None,
+                 buckets: int = BOOTSTRAP_BUCKETS) -> Dict[str, float]:
+    """Перцентильные бутстреп-ДИ разницы средних и относительного лифта
+
+    Единицы случайно раскладываются по корзинам (суммы и счетчики), повторная
+    выборка берется из корзин — так стоимость O(повторов × корзин) при
+    любом числе единиц. Если единиц не больше корзин, это обычный бутстреп.
+    Повторы считаются пачками, чтобы матрица индексов помещалась в память.
+    """
+    rng = np.random.default_rng(seed)
+    control_sums, control_counts = _bucketize(control, buckets, rng)
+    test_sums, test_counts = _bucketize(test, buckets, rng)
+    batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // max(len(control_sums), len(test_sums)))
+
+    diffs, lifts = [], []
+    for start in range(0, iterations, batch):
+        size = min(batch, iterations - start)
+        control_means = _resampled_means(control_sums, control_counts, size, rng)
+        test_means = _resampled_means(test_sums, test_counts, size, rng)
+        diffs.append(test_means - control_means)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lifts.append(test_means / control_means - 1)
+    diffs, lifts = np.concatenate(diffs), np.concatenate(lifts)
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    diff_low, diff_high = np.percentile(diffs, bounds)
+    lift_low, lift_high = np.nanpercentile(lifts, bounds) if np.isfinite(lifts).any() else (np.nan, np.nan)
+    return {'iterations': iterations, 'diff_low': float(diff_low), 'diff_high': float(diff_high),
+            'lift_low': float(lift_low), 'lift_high': float(lift_high)}
+
+
+def _bucketize(values: np.ndarray, buckets: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    if len(values) <= buckets:
+        return values.astype(float), np.ones(len(values))
+    ids = rng.integers(0, buckets, len(values))
+    return np.bincount(ids, weights=values, minlength=buckets), np.bincount(ids, minlength=buckets).astype(float)
+
+
+def _resampled_means(sums: np.ndarray, counts: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    index = rng.integers(0, len(sums), size=(size, len(sums)))
+    return sums[index].sum(axis=1) / counts[index].sum(axis=1)
+
+
+# --- анализ ---
+
+def analyze(spec: Dict[str, Any], data: Any) -> Dict[str, Any]:
+    """Результаты эксперимента по спецификации и данным (путь или DataFrame)"""
+    started = time.perf_counter()
+    check_spec(spec)
+    units, mixed = load_units(spec, data)
+    alpha = spec.get('alpha', DEFAULT_ALPHA)
+    group_column = spec['group']
+    groups = units[group_column].astype(str)
+    sizes = groups.value_counts().sort_index()
+    control_name = str(spec['control'])
+    if control_name not in sizes:
+        raise ValueError(f"В данных нет контрольной группы '{control_name}'")
+    sizes = pd.concat([sizes[[control_name]], sizes.drop(control_name)])
+    control_mask = (groups == control_name).to_numpy()
+
+    bootstrap = spec.get('bootstrap')
+    comparisons = []
+    for group in sizes.index:
+        if group == control_name:
+            continue
+        test_mask = (groups == group).to_numpy()
+        metrics = []
+        for metric in spec['metrics']:
+            metrics.append(_analyze_metric(units, metric, control_mask, test_mask, alpha, bootstrap))
+        comparisons.append({'group': group, 'metrics': metrics})
+
+    results = {
+        'alpha': alpha,
+        'groups': {group: int(count) for group, count in sizes.items()},
+        'control': control_name,
+        'excluded_units': mixed,
+        'comparisons': comparisons,
+    }
+    if spec.get('sequential'):
+        results['sequential'] = _sequential(spec, results)
+    results['duration'] = time.perf_counter() - started
+    return results
+
+
+def _analyze_metric(units: pd.DataFrame, metric: Dict[str, Any], control_mask: np.ndarray,
+                    test_mask: np.ndarray, alpha: float, bootstrap: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    kind = metric.get('type', 'mean')
+    values = units[metric['column']].to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(values)
+    control, test = values[control_mask & valid], values[test_mask & valid]
+    if kind == 'proportion' and not np.isin(values[valid], (0, 1)).all():
+        raise ValueError(f"Метрика-доля '{metric['column']}' должна содержать только 0 и 1")
+
+    result = {'name': metric.get('name', metric['column']), 'column': metric['column'], 'type': kind,
+              'primary': metric.get('primary', False)}
+    result.update(mean_difference(control, test, alpha, proportion=kind == 'proportion'))
+
+    covariate = metric.get('covariate')
+    if covariate:
+        x = units[covariate].to_numpy(dtype=float, na_value=np.nan)
+        both = (control_mask | test_mask) & valid & ~np.isnan(x)
+        adjusted, theta, reduction = cuped_adjust(values[both], x[both])
+        in_control = control_mask[both]
+        cuped = mean_difference(adjusted[in_control], adjusted[~in_control], alpha)
+        # Средние контроля без поправки: лифт относительно реального уровня метрики
+        base = values[both][in_control].mean()
+        if base:
+            cuped['lift'] = cuped['diff'] / base
+            scale = (cuped['ci_high'] - cuped['ci_low']) / 2 / abs(base)
+            cuped['lift_low'], cuped['lift_high'] = cuped['lift'] - scale, cuped['lift'] + scale
+        cuped.update({'covariate': covariate, 'theta': theta, 'variance_reduction': reduction})
+        result['cuped'] = cuped
+
+    if bootstrap is not None:
+        result['bootstrap'] = bootstrap_ci(control, test, alpha, bootstrap.get('iterations', DEFAULT_BOOTSTRAP_ITERATIONS),
+                                           bootstrap.get('seed'), bootstrap.get('buckets', BOOTSTRAP_BUCKETS))
+    return result
+
+
+def _sequential(spec: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """Границы проверок и решение по основной метрике на последней пройденной проверке
+
+    Проверки равномерны по доле информации: k / looks от planned_units
+    (плановое число единиц в группе).
+    """
+    settings = spec['sequential']
+    looks = settings.get('looks', 5)
+    spending = settings.get('spending', 'obrien_fleming')
+    fractions = [(k + 1) / looks for k in range(looks)]
+    boundaries = sequential_boundaries(fractions, results['alpha'], spending)
+    planned = settings.get('planned_units')
+
+    decisions = []
+    for comparison in results['comparisons']:
+        metrics = comparison['metrics']
+        primary = next((metric for metric in metrics if metric['primary']), metrics[0])
+        observed = primary.get('cuped', primary)
+        units = min(primary['n_control'], primary['n_test'])
+        fraction = min(units / planned, 1.0) if planned else 1.0
+        reached = sum(1 for value in fractions if value <= fraction + 1e-9)
+        if reached == 0:
+            decision = 'до первой проверки'
+            bound = None
+        else:
+            bound = boundaries[reached - 1]
+            if abs(observed['z']) >= bound:
+                decision = 'остановить: эффект значим'
+            elif reached == looks:
+                decision = 'завершить: эффект не значим'
+            else:
+                decision = 'продолжить'
+        decisions.append({'group': comparison['group'], 'metric': primary['name'], 'fraction': fraction,
+                          'look': reached, 'z': observed['z'], 'boundary': bound, 'decision': decision})
+    return {'looks': looks, 'spending': spending, 'fractions': fractions, 'boundaries': boundaries,
+            'nominal_alpha': [_two_sided_p(bound) for bound in boundaries], 'decisions': decisions}
+
+
+# --- документ ---
+
+def _number(value: float, digits: int = 4) -> str:
+    if value is None or not math.isfinite(value):
+        return '—'
+    return f"{value:.{digits}g}"
+
+
+def _percent(value: float) -> str:
+    return '—' if value is None or not math.isfinite(value) else f"{value * 100:+.2f}%"
+
+
+def _p_value(value: float) -> str:
+    if not math.isfinite(value):
+        return '—'
+    return '< 0.0001' if value < 1e-4 else f"{value:.4f}"
+
+
+def render_results(results: Dict[str, Any]) -> str:
+    """Раздел результатов в Markdown"""
+    alpha = results['alpha']
+    level = f"{(1 - alpha) * 100:g}%"
+    groups = ', '.join(f"{name}: {count:,}".replace(',', ' ') for name, count in results['groups'].items())
+    lines = [f"**Дата расчета:** {datetime.now().strftime('%Y-%m-%d %H:%M')}  ",
+             f"**Единиц по группам:** {groups}  "]
+    if results['excluded_units']:
+        lines.append(f"**Исключено единиц в нескольких группах:** {results['excluded_units']}  ")
+    lines.append(f"**Уровень значимости:** α = {alpha:g}")
+    lines.append('')
+
+    for comparison in results['comparisons']:
+        lines += [f"### {comparison['group']} против {results['control']}", '',
+                  f"| Метрика | Контроль | Тест | Разница | {level} ДИ разницы | Лифт | {level} ДИ лифта | p-value | Значимо |",
+                  "|---------|----------|------|---------|--------------|------|-------------|---------|---------|"]
+        for metric in comparison['metrics']:
+            rows = [(metric['name'], metric)]
+            if 'cuped' in metric:
+                rows.append((f"{metric['name']} (CUPED)", metric['cuped']))
+            for name, values in rows:
+                significant = '✅ да' if values['p_value'] < alpha else 'нет'
+                lines.append(
+                    f"| {name} | {_number(values['control'])} | {_number(values['test'])} | {_number(values['diff'])} "
+                    f"| [{_number(values['ci_low'])}; {_number(values['ci_high'])}] | {_percent(values['lift'])} "
+                    f"| [{_percent(values['lift_low'])}; {_percent(values['lift_high'])}] "
+                    f"| {_p_value(values['p_value'])} | {significant} |")
+        lines.append('')
+
+        cuped = [metric for metric in comparison['metrics'] if 'cuped' in metric]
+        if cuped:
+            lines += ["**CUPED:**", '',
+                      "| Метрика | Ковариата | θ | Снижение дисперсии |",
+                      "|---------|-----------|---|--------------------|"]
+            lines += [f"| {metric['name']} | {metric['cuped']['covariate']} | {_number(metric['cuped']['theta'])} "
+                      f"| {metric['cuped']['variance_reduction'] * 100:.1f}% |" for metric in cuped]
+            lines.append('')
+
+        boot = [metric for metric in comparison['metrics'] if 'bootstrap' in metric]
+        if boot:
+            lines += [f"**Бутстреп ({boot[0]['bootstrap']['iterations']} повторов):**", '',
+                      f"| Метрика | {level} ДИ разницы | {level} ДИ лифта |",
+                      "|---------|--------------|-------------|"]
+            lines += [f"| {metric['name']} | [{_number(metric['bootstrap']['diff_low'])}; "
+                      f"{_number(metric['bootstrap']['diff_high'])}] | [{_percent(metric['bootstrap']['lift_low'])}; "
+                      f"{_percent(metric['bootstrap']['lift_high'])}] |" for metric in boot]
+            lines.append('')
+
+    sequential = results.get('sequential')
+    if sequential:
+        names = {'obrien_fleming': "О'Брайена — Флеминга", 'pocock': 'Покока'}
+        lines += ["### Последовательный тест", '',
+                  f"Функция расходования alpha: {names[sequential['spending']]}, проверок: {sequential['looks']}", '',
+                  "| Проверка | Доля информации | Граница z | Номинальный p |",
+                  "|----------|-----------------|-----------|---------------|"]
+        lines += [f"| {number} | {fraction:.1%} | {bound:.3f} | {_p_value(nominal)} |"
+                  for number, (fraction, bound, nominal)
+                  in enumerate(zip(sequential['fractions'], sequential['boundaries'], sequential['nominal_alpha']), 1)]
+        lines += ['', "| Группа | Метрика | Доля информации | Проверка | z | Граница | Решение |",
+                  "|--------|---------|-----------------|----------|---|---------|---------|"]
+        for item in sequential['decisions']:
+            bound = '—' if item['boundary'] is None else f"{item['boundary']:.3f}"
+            lines.append(f"| {item['group']} | {item['metric']} | {item['fraction']:.1%} | {item['look']} "
+                         f"| {_number(item['z'])} | {bound} | {item['decision']} |")
+        lines.append('')
+    return '\n'.join(lines).rstrip('\n') + '\n'
+
+
+def write_results(doc_path: Path, markdown: str) -> None:
+    """Заменяет раздел между метками experiment-results (или добавляет его в конец)"""
+    doc_path = Path(doc_path)
+    text = doc_path.read_text(encoding='utf-8')
+    block = f"{RESULTS_START}\n{markdown}{RESULTS_END}"
+    start, end = text.find(RESULTS_START), text.find(RESULTS_END)
+    if start >= 0 and end > start:
+        text = text[:start] + block + text[end + len(RESULTS_END):]
+    else:
+        text = text.rstrip('\n') + f"\n\n{RESULTS_HEADING}\n\n{block}\n"
+    tmp_path = doc_path.with_name(doc_path.name + '.part')
+    tmp_path.write_text(text, encoding='utf-8')
+    tmp_path.replace(doc_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Анализ A/B эксперимента по спецификации из документа')
+    parser.add_argument('document', help='Документ эксперимента (.md) со спецификацией анализа')
+    parser.add_argument('--data', help='Файл данных (по умолчанию — из спецификации)')
+    parser.add_argument('--dry-run', action='store_true', help='Только вывести результаты, не меняя документ')
+
+    args = parser.parse_args()
+    doc_path = Path(args.document)
+    try:
+        spec = read_spec(doc_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    data_path = Path(args.data) if args.data else doc_path.parent / spec['data']
+    if not data_path.exists():
+        print(f"❌ Файл данных не найден: {data_path}")
+        return
+
+    try:
+        results = analyze(spec, data_path)
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    markdown = render_results(results)
+    if args.dry_run:
+        print(markdown)
+    else:
+        write_results(doc_path, markdown)
+        print(f"💾 Результаты записаны в {doc_path}")
+
+    for comparison in results['comparisons']:
+        for metric in comparison['metrics']:
+            mark = '✅' if metric['p_value'] < results['alpha'] else '➖'
+            print(f"{mark} {comparison['group']} / {metric['name']}: лифт {_percent(metric['lift'])}, "
+                  f"p = {_p_value(metric['p_value'])}")
+    for item in results.get('sequential', {}).get('decisions', []):
+        print(f"🧭 {item['group']}: {item['decision']}")
+    print(f"⏱️ Расчет за {results['duration']:.2f} сек")
+
+
+if __name__ == '__main__':
+    main()
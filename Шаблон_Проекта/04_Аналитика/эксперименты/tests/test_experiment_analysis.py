@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Тесты анализа A/B экспериментов"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from experiment_analysis import analyze, bootstrap_ci, mean_difference, sequential_boundaries
+
+
+@pytest.mark.parametrize('spending', ['obrien_fleming', 'pocock'])
+def test_sequential_boundaries_keep_type_one_error(spending):
+    fractions = [0.2, 0.4, 0.6, 0.8, 1.0]
+    boundaries = np.array(sequential_boundaries(fractions, 0.05, spending))
+    # Накопленная статистика при H0 — броуновское движение в моменты проверок
+    rng = np.random.default_rng(0)
+    increments = rng.standard_normal((400_000, len(fractions))) * np.sqrt(np.diff([0] + fractions))
+    z = increments.cumsum(axis=1) / np.sqrt(fractions)
+    assert (np.abs(z) >= boundaries).any(axis=1).mean() == pytest.approx(0.05, abs=0.002)
+
+
+def test_single_look_is_fixed_sample_test():
+    assert sequential_boundaries([1.0]) == [pytest.approx(1.959964, abs=1e-5)]
+
+
+def make_units(n=40_000, effect=0.5, seed=1):
+    rng = np.random.default_rng(seed)
+    before = rng.normal(10, 3, n)
+    group = np.where(rng.random(n) < 0.5, 'control', 'test')
+    revenue = before + rng.normal(0, 1, n) + effect * (group == 'test')
+    return pd.DataFrame({'user_id': np.arange(n), 'group': group, 'revenue': revenue, 'revenue_before': before,
+                         'converted': (rng.random(n) < np.where(group == 'test', 0.12, 0.10)).astype(int)})
+
+
+def test_analyze_estimates_effect_and_cuped_reduces_variance():
+    spec = {'data': 'units.csv', 'unit': 'user_id', 'group': 'group', 'control': 'control',
+            'metrics': [{'column': 'revenue', 'covariate': 'revenue_before', 'primary': True},
+                        {'column': 'converted', 'type': 'proportion'}],
+            'sequential': {'looks': 4, 'planned_units': 30_000}}
+    results = analyze(spec, make_units())
+    revenue, converted = results['comparisons'][0]['metrics']
+    assert revenue['ci_low'] < 0.5 < revenue['ci_high']
+    cuped = revenue['cuped']
+    assert cuped['ci_low'] < 0.5 < cuped['ci_high']
+    # Ковариата объясняет 9 / 10 дисперсии метрики
+    assert cuped['variance_reduction'] == pytest.approx(0.9, abs=0.01)
+    assert cuped['ci_high'] - cuped['ci_low'] < (revenue['ci_high'] - revenue['ci_low']) / 3
+    assert converted['ci_low'] < 0.02 < converted['ci_high']
+    # planned_units — на группу: около 20 000 из 30 000 единиц — вторая проверка из четырех
+    decision = results['sequential']['decisions'][0]
+    assert decision['look'] == 2 and decision['decision'] == 'остановить: эффект значим'
+
+
+def test_units_in_several_groups_are_excluded():
+    events = pd.DataFrame({'user_id': [1, 1, 2, 2, 3, 4, 5], 'group': ['a', 'a', 'a', 'b', 'b', 'a', 'b'],
+                           'revenue': [1.0, 2.0, 5.0, 5.0, 4.0, 5.0, 6.0]})
+    spec = {'data': '', 'unit': 'user_id', 'group': 'group', 'control': 'a', 'metrics': [{'column': 'revenue'}]}
+    results = analyze(spec, events)
+    assert results['excluded_units'] == 1 and results['groups'] == {'a': 2, 'b': 2}
+    assert results['comparisons'][0]['metrics'][0]['control'] == 4.0
+
+
+def test_bucketed_bootstrap_matches_normal_interval():
+    rng = np.random.default_rng(2)
+    control, test = rng.exponential(10, 200_000), rng.exponential(10.2, 200_000)
+    normal = mean_difference(control, test)
+    bootstrap = bootstrap_ci(control, test, iterations=1000, seed=3, buckets=2_000)
+    width = normal['ci_high'] - normal['ci_low']
+    assert bootstrap['diff_low'] == pytest.approx(normal['ci_low'], abs=0.1 * width)
+    assert bootstrap['diff_high'] == pytest.approx(normal['ci_high'], abs=0.1 * width)